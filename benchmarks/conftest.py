@@ -0,0 +1,149 @@
+"""
+Benchmark harness: `bench` fixture, stored baselines, regression flags.
+
+    python -m pytest benchmarks                  # time everything, compare to baseline
+    python -m pytest benchmarks --bench-save     # (re)record this machine's baseline
+    python -m pytest benchmarks --bench-strict   # fail (not just warn) on regressions
+
+Each benchmark runs one warm-up call and then `rounds` timed calls; the minimum is
+compared with benchmarks/baseline.json. Baselines are keyed by a machine tag
+(OS, arch, Python, CPU count; override with BENCH_MACHINE) and only compared on a
+matching machine, since absolute timings don't transfer. A benchmark whose minimum
+is more than --bench-tolerance (default 25%, env BENCH_TOLERANCE) above its
+baseline is reported as a regression.
+"""
+
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import warnings
+from pathlib import Path
+
+import pytest
+
+HERE = Path(__file__).resolve().parent
+for path in (HERE.parent, HERE):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+BASELINE = HERE / "baseline.json"
+
+_RESULTS = {}  # name -> {"min": s, "median": s, "rounds": n}
+
+
+class BenchmarkRegression(UserWarning):
+    """A benchmark ran slower than its stored baseline allows."""
+
+
+def machine_tag() -> str:
+    return os.getenv("BENCH_MACHINE") or (
+        f"{platform.system()}-{platform.machine()}-py{sys.version_info[0]}.{sys.version_info[1]}"
+        f"-{os.cpu_count()}cpu")
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("benchmarks")
+    group.addoption("--bench-save", action="store_true", default=False,
+                    help="Store this run's timings as the baseline for this machine")
+    group.addoption("--bench-strict", action="store_true", default=False,
+                    help="Fail benchmarks that regress past the tolerance (default: warn)")
+    group.addoption("--bench-tolerance", type=float, default=float(os.getenv("BENCH_TOLERANCE", "0.25")),
+                    help="Allowed slowdown vs baseline as a fraction (default 0.25)")
+    group.addoption("--bench-rounds", type=int, default=None,
+                    help="Override every benchmark's number of timed rounds")
+
+
+def _option(config, name, default=None):
+    try:
+        return config.getoption(name)
+    except ValueError:  # conftest not loaded at startup (pytest run from the repo root)
+        return default
+
+
+def _load_baseline() -> dict:
+    try:
+        return json.loads(BASELINE.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+class Bench:
+    """Times `fn(*args, **kwargs)`; `setup()` (untimed) may return (args, kwargs) per round."""
+
+    def __init__(self, name: str, config):
+        self.name = name
+        self.config = config
+
+    def __call__(self, fn, *args, setup=None, rounds: int = 5, warmup: int = 1, **kwargs):
+        rounds = _option(self.config, "--bench-rounds") or rounds
+
+        def _call():
+            a, kw = setup() if setup is not None else (args, kwargs)
+            start = time.perf_counter()
+            out = fn(*a, **kw)
+            return time.perf_counter() - start, out
+
+        for _ in range(warmup):
+            _call()
+        times = []
+        for _ in range(max(1, int(rounds))):
+            elapsed, out = _call()
+            times.append(elapsed)
+        _RESULTS[self.name] = {"min": min(times), "median": statistics.median(times), "rounds": len(times)}
+        self._check(_RESULTS[self.name]["min"])
+        return out
+
+    def _check(self, best: float) -> None:
+        base = _load_baseline().get(machine_tag(), {}).get(self.name)
+        if not base or _option(self.config, "--bench-save", False):
+            return
+        tol = _option(self.config, "--bench-tolerance", 0.25)
+        if best > base["min"] * (1.0 + tol):
+            msg = (f"{self.name}: {best * 1e3:.2f} ms vs baseline {base['min'] * 1e3:.2f} ms "
+                   f"(+{(best / base['min'] - 1.0) * 100:.0f}%, tolerance {tol * 100:.0f}%)")
+            if _option(self.config, "--bench-strict", False):
+                pytest.fail(msg)
+            warnings.warn(msg, BenchmarkRegression)
+
+
+@pytest.fixture
+def bench(request):
+    """Benchmark timer named after the test (module::test[param])."""
+    name = f"{Path(request.node.fspath).stem}::{request.node.name}"
+    return Bench(name, request.config)
+
+
+def pytest_sessionfinish(session, exitstatus):
+    if not _RESULTS or not _option(session.config, "--bench-save", False):
+        return
+    data = _load_baseline()
+    entries = data.setdefault(machine_tag(), {})
+    for name, res in _RESULTS.items():
+        entries[name] = {k: (round(v, 6) if isinstance(v, float) else v) for k, v in res.items()}
+    data[machine_tag()] = dict(sorted(entries.items()))
+    BASELINE.write_text(json.dumps(data, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    if not _RESULTS:
+        return
+    base = _load_baseline().get(machine_tag(), {})
+    tol = _option(config, "--bench-tolerance", 0.25)
+    tr = terminalreporter
+    tr.section(f"benchmarks ({machine_tag()})")
+    width = max(len(n) for n in _RESULTS)
+    tr.write_line(f"{'name':<{width}}  {'min ms':>10}  {'median ms':>10}  {'baseline':>10}  {'change':>8}")
+    for name, res in sorted(_RESULTS.items()):
+        ref = base.get(name, {}).get("min")
+        change, flag = "", ""
+        if ref:
+            ratio = res["min"] / ref - 1.0
+            change = f"{ratio * 100:+.0f}%"
+            flag = "  REGRESSION" if ratio > tol else ""
+        tr.write_line(f"{name:<{width}}  {res['min'] * 1e3:>10.2f}  {res['median'] * 1e3:>10.2f}  "
+                      f"{(f'{ref * 1e3:.2f}' if ref else '-'):>10}  {change:>8}{flag}")
+    if _option(config, "--bench-save", False):
+        tr.write_line(f"baseline saved to {BASELINE}")
@@ -0,0 +1,145 @@
+"""
+Record benchmark fixtures (benchmarks/fixtures/<TICKER>.json.gz).
+
+Live recording goes through the configured provider exactly like a scan
+(fetch_market_snapshot + every expiration's chain) plus 3 months of yfinance
+history for prescreen_tickers:
+
+    python benchmarks/record_fixtures.py AAPL MSFT --max-exps 16
+
+--synthetic regenerates the deterministic chains checked into the repo (no
+network; Black-Scholes quotes with a volatility smile, spreads and open interest
+that thin out away from the money) so the suite runs anywhere:
+
+    python benchmarks/record_fixtures.py --synthetic
+
+Baselines in benchmarks/baseline.json were measured against the fixtures on disk;
+re-record them (pytest benchmarks --bench-save) after changing fixtures.
+"""
+
+import argparse
+import math
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+for path in (HERE.parent, HERE):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+import numpy as np
+import pandas as pd
+
+from options_math import bs_call_price, bs_put_price
+from replay import save_fixture
+
+# ticker -> (spot, strike step, annual dividend/share, earnings in N days or None, ATM IV)
+SYNTHETIC = {
+    "SYN45": (45.30, 1.0, 0.0, None, 0.42),
+    "SYN100": (101.70, 2.5, 2.00, 52, 0.28),
+    "SYN320": (318.40, 5.0, 0.0, 38, 0.33),
+}
+
+# Weeklies through ~2 months, monthlies, and LEAPS for PMCC / synthetic collar
+SYNTHETIC_DTES = (4, 11, 18, 25, 32, 39, 46, 53, 81, 109, 172, 235, 361, 424)
+
+# Fixed so regenerated files are identical; replay shifts dates to the run day
+SYNTHETIC_RECORDED_ON = date(2025, 1, 6)
+
+
+def _synthetic_chain(rng, S, step, q, atm_iv, dte):
+    T = dte / 365.0
+    lo, hi = math.floor(S * 0.5 / step) * step, math.ceil(S * 1.5 / step) * step
+    rows = []
+    for K in np.arange(lo, hi + step / 2, step):
+        m = math.log(K / S)
+        # Put skew plus a smile that flattens with maturity
+        iv = max(0.05, atm_iv - 0.25 * m + 0.6 * m * m / max(math.sqrt(T * 12.0), 0.5))
+        distance = abs(m) / (atm_iv * math.sqrt(max(T, 1 / 365.0)))
+        oi_base = 4000.0 * math.exp(-0.6 * distance) / (1.0 + dte / 120.0)
+        for right in ("call", "put"):
+            price = (bs_call_price if right == "call" else bs_put_price)(S, K, 0.04, q, iv, T)
+            half = max(0.01, price * (0.015 + 0.02 * min(distance, 3.0)) + 0.01)
+            bid = max(0.0, round(price - half, 2))
+            ask = round(price + half, 2)
+            oi = int(oi_base * rng.uniform(0.5, 1.5))
+            rows.append({
+                "contractSymbol": f"{right[0].upper()}{K:g}",
+                "type": right, "strike": float(K),
+                "bid": bid, "ask": max(ask, bid + 0.01),
+                "lastPrice": round(price * rng.uniform(0.97, 1.03), 2),
+                "openInterest": oi, "volume": int(oi * rng.uniform(0.05, 0.9)),
+                "impliedVolatility": round(iv, 4),
+            })
+    return pd.DataFrame(rows)
+
+
+def _synthetic_history(rng, S, atm_iv, days=63):
+    rets = rng.normal(0.0, atm_iv * 0.9 / math.sqrt(252.0), days)
+    close = np.exp(np.cumsum(rets))
+    close *= S / close[-1]
+    open_ = close * np.exp(rng.normal(0.0, 0.004, days))
+    high = np.maximum(open_, close) * (1.0 + np.abs(rng.normal(0.0, 0.008, days)))
+    low = np.minimum(open_, close) * (1.0 - np.abs(rng.normal(0.0, 0.008, days)))
+    index = pd.bdate_range(end=SYNTHETIC_RECORDED_ON - timedelta(days=1), periods=days)
+    return pd.DataFrame({"Open": open_, "High": high, "Low": low, "Close": close,
+                         "Volume": rng.integers(2_000_000, 9_000_000, days).astype(float)}, index=index)
+
+
+def record_synthetic(directory=None):
+    from market_snapshot import MarketSnapshot
+
+    paths = []
+    for i, (ticker, (S, step, div, earnings_in, atm_iv)) in enumerate(SYNTHETIC.items()):
+        rng = np.random.default_rng(1000 + i)
+        q = div / S
+        exps = tuple((SYNTHETIC_RECORDED_ON + timedelta(days=d)).isoformat() for d in SYNTHETIC_DTES)
+        chains = {e: _synthetic_chain(rng, S, step, q, atm_iv, d) for e, d in zip(exps, SYNTHETIC_DTES)}
+        snap = MarketSnapshot(
+            ticker=ticker, spot=S, expirations=exps,
+            div_ps_annual=div, div_y=q,
+            next_ex_div=SYNTHETIC_RECORDED_ON + timedelta(days=24) if div else None,
+            next_ex_div_amt=div / 4.0,
+            earnings_date=None if earnings_in is None else SYNTHETIC_RECORDED_ON + timedelta(days=earnings_in),
+            chain_loader=lambda t, e: chains[e],
+        )
+        paths.append(save_fixture(ticker, snap.to_payload(), _synthetic_history(rng, S, atm_iv),
+                                  recorded_on=SYNTHETIC_RECORDED_ON, directory=directory))
+    return paths
+
+
+def record_live(tickers, max_exps=None, directory=None):
+    import yfinance as yf
+    from strategy_analysis import fetch_market_snapshot
+
+    paths = []
+    for ticker in tickers:
+        snap = fetch_market_snapshot(ticker)
+        exps = snap.expirations[:max_exps] if max_exps else snap.expirations
+        payload = snap.to_payload(exps)
+        payload["expirations"] = tuple(exps)
+        hist = yf.Ticker(ticker).history(period="3mo")
+        paths.append(save_fixture(ticker, payload, hist, directory=directory))
+    return paths
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("tickers", nargs="*", help="Tickers to record from the live provider")
+    ap.add_argument("--synthetic", action="store_true", help="Regenerate the checked-in synthetic fixtures")
+    ap.add_argument("--max-exps", type=int, default=None, help="Record only the first N expirations")
+    ap.add_argument("--out", default=None, help="Output directory (default benchmarks/fixtures)")
+    args = ap.parse_args(argv)
+    if not args.synthetic and not args.tickers:
+        ap.error("give tickers to record or --synthetic")
+
+    paths = record_synthetic(args.out) if args.synthetic else []
+    if args.tickers:
+        paths += record_live([t.upper() for t in args.tickers], args.max_exps, args.out)
+    for p in paths:
+        print(f"wrote {p} ({p.stat().st_size / 1024:.0f} KiB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+"""
+Fixture replay for the benchmark suite.
+
+A fixture is one ticker's market data recorded on a given day, stored as
+benchmarks/fixtures/<TICKER>.json.gz:
+
+    {
+      "recorded_on": "YYYY-MM-DD",
+      "snapshot": MarketSnapshot.to_payload() (column arrays as lists, dates as ISO strings),
+      "history": {"index": [...], "Open": [...], "High": [...], "Low": [...], "Close": [...], "Volume": [...]}
+    }
+
+Analyzers filter on days-to-expiration measured from today, so replay shifts every
+date in the fixture (expirations, ex-dividend, earnings, price history) by
+(today - recorded_on): a chain recorded 30 days before expiration still expires in
+30 days when it is replayed months later.
+
+    snap = load_snapshot("SYN100")                  # MarketSnapshot, never fetches
+    monkeypatch.setattr(strategy_analysis.yf, "Ticker", ReplayTicker)   # prescreen_tickers
+"""
+
+import gzip
+import json
+from collections import namedtuple
+from datetime import date, timedelta
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from market_snapshot import MarketSnapshot
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+
+HISTORY_COLUMNS = ("Open", "High", "Low", "Close", "Volume")
+
+
+# ----------------------------- Serialization -----------------------------
+
+def _iso(value):
+    if value is None:
+        return None
+    return value.isoformat() if hasattr(value, "isoformat") else str(value)
+
+
+def _date(value):
+    return None if value is None else date.fromisoformat(str(value)[:10])
+
+
+def encode_payload(payload: dict) -> dict:
+    """MarketSnapshot.to_payload() output as plain JSON types."""
+    out = dict(payload)
+    out["expirations"] = list(payload["expirations"])
+    for key in ("next_ex_div", "earnings_date"):
+        out[key] = _iso(payload.get(key))
+    chains = {}
+    for exp, packed in payload["chains"].items():
+        if packed is None:
+            chains[exp] = None
+            continue
+        cols = {}
+        for col, arr in packed["cols"].items():
+            values = np.asarray(arr)
+            if col == "type":
+                cols[col] = values.astype(str).tolist()
+            else:
+                # NaN is not JSON; None round-trips back to NaN
+                cols[col] = [None if v != v else round(float(v), 6) for v in values.tolist()]
+        chains[exp] = {"typed": bool(packed["typed"]), "cols": cols}
+    out["chains"] = chains
+    return out
+
+
+def decode_payload(data: dict, shift_days: int = 0) -> dict:
+    """Inverse of encode_payload(), moving every date forward by `shift_days`."""
+    delta = timedelta(days=int(shift_days))
+
+    def _exp(exp):
+        return (date.fromisoformat(exp) + delta).isoformat()
+
+    def _shifted(value):
+        d = _date(value)
+        return None if d is None else d + delta
+
+    chains = {}
+    for exp, packed in data["chains"].items():
+        if packed is None:
+            chains[_exp(exp)] = None
+            continue
+        cols = {col: (np.asarray(vals, dtype=str) if col == "type" else np.asarray(vals, dtype=float))
+                for col, vals in packed["cols"].items()}
+        chains[_exp(exp)] = {"typed": packed["typed"], "cols": cols}
+    return {
+        **data,
+        "expirations": tuple(_exp(e) for e in data["expirations"]),
+        "next_ex_div": _shifted(data.get("next_ex_div")),
+        "earnings_date": _shifted(data.get("earnings_date")),
+        "chains": chains,
+    }
+
+
+def encode_history(hist: pd.DataFrame) -> dict:
+    out = {"index": [pd.Timestamp(i).date().isoformat() for i in hist.index]}
+    for col in HISTORY_COLUMNS:
+        out[col] = [round(float(v), 6) for v in hist[col].to_numpy(dtype=float)]
+    return out
+
+
+def decode_history(data: dict, shift_days: int = 0) -> pd.DataFrame:
+    index = pd.DatetimeIndex(pd.to_datetime(data["index"]) + pd.Timedelta(days=int(shift_days)), name="Date")
+    return pd.DataFrame({col: np.asarray(data[col], dtype=float) for col in HISTORY_COLUMNS}, index=index)
+
+
+def save_fixture(ticker: str, payload: dict, history: pd.DataFrame, recorded_on: date | None = None,
+                 directory: Path | None = None) -> Path:
+    """Write one ticker's fixture (payload from MarketSnapshot.to_payload())."""
+    directory = Path(directory or FIXTURES_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{ticker}.json.gz"
+    data = {
+        "recorded_on": (recorded_on or date.today()).isoformat(),
+        "snapshot": encode_payload(payload),
+        "history": encode_history(history),
+    }
+    # mtime=0 keeps re-recorded synthetic fixtures byte-identical
+    with open(path, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) as fh:
+        fh.write(json.dumps(data, separators=(",", ":")).encode("utf-8"))
+    return path
+
+
+# ----------------------------- Loading -----------------------------
+
+def fixture_tickers() -> list:
+    return sorted(p.name[:-len(".json.gz")] for p in FIXTURES_DIR.glob("*.json.gz"))
+
+
+@lru_cache(maxsize=None)
+def _read(ticker: str) -> dict:
+    with gzip.open(FIXTURES_DIR / f"{ticker}.json.gz", "rt", encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def _shift(data: dict, today: date | None) -> int:
+    return ((today or date.today()) - date.fromisoformat(data["recorded_on"])).days
+
+
+@lru_cache(maxsize=None)
+def load_payload(ticker: str, today: date | None = None) -> dict:
+    """Decoded, date-shifted snapshot payload (cached; MarketSnapshot.from_payload copies nothing mutable)."""
+    data = _read(ticker)
+    return decode_payload(data["snapshot"], _shift(data, today))
+
+
+def load_snapshot(ticker: str, today: date | None = None) -> MarketSnapshot:
+    """Fresh MarketSnapshot (empty per-instance caches) replaying the fixture as of `today`."""
+    return MarketSnapshot.from_payload(load_payload(ticker, today))
+
+
+@lru_cache(maxsize=None)
+def load_history(ticker: str, today: date | None = None) -> pd.DataFrame:
+    data = _read(ticker)
+    return decode_history(data["history"], _shift(data, today))
+
+
+# ----------------------------- yfinance replay -----------------------------
+
+_OptionChain = namedtuple("Options", ["calls", "puts", "underlying"])
+
+
+class ReplayTicker:
+    """
+    Replays a fixture through the subset of the yfinance.Ticker interface that
+    prescreen_tickers and the price store use (history, options, option_chain, calendar).
+    Unknown tickers behave like yfinance for a delisted symbol (empty history).
+    """
+
+    def __init__(self, ticker: str):
+        self.ticker = str(ticker).upper()
+        self._known = (FIXTURES_DIR / f"{self.ticker}.json.gz").exists()
+
+    def history(self, period: str = "1mo", start=None, end=None, actions: bool = False, **kwargs) -> pd.DataFrame:
+        if not self._known:
+            return pd.DataFrame(columns=list(HISTORY_COLUMNS))
+        hist = load_history(self.ticker)
+        if start is not None:
+            hist = hist[hist.index >= pd.Timestamp(start)]
+        if end is not None:
+            hist = hist[hist.index < pd.Timestamp(end)]
+        hist = hist.copy()
+        if actions:
+            hist["Dividends"] = 0.0
+            hist["Stock Splits"] = 0.0
+        return hist
+
+    @property
+    def options(self) -> tuple:
+        return load_payload(self.ticker)["expirations"] if self._known else ()
+
+    def option_chain(self, expiration: str):
+        snap = load_snapshot(self.ticker)
+        calls, puts = snap.sides(expiration)
+        if calls is None or puts is None:
+            raise ValueError(f"Expiration `{expiration}` cannot be found.")
+
+        def _yf(side):
+            df = side.drop(columns=["type"], errors="ignore").copy()
+            return df.rename(columns={"oi": "openInterest", "iv": "impliedVolatility", "last": "lastPrice"})
+
+        return _OptionChain(_yf(calls), _yf(puts), {"regularMarketPrice": snap.spot})
+
+    @property
+    def calendar(self) -> dict:
+        earnings = load_payload(self.ticker)["earnings_date"] if self._known else None
+        return {"Earnings Date": [earnings]} if earnings is not None else {}
@@ -0,0 +1,53 @@
+"""Every analyzer over the replayed fixture chains (one call per ticker per round)."""
+
+import pandas as pd
+import pytest
+
+import scan_engine
+from scan_executor import STRATEGY_RUNNERS
+
+from replay import fixture_tickers, load_snapshot
+
+TICKERS = fixture_tickers()
+
+# Scan defaults with entry thresholds loose enough that every analyzer keeps rows
+# (and so runs Monte Carlo / scoring) on the synthetic chains
+BENCH_PARAMS = dict(scan_engine.DEFAULT_SCAN_PARAMS, min_roi_csp=0.08, min_otm_csp=3.0, min_poew=0.5,
+                    min_cushion=0.5, cs_min_roi=10.0, ic_min_roi=8.0, ic_min_cushion=0.3)
+
+
+@pytest.fixture(autouse=True)
+def _fixed_mc(monkeypatch):
+    # Fixed path count and seed so rounds (and machines) do the same MC work
+    monkeypatch.setenv("SCAN_MC_PATHS", "2000")
+    monkeypatch.setenv("SCAN_MC_SEED", "7")
+
+
+def _analyze_all(name, params, snaps):
+    build, run = STRATEGY_RUNNERS[name]
+    return [run(t, build(params), snap) for t, snap in snaps]
+
+
+@pytest.mark.parametrize("name", list(STRATEGY_RUNNERS))
+def test_analyzer(bench, name):
+    params = dict(BENCH_PARAMS)
+
+    def setup():
+        # Fresh snapshots: normalized sides / fill tables are rebuilt inside the timing
+        return (name, params, [(t, load_snapshot(t)) for t in TICKERS]), {}
+
+    out = bench(_analyze_all, setup=setup, rounds=3)
+    assert len(out) == len(TICKERS)
+    assert all(isinstance(df, pd.DataFrame) for df, _ in out)
+
+
+def test_scan_ticker(bench):
+    from scan_executor import scan_ticker
+
+    params = dict(BENCH_PARAMS)
+
+    def scan_all(snaps):
+        return [scan_ticker(t, params, snap) for t, snap in snaps]
+
+    out = bench(scan_all, setup=lambda: (([(t, load_snapshot(t)) for t in TICKERS],), {}), rounds=3)
+    assert len(out) == len(TICKERS)
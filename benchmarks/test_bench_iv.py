@@ -0,0 +1,31 @@
+"""implied_vol_vec over every quote of a recorded chain (all expirations, both sides)."""
+
+from datetime import date
+
+import numpy as np
+import pytest
+
+from options_math import implied_vol_vec
+from replay import fixture_tickers, load_snapshot
+
+
+def _quotes(ticker):
+    snap = load_snapshot(ticker)
+    price, K, T, is_call = [], [], [], []
+    for exp in snap.expirations:
+        days = (date.fromisoformat(exp) - date.today()).days
+        for side in snap.sides(exp):
+            mid = 0.5 * (side["bid"].to_numpy(dtype=float) + side["ask"].to_numpy(dtype=float))
+            price.append(mid)
+            K.append(side["strike"].to_numpy(dtype=float))
+            T.append(np.full(len(mid), max(days, 1) / 365.0))
+            is_call.append(side["type"].to_numpy() == "call")
+    return snap, np.concatenate(price), np.concatenate(K), np.concatenate(T), np.concatenate(is_call)
+
+
+@pytest.mark.parametrize("ticker", fixture_tickers())
+def test_implied_vol_whole_chain(bench, ticker):
+    snap, price, K, T, is_call = _quotes(ticker)
+    iv, converged = bench(implied_vol_vec, price, snap.spot, K, T, 0.04, snap.div_y, is_call, rounds=10)
+    assert iv.shape == price.shape
+    assert converged.mean() > 0.9
@@ -0,0 +1,28 @@
+"""Monte Carlo P&L at scan and detail-view path counts."""
+
+import pytest
+
+from options_math import mc_pnl, mc_pnl_batch
+
+PARAMS = {
+    "CSP": dict(S0=100.0, days=30, iv=0.30, Kp=95.0, put_premium=1.2),
+    "COLLAR": dict(S0=100.0, days=45, iv=0.25, Kc=105.0, call_premium=1.4, Kp=92.0, put_premium=0.9,
+                   div_ps_annual=1.5),
+    "IRON_CONDOR": dict(S0=100.0, days=30, iv=0.28, put_short_strike=92.0, put_long_strike=87.0,
+                        call_short_strike=108.0, call_long_strike=113.0, net_credit=1.35),
+}
+
+
+@pytest.mark.parametrize("n_paths", [1_000, 10_000, 100_000])
+@pytest.mark.parametrize("strategy", list(PARAMS))
+def test_mc_pnl(bench, strategy, n_paths):
+    # seed=None: fresh normals every call (seeded draws are memoized by mc_normals)
+    res = bench(mc_pnl, strategy, PARAMS[strategy], n_paths=n_paths, seed=None, rounds=7)
+    assert len(res["pnl_paths"]) == n_paths
+
+
+@pytest.mark.parametrize("n_paths", [1_000, 10_000])
+def test_mc_pnl_batch_50_candidates(bench, n_paths):
+    candidates = [dict(PARAMS["CSP"], Kp=80.0 + 0.4 * i, put_premium=0.2 + 0.06 * i) for i in range(50)]
+    res = bench(mc_pnl_batch, "CSP", candidates, n_paths=n_paths, seed=None, rounds=7)
+    assert len(res) == 50
@@ -0,0 +1,32 @@
+"""prescreen_tickers replayed from fixtures (yfinance history / chains / calendar, no provider).
+
+History goes through a fresh price store: the warm-up round fills it, timed rounds
+measure the every-morning case where no bars are missing.
+"""
+
+import pandas as pd
+import pytest
+
+import providers
+import strategy_analysis
+
+from replay import ReplayTicker, fixture_tickers
+
+
+@pytest.fixture(autouse=True)
+def _replay(monkeypatch, tmp_path):
+    def _no_provider():
+        raise RuntimeError("benchmarks replay yfinance fixtures only")
+
+    monkeypatch.setattr(providers, "get_provider", _no_provider)
+    monkeypatch.setattr(strategy_analysis.yf, "Ticker", ReplayTicker)
+    monkeypatch.setenv("PRICE_STORE_DIR", str(tmp_path / "price_store"))
+
+
+def test_prescreen_tickers(bench):
+    # Every fixture several times over so the worker pool has a realistic batch
+    tickers = fixture_tickers() * 8
+    out = bench(strategy_analysis.prescreen_tickers, tickers, min_price=1, max_price=10_000,
+                min_avg_volume=1, min_hv=1, max_hv=500, min_option_volume=0, rounds=3)
+    assert isinstance(out, pd.DataFrame)
+    assert set(out["Ticker"]) == set(fixture_tickers())
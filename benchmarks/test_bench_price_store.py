@@ -0,0 +1,36 @@
+"""PriceStore warm reads: a 500-symbol morning update pass and aligned close matrix."""
+
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from price_store import PriceStore
+
+SYMBOLS = [f"S{i:03d}" for i in range(500)]
+
+
+def _fetcher(symbol, start, end):
+    rng = np.random.default_rng(int(symbol[1:]))
+    idx = pd.bdate_range(start, end - timedelta(days=1))
+    close = 50.0 * np.exp(np.cumsum(rng.normal(0, 0.015, len(idx))))
+    return pd.DataFrame({"Open": close, "High": close * 1.01, "Low": close * 0.99, "Close": close,
+                         "Volume": 1e6, "Dividends": 0.0}, index=idx)
+
+
+@pytest.fixture(scope="module")
+def store(tmp_path_factory):
+    s = PriceStore(str(tmp_path_factory.mktemp("price_store")), fetcher=_fetcher, backfill_days=730, mode="on")
+    s.update_many(SYMBOLS)
+    return s
+
+
+def test_update_500_symbols_nothing_missing(bench, store):
+    appended = bench(store.update_many, SYMBOLS, rounds=3)
+    assert not any(appended.values())
+
+
+def test_closes_matrix_500x1y(bench, store):
+    mat = bench(store.closes, SYMBOLS, start=date.today() - timedelta(days=365), rounds=3)
+    assert mat.shape[1] == 500 and 240 <= len(mat) <= 262
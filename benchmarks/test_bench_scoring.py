@@ -0,0 +1,40 @@
+"""compute_unified_score over a 10k-row mixed-strategy result table."""
+
+import numpy as np
+import pandas as pd
+
+from scoring_utils import compute_unified_score
+
+
+def _rows(n=10_000, seed=3):
+    rng = np.random.default_rng(seed)
+    strike = rng.uniform(20.0, 400.0, n)
+    credit = strike * rng.uniform(0.003, 0.03, n)
+    df = pd.DataFrame({
+        "Strike": strike,
+        "Premium": credit,
+        "ROI%_ann": rng.uniform(-5.0, 80.0, n),
+        "MC_ExpectedPnL": rng.normal(20.0, 60.0, n),
+        "MC_ROI_ann%": rng.normal(25.0, 30.0, n),
+        "MC_PnL_p5": -strike * rng.uniform(2.0, 40.0, n),
+        "Spread%": rng.uniform(0.5, 25.0, n),
+        "Volume": rng.integers(0, 5000, n).astype(float),
+        "OI": rng.integers(0, 20000, n).astype(float),
+        "CushionSigma": rng.uniform(-0.5, 3.5, n),
+    })
+    # Spread / condor rows carry a width and net credit instead of a single strike's collateral
+    spread = rng.random(n) < 0.4
+    df["Width"] = np.where(spread, rng.choice([1.0, 2.5, 5.0, 10.0], n), np.nan)
+    df["NetCredit"] = np.where(spread, df["Width"] * rng.uniform(0.1, 0.4, n), np.nan)
+    df["MaxLoss"] = np.where(spread, (df["Width"] - df["NetCredit"]) * 100.0, np.nan)
+    # Missing data the scorer has to tolerate
+    for col in ("MC_PnL_p5", "Spread%", "CushionSigma"):
+        df.loc[rng.random(n) < 0.05, col] = np.nan
+    return df
+
+
+def test_compute_unified_score_10k(bench):
+    df = _rows()
+    scores = bench(compute_unified_score, df, rounds=3)
+    assert len(scores) == len(df)
+    assert scores.between(0.0, 1.0).all()
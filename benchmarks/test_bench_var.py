@@ -0,0 +1,66 @@
+"""calculate_portfolio_var on 50 / 500 position books: historical replay and Monte Carlo."""
+
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from options_math import bs_call_price, bs_put_price
+from risk_metrics.var_calculator import calculate_portfolio_var
+
+
+def _book(n_positions, seed=11):
+    """(positions, historical_prices): ~one underlying per 5 positions, 2 years of daily closes."""
+    rng = np.random.default_rng(seed)
+    n_symbols = max(1, n_positions // 5)
+    symbols = [f"S{i:03d}" for i in range(n_symbols)]
+    spots = rng.uniform(20.0, 400.0, n_symbols)
+    vols = rng.uniform(0.18, 0.60, n_symbols)
+    # Correlated daily returns through one market factor
+    market = rng.normal(0.0, 0.01, 504)
+    rets = market[:, None] * rng.uniform(0.5, 1.5, n_symbols) + rng.normal(0.0, 1.0, (504, n_symbols)) * (
+        vols / np.sqrt(252.0))
+    closes = spots * np.exp(np.cumsum(rets, axis=0) - np.cumsum(rets, axis=0)[-1])
+    prices = pd.DataFrame(closes, columns=symbols, index=pd.bdate_range(end=date.today(), periods=504))
+
+    positions = []
+    today = date.today()
+    for i in range(n_positions):
+        j = int(rng.integers(n_symbols))
+        S, sigma = float(spots[j]), float(vols[j])
+        kind = ("STOCK", "CALL", "PUT")[i % 3]
+        if kind == "STOCK":
+            qty = float(rng.integers(10, 500))
+            positions.append({"symbol": symbols[j], "quantity": qty, "underlying_price": S,
+                              "position_type": "STOCK", "market_value": qty * S})
+            continue
+        days = int(rng.integers(7, 120))
+        K = round(S * float(rng.uniform(0.85, 1.15)), 1)
+        T = days / 365.0
+        price = (bs_call_price if kind == "CALL" else bs_put_price)(S, K, 0.03, 0.0, sigma, T)
+        qty = float(rng.choice([-5, -3, -1, 1, 2]))
+        positions.append({
+            "symbol": symbols[j], "quantity": qty, "underlying_price": S, "position_type": kind,
+            "option_price": price, "strike": K, "delta": 0.5,
+            "expiration": (today + timedelta(days=days)).isoformat(),
+            "market_value": qty * price * 100.0,
+        })
+    return positions, prices
+
+
+@pytest.mark.parametrize("horizon", [1, 10])
+@pytest.mark.parametrize("n_positions", [50, 500])
+def test_calculate_portfolio_var(bench, n_positions, horizon):
+    positions, prices = _book(n_positions)
+    res = bench(calculate_portfolio_var, positions, prices, confidence_level=0.95,
+                time_horizon_days=horizon, method="historical", rounds=3)
+    assert res.var_amount >= 0.0
+
+
+@pytest.mark.parametrize("n_paths", [20_000, 100_000])
+def test_monte_carlo_var_400_legs_10d_99(bench, n_paths):
+    positions, prices = _book(400)
+    res = bench(calculate_portfolio_var, positions, prices, confidence_level=0.99, time_horizon_days=10,
+                method="monte_carlo", n_paths=n_paths, seed=1, rounds=3)
+    assert res.data_points == n_paths
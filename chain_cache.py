@@ -0,0 +1,179 @@
+"""
+Persistent Market-Data Cache
+
+Disk-backed layer under the in-process caches in data_fetching (st.cache_data or the
+headless TTL cache), so restarts of the app, the scan CLI and the dev scripts don't
+refetch everything, and scans can be replayed against identical data.
+
+Entries are keyed by (provider, symbol, kind, key, fetch-time bucket):
+
+    <dir>/<provider>/<SYMBOL>/<kind>/<key>@<bucket>.arrow   (DataFrames, Arrow IPC)
+    <dir>/<provider>/<SYMBOL>/<kind>/<key>@<bucket>.json    (prices, expirations, metadata)
+
+where bucket = floor(fetch_time / ttl). DataFrames are read through a memory map.
+
+Modes (CHAIN_CACHE_MODE):
+  - "off" (default): no disk access
+  - "readwrite": serve entries from the current TTL bucket, write new fetches
+  - "replay": serve the newest entry regardless of age and never call the fetcher;
+    a missing entry raises ReplayMiss (no network access)
+
+Other knobs: CHAIN_CACHE_DIR (default ./.chain_cache), CHAIN_CACHE_TTL seconds
+(default 300). Arrow files need pyarrow (in requirements.txt); without it DataFrames are
+not cached and a RuntimeWarning says so, since replay would otherwise just miss.
+"""
+
+import os
+import glob
+import json
+import time
+import functools
+import warnings
+
+import pandas as pd
+
+
+class ReplayMiss(LookupError):
+    """Replay mode has no cached entry for the request."""
+
+
+def get_cache_config() -> dict:
+    """Resolve mode/dir/ttl from env vars (read on every call so tests/CLI can flip them)."""
+    mode = str(os.getenv("CHAIN_CACHE_MODE", "off")).strip().lower()
+    if mode not in ("off", "readwrite", "replay"):
+        mode = "off"
+    try:
+        ttl = max(1.0, float(os.getenv("CHAIN_CACHE_TTL", "300")))
+    except Exception:
+        ttl = 300.0
+    return {"mode": mode, "dir": os.getenv("CHAIN_CACHE_DIR") or ".chain_cache", "ttl": ttl}
+
+
+# ----------------------------- Storage -----------------------------
+
+def _safe(part) -> str:
+    return str(part).replace(os.sep, "_").replace("/", "_").replace("@", "_") or "_"
+
+
+def _entry_base(cfg: dict, kind: str, provider: str, symbol: str, key: str) -> str:
+    return os.path.join(cfg["dir"], _safe(provider), _safe(str(symbol).upper()), _safe(kind), _safe(key or "_"))
+
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.ipc  # noqa: F401
+    except ImportError:
+        warnings.warn("pyarrow is not installed; option chains are not stored in or read from "
+                      "the disk cache (CHAIN_CACHE_MODE)", RuntimeWarning, stacklevel=3)
+        raise
+    return pa
+
+
+def _write_frame(path: str, df: pd.DataFrame):
+    pa = _pyarrow()
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    with pa.OSFile(path, "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+
+def _read_frame(path: str) -> pd.DataFrame:
+    pa = _pyarrow()
+    with pa.memory_map(path, "r") as source:
+        return pa.ipc.open_file(source).read_all().to_pandas()
+
+
+def _cacheable(value) -> bool:
+    if value is None:
+        return False
+    if isinstance(value, pd.DataFrame):
+        return not value.empty
+    if isinstance(value, float):
+        return value == value
+    if isinstance(value, (list, tuple, dict)):
+        return len(value) > 0
+    return True
+
+
+def store(kind: str, provider: str, symbol: str, key: str, value, *, now: float | None = None) -> bool:
+    """Persist `value` (DataFrame or JSON-serializable) in the current bucket. Returns True if written."""
+    cfg = get_cache_config()
+    if cfg["mode"] != "readwrite" or not _cacheable(value):
+        return False
+    bucket = int((time.time() if now is None else now) // cfg["ttl"])
+    base = _entry_base(cfg, kind, provider, symbol, key)
+    is_frame = isinstance(value, pd.DataFrame)
+    path = f"{base}@{bucket}.{'arrow' if is_frame else 'json'}"
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if is_frame:
+            _write_frame(tmp, value)
+        else:
+            with open(tmp, "w", encoding="utf-8") as fh:
+                json.dump(value, fh)
+        os.replace(tmp, path)  # atomic: readers never see partial files
+        return True
+    except Exception:
+        try:
+            os.remove(tmp)
+        except Exception:
+            pass
+        return False
+
+
+def load(kind: str, provider: str, symbol: str, key: str = "", *, now: float | None = None):
+    """
+    Cached value or None. readwrite: current bucket only; replay: newest bucket
+    (raises ReplayMiss if there is none); off: always None.
+    """
+    cfg = get_cache_config()
+    if cfg["mode"] == "off":
+        return None
+    base = _entry_base(cfg, kind, provider, symbol, key)
+    if cfg["mode"] == "replay":
+        paths = [p for p in glob.glob(glob.escape(base) + "@*") if not p.endswith(".tmp")]
+        if not paths:
+            raise ReplayMiss(f"No cached {kind} for {provider}/{symbol} {key}".rstrip())
+        path = max(paths, key=lambda p: int(p.rsplit("@", 1)[1].split(".", 1)[0]))
+    else:
+        bucket = int((time.time() if now is None else now) // cfg["ttl"])
+        path = None
+        for ext in ("arrow", "json"):
+            if os.path.exists(f"{base}@{bucket}.{ext}"):
+                path = f"{base}@{bucket}.{ext}"
+                break
+        if path is None:
+            return None
+    try:
+        if path.endswith(".arrow"):
+            return _read_frame(path)
+        with open(path, "r", encoding="utf-8") as fh:
+            return json.load(fh)
+    except Exception:
+        if cfg["mode"] == "replay":
+            raise ReplayMiss(f"Unreadable cache entry {path}")
+        return None
+
+
+def disk_cached(kind: str, provider=None):
+    """
+    Decorator for fetchers called as fn(symbol, *key_parts). `provider` is a name or a
+    zero-arg callable returning the active provider name (part of the key).
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(symbol, *args):
+            if get_cache_config()["mode"] == "off":
+                return fn(symbol, *args)
+            prov = provider() if callable(provider) else (provider or "default")
+            key = "_".join(str(a) for a in args)
+            hit = load(kind, prov, symbol, key)
+            if hit is not None:
+                return hit
+            value = fn(symbol, *args)
+            store(kind, prov, symbol, key, value)
+            return value
+        return wrapper
+    return decorator
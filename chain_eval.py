@@ -0,0 +1,327 @@
+"""
+Vectorized Chain Evaluation
+
+Shared columnar stage used by every analyzer in strategy_analysis.py. An option
+chain is normalized once (provider-specific column names coalesced into a fixed
+set of float columns) and the per-contract quantities the analyzers filter on are
+computed as NumPy arrays instead of row-by-row with iterrows():
+
+- effective fill price (credit for short legs, debit for long legs); both sides
+  come from one fill-price table per chain (see fill_table), which MarketSnapshot
+  memoizes so every analyzer shares it
+- IV normalized to decimal, plus the IV actually used for pricing (backed out of
+  the quote when the provider sent none, see solve_missing_iv)
+- Black-Scholes d1/d2, delta, gamma, theta (per day)
+- probability of expiring worthless, expected move, cushion (sigmas), OTM%
+- bid/ask spread% relative to the fill price
+
+Analyzers then apply their filters as boolean masks and only iterate over the
+surviving candidates for the per-trade work (scoring, Monte Carlo, risk checks).
+Every array here is element-for-element equivalent to the scalar helpers in
+options_math.py / utils.py so scan results do not change.
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from options_math import _norm_cdf, bs_greeks, implied_vol_vec
+from utils import fill_price_table, _int_like_array
+
+
+# Column aliases seen across yfinance / Polygon / Schwab chains (first match wins)
+STRIKE_KEYS = ["strike", "Strike", "k", "K"]
+BID_KEYS = ["bid", "Bid", "b"]
+ASK_KEYS = ["ask", "Ask", "a"]
+LAST_KEYS = ["lastPrice", "last", "mark", "mid"]
+OI_KEYS = ["openInterest", "oi", "open_interest", "OI"]
+VOLUME_KEYS = ["volume", "Volume", "vol"]
+IV_KEYS = ["impliedVolatility", "iv", "IV"]
+
+NORMALIZED_COLUMNS = ["type", "strike", "bid", "ask", "last", "oi", "volume", "iv"]
+
+
+# ----------------------------- Normalization -----------------------------
+
+def _coalesce(df: pd.DataFrame, keys: list) -> np.ndarray:
+    """Column-wise equivalent of _get_num_from_row: first non-NaN numeric value across keys."""
+    out = np.full(len(df), np.nan, dtype=float)
+    for k in keys:
+        if k not in df.columns:
+            continue
+        col = df[k]
+        if isinstance(col, pd.DataFrame):  # duplicated column labels
+            col = col.iloc[:, 0]
+        vals = pd.to_numeric(col, errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+        fill = np.isnan(out)
+        if not fill.any():
+            break
+        out[fill] = vals[fill]
+    return out
+
+
+def normalize_chain(chain: pd.DataFrame, right: str | None = None) -> pd.DataFrame:
+    """
+    Normalize a raw provider chain into fixed float columns.
+
+    Args:
+        chain: Raw chain DataFrame (calls and/or puts)
+        right: Optional "call"/"put" to keep only that side. When the chain has no
+            'type' column the whole chain is returned (legacy fallback).
+
+    Returns:
+        DataFrame with columns type, strike, bid, ask, last, oi, volume, iv and a
+        fresh RangeIndex. Missing values are NaN; iv is decimal (vol points / 100).
+    """
+    if chain is None or len(chain) == 0:
+        return pd.DataFrame(columns=NORMALIZED_COLUMNS)
+    if "type" in chain.columns:
+        typ = chain["type"].astype(str).str.lower()
+        if right is not None:
+            keep = (typ == right).to_numpy()
+            chain = chain.loc[keep]
+            typ = typ.loc[keep]
+        typ_arr = typ.to_numpy()
+    else:
+        typ_arr = np.full(len(chain), right or "", dtype=object)
+
+    iv_raw = _coalesce(chain, IV_KEYS)
+    with np.errstate(invalid="ignore"):
+        iv = np.where(iv_raw > 3.0, iv_raw / 100.0, iv_raw)
+
+    return pd.DataFrame({
+        "type": typ_arr,
+        "strike": _coalesce(chain, STRIKE_KEYS),
+        "bid": _coalesce(chain, BID_KEYS),
+        "ask": _coalesce(chain, ASK_KEYS),
+        "last": _coalesce(chain, LAST_KEYS),
+        "oi": _coalesce(chain, OI_KEYS),
+        "volume": _coalesce(chain, VOLUME_KEYS),
+        "iv": iv,
+    })
+
+
+def split_chain(chain: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Return (calls, puts) normalized frames; both are the full chain if 'type' is absent."""
+    if chain is not None and "type" in getattr(chain, "columns", []):
+        return normalize_chain(chain, "call"), normalize_chain(chain, "put")
+    full = normalize_chain(chain)
+    return full, full.copy()
+
+
+def pricing_aggressiveness() -> str | None:
+    """
+    Fill-aggressiveness preset: the UI preset if a Streamlit session is active (never
+    imports streamlit), else the PRICING_AGGRESSIVENESS env var (used by scan workers).
+    """
+    st = sys.modules.get("streamlit")
+    if st is not None:
+        try:
+            preset = st.session_state.get("pricing_aggressiveness")
+            if preset:
+                return preset
+        except Exception:
+            pass
+    return os.getenv("PRICING_AGGRESSIVENESS") or None
+
+
+# ----------------------------- Fill prices -----------------------------
+
+def fill_table(chain: pd.DataFrame, *, dte=None, use_volume: bool = True,
+               aggressiveness: str | None = None) -> pd.DataFrame:
+    """
+    alpha / credit_fill / debit_fill for every row of a normalized chain (row-aligned).
+
+    Args:
+        chain: Normalized chain (see normalize_chain)
+        dte: Days to expiration passed to the fill model (None = no DTE overlay)
+        use_volume: Whether the fill model sees option volume
+        aggressiveness: Fill aggressiveness preset (defaults to the UI preset)
+    """
+    if aggressiveness is None:
+        aggressiveness = pricing_aggressiveness()
+    vol_i = _int_like_array(chain["volume"].to_numpy(dtype=float)) if use_volume else None
+    return fill_price_table(chain["bid"].to_numpy(dtype=float), chain["ask"].to_numpy(dtype=float),
+                           chain["last"].to_numpy(dtype=float),
+                           oi=_int_like_array(chain["oi"].to_numpy(dtype=float)), volume=vol_i,
+                           dte=dte, aggressiveness=aggressiveness)
+
+
+# ----------------------------- Per-contract metrics -----------------------------
+
+def iv_for_calc(iv, default: float = 0.20) -> np.ndarray:
+    """IV used for pricing: decimal IV when positive, otherwise the default."""
+    iv = np.asarray(iv, dtype=float)
+    with np.errstate(invalid="ignore"):
+        return np.where(iv > 0.0, iv, default)
+
+
+def solve_missing_iv(iv, *, bid, ask, last, S: float, K, T: float, r: float = 0.0, q: float = 0.0,
+                     right: str = "put") -> np.ndarray:
+    """
+    Decimal IV with missing / non-positive entries implied from the quote (bid/ask mid,
+    else last) in one vectorized solve; entries with no quote or no solution stay NaN.
+    """
+    iv = np.array(iv, dtype=float)
+    with np.errstate(invalid="ignore"):
+        missing = ~(iv > 0.0)
+        if not missing.any() or not T > 0:
+            return iv
+        bid = np.asarray(bid, dtype=float)[missing]
+        ask = np.asarray(ask, dtype=float)[missing]
+        last = np.asarray(last, dtype=float)[missing]
+        price = np.where((bid > 0) & (ask > 0), 0.5 * (bid + ask), np.where(last > 0, last, np.nan))
+    solved, converged = implied_vol_vec(price, S, np.asarray(K, dtype=float)[missing], T, r, q,
+                                        str(right).lower() == "call")
+    iv[missing] = np.where(converged, solved, np.nan)
+    return iv
+
+
+def spread_pct_array(bid, ask, mid) -> np.ndarray:
+    """Array version of compute_spread_pct; NaN replaces None (unknown => don't auto-reject)."""
+    bid = np.asarray(bid, dtype=float)
+    ask = np.asarray(ask, dtype=float)
+    mid = np.asarray(mid, dtype=float)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ok = (bid > 0) & (ask > 0) & (mid > 0)
+        return np.where(ok, (ask - bid) / mid * 100.0, np.nan)
+
+
+def evaluate_chain(chain: pd.DataFrame, *, S: float, T: float, r: float = 0.0, q: float = 0.0,
+                   right: str = "put", fill: str = "credit", dte=None,
+                   iv_default: float = 0.20, use_volume: bool = True,
+                   aggressiveness: str | None = None, fills: pd.DataFrame | None = None,
+                   solve_iv: bool = True) -> pd.DataFrame:
+    """
+    Compute all per-contract metrics for one side of one expiration.
+
+    Args:
+        chain: Normalized chain (see normalize_chain)
+        S: Spot price
+        T: Time to expiration in years
+        r, q: Risk-free rate and continuous dividend yield
+        right: "put" or "call" (sign conventions for delta/theta/POEW/cushion)
+        fill: "credit" (short leg) or "debit" (long leg) effective fill price
+        dte: Days to expiration passed to the fill model (None = no DTE overlay)
+        iv_default: IV used when the quote has no positive IV (and none can be implied)
+        use_volume: Whether the fill model sees option volume
+        aggressiveness: Fill aggressiveness preset (defaults to the UI preset)
+        fills: Precomputed fill_table for `chain` built with the same dte/use_volume/
+            aggressiveness (e.g. MarketSnapshot.fills); computed here when omitted
+        solve_iv: Imply IV from the quote for rows the provider sent without one
+
+    Returns:
+        Copy of `chain` with extra float columns: oi_i, volume_i (integer-valued,
+        missing -> 0), iv_calc, alpha, credit_fill, debit_fill, prem (the `fill`
+        side), spread_pct, d1, d2, delta, gamma, theta, exp_move, otm_pct,
+        cushion, poew.
+    """
+    ev = chain.copy()
+    if fills is None or len(fills) != len(ev):
+        fills = fill_table(ev, dte=dte, use_volume=use_volume, aggressiveness=aggressiveness)
+
+    K = ev["strike"].to_numpy(dtype=float)
+    bid = ev["bid"].to_numpy(dtype=float)
+    ask = ev["ask"].to_numpy(dtype=float)
+    last = ev["last"].to_numpy(dtype=float)
+    oi_i = _int_like_array(ev["oi"].to_numpy(dtype=float))
+    vol_i = _int_like_array(ev["volume"].to_numpy(dtype=float))
+    iv = ev["iv"].to_numpy(dtype=float)
+    if solve_iv:
+        iv = solve_missing_iv(iv, bid=bid, ask=ask, last=last, S=S, K=K, T=T, r=r, q=q, right=right)
+    sigma = iv_for_calc(iv, iv_default)
+
+    credit_fill = fills["credit_fill"].to_numpy(dtype=float)
+    debit_fill = fills["debit_fill"].to_numpy(dtype=float)
+    prem = credit_fill if fill == "credit" else debit_fill
+
+    g = bs_greeks(S, K, r, sigma, T, q)
+    d1, d2 = g["d1"], g["d2"]
+    is_call = str(right).lower() == "call"
+    with np.errstate(invalid="ignore", divide="ignore", over="ignore"):
+        sqrt_t = np.sqrt(T) if T > 0 else np.nan
+        if is_call:
+            delta, theta = g["call_delta"], g["call_theta"]
+            poew = _norm_cdf(-d2)
+            otm_pct = (K - S) / S * 100.0
+            dist = K - S
+        else:
+            delta, theta = g["put_delta"], g["put_theta"]
+            poew = _norm_cdf(d2)
+            otm_pct = (S - K) / S * 100.0
+            dist = S - K
+        exp_move = S * sigma * sqrt_t
+        cushion = np.where(exp_move > 0, dist / exp_move, np.nan)
+
+    ev["oi_i"] = oi_i
+    ev["volume_i"] = vol_i
+    ev["iv_calc"] = sigma
+    ev["alpha"] = fills["alpha"].to_numpy(dtype=float)
+    ev["credit_fill"] = credit_fill
+    ev["debit_fill"] = debit_fill
+    ev["prem"] = prem
+    ev["spread_pct"] = spread_pct_array(bid, ask, prem)
+    ev["d1"] = d1
+    ev["d2"] = d2
+    ev["delta"] = delta
+    ev["gamma"] = g["gamma"]
+    ev["theta"] = theta
+    ev["exp_move"] = exp_move
+    ev["otm_pct"] = otm_pct
+    ev["cushion"] = cushion
+    ev["poew"] = poew
+    return ev
+
+
+class StrikeIndex:
+    """
+    Sorted view of one chain side's strikes for O(log n) leg lookups.
+
+    find() returns the same position first_index_near would (the first strike in
+    chain order within `tol` of the target; missing strikes count as 0) for any
+    array of targets at once, e.g. every (short strike, width) pair of a vertical.
+    """
+
+    def __init__(self, strikes):
+        k = np.nan_to_num(np.asarray(strikes, dtype=float), nan=0.0)
+        self.order = np.argsort(k, kind="stable")
+        self.sorted = k[self.order]
+
+    def find(self, targets, tol: float = 0.5) -> np.ndarray:
+        """Chain positions (same shape as targets) of the matching strike, -1 where none."""
+        t = np.asarray(targets, dtype=float)
+        lo = np.searchsorted(self.sorted, t - tol, side="right")
+        hi = np.searchsorted(self.sorted, t + tol, side="left")
+        out = np.full(t.shape, -1, dtype=np.intp)
+        hit = hi > lo
+        out[hit] = self.order[lo[hit]]
+        # Several strikes inside the window (sub-$1 strike grids): first in chain order wins
+        for f in np.flatnonzero((hi - lo).ravel() > 1):
+            out.flat[f] = self.order[lo.flat[f]:hi.flat[f]].min()
+        return out
+
+
+def spread_widths(width) -> np.ndarray:
+    """Vertical widths to scan: a number or a sequence of numbers (positive, de-duplicated, in order)."""
+    vals = np.atleast_1d(np.asarray(width, dtype=float)).ravel()
+    vals = vals[np.isfinite(vals) & (vals > 0)]
+    _, first = np.unique(vals, return_index=True)
+    return vals[np.sort(first)]
+
+
+def first_index_near(strikes: np.ndarray, target: float, tol: float = 0.5) -> int | None:
+    """Position of the first strike within `tol` of target (missing strikes count as 0), else None."""
+    k = np.nan_to_num(np.asarray(strikes, dtype=float), nan=0.0)
+    hits = np.flatnonzero(np.abs(k - float(target)) < tol)
+    return int(hits[0]) if hits.size else None
+
+
+def nan_to_none(x):
+    """Convert NaN spread/float back to None (matches compute_spread_pct's unknown marker)."""
+    try:
+        x = float(x)
+    except Exception:
+        return None
+    return x if x == x else None
@@ -5,75 +5,148 @@ This module contains data fetching functions that are used by both strategy_lab.
 and strategy_analysis.py. By placing them here, we avoid circular import issues.
 
 These functions include Streamlit caching decorators and provider fallback logic.
+Streamlit is only used when it is already loaded (i.e. inside the app); headless
+callers (scan_engine CLI, scan workers) get an in-process TTL cache instead and never
+pay the Streamlit import. Below that, fetchers go through the optional on-disk cache
+(chain_cache; CHAIN_CACHE_MODE=readwrite|replay), and every network call takes a token
+from the provider's process-wide rate limiter and is retried on 429/5xx
+(providers.rate_limit). A provider whose circuit breaker is open is skipped without a
+request (straight to the fallback), and inside a scan every request is a cancellation
+checkpoint; fallbacks are recorded as degraded data for the scan report (scan_control).
 """
 
-import streamlit as st
+import sys
+import copy
+import time
+import threading
+import functools
 import pandas as pd
 import numpy as np
 import yfinance as yf
 from datetime import datetime, timedelta
 
+from chain_cache import disk_cached
+from providers.rate_limit import get_rate_limiter, get_circuit_breaker, call_with_retry
+from scan_control import checkpoint, note_degraded
+from scan_profile import timer
+
+
+def _ttl_cache_data(ttl=None, show_spinner=False):
+    """
+    Minimal stand-in for st.cache_data outside Streamlit: per-argument results cached
+    for `ttl` seconds, copies returned to callers, exceptions not cached. Exposes
+    .clear() and __wrapped__ like the Streamlit decorator.
+    """
+    def decorator(fn):
+        store = {}
+        lock = threading.Lock()
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+            now = time.monotonic()
+            with lock:
+                hit = store.get(key)
+            if hit is not None and (ttl is None or now - hit[0] < ttl):
+                return copy.copy(hit[1])
+            value = fn(*args, **kwargs)
+            with lock:
+                store[key] = (now, value)
+            return copy.copy(value)
+
+        wrapper.clear = store.clear
+        return wrapper
+    return decorator
+
+
+if "streamlit" in sys.modules:
+    import streamlit as st
+    _cache_data = st.cache_data
+else:
+    _cache_data = _ttl_cache_data
+
+
 # Import provider globals (these will be set by strategy_lab.py)
 # Using late binding to avoid import order issues
 def _get_providers():
-    """Get provider globals from strategy_lab if available"""
-    try:
-        from strategy_lab import POLY, USE_POLYGON, PROVIDER_SYSTEM_AVAILABLE, PROVIDER
-        return POLY, USE_POLYGON, PROVIDER_SYSTEM_AVAILABLE, PROVIDER
-    except ImportError:
+    """Get provider globals from strategy_lab if it is loaded (never imports the UI script)"""
+    sl = sys.modules.get("strategy_lab")
+    if sl is None:
         return None, False, False, "yfinance"
+    return (getattr(sl, "POLY", None), getattr(sl, "USE_POLYGON", False),
+            getattr(sl, "PROVIDER_SYSTEM_AVAILABLE", False), getattr(sl, "PROVIDER", "yfinance"))
+
+def _provider_call(name, fn, *args, **kwargs):
+    """One provider request: scan checkpoint, profile timer, rate limit, circuit breaker, retry on 429/5xx."""
+    checkpoint()
+    with timer("request", provider=name):
+        return call_with_retry(fn, *args, limiter=get_rate_limiter(name), breaker=get_circuit_breaker(name), **kwargs)
+
+
+def _legacy_provider_name():
+    POLY, USE_POLYGON, _, _ = _get_providers()
+    return "polygon" if (USE_POLYGON and POLY) else "yfinance"
+
+
+def _chain_provider_name():
+    provider = _get_chain_provider()
+    return type(provider).__name__.lower().replace("provider", "") or "default"
+
 
-@st.cache_data(ttl=60, show_spinner=False)
+@_cache_data(ttl=60, show_spinner=False)
+@disk_cached("price", provider=_legacy_provider_name)
 def fetch_price(ticker):
     """Fetch current stock price with provider fallback"""
     POLY, USE_POLYGON, PROVIDER_SYSTEM_AVAILABLE, PROVIDER = _get_providers()
     
     if USE_POLYGON and POLY:
         try:
-            return float(POLY.last_price(ticker))
-        except Exception:
-            pass
+            return float(_provider_call("polygon", POLY.last_price, ticker))
+        except Exception as e:
+            note_degraded("polygon", e)
     
     # Fallback to yfinance
     stock = yf.Ticker(ticker)
-    hist = stock.history(period="1d")
+    hist = _provider_call("yfinance", stock.history, period="1d")
     if hist.empty:
         raise ValueError(f"No price data for {ticker}")
     return float(hist['Close'].iloc[-1])
 
-@st.cache_data(ttl=300, show_spinner=False)
+@_cache_data(ttl=300, show_spinner=False)
+@disk_cached("expirations", provider=_legacy_provider_name)
 def fetch_expirations(ticker):
     """Fetch available option expirations with provider fallback"""
     POLY, USE_POLYGON, PROVIDER_SYSTEM_AVAILABLE, PROVIDER = _get_providers()
     
     if USE_POLYGON and POLY:
         try:
-            return POLY.expirations(ticker)
-        except Exception:
-            pass
+            return _provider_call("polygon", POLY.expirations, ticker)
+        except Exception as e:
+            note_degraded("polygon", e)
     
     # Fallback to yfinance
     stock = yf.Ticker(ticker)
-    exps = stock.options
+    exps = _provider_call("yfinance", lambda: stock.options)
     if not exps:
         raise ValueError(f"No expirations for {ticker}")
     return list(exps)
 
-@st.cache_data(ttl=120, show_spinner=False)
+@_cache_data(ttl=120, show_spinner=False)
+@disk_cached("chain", provider=_legacy_provider_name)
 def fetch_chain(ticker, expiration):
     """Fetch option chain with provider fallback"""
     POLY, USE_POLYGON, PROVIDER_SYSTEM_AVAILABLE, PROVIDER = _get_providers()
     
     if USE_POLYGON and POLY:
         try:
-            return POLY.chain_snapshot_df(ticker, expiration)
-        except Exception:
-            pass
+            return _provider_call("polygon", POLY.chain_snapshot_df, ticker, expiration)
+        except Exception as e:
+            note_degraded("polygon", e)
     
     # Fallback to yfinance
     stock = yf.Ticker(ticker)
     try:
-        chain = stock.option_chain(expiration)
+        chain = _provider_call("yfinance", stock.option_chain, expiration)
     except Exception as e:
         raise ValueError(f"No chain for {ticker} {expiration}: {e}")
     
@@ -102,6 +175,55 @@ def fetch_chain(ticker, expiration):
     
     return df
 
+# Options provider used for bulk chain requests. Inside the app this is strategy_lab's
+# PROVIDER_INSTANCE; headless callers register one explicitly (never auto-created, so a
+# cron scan can't block on an interactive OAuth flow).
+_CHAIN_PROVIDER = None
+
+
+def set_chain_provider(provider):
+    """Register an OptionsProvider for fetch_chain_range (None to unregister)."""
+    global _CHAIN_PROVIDER
+    _CHAIN_PROVIDER = provider
+
+
+def _get_chain_provider():
+    if _CHAIN_PROVIDER is not None:
+        return _CHAIN_PROVIDER
+    sl = sys.modules.get("strategy_lab")
+    if sl is not None and getattr(sl, "USE_PROVIDER_SYSTEM", False):
+        return getattr(sl, "PROVIDER_INSTANCE", None)
+    return None
+
+
+@_cache_data(ttl=120, show_spinner=False)
+@disk_cached("chain_range", provider=_chain_provider_name)
+def fetch_chain_range(ticker, from_date, to_date):
+    """
+    Option chains for every expiration in [from_date, to_date] (YYYY-MM-DD) with one
+    provider request, as a single calls+puts frame with an 'expiration' column.
+
+    Raises ValueError when the configured provider has no bulk endpoint; callers then
+    fall back to per-expiration fetch_chain.
+    """
+    provider = _get_chain_provider()
+    if provider is None or not getattr(provider, "supports_bulk_chain", False):
+        raise ValueError("No bulk chain provider configured")
+    name = _chain_provider_name()
+    try:
+        df = _provider_call(name, provider.chain_range_df, ticker, from_date, to_date)
+    except Exception as e:
+        note_degraded(name, e)
+        raise
+    if df is None or df.empty or "expiration" not in df.columns:
+        raise ValueError(f"No chains for {ticker} {from_date}..{to_date}")
+    df = df.copy()
+    df["expiration"] = df["expiration"].astype(str).str[:10]
+    if "type" in df.columns:
+        df["type"] = df["type"].astype(str).str.lower()
+    return df
+
+
 def _safe_float(x, default=float("nan")):
     """Safely convert value to float with default"""
     try:
@@ -176,8 +298,8 @@ def effective_credit(bid, ask, last=None, alpha=None, *, oi: int | None = None,
         # pull UI preset if not explicitly provided
         if aggressiveness is None:
             try:
-                import streamlit as _st  # type: ignore
-                aggressiveness = _st.session_state.get('pricing_aggressiveness')
+                from chain_eval import pricing_aggressiveness
+                aggressiveness = pricing_aggressiveness()
             except Exception:
                 pass
         return _eff_credit(bid, ask, last, alpha=alpha, oi=oi, volume=volume, dte=dte, aggressiveness=aggressiveness)
@@ -208,8 +330,8 @@ def effective_debit(bid, ask, last=None, alpha=None, *, oi: int | None = None,
         from utils import effective_debit as _eff_debit  # centralized logic
         if aggressiveness is None:
             try:
-                import streamlit as _st  # type: ignore
-                aggressiveness = _st.session_state.get('pricing_aggressiveness')
+                from chain_eval import pricing_aggressiveness
+                aggressiveness = pricing_aggressiveness()
             except Exception:
                 pass
         return _eff_debit(bid, ask, last, alpha=alpha, oi=oi, volume=volume, dte=dte, aggressiveness=aggressiveness)
@@ -1,13 +1,13 @@
 """Profile end-to-end scan timings using the same pipeline as Streamlit.
 
-This script imports `strategy_lab.run_scans` and calls it with a representative
-set of tickers and parameters, without going through Streamlit. It measures the
-overall runtime and prints basic stats about the resulting DataFrames.
+This script calls the headless `scan_engine.run_scans` (what `strategy_lab.run_scans`
+wraps) with a representative set of tickers and parameters, without importing
+Streamlit. It measures the overall runtime and prints basic stats about the
+resulting DataFrames.
 """
 
 from __future__ import annotations
 
-import logging
 import time
 from typing import Dict, Any, List
 import os
@@ -18,38 +18,12 @@ from datetime import datetime
 import pandas as pd
 
 
-def _silence_streamlit_logging() -> None:
-    logging.getLogger().setLevel(logging.CRITICAL)
-    logger_names = [
-        "streamlit",
-        "streamlit.runtime",
-        "streamlit.runtime.scriptrunner_utils",
-        "streamlit.runtime.scriptrunner_utils.script_run_context",
-        "streamlit.runtime.caching",
-        "streamlit.runtime.caching.cache_data_api",
-        "streamlit.runtime.state",
-        "streamlit.runtime.state.session_state_proxy",
-    ]
-    for name in logger_names:
-        logger = logging.getLogger(name)
-        logger.setLevel(logging.CRITICAL)
-        logger.disabled = True
-        logger.propagate = False
-        logger.handlers.clear()
-
-
-_silence_streamlit_logging()
-
-# Ensure repo root is on sys.path so we can import strategy_lab
+# Ensure repo root is on sys.path so we can import scan_engine
 ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 if ROOT_DIR not in sys.path:
     sys.path.insert(0, ROOT_DIR)
 
-import strategy_lab as sl  # noqa: E402
-
-_silence_streamlit_logging()
-
-RUN_SCANS = getattr(sl.run_scans, "__wrapped__", sl.run_scans)
+from scan_engine import run_scans as RUN_SCANS  # noqa: E402
 
 
 def _log_to_file(message: str) -> None:
@@ -140,11 +114,12 @@ def _describe_df(name: str, df: pd.DataFrame) -> str:
 def main() -> None:
     tickers: List[str] = ["AAPL", "MSFT", "SPY", "AMD", "TSLA"]
     params = _default_params()
+    params["scan_profile"] = True  # built-in stage timers (scan_profile)
 
     n_runs = 3
     durations: List[float] = []
 
-    print("Profiling full scan via run_scans()")
+    print("Profiling full scan via scan_engine.run_scans()")
     print("Tickers:", ", ".join(tickers))
     print(f"Runs: {n_runs}\n")
 
@@ -215,6 +190,15 @@ def main() -> None:
     for k, v in csp_counters.items():
         print(f"  {k}: {v}")
 
+    profile = scan_counters.get("profile") if isinstance(scan_counters, dict) else None
+    if profile:
+        print("\nStage profile from last run (seconds, count):")
+        _log_to_file("Stage profile from last run:")
+        for stage, v in sorted(profile["stages"].items(), key=lambda kv: -kv[1]["seconds"]):
+            line = f"  {stage}: {v['seconds']:.3f}s ({v['count']})"
+            print(line)
+            _log_to_file(line)
+
 
 if __name__ == "__main__":  # pragma: no cover
     main()
@@ -0,0 +1,290 @@
+"""
+Incremental Scan
+
+Re-running a scan usually finds most option chains unchanged, and a sidebar tweak
+usually touches one or two strategies. IncrementalScanner keeps the results of the
+previous scans as blocks and recomputes only the blocks whose inputs changed:
+
+- one block per (ticker, expiration, strategy) for the single-expiration strategies
+  (CSP, Collar, Iron Condor, Bull Put, Bear Call), and one per (ticker, strategy) for
+  PMCC / Synthetic Collar, which pair a LEAPS expiration with short expirations, and
+  for CC, whose relaxed-threshold retry depends on every expiration coming up empty
+- a block is reused when its inputs fingerprint (the normalized chain(s) it read,
+  spot/dividend/earnings data, today's date, MC and fill settings) and the
+  strategy's own parameter subset are unchanged
+- tightening a pure row filter (min_oi / max_spread where the analyzer applies them
+  per row and the checked value is an output column) re-filters the cached rows
+  instead of re-running the analyzer and Monte Carlo
+- the DTE window (min_days / days_limit) only selects which expiration blocks are
+  used, so widening or narrowing it reuses every block already computed
+
+Market data is still fetched on every scan (that is how changed chains are found);
+what is skipped is the analyzer + Monte Carlo work. Filter-pass counters of
+re-filtered CSP blocks describe the run that built the block.
+
+    scanner = IncrementalScanner()
+    scan_engine.run_scans(tickers, params, scanner=scanner)   # full scan
+    scan_engine.run_scans(tickers, params, scanner=scanner)   # only changed blocks
+"""
+
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from chain_eval import NORMALIZED_COLUMNS, pricing_aggressiveness
+from market_snapshot import MarketSnapshot
+from scan_control import ScanReport
+from scan_executor import STRATEGY_RUNNERS, ScanSupervisor, get_scan_executor_config, scan_expirations
+from scan_profile import ScanProfile
+from strategy_analysis import fetch_market_snapshot, _get_scan_perf_config
+
+
+# Strategies whose rows come from one expiration each (block per expiration)
+PER_EXPIRATION = ("csp", "collar", "iron_condor", "bull_put_spread", "bear_call_spread")
+
+# Decide which expiration blocks are used; not part of a block's parameter key
+WINDOW_KEYS = ("min_days", "days_limit")
+
+# Row filters that can be tightened on cached rows: {strategy: {kwarg: output column}}.
+# Only filters applied per candidate row whose checked value is in the output qualify
+# (the condor/collar pick one leg per expiration after filtering; spread long-leg OI is
+# not an output column). CC only qualifies while min_roi is 0: otherwise an empty result
+# retries with relaxed OI/spread/ROI thresholds, which tighter cached rows can't reproduce.
+REFILTERS = {
+    "csp": {"min_oi": "OI", "max_spread": "Spread%"},
+    "cc": {"min_oi": "OI", "max_spread": "Spread%"},
+    "bull_put_spread": {"max_spread": "Spread%"},
+    "bear_call_spread": {"max_spread": "Spread%"},
+}
+
+# Analyzer output order; merged expiration blocks are re-sorted the same way
+_SORT_KEYS = ["UnifiedScore", "Score", "ROI%_ann"]
+
+# Parameter subsets remembered per block key (a few recent sidebar settings)
+_MAX_VARIANTS = 4
+
+
+@dataclass
+class _Block:
+    fingerprint: tuple
+    params: dict
+    df: pd.DataFrame
+    counters: dict
+
+
+# ----------------------------- Fingerprints -----------------------------
+
+def chain_fingerprint(snapshot: MarketSnapshot, expiration: str) -> str:
+    """Digest of both normalized sides of one expiration ('missing' if the chain is unavailable)."""
+    chain = snapshot.chain(expiration)
+    if chain is None or len(chain) == 0:
+        return "missing"
+    h = hashlib.blake2b(digest_size=16)
+    for side in snapshot.sides(expiration):
+        for col in NORMALIZED_COLUMNS:
+            if col == "type":
+                h.update("|".join(map(str, side[col].tolist())).encode())
+            else:
+                h.update(np.ascontiguousarray(side[col].to_numpy(dtype=float)).tobytes())
+    return h.hexdigest()
+
+
+def _canonical(value):
+    if isinstance(value, (set, frozenset)):
+        return tuple(sorted(value))
+    if isinstance(value, dict):
+        return tuple(sorted((k, _canonical(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_canonical(v) for v in value)
+    return value
+
+
+def _context_fingerprint(snapshot: MarketSnapshot) -> tuple:
+    """Inputs shared by every block of a ticker besides the chains."""
+    return (
+        snapshot.spot, snapshot.div_ps_annual, snapshot.div_y, snapshot.next_ex_div,
+        snapshot.next_ex_div_amt, snapshot.earnings_date,
+        datetime.now(timezone.utc).date(),  # DTE, earnings distance
+        _canonical(_get_scan_perf_config()),
+        pricing_aggressiveness(),
+    )
+
+
+# ----------------------------- Re-filtering -----------------------------
+
+def _refilter(name: str, block: _Block, params: dict) -> pd.DataFrame | None:
+    """Rows of `block` that pass the tighter `params`, or None if that can't be done exactly."""
+    allowed = REFILTERS.get(name)
+    if not allowed:
+        return None
+    changed = [k for k in params if params[k] != block.params.get(k)]
+    if not changed or any(k not in allowed for k in changed):
+        return None
+    if name == "cc" and float(block.params.get("min_roi") or 0.0) > 0.0:
+        return None
+    df = block.df
+    if df is None or df.empty:
+        return df
+    keep = np.ones(len(df), dtype=bool)
+    for k in changed:
+        old, new = block.params[k], params[k]
+        col = df[allowed[k]].to_numpy(dtype=float)
+        if k == "min_oi":
+            if (new or 0) < (old or 0):
+                return None
+            ok = col >= (new or 0)
+            if name == "csp":
+                # CSP keeps quotes with no OI at all (reported as 0); a 0 is only known to be
+                # "missing" if the cached run already filtered on OI
+                if not old and (col <= 0).any():
+                    return None
+                ok |= col <= 0
+            keep &= ok
+        elif k == "max_spread":
+            if float(new) > float(old):
+                return None
+            with np.errstate(invalid="ignore"):
+                keep &= ~(col > float(new))  # unknown spread never rejects
+    return df.loc[keep].reset_index(drop=True)
+
+
+def _merge(parts: list) -> pd.DataFrame:
+    frames = [p for p in parts if p is not None and not p.empty]
+    if not frames:
+        return pd.DataFrame()
+    df = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0].copy()
+    if all(k in df.columns for k in _SORT_KEYS):
+        df = df.sort_values(_SORT_KEYS, ascending=[False] * len(_SORT_KEYS)).reset_index(drop=True)
+    return df
+
+
+def _days_to(exp: str, today) -> int | None:
+    try:
+        return (datetime.strptime(exp, "%Y-%m-%d").date() - today).days
+    except Exception:
+        return None
+
+
+# ----------------------------- Scanner -----------------------------
+
+class IncrementalScanner:
+    """Block cache for repeated scans; thread-safe, one instance per UI session / process."""
+
+    def __init__(self):
+        self._blocks = {}
+        self._lock = threading.Lock()
+        self.stats = {"reused": 0, "refiltered": 0, "computed": 0}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._blocks.clear()
+
+    def _count(self, what: str) -> None:
+        with self._lock:
+            self.stats[what] += 1
+
+    def _block(self, key: tuple, fingerprint: tuple, params: dict, compute) -> tuple:
+        """(DataFrame, counters) for `key`: cached, re-filtered from a cached variant, or computed."""
+        with self._lock:
+            variants = [b for b in self._blocks.get(key, []) if b.fingerprint == fingerprint]
+        for b in variants:
+            if b.params == params:
+                self._count("reused")
+                return b.df, b.counters
+        for b in variants:
+            df = _refilter(key[2], b, params)
+            if df is not None:
+                self._count("refiltered")
+                counters = dict(b.counters)
+                if "final" in counters:
+                    counters["final"] = len(df)
+                self._store(key, _Block(fingerprint, params, df, counters))
+                return df, counters
+        df, counters = compute()
+        self._count("computed")
+        self._store(key, _Block(fingerprint, params, df, counters))
+        return df, counters
+
+    def _store(self, key: tuple, block: _Block) -> None:
+        with self._lock:
+            # Variants with stale inputs are dropped; keep the most recent parameter sets
+            kept = [b for b in self._blocks.get(key, [])
+                    if b.fingerprint == block.fingerprint and b.params != block.params]
+            self._blocks[key] = ([block] + kept)[:_MAX_VARIANTS]
+
+    def scan_ticker(self, t, params: dict):
+        """Same result tuple as scan_executor.scan_ticker, recomputing only changed blocks."""
+        snap = fetch_market_snapshot(t)
+        snap.prefetch(scan_expirations(snap, params))
+        ctx = _context_fingerprint(snap)
+        today = datetime.now(timezone.utc).date()
+        fps = {}
+
+        def _fp(exp):
+            if exp not in fps:
+                fps[exp] = chain_fingerprint(snap, exp)
+            return fps[exp]
+
+        out = {}
+        for name, (build, run) in STRATEGY_RUNNERS.items():
+            kwargs = build(params)
+            if name in PER_EXPIRATION:
+                key_params = {k: v for k, v in kwargs.items() if k not in WINDOW_KEYS}
+                parts, counters = [], {}
+                for exp in snap.expirations:
+                    D = _days_to(exp, today)
+                    if D is None or D < int(kwargs["min_days"]) or D > int(kwargs["days_limit"]):
+                        continue
+                    df, cnt = self._block(
+                        (t, exp, name), (ctx, _fp(exp)), key_params,
+                        lambda exp=exp: run(t, kwargs, snap.restrict((exp,))))
+                    parts.append(df)
+                    for k, v in (cnt or {}).items():
+                        counters[k] = counters.get(k, 0) + int(v)
+                out[name] = (_merge(parts), counters)
+            else:
+                if "long_min_days" in kwargs:
+                    windows = ((kwargs["long_min_days"], kwargs["long_max_days"]),
+                               (kwargs["short_min_days"], kwargs["short_max_days"]))
+                else:
+                    windows = ((kwargs["min_days"], kwargs["days_limit"]),)
+                used = tuple((exp, _fp(exp)) for exp in snap.expirations
+                             if (D := _days_to(exp, today)) is not None
+                             and any(lo <= D <= hi for lo, hi in windows))
+                out[name] = self._block((t, "*", name), (ctx, used), kwargs, lambda: run(t, kwargs, snap))
+
+        csp, csp_cnt = out["csp"]
+        return (csp, csp_cnt) + tuple(out[name][0] for name in list(STRATEGY_RUNNERS)[1:])
+
+    def iter_execute(self, tickers, params: dict, *, max_workers: int | None = None,
+                     report: ScanReport | None = None, profile: ScanProfile | None = None):
+        """
+        Drop-in for scan_executor.iter_scan (thread mode): yields (ticker, result, error)
+        as each ticker finishes, under the same per-ticker / overall deadlines.
+        """
+        tickers = list(tickers)
+        workers = max_workers or get_scan_executor_config({**params, "scan_executor": "thread"})["workers"]
+        if not tickers:
+            return
+        with ScanSupervisor(params, report, profile) as sup:
+            pool = sup.add_pool(ThreadPoolExecutor(max_workers=min(len(tickers), workers)))
+            for t in tickers:
+                sup.submit_guarded(pool, "scan", t, self.scan_ticker, t, params)
+            for _, t, value, err in sup.results():
+                yield t, None if value is None else value[0], err
+
+    def execute(self, tickers, params: dict, *, max_workers: int | None = None,
+                report: ScanReport | None = None, profile: ScanProfile | None = None):
+        """
+        Drop-in for scan_executor.execute_scan (thread mode): list of
+        (ticker, result, error) in input order.
+        """
+        tickers = list(tickers)
+        results = {t: (res, err) for t, res, err in
+                   self.iter_execute(tickers, params, max_workers=max_workers, report=report, profile=profile)}
+        return [(t, *results.get(t, (None, None))) for t in tickers]
@@ -0,0 +1,258 @@
+"""
+Per-Ticker Market Snapshot
+
+Everything the strategy analyzers need about one underlying, fetched once per scan
+and shared by all of them:
+
+- spot price, expirations
+- trailing dividend ($/share/yr and yield), next estimated ex-dividend date/amount
+- next earnings date
+- option chains, loaded lazily per expiration (one fetch per expiration, however
+  many strategies ask for it) and normalized once per side (see chain_eval)
+- per-contract fill prices (alpha, credit_fill, debit_fill), computed once per
+  (expiration, side, fill settings, aggressiveness) and looked up by every analyzer
+- a sorted strike index per side for O(log n) spread/condor wing lookups
+- optionally bulk-loaded up front: prefetch() pulls a whole run of expirations with
+  one provider range request (data_fetching.fetch_chain_range) and splits it locally
+
+Built by strategy_analysis.fetch_market_snapshot(). Analyzers accept an optional
+``snapshot=`` argument; when it is omitted they build their own, so calling a single
+analyzer standalone behaves as before.
+"""
+
+import threading
+from dataclasses import dataclass, field, replace
+from datetime import date
+from typing import Any, Callable
+
+import pandas as pd
+
+from chain_eval import NORMALIZED_COLUMNS, StrikeIndex, fill_table, normalize_chain, pricing_aggressiveness
+from scan_control import checkpoint
+from scan_profile import timer
+
+
+@dataclass(frozen=True)
+class MarketSnapshot:
+    """Immutable market data for one ticker; chains are cached lazily and thread-safely."""
+    ticker: str
+    spot: float
+    expirations: tuple
+    div_ps_annual: float = 0.0
+    div_y: float = 0.0
+    next_ex_div: date | None = None
+    next_ex_div_amt: float = 0.0
+    earnings_date: date | None = None
+    chain_loader: Callable[[str, str], Any] | None = field(default=None, repr=False, compare=False)
+    chain_range_loader: Callable[[str, str, str], Any] | None = field(default=None, repr=False, compare=False)
+    _chains: dict = field(default_factory=dict, init=False, repr=False, compare=False)
+    _normalized: dict = field(default_factory=dict, init=False, repr=False, compare=False)
+    _fills: dict = field(default_factory=dict, init=False, repr=False, compare=False)
+    _strike_index: dict = field(default_factory=dict, init=False, repr=False, compare=False)
+    _fetch_locks: dict = field(default_factory=dict, init=False, repr=False, compare=False)
+    _lock: Any = field(default_factory=threading.Lock, init=False, repr=False, compare=False)
+
+    def chain(self, expiration: str) -> pd.DataFrame | None:
+        """Raw provider chain for `expiration` (fetched on first use, then cached).
+
+        Fetch errors are cached as None so a failing expiration is not retried by
+        every analyzer. Each call is a scan cancellation checkpoint (scan_control).
+        """
+        checkpoint()
+        with self._lock:
+            if expiration in self._chains:
+                return self._chains[expiration]
+            exp_lock = self._fetch_locks.setdefault(expiration, threading.Lock())
+        # Per-expiration lock: concurrent callers wait for the one in-flight fetch
+        with exp_lock:
+            with self._lock:
+                if expiration in self._chains:
+                    return self._chains[expiration]
+            try:
+                loader = self.chain_loader
+                if loader is None:
+                    from data_fetching import fetch_chain as loader
+                with timer("fetch_chain"):
+                    df = loader(self.ticker, expiration)
+            except Exception:
+                df = None
+            with self._lock:
+                self._chains[expiration] = df
+            return df
+
+    def prefetch(self, expirations) -> int:
+        """
+        Bulk-load `expirations`: one range request per run of consecutive (in
+        self.expirations order) not-yet-loaded expirations, split by the 'expiration'
+        column. Expirations missing from a response, or runs whose request fails, are
+        left to the lazy per-expiration path in chain().
+
+        Returns:
+            Number of range requests that succeeded.
+        """
+        order = {e: i for i, e in enumerate(self.expirations)}
+        with self._lock:
+            wanted = sorted({e for e in expirations if e in order and e not in self._chains}, key=order.get)
+        runs = []
+        for exp in wanted:
+            if runs and order[exp] == order[runs[-1][-1]] + 1:
+                runs[-1].append(exp)
+            else:
+                runs.append([exp])
+
+        loaded = 0
+        for run in runs:
+            try:
+                loader = self.chain_range_loader
+                if loader is None:
+                    from data_fetching import fetch_chain_range as loader
+                with timer("fetch_chain_range"):
+                    df = loader(self.ticker, run[0], run[-1])
+                if df is None or df.empty or "expiration" not in df.columns:
+                    continue
+            except Exception:
+                continue
+            keys = df["expiration"].astype(str).str[:10]
+            with self._lock:
+                for exp, part in df.groupby(keys, sort=False):
+                    if exp in run:
+                        self._chains.setdefault(exp, part.reset_index(drop=True))
+            loaded += 1
+        return loaded
+
+    def normalized(self, expiration: str, right: str) -> pd.DataFrame:
+        """Normalized one-sided chain ('call'/'put'); empty frame if the chain is missing."""
+        key = (expiration, right)
+        with self._lock:
+            if key in self._normalized:
+                return self._normalized[key]
+        norm = normalize_chain(self.chain(expiration), right=right)
+        with self._lock:
+            return self._normalized.setdefault(key, norm)
+
+    def sides(self, expiration: str) -> tuple[pd.DataFrame, pd.DataFrame]:
+        """(calls, puts) normalized frames; both are the whole chain if it has no 'type' column."""
+        return self.normalized(expiration, "call"), self.normalized(expiration, "put")
+
+    def fills(self, expiration: str, right: str, *, dte=None, use_volume: bool = True,
+              aggressiveness: str | None = None) -> pd.DataFrame:
+        """
+        Fill-price table (alpha, credit_fill, debit_fill) row-aligned with
+        normalized(expiration, right); pass it to evaluate_chain(fills=...).
+
+        Memoized per (expiration, side, DTE overlay, use_volume, aggressiveness), so the
+        CSP, spread and condor analyzers price each contract once per scan.
+        """
+        if aggressiveness is None:
+            aggressiveness = pricing_aggressiveness()
+        # The fill model only looks at DTE through its <= 7 day overlay
+        near_term = None if dte is None else float(dte) <= 7
+        key = (expiration, right, near_term, bool(use_volume), aggressiveness)
+        with self._lock:
+            if key in self._fills:
+                return self._fills[key]
+        table = fill_table(self.normalized(expiration, right), dte=dte, use_volume=use_volume,
+                           aggressiveness=aggressiveness)
+        with self._lock:
+            return self._fills.setdefault(key, table)
+
+    def strike_index(self, expiration: str, right: str) -> StrikeIndex:
+        """Sorted strike index over normalized(expiration, right) (positions are chain rows)."""
+        key = (expiration, right)
+        with self._lock:
+            if key in self._strike_index:
+                return self._strike_index[key]
+        idx = StrikeIndex(self.normalized(expiration, right)["strike"].to_numpy(dtype=float))
+        with self._lock:
+            return self._strike_index.setdefault(key, idx)
+
+    def restrict(self, expirations) -> "MarketSnapshot":
+        """
+        View of this snapshot limited to `expirations` (order kept). Chains,
+        normalized sides, fill tables and strike indexes are shared with the parent,
+        so analyzers run on the view reuse everything already loaded.
+        """
+        keep = set(expirations)
+        view = replace(self, expirations=tuple(e for e in self.expirations if e in keep))
+        for name in ("_chains", "_normalized", "_fills", "_strike_index", "_fetch_locks", "_lock"):
+            object.__setattr__(view, name, getattr(self, name))
+        return view
+
+    @property
+    def chains_loaded(self) -> int:
+        """Number of expirations fetched so far (for diagnostics/tests)."""
+        with self._lock:
+            return len(self._chains)
+
+    # ----------------------------- Process transport -----------------------------
+
+    def to_payload(self, expirations=None) -> dict:
+        """
+        Compact, picklable form for shipping to worker processes.
+
+        Each requested expiration's chain is normalized once and sent as a dict of
+        NumPy column arrays (no DataFrames, no provider-specific columns). Chains
+        that are missing/failed travel as None. Expirations not listed are absent and
+        read as missing on the worker side (workers never fetch).
+        """
+        exps = self.expirations if expirations is None else expirations
+        chains = {}
+        for exp in exps:
+            raw = self.chain(exp)
+            if raw is None or raw.empty:
+                chains[exp] = None
+                continue
+            norm = normalize_chain(raw)
+            cols = {c: norm[c].to_numpy(dtype=float) for c in NORMALIZED_COLUMNS if c != "type"}
+            cols["type"] = norm["type"].to_numpy(dtype=str)
+            chains[exp] = {"typed": "type" in raw.columns, "cols": cols}
+        return {
+            "ticker": self.ticker,
+            "spot": self.spot,
+            "expirations": tuple(self.expirations),
+            "div_ps_annual": self.div_ps_annual,
+            "div_y": self.div_y,
+            "next_ex_div": self.next_ex_div,
+            "next_ex_div_amt": self.next_ex_div_amt,
+            "earnings_date": self.earnings_date,
+            "chains": chains,
+        }
+
+    @classmethod
+    def from_payload(cls, payload: dict) -> "MarketSnapshot":
+        """Rebuild a snapshot from to_payload() output with all shipped chains pre-cached."""
+        snap = cls(
+            ticker=payload["ticker"],
+            spot=payload["spot"],
+            expirations=tuple(payload["expirations"]),
+            div_ps_annual=payload["div_ps_annual"],
+            div_y=payload["div_y"],
+            next_ex_div=payload["next_ex_div"],
+            next_ex_div_amt=payload["next_ex_div_amt"],
+            earnings_date=payload["earnings_date"],
+            chain_loader=_no_chain,
+            chain_range_loader=_no_chain_range,
+        )
+        for exp, packed in payload["chains"].items():
+            if packed is None:
+                snap._chains[exp] = None
+                continue
+            full = pd.DataFrame(packed["cols"], columns=NORMALIZED_COLUMNS)
+            snap._chains[exp] = full
+            for right in ("call", "put"):
+                if packed["typed"]:
+                    side = full.loc[(full["type"] == right).to_numpy()].reset_index(drop=True)
+                else:
+                    side = full.assign(type=right)
+                snap._normalized[(exp, right)] = side
+        return snap
+
+
+def _no_chain(ticker, expiration):
+    """Chain loader for rehydrated snapshots: anything not shipped is treated as missing."""
+    return None
+
+
+def _no_chain_range(ticker, from_date, to_date):
+    """Range loader for rehydrated snapshots: workers never fetch."""
+    return None
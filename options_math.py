@@ -7,12 +7,15 @@ Extracted from strategy_lab.py for better code organization and testability.
 Functions:
 - Black-Scholes pricing (calls and puts)
 - Greeks calculations (delta, gamma, theta, vega)
-- Monte Carlo P&L simulation
+- Monte Carlo P&L simulation (per candidate and batched over an expiration)
 - Expected move calculations
 - Utility functions for pricing and spreads
 """
 
 import math
+import bisect
+import warnings
+from statistics import NormalDist
 import numpy as np
 import pandas as pd
 import yfinance as yf
@@ -30,19 +33,47 @@ def _safe_float(x, default=float("nan")):
         return default
 
 
+_ERF = None
+_NDTR = False  # unresolved
+
+
+def _ndtr_ufunc():
+    """scipy.special.ndtr if scipy is installed (resolved once), else None."""
+    global _NDTR
+    if _NDTR is False:
+        try:
+            from scipy.special import ndtr as _NDTR
+        except Exception:
+            _NDTR = None
+    return _NDTR
+
+
+def _erf_ufunc():
+    """Array erf, resolved once: numpy's if exposed, else scipy.special.erf, else math.erf vectorized."""
+    global _ERF
+    if _ERF is None:
+        erf = getattr(np, "erf", None)
+        if erf is None:
+            try:
+                from scipy.special import erf
+            except Exception:
+                erf = np.vectorize(math.erf, otypes=[float])
+        _ERF = erf
+    return _ERF
+
+
 def _norm_cdf(x):
     """Standard normal cumulative distribution function.
 
-    Accepts scalars or numpy arrays. Uses vectorized numpy.erf when possible.
+    Accepts scalars or numpy arrays. Uses scipy.special.ndtr (one ufunc pass) when
+    available, else a vectorized erf; np.vectorize(math.erf) is a Python-level loop
+    over every element and only the last resort.
     """
     x_arr = np.asarray(x, dtype=float)
-    # Prefer numpy's erf if available (fast ufunc). Some builds may not expose np.erf.
-    np_erf = getattr(np, "erf", None)
-    if np_erf is not None:
-        return 0.5 * (1.0 + np_erf(x_arr / np.sqrt(2.0)))
-    # Robust fallback: vectorize math.erf over numpy arrays
-    v_erf = np.vectorize(math.erf, otypes=[float])
-    return 0.5 * (1.0 + v_erf(x_arr / np.sqrt(2.0)))
+    ndtr = _ndtr_ufunc()
+    if ndtr is not None:
+        return ndtr(x_arr)
+    return 0.5 * (1.0 + _erf_ufunc()(x_arr / np.sqrt(2.0)))
 
 
 # ----------------------------- Black-Scholes & Greeks -----------------------------
@@ -245,6 +276,214 @@ def expected_move(S, iv, T):
     return S * iv * math.sqrt(T)
 
 
+# ----------------------------- Vectorized Black-Scholes Kernel -----------------------------
+
+_INV_SQRT_2PI = 1.0 / math.sqrt(2.0 * math.pi)
+
+
+def bs_d1_d2_vec(S, K, r, sigma, T, q=0.0):
+    """
+    Array version of _bs_d1_d2. Broadcasts over all inputs.
+
+    Returns:
+        (d1, d2) float arrays, NaN wherever S, K, sigma or T is non-positive/NaN
+    """
+    S, K, r, sigma, T, q = np.broadcast_arrays(*(np.asarray(a, dtype=float) for a in (S, K, r, sigma, T, q)))
+    with np.errstate(invalid="ignore", divide="ignore", over="ignore"):
+        valid = (S > 0) & (K > 0) & (sigma > 0) & (T > 0)
+        sqrt_t = np.sqrt(np.where(T > 0, T, np.nan))
+        d1 = (np.log(S / K) + (r - q + 0.5 * sigma ** 2) * T) / (sigma * sqrt_t)
+        d2 = d1 - sigma * sqrt_t
+    return np.where(valid, d1, np.nan), np.where(valid, d2, np.nan)
+
+
+def bs_greeks(S, K, r, sigma, T, q=0.0):
+    """
+    Fused Black-Scholes prices and greeks for calls and puts from one d1/d2 evaluation.
+
+    Array in / array out: S, K, r, sigma, T and q broadcast against each other, so a
+    whole expiration (vector of K, sigma) or a scenario grid (vector of S, sigma) is
+    priced in one call. Argument order follows the scalar greeks (S, K, r, sigma, T, q).
+
+    Element-wise equivalent to the scalar helpers, except that T is NOT clamped here:
+    pass np.maximum(T, 1e-6) to reproduce bs_call_price / bs_put_price exactly.
+
+    Returns:
+        dict of float arrays (0-d arrays for scalar inputs):
+        d1, d2, call_price, put_price (intrinsic where d1/d2 are undefined),
+        call_delta, put_delta, gamma, vega (per 1% IV), call_theta, put_theta (per day).
+        Greeks are NaN where d1/d2 are undefined.
+    """
+    S, K, r, sigma, T, q = np.broadcast_arrays(*(np.asarray(a, dtype=float) for a in (S, K, r, sigma, T, q)))
+    d1, d2 = bs_d1_d2_vec(S, K, r, sigma, T, q)
+    with np.errstate(invalid="ignore", divide="ignore", over="ignore"):
+        disc_q = np.exp(-q * T)
+        disc_r = np.exp(-r * T)
+        sqrt_t = np.sqrt(np.where(T > 0, T, np.nan))
+        n_d1 = _norm_cdf(d1)
+        n_d2 = _norm_cdf(d2)
+        n_md1 = _norm_cdf(-d1)
+        n_md2 = _norm_cdf(-d2)
+        phi_d1 = _INV_SQRT_2PI * np.exp(-0.5 * d1 * d1)
+
+        ok = ~np.isnan(d1)
+        call_price = np.where(ok, S * disc_q * n_d1 - K * disc_r * n_d2, np.fmax(0.0, S - K))
+        put_price = np.where(ok, K * disc_r * n_md2 - S * disc_q * n_md1, np.fmax(0.0, K - S))
+
+        call_delta = disc_q * n_d1
+        term1 = -(S * disc_q * phi_d1 * sigma) / (2.0 * sqrt_t)
+        out = {
+            "d1": d1,
+            "d2": d2,
+            "call_price": call_price,
+            "put_price": put_price,
+            "call_delta": call_delta,
+            "put_delta": call_delta - 1.0,
+            "gamma": (disc_q * phi_d1) / (S * sigma * sqrt_t),
+            "vega": (S * disc_q * phi_d1 * sqrt_t) / 100.0,
+            "call_theta": (term1 - r * K * disc_r * n_d2 + q * S * disc_q * n_d1) / 365.0,
+            "put_theta": (term1 + r * K * disc_r * n_md2 - q * S * disc_q * n_md1) / 365.0,
+        }
+    return out
+
+
+def bs_price_vec(S, K, r, sigma, T, is_call, q=0.0):
+    """
+    Black-Scholes price only (no greeks) for large scenario grids.
+
+    Same conventions as bs_greeks (broadcasting, no clamping of T, intrinsic value
+    where d1/d2 are undefined); `is_call` is a boolean array selecting call or put
+    per element. Inputs are not materialized at the broadcast shape, so per-leg
+    arrays (K, T, is_call of shape (legs,)) against a (paths x legs) spot grid cost
+    one pass over the grid per operation.
+    """
+    S, K, r, sigma, T, q = (np.asarray(a, dtype=float) for a in (S, K, r, sigma, T, q))
+    w = np.where(np.asarray(is_call, dtype=bool), 1.0, -1.0)  # +1 call, -1 put
+    with np.errstate(invalid="ignore", divide="ignore", over="ignore"):
+        vol_t = sigma * np.sqrt(np.where(T > 0, T, np.nan))
+        d1 = (np.log(S / K) + (r - q) * T) / vol_t + 0.5 * vol_t
+        d2 = d1 - vol_t
+        fwd_s = S * np.exp(-q * T)
+        pv_k = K * np.exp(-r * T)
+        price = w * (fwd_s * _norm_cdf(w * d1) - pv_k * _norm_cdf(w * d2))
+    bad = ~np.isfinite(d1)
+    if bad.any():
+        shape = price.shape
+        S_b, K_b, w_b = (np.broadcast_to(a, shape)[bad] for a in (S, K, w))
+        price = np.array(price, copy=True)
+        price[bad] = np.fmax(0.0, w_b * (S_b - K_b))
+    return price
+
+
+# ----------------------------- Implied Volatility -----------------------------
+
+IV_LOWER = 1e-4  # Search bracket for implied_vol_vec
+IV_UPPER = 5.0
+
+
+def _iv_initial_guess(call_price, fwd_s, pv_k, sqrt_t):
+    """Corrado-Miller (1996) closed-form approximation from call-equivalent prices."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        x = call_price - 0.5 * (fwd_s - pv_k)
+        disc = np.fmax(x * x - (fwd_s - pv_k) ** 2 / math.pi, 0.0)
+        return math.sqrt(2.0 * math.pi) / ((fwd_s + pv_k) * sqrt_t) * (x + np.sqrt(disc))
+
+
+def implied_vol_vec(price, S, K, T, r=0.0, q=0.0, is_call=True, *, tol=1e-8, max_iter=50,
+                    lower=IV_LOWER, upper=IV_UPPER):
+    """
+    Black-Scholes implied volatility for arrays of option prices.
+
+    Safeguarded Newton: each element starts from the Corrado-Miller approximation and
+    takes Newton steps on price while keeping a bracket [lo, hi] that contains the
+    root; a step that leaves the bracket (vega vanishing deep ITM/OTM) is replaced by
+    bisection. Only unconverged elements are iterated, so a whole chain costs a
+    handful of vectorized passes.
+
+    Args:
+        price: Option prices per share
+        S, K, T, r, q: Spot, strike, years to expiration, risk-free rate, dividend yield
+        is_call: Boolean (array) selecting call or put per element
+        tol: Absolute price tolerance
+        max_iter: Maximum Newton/bisection iterations
+        lower, upper: Volatility search bracket
+
+    Returns:
+        (iv, converged): float and boolean arrays at the broadcast shape of the inputs.
+        iv is NaN where inputs are invalid (non-positive price, S, K or T) or the price
+        is outside the prices reachable within [lower, upper] (e.g. below discounted
+        intrinsic); elements that run out of iterations keep their last iterate with
+        converged False.
+    """
+    arrays = np.broadcast_arrays(*(np.asarray(a, dtype=float) for a in (price, S, K, T, r, q)),
+                                 np.asarray(is_call, dtype=bool))
+    shape = arrays[0].shape
+    price, S, K, T, r, q, is_call = (a.ravel() for a in arrays)
+    iv = np.full(price.size, np.nan)
+    converged = np.zeros(price.size, dtype=bool)
+
+    with np.errstate(invalid="ignore"):
+        valid = (price > 0) & (S > 0) & (K > 0) & (T > 0) & np.isfinite(r) & np.isfinite(q)
+    sel = np.flatnonzero(valid)
+    if sel.size == 0:
+        return iv.reshape(shape), converged.reshape(shape)
+
+    p, t, call = price[sel], T[sel], is_call[sel]
+    w = np.where(call, 1.0, -1.0)
+    fwd_s = S[sel] * np.exp(-q[sel] * t)
+    pv_k = K[sel] * np.exp(-r[sel] * t)
+    log_m = np.log(fwd_s / pv_k)
+    sqrt_t = np.sqrt(t)
+
+    def _price(sigma, i):
+        with np.errstate(invalid="ignore", divide="ignore", over="ignore"):
+            vol_t = sigma * sqrt_t[i]
+            d1 = log_m[i] / vol_t + 0.5 * vol_t
+            model = w[i] * (fwd_s[i] * _norm_cdf(w[i] * d1) - pv_k[i] * _norm_cdf(w[i] * (d1 - vol_t)))
+        return model, d1
+
+    everything = np.arange(sel.size)
+    p_lo = _price(np.full(sel.size, lower), everything)[0]
+    p_hi = _price(np.full(sel.size, upper), everything)[0]
+    at_lo = np.abs(p - p_lo) <= tol
+    at_hi = ~at_lo & (np.abs(p - p_hi) <= tol)
+    out = np.full(sel.size, np.nan)
+    done = np.zeros(sel.size, dtype=bool)
+    out[at_lo], out[at_hi] = lower, upper
+    done[at_lo | at_hi] = True
+
+    lo = np.full(sel.size, lower)
+    hi = np.full(sel.size, upper)
+    guess = _iv_initial_guess(np.where(call, p, p + fwd_s - pv_k), fwd_s, pv_k, sqrt_t)
+    sigma = np.where((guess > lower) & (guess < upper), guess, np.clip(0.3, lower, upper))
+
+    active = np.flatnonzero((p > p_lo) & (p < p_hi) & ~done)
+    for _ in range(int(max_iter)):
+        if active.size == 0:
+            break
+        s = sigma[active]
+        model, d1 = _price(s, active)
+        f = model - p[active]
+        ok = (np.abs(f) <= tol) | (hi[active] - lo[active] <= 1e-12)
+        out[active[ok]] = s[ok]
+        done[active[ok]] = True
+
+        keep = ~ok
+        active, s, f, d1 = active[keep], s[keep], f[keep], d1[keep]
+        lo[active] = np.where(f < 0.0, s, lo[active])
+        hi[active] = np.where(f > 0.0, s, hi[active])
+        with np.errstate(invalid="ignore", divide="ignore", over="ignore"):
+            vega = fwd_s[active] * _INV_SQRT_2PI * np.exp(-0.5 * d1 * d1) * sqrt_t[active]
+            step = s - f / vega
+        inside = (step > lo[active]) & (step < hi[active])
+        sigma[active] = np.where(inside, step, 0.5 * (lo[active] + hi[active]))
+
+    out[active] = sigma[active]  # out of iterations: best estimate, not converged
+    iv[sel] = out
+    converged[sel] = done
+    return iv.reshape(shape), converged.reshape(shape)
+
+
 # ----------------------------- Pricing Utilities -----------------------------
 
 def compute_spread_pct(bid, ask, mid):
@@ -273,24 +512,32 @@ def safe_annualize_roi(cycle_roi, days, clip_low: float = -50.0, clip_high: floa
 
     Args:
         cycle_roi: float or array-like of per-cycle ROI (e.g., P&L / capital)
-        days: int > 0, number of days in the cycle
+        days: int > 0, number of days in the cycle, or an array broadcasting against
+            `cycle_roi` (e.g. one row per candidate; NaN where days <= 0)
         clip_low: lower bound for the exponent's natural log (default -50)
         clip_high: upper bound for the exponent's natural log (default 700)
 
     Returns:
-        Annualized ROI, same shape as `cycle_roi`. Returns NaN when days <= 0,
+        Annualized ROI, broadcast shape of `cycle_roi` and `days`. Returns NaN when days <= 0,
         or when (1 + cycle_roi) <= 0 (invalid base).
     """
     import numpy as _np
 
     arr = _np.asarray(cycle_roi, dtype=float)
-    if days is None or float(days) <= 0.0:
-        out = _np.full_like(arr, _np.nan)
-        return out.item() if out.shape == () else out
+    if _np.ndim(days) == 0:
+        if days is None or float(days) <= 0.0:
+            out = _np.full_like(arr, _np.nan)
+            return out.item() if out.shape == () else out
+        exponent = 365.0 / float(days)
+    else:
+        d = _np.asarray(days, dtype=float)
+        with _np.errstate(divide="ignore", invalid="ignore"):
+            exponent = _np.where(d > 0.0, 365.0 / d, _np.nan)
 
     base = 1.0 + arr
-    ln_base = _np.where(base > 0.0, _np.log1p(arr), _np.nan)
-    ln_val = (365.0 / float(days)) * ln_base
+    with _np.errstate(invalid="ignore"):
+        ln_base = _np.where(base > 0.0, _np.log1p(arr), _np.nan)
+    ln_val = exponent * ln_base
     ln_val = _np.clip(ln_val, float(clip_low), float(clip_high))
     out = _np.expm1(ln_val)
     return out.item() if out.shape == () else out
@@ -434,7 +681,56 @@ def get_earnings_date(stock: yf.Ticker, use_alpha_vantage=False):
 
 # ----------------------------- Monte Carlo Simulation -----------------------------
 
-def gbm_terminal_prices(S0, mu, sigma, T_years, n_paths, rng=None):
+MC_SAMPLERS = ("pseudo", "stratified", "sobol")
+
+
+def _mc_normals_uncached(n_paths, seed, sampler):
+    rng = np.random.default_rng(seed)
+    if sampler == "pseudo":
+        return rng.standard_normal(n_paths)
+    try:
+        from scipy.special import ndtri
+    except ImportError:  # scipy missing: plain pseudo-random draws
+        return rng.standard_normal(n_paths)
+    if sampler == "sobol":
+        from scipy.stats import qmc
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", UserWarning)  # n not a power of 2
+            u = qmc.Sobol(d=1, scramble=True, seed=rng).random(n_paths)[:, 0]
+    else:
+        # One uniform per equal-probability stratum (1-D Latin hypercube)
+        u = (np.arange(n_paths) + rng.random(n_paths)) / n_paths
+    return ndtri(np.clip(u, 1e-12, 1.0 - 1e-12))
+
+
+@lru_cache(maxsize=64)
+def _mc_normals_cached(n_paths, seed, sampler):
+    z = _mc_normals_uncached(n_paths, seed, sampler)
+    z.flags.writeable = False
+    return z
+
+
+def mc_normals(n_paths, *, seed=None, sampler="pseudo"):
+    """
+    Standard normal variates for the GBM terminal-price draw.
+
+    Samplers:
+      - "pseudo": np.random.default_rng(seed).standard_normal (historical behavior)
+      - "stratified": one draw per equal-probability stratum, mapped through the inverse CDF
+      - "sobol": scrambled Sobol points mapped through the inverse CDF (quasi-MC)
+
+    The quasi-MC samplers cover the tails evenly, so p5/p95 settle with far fewer paths.
+    With a fixed seed every call returns the same (read-only, cached) vector: candidates
+    simulated with it share common random numbers and are ranked on identical noise.
+    """
+    n_paths = int(n_paths)
+    sampler = sampler if sampler in MC_SAMPLERS else "pseudo"
+    if seed is None:
+        return _mc_normals_uncached(n_paths, None, sampler)
+    return _mc_normals_cached(n_paths, int(seed), sampler)
+
+
+def gbm_terminal_prices(S0, mu, sigma, T_years, n_paths, rng=None, Z=None):
     """
     Generate terminal stock prices using Geometric Brownian Motion.
     
@@ -445,75 +741,67 @@ def gbm_terminal_prices(S0, mu, sigma, T_years, n_paths, rng=None):
         T_years: Time horizon (years)
         n_paths: Number of simulation paths
         rng: Random number generator (optional)
+        Z: Pre-drawn standard normals (optional, see mc_normals); overrides rng
     
     Returns:
         Array of terminal prices
     """
-    rng = rng or np.random.default_rng()
-    Z = rng.standard_normal(n_paths)
+    if Z is None:
+        rng = rng or np.random.default_rng()
+        Z = rng.standard_normal(n_paths)
     drift = (mu - 0.5 * sigma**2) * T_years
     vol_term = sigma * np.sqrt(T_years)
     return S0 * np.exp(drift + vol_term * Z)
 
 
-def mc_pnl(strategy, params, n_paths=20000, mu=0.0, seed=None, rf=0.0):
-    """
-    Monte Carlo P&L simulation for options strategies.
+_REQUIRED = object()
 
-    For CSP: adds continuous risk-free carry on collateral.
-    For CC/Collar: includes stock price movement and dividends (no additional rf on stock capital).
 
-    Args:
-        strategy: Strategy type ("CSP", "CC", "COLLAR", "IRON_CONDOR", "BULL_PUT_SPREAD", "BEAR_CALL_SPREAD")
-        params: Dictionary of strategy parameters
-        n_paths: Number of Monte Carlo paths
-        mu: Expected return (drift, annualized decimal)
-        seed: Random seed for reproducibility
-        rf: Risk-free rate (annualized decimal)
-    
-    Returns:
-        Dictionary with pnl_paths, roi_ann_paths, and summary statistics
+def _param_getter(params):
+    """get(key[, default]) -> float for one candidate's mc_pnl parameter dict."""
+    def get(key, default=_REQUIRED):
+        if default is _REQUIRED:
+            return float(params[key])
+        v = params.get(key)
+        return float(default if v is None else v)
+    return get
+
+
+def _mc_payoff(strategy, S_T, get, *, S0, days, sigma, rf, T):
     """
-    S0 = float(params["S0"])
-    days = int(params["days"])
-    # Time horizon for price simulation; allow T=0 for same-day to maintain P&L logic
-    T = max(days, 0) / 365.0
-    # Ensure non-degenerate volatility for stochastic paths
-    sigma = float(params.get("iv", 0.20))
-    # Clamp volatility to reasonable bounds to avoid numerical issues
-    if not (sigma == sigma) or sigma <= 0.0:
-        sigma = 0.20
-    sigma = max(1e-6, min(sigma, 3.0))
-    rng = np.random.default_rng(seed)
-    S_T = gbm_terminal_prices(S0, mu, sigma, T, n_paths, rng)
+    Per-share P&L paths and capital per share for `strategy` at the simulation horizon.
 
-    div_ps_annual = float(params.get("div_ps_annual", 0.0))
+    Shared by mc_pnl (scalar parameters, S_T of shape (n_paths,)) and mc_pnl_batch
+    (parameters as (K, 1) columns, S_T of shape (K, n_paths)). `get(key[, default])`
+    returns the parameter as a float or a column; S0/days/sigma/T follow the same shape.
+    """
+    div_ps_annual = get("div_ps_annual", 0.0)
     div_ps_period = div_ps_annual * (days / 365.0)
 
     if strategy == "CSP":
-        Kp = float(params["Kp"])
-        Pp = float(params["put_premium"])
+        Kp = get("Kp")
+        Pp = get("put_premium")
         # Choose collateral base: full strike (default) or net of premium if requested
-        use_net_collateral = bool(params.get("use_net_collateral", False))
-        collateral_base = Kp - Pp if use_net_collateral else Kp
-        collateral_base = max(collateral_base, 1e-6)
+        use_net_collateral = get("use_net_collateral", 0.0) != 0
+        collateral_base = np.where(use_net_collateral, Kp - Pp, Kp)
+        collateral_base = np.maximum(collateral_base, 1e-6)
         pnl_per_share = Pp - np.maximum(0.0, Kp - S_T)
         # Add continuous risk-free interest on collateral base
         pnl_per_share += collateral_base * (np.exp(rf * T) - 1.0)
         capital_per_share = collateral_base
 
     elif strategy == "CC":
-        Kc = float(params["Kc"])
-        Pc = float(params["call_premium"])
+        Kc = get("Kc")
+        Pc = get("call_premium")
         pnl_per_share = (S_T - S0) + Pc - \
             np.maximum(0.0, S_T - Kc) + div_ps_period
         capital_per_share = S0
 
     elif strategy == "COLLAR":
-        Kc = float(params["Kc"])
-        Pc = float(params["call_premium"])
-        Kp = float(params["Kp"])
-        Pp = float(params["put_premium"])
+        Kc = get("Kc")
+        Pc = get("call_premium")
+        Kp = get("Kp")
+        Pp = get("put_premium")
         pnl_per_share = ((S_T - S0)
                          + Pc - np.maximum(0.0, S_T - Kc)
                          - Pp + np.maximum(0.0, Kp - S_T)
@@ -524,11 +812,11 @@ def mc_pnl(strategy, params, n_paths=20000, mu=0.0, seed=None, rf=0.0):
         # Two-leg structure: short call + long put, no stock position
         # P&L per share at expiration (ignoring borrow/dividends):
         #   = -max(0, S_T - Kc) + max(0, Kp - S_T) + (call_premium - put_premium)
-        Kc = float(params["Kc"])
-        Pc = float(params["call_premium"])  # credit from short call
-        Kp = float(params["Kp"])
-        Pp = float(params["put_premium"])   # debit for long put
-        net_credit = float(Pc) - float(Pp)
+        Kc = get("Kc")
+        Pc = get("call_premium")  # credit from short call
+        Kp = get("Kp")
+        Pp = get("put_premium")   # debit for long put
+        net_credit = Pc - Pp
         pnl_per_share = (-np.maximum(0.0, S_T - Kc)
                          + np.maximum(0.0, Kp - S_T)
                          + net_credit)
@@ -539,15 +827,15 @@ def mc_pnl(strategy, params, n_paths=20000, mu=0.0, seed=None, rf=0.0):
     elif strategy == "IRON_CONDOR":
         # Iron Condor: Sell OTM put spread + Sell OTM call spread
         # Profit if stock stays between short strikes
-        Kps = float(params["put_short_strike"])   # Short put strike
-        Kpl = float(params["put_long_strike"])    # Long put strike (lower)
-        Kcs = float(params["call_short_strike"])  # Short call strike
-        Kcl = float(params["call_long_strike"])   # Long call strike (higher)
-        net_credit = float(params["net_credit"])
+        Kps = get("put_short_strike")   # Short put strike
+        Kpl = get("put_long_strike")    # Long put strike (lower)
+        Kcs = get("call_short_strike")  # Short call strike
+        Kcl = get("call_long_strike")   # Long call strike (higher)
+        net_credit = get("net_credit")
         
         # P&L calculation for Iron Condor
         # Start with net credit received
-        pnl_per_share = np.full_like(S_T, net_credit)
+        pnl_per_share = net_credit + np.zeros_like(S_T)
         
         # Subtract put spread loss if price < short put strike
         # Max loss on put side: (Kps - Kpl) when S_T <= Kpl
@@ -562,19 +850,19 @@ def mc_pnl(strategy, params, n_paths=20000, mu=0.0, seed=None, rf=0.0):
         # Capital = max loss = (width of wider spread - net credit)
         put_spread_width = Kps - Kpl
         call_spread_width = Kcl - Kcs
-        max_spread_width = max(put_spread_width, call_spread_width)
-        capital_per_share = max(max_spread_width - net_credit, 1e-6)
+        max_spread_width = np.maximum(put_spread_width, call_spread_width)
+        capital_per_share = np.maximum(max_spread_width - net_credit, 1e-6)
     
     elif strategy == "BULL_PUT_SPREAD":
         # Bull Put Spread: SELL higher strike put + BUY lower strike put = NET CREDIT
         # Profit if stock stays above sell strike
-        sell_strike = float(params["sell_strike"])  # Short put (higher strike)
-        buy_strike = float(params["buy_strike"])    # Long put (lower strike)
-        net_credit = float(params["net_credit"])
+        sell_strike = get("sell_strike")  # Short put (higher strike)
+        buy_strike = get("buy_strike")    # Long put (lower strike)
+        net_credit = get("net_credit")
         
         # P&L calculation for Bull Put Spread
         # Start with net credit received
-        pnl_per_share = np.full_like(S_T, net_credit)
+        pnl_per_share = net_credit + np.zeros_like(S_T)
         
         # Subtract spread loss if price < sell strike
         # Loss = max(0, sell_strike - S_T) - max(0, buy_strike - S_T)
@@ -584,18 +872,18 @@ def mc_pnl(strategy, params, n_paths=20000, mu=0.0, seed=None, rf=0.0):
         
         # Capital at risk = max loss = spread width - net credit
         spread_width = sell_strike - buy_strike
-        capital_per_share = max(spread_width - net_credit, 1e-6)
+        capital_per_share = np.maximum(spread_width - net_credit, 1e-6)
     
     elif strategy == "BEAR_CALL_SPREAD":
         # Bear Call Spread: SELL lower strike call + BUY higher strike call = NET CREDIT
         # Profit if stock stays below sell strike
-        sell_strike = float(params["sell_strike"])  # Short call (lower strike)
-        buy_strike = float(params["buy_strike"])    # Long call (higher strike)
-        net_credit = float(params["net_credit"])
+        sell_strike = get("sell_strike")  # Short call (lower strike)
+        buy_strike = get("buy_strike")    # Long call (higher strike)
+        net_credit = get("net_credit")
         
         # P&L calculation for Bear Call Spread
         # Start with net credit received
-        pnl_per_share = np.full_like(S_T, net_credit)
+        pnl_per_share = net_credit + np.zeros_like(S_T)
         
         # Subtract spread loss if price > sell strike
         # Loss = max(0, S_T - sell_strike) - max(0, S_T - buy_strike)
@@ -605,7 +893,7 @@ def mc_pnl(strategy, params, n_paths=20000, mu=0.0, seed=None, rf=0.0):
         
         # Capital at risk = max loss = spread width - net credit
         spread_width = buy_strike - sell_strike
-        capital_per_share = max(spread_width - net_credit, 1e-6)
+        capital_per_share = np.maximum(spread_width - net_credit, 1e-6)
     
     elif strategy == "PMCC":
         # Poor Man's Covered Call (Diagonal): Long deep ITM LEAPS call + Short near-term call
@@ -614,35 +902,26 @@ def mc_pnl(strategy, params, n_paths=20000, mu=0.0, seed=None, rf=0.0):
         #   short_call_strike, short_call_premium, short_days (sim horizon), short_iv
         # P&L at short expiry approximated as (value of long call with remaining time - initial cost)
         # + short call premium - intrinsic short call payoff.
-        long_K = float(params["long_call_strike"])
-        long_cost = float(params["long_call_cost"])  # debit paid per share
-        long_days_total = int(params.get("long_days_total", days))
-        long_remaining_days = max(long_days_total - days, 1)
-        short_K = float(params["short_call_strike"])
-        short_prem = float(params["short_call_premium"])  # credit per share
+        long_K = get("long_call_strike")
+        long_cost = get("long_call_cost")  # debit paid per share
+        long_days_total = np.trunc(get("long_days_total", days))
+        long_remaining_days = np.maximum(long_days_total - days, 1)
+        short_K = get("short_call_strike")
+        short_prem = get("short_call_premium")  # credit per share
         # IV handling
-        long_iv = float(params.get("long_iv", sigma))
-        short_iv = float(params.get("short_iv", sigma))
+        long_iv = get("long_iv", sigma)
+        short_iv = get("short_iv", sigma)
         # Remaining time for long call after short leg expires
         T_long_remaining = long_remaining_days / 365.0
-        # Reprice long call at horizon for each path using Black-Scholes approximation
-        # Use same drifted terminal prices S_T already simulated.
-        # Avoid importing bs_call_price here (would create circular if renamed); replicate minimal formula.
-        def _reprice_long_call(S_T_path):
-            # Use Black-Scholes with dividend yield 0 for simplicity
-            S = S_T_path
-            K = long_K
-            vol = max(1e-6, min(long_iv, 3.0))
-            T_rem = max(T_long_remaining, 1e-6)
-            d1 = (np.log(S / K) + (rf + 0.5 * vol**2) * T_rem) / (vol * np.sqrt(T_rem))
-            d2 = d1 - vol * np.sqrt(T_rem)
-            call_val = S * _norm_cdf(d1) - K * np.exp(-rf * T_rem) * _norm_cdf(d2)
-            return call_val
-        long_call_vals = _reprice_long_call(S_T)
+        # Reprice long call at horizon for each path (all paths in one kernel call).
+        # Dividend yield 0 for simplicity; vol clamped to a sane range.
+        vol = np.maximum(1e-6, np.minimum(long_iv, 3.0))
+        T_rem = np.maximum(T_long_remaining, 1e-6)
+        long_call_vals = bs_greeks(S_T, long_K, rf, vol, T_rem)["call_price"]
         intrinsic_short = np.maximum(0.0, S_T - short_K)
         pnl_per_share = (long_call_vals - long_cost) + short_prem - intrinsic_short
         # Capital at risk approximated as net debit: long cost - short premium
-        capital_per_share = max(long_cost - short_prem, 1e-6)
+        capital_per_share = np.maximum(long_cost - short_prem, 1e-6)
 
     elif strategy == "SYNTHETIC_COLLAR":
         # Synthetic Collar: Long deep ITM call (stock proxy) + Long protective put + Short OTM call
@@ -650,46 +929,74 @@ def mc_pnl(strategy, params, n_paths=20000, mu=0.0, seed=None, rf=0.0):
         #   long_call_strike, long_call_cost, long_days_total, long_iv
         #   put_strike, put_cost, put_iv
         #   short_call_strike, short_call_premium, short_iv
-        long_K = float(params["long_call_strike"])
-        long_cost = float(params["long_call_cost"])  # debit per share
-        long_days_total = int(params.get("long_days_total", days))
-        long_remaining_days = max(long_days_total - days, 1)
-        put_K = float(params["put_strike"])
-        put_cost = float(params["put_cost"])  # debit
-        short_K = float(params["short_call_strike"])
-        short_prem = float(params["short_call_premium"])  # credit
-        long_iv = float(params.get("long_iv", sigma))
-        put_iv = float(params.get("put_iv", sigma))
-        short_iv = float(params.get("short_iv", sigma))
+        long_K = get("long_call_strike")
+        long_cost = get("long_call_cost")  # debit per share
+        long_days_total = np.trunc(get("long_days_total", days))
+        long_remaining_days = np.maximum(long_days_total - days, 1)
+        put_K = get("put_strike")
+        put_cost = get("put_cost")  # debit
+        short_K = get("short_call_strike")
+        short_prem = get("short_call_premium")  # credit
+        long_iv = get("long_iv", sigma)
+        put_iv = get("put_iv", sigma)
+        short_iv = get("short_iv", sigma)
         # At the horizon (short leg expiry), the LEAPS call still has time remaining,
         # while the protective put expires now. Reflect that explicitly:
         T_long_remaining = long_remaining_days / 365.0
         T_put_remaining = 1e-6  # effectively intrinsic at short expiry
 
-        def _bs_call_val(S, K, vol, T_rem):
-            vol = max(1e-6, min(vol, 3.0))
-            T_rem = max(T_rem, 1e-6)
-            d1 = (np.log(S / K) + (rf + 0.5 * vol**2) * T_rem) / (vol * np.sqrt(T_rem))
-            d2 = d1 - vol * np.sqrt(T_rem)
-            return S * _norm_cdf(d1) - K * np.exp(-rf * T_rem) * _norm_cdf(d2)
-        def _bs_put_val(S, K, vol, T_rem):
-            vol = max(1e-6, min(vol, 3.0))
-            T_rem = max(T_rem, 1e-6)
-            d1 = (np.log(S / K) + (rf + 0.5 * vol**2) * T_rem) / (vol * np.sqrt(T_rem))
-            d2 = d1 - vol * np.sqrt(T_rem)
-            # Put via parity
-            call_val = S * _norm_cdf(d1) - K * np.exp(-rf * T_rem) * _norm_cdf(d2)
-            put_val = call_val - S + K * np.exp(-rf * T_rem)
-            return put_val
-        long_call_vals = _bs_call_val(S_T, long_K, long_iv, T_long_remaining)
-        put_vals = _bs_put_val(S_T, put_K, put_iv, T_put_remaining)
+        long_call_vals = bs_greeks(S_T, long_K, rf, np.maximum(1e-6, np.minimum(long_iv, 3.0)),
+                                   np.maximum(T_long_remaining, 1e-6))["call_price"]
+        put_vals = bs_greeks(S_T, put_K, rf, np.maximum(1e-6, np.minimum(put_iv, 3.0)),
+                             np.maximum(T_put_remaining, 1e-6))["put_price"]
         intrinsic_short = np.maximum(0.0, S_T - short_K)
         pnl_per_share = (long_call_vals - long_cost) + (put_vals - put_cost) + short_prem - intrinsic_short
-        capital_per_share = max(long_cost + put_cost - short_prem, 1e-6)
+        capital_per_share = np.maximum(long_cost + put_cost - short_prem, 1e-6)
 
     else:
         raise ValueError(f"Unknown strategy for MC: {strategy}")
 
+    return pnl_per_share, capital_per_share
+
+
+
+def mc_pnl(strategy, params, n_paths=20000, mu=0.0, seed=None, rf=0.0, sampler="pseudo"):
+    """
+    Monte Carlo P&L simulation for options strategies.
+
+    For CSP: adds continuous risk-free carry on collateral.
+    For CC/Collar: includes stock price movement and dividends (no additional rf on stock capital).
+
+    Args:
+        strategy: Strategy type ("CSP", "CC", "COLLAR", "IRON_CONDOR", "BULL_PUT_SPREAD", "BEAR_CALL_SPREAD")
+        params: Dictionary of strategy parameters
+        n_paths: Number of Monte Carlo paths
+        mu: Expected return (drift, annualized decimal)
+        seed: Random seed for reproducibility (fixed seed = common random numbers)
+        rf: Risk-free rate (annualized decimal)
+        sampler: "pseudo" (default), "stratified" or "sobol" (see mc_normals)
+    
+    Returns:
+        Dictionary with pnl_paths, roi_ann_paths, and summary statistics
+    """
+    S0 = float(params["S0"])
+    days = int(params["days"])
+    # Time horizon for price simulation; allow T=0 for same-day to maintain P&L logic
+    T = max(days, 0) / 365.0
+    # Ensure non-degenerate volatility for stochastic paths
+    sigma = float(params.get("iv", 0.20))
+    # Clamp volatility to reasonable bounds to avoid numerical issues
+    if not (sigma == sigma) or sigma <= 0.0:
+        sigma = 0.20
+    sigma = max(1e-6, min(sigma, 3.0))
+    S_T = gbm_terminal_prices(S0, mu, sigma, T, n_paths,
+                              Z=mc_normals(n_paths, seed=seed, sampler=sampler))
+
+    get = _param_getter(params)
+    pnl_per_share, capital_per_share = _mc_payoff(strategy, S_T, get, S0=S0, days=days,
+                                                  sigma=sigma, rf=rf, T=T)
+    capital_per_share = float(capital_per_share)
+
     pnl_contract = 100.0 * pnl_per_share
     capital_contract = 100.0 * capital_per_share
 
@@ -743,9 +1050,323 @@ def mc_pnl(strategy, params, n_paths=20000, mu=0.0, seed=None, rf=0.0):
         "mean_roi_ann": float(np.mean(roi_clean)) if roi_clean.size > 0 else float("nan"),
     }
 
-    # --- Theoretical min payoff override for bounded credit strategies ---
-    # In rare cases with low volatility + few MC paths the tail (max loss) might not be sampled,
-    # leading to an unrealistic pnl_min equal to the net credit. Expose true worst-case risk.
+    _apply_theoretical_min(strategy, params, out, capital_contract, days)
+    return out
+
+
+def _row_stats(arr):
+    """mean/std/p5/p50/p95/min/max along axis 1 over finite entries (NaN for rows with none)."""
+    finite = np.isfinite(arr)
+    if finite.all():
+        pct = np.percentile(arr, [5, 50, 95], axis=1)
+        return {"expected": arr.mean(axis=1), "std": arr.std(axis=1),
+                "p5": pct[0], "p50": pct[1], "p95": pct[2],
+                "min": arr.min(axis=1), "max": arr.max(axis=1)}
+    a = np.where(finite, arr, np.nan)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN rows
+        pct = np.nanpercentile(a, [5, 50, 95], axis=1)
+        return {"expected": np.nanmean(a, axis=1), "std": np.nanstd(a, axis=1),
+                "p5": pct[0], "p50": pct[1], "p95": pct[2],
+                "min": np.nanmin(a, axis=1), "max": np.nanmax(a, axis=1)}
+
+
+def mc_pnl_batch(strategy, params_list, n_paths=20000, mu=0.0, seed=None, rf=0.0, sampler="pseudo"):
+    """
+    Batched mc_pnl: evaluate K candidates of one strategy against one shared path set.
+
+    One vector of standard normals is drawn per call. Terminal prices are computed once
+    per distinct (S0, days, iv) -- candidates of an expiration typically differ only by
+    strike -- payoffs for the (K, n_paths) matrix are evaluated in one broadcast pass, and
+    quantiles come from a single np.percentile(axis=1). The shared draws act as common
+    random numbers, so candidate rankings are not driven by sampling noise.
+
+    Args:
+        strategy: Strategy type (same values as mc_pnl)
+        params_list: List of mc_pnl parameter dicts, one per candidate
+        n_paths, mu, seed, rf, sampler: As in mc_pnl
+
+    Returns:
+        List of dicts with the same keys as mc_pnl, one per candidate. With the same seed,
+        a one-candidate batch reproduces mc_pnl exactly.
+    """
+    n_cand = len(params_list)
+    if n_cand == 0:
+        return []
+
+    def col(key, default=_REQUIRED):
+        out = np.empty((n_cand, 1))
+        for i, p in enumerate(params_list):
+            if default is _REQUIRED:
+                v = p[key]
+            else:
+                v = p.get(key)
+                if v is None:
+                    v = default[i, 0] if isinstance(default, np.ndarray) else default
+            out[i, 0] = float(v)
+        return out
+
+    S0 = col("S0")
+    days = np.trunc(col("days"))
+    T = np.maximum(days, 0) / 365.0
+    sigma = col("iv", 0.20)
+    sigma = np.where(~np.isfinite(sigma) | (sigma <= 0.0), 0.20, sigma)
+    sigma = np.clip(sigma, 1e-6, 3.0)
+
+    Z = mc_normals(n_paths, seed=seed, sampler=sampler)
+    keys, inv = np.unique(np.hstack([S0, sigma, T]), axis=0, return_inverse=True)
+    S0_u, sig_u, T_u = keys[:, 0:1], keys[:, 1:2], keys[:, 2:3]
+    drift = (mu - 0.5 * sig_u**2) * T_u
+    vol_term = sig_u * np.sqrt(T_u)
+    S_T = (S0_u * np.exp(drift + vol_term * Z))[np.asarray(inv).reshape(-1)]
+
+    pnl_per_share, capital_per_share = _mc_payoff(strategy, S_T, col, S0=S0, days=days,
+                                                  sigma=sigma, rf=rf, T=T)
+    capital_per_share = np.broadcast_to(np.asarray(capital_per_share, dtype=float), (n_cand, 1))
+    pnl_contract = 100.0 * pnl_per_share
+    capital_contract = 100.0 * capital_per_share
+
+    with np.errstate(invalid="ignore", divide="ignore", over="ignore", under="ignore"):
+        roi_cycle = pnl_contract / capital_contract
+        roi_ann = safe_annualize_roi(roi_cycle, days)
+
+    stats = {"pnl": _row_stats(pnl_contract), "roi_ann": _row_stats(roi_ann)}
+    mean_pps = pnl_per_share.mean(axis=1)
+    pnl_mean, pnl_std = stats["pnl"]["expected"], stats["pnl"]["std"]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        sharpe = np.where((days[:, 0] > 0) & (pnl_std > 0),
+                          pnl_mean / pnl_std * np.sqrt(365.0 / np.maximum(days[:, 0], 1.0)), np.nan)
+
+    results = []
+    for i in range(n_cand):
+        d = int(days[i, 0])
+        out = {
+            "S_T": S_T[i],
+            "pnl_paths": pnl_contract[i],
+            "roi_ann_paths": roi_ann[i],
+            "collateral": float(capital_contract[i, 0]),
+            "capital_per_share": float(capital_per_share[i, 0]),
+            "days": d,
+            "paths": int(n_paths),
+        }
+        for label, st in stats.items():
+            for k, v in st.items():
+                out[f"{label}_{k}"] = float(v[i])
+        out["sharpe"] = float(sharpe[i])
+        out["summary"] = {
+            "mean_pnl_per_share": float(mean_pps[i]) if np.isfinite(mean_pps[i]) else float("nan"),
+            "mean_roi_ann": out["roi_ann_expected"],
+        }
+        _apply_theoretical_min(strategy, params_list[i], out, out["collateral"], d)
+        results.append(out)
+    return results
+
+
+# ----------------------------- Closed-form P&L Distribution -----------------------------
+
+# Strike parameters (payoff kinks) of the strategies whose P&L depends only on S_T
+_ANALYTIC_KINKS = {
+    "CSP": ("Kp",),
+    "CC": ("Kc",),
+    "COLLAR": ("Kp", "Kc"),
+    "IRON_CONDOR": ("put_long_strike", "put_short_strike", "call_short_strike", "call_long_strike"),
+    "BULL_PUT_SPREAD": ("buy_strike", "sell_strike"),
+    "BEAR_CALL_SPREAD": ("sell_strike", "buy_strike"),
+}
+ANALYTIC_STRATEGIES = frozenset(_ANALYTIC_KINKS)
+
+_GL_X, _GL_W = np.polynomial.legendre.leggauss(24)
+_Z_RANGE = 8.5  # standard-normal mass beyond +/-8.5 is below 1e-16
+_NORMAL = NormalDist()
+
+
+def _std_norm_cdf(z):
+    """Scalar standard normal CDF (math.erfc; handles +/-inf)."""
+    return 0.5 * math.erfc(-z / math.sqrt(2.0))
+
+
+def mc_pnl_analytic(strategy, params, mu=0.0, rf=0.0):
+    """
+    Closed-form counterpart of mc_pnl for strategies whose P&L is a piecewise-linear
+    function of the terminal GBM price (ANALYTIC_STRATEGIES).
+
+    P&L mean/std come from lognormal partial moments on each linear piece; quantiles map
+    the lognormal quantile through the payoff, or invert the exact CDF when the payoff is
+    not monotone (iron condors); min/max are the payoff bounds. Annualized-ROI mean/std
+    are integrated by Gauss-Legendre between the payoff kinks, excluding total-loss
+    outcomes (undefined annualized ROI) as mc_pnl does; ROI quantiles are the annualized
+    P&L quantiles (-100% for a total loss).
+
+    Returns:
+        Dict with the summary keys of mc_pnl (no path arrays, "paths" is 0) plus
+        prob_profit and method="analytic". Raises ValueError for other strategies.
+    """
+    if strategy not in _ANALYTIC_KINKS:
+        raise ValueError(f"No analytic P&L for strategy: {strategy}")
+
+    S0 = float(params["S0"])
+    days = int(params["days"])
+    T = max(days, 0) / 365.0
+    sigma = float(params.get("iv", 0.20))
+    if not (sigma == sigma) or sigma <= 0.0:
+        sigma = 0.20
+    sigma = max(1e-6, min(sigma, 3.0))
+    get = _param_getter(params)
+
+    # Linear pieces alpha + beta * S on (edges[i], edges[i+1]], read off the shared payoff
+    kinks = sorted({k for k in (get(name) for name in _ANALYTIC_KINKS[strategy]) if k > 0})
+    edges = [0.0] + kinks + [math.inf]
+    n_pc = len(edges) - 1
+    xa = [lo + 0.25 * (hi - lo) if hi < math.inf else lo + 1.0 for lo, hi in zip(edges, edges[1:])]
+    xb = [lo + 0.75 * (hi - lo) if hi < math.inf else lo + 2.0 for lo, hi in zip(edges, edges[1:])]
+    f_ab, capital_per_share = _mc_payoff(strategy, np.array(xa + xb), get, S0=S0, days=days,
+                                         sigma=sigma, rf=rf, T=T)
+    capital_per_share = float(capital_per_share)
+    f_ab = f_ab.tolist()
+    beta = [(f_ab[n_pc + i] - f_ab[i]) / (xb[i] - xa[i]) for i in range(n_pc)]
+    beta = [0.0 if abs(b) < 1e-9 else b for b in beta]  # flat pieces exactly flat
+    alpha = [f_ab[i] - beta[i] * xa[i] for i in range(n_pc)]
+
+    def f_at(S):
+        i = bisect.bisect_left(kinks, S)
+        return alpha[i] + beta[i] * S
+
+    bounds = [f_at(x) for x in [0.0] + kinks]
+    bounds.append(alpha[-1] if beta[-1] == 0 else math.copysign(math.inf, beta[-1]))
+    f_min, f_max = min(bounds), max(bounds)
+
+    m = (mu - 0.5 * sigma**2) * T
+    s = sigma * math.sqrt(T)
+
+    def ann(pnl_ps):
+        """Annualized ROI of a per-share P&L (-100% for a total loss)."""
+        x = pnl_ps / capital_per_share
+        if not (x == x) or days <= 0:
+            return float("nan")
+        if x <= -1.0:
+            return -1.0
+        return math.expm1(min(max((365.0 / days) * math.log1p(x), -50.0), 700.0))
+
+    if s < 1e-9:  # no time left: point mass at the forward price
+        v = f_at(S0 * math.exp(mu * T))
+        mean, std, f_min, f_max = v, 0.0, v, v
+        quant = {5: v, 50: v, 95: v}
+        prob_profit = 1.0 if v > 0 else 0.0
+        roi_mean, roi_std = (ann(v) if v / capital_per_share > -1.0 else float("nan")), 0.0
+    else:
+        def z_of(x):
+            if x <= 0.0:
+                return -math.inf
+            return math.inf if x == math.inf else (math.log(x / S0) - m) / s
+
+        z_edges = [z_of(x) for x in edges]
+        # E[S^k 1{piece}] = E[S^k] * (N(k s - z_lo) - N(k s - z_hi))
+        mean = second = 0.0
+        for i in range(n_pc):
+            part = [S0**k * math.exp(k * m + 0.5 * (k * s) ** 2)
+                    * (_std_norm_cdf(k * s - z_edges[i]) - _std_norm_cdf(k * s - z_edges[i + 1]))
+                    for k in range(3)]
+            a_i, b_i = alpha[i], beta[i]
+            mean += a_i * part[0] + b_i * part[1]
+            second += a_i * a_i * part[0] + 2.0 * a_i * b_i * part[1] + b_i * b_i * part[2]
+        std = math.sqrt(max(second - mean * mean, 0.0))
+
+        def cdf(v):
+            """P(P&L per share <= v)."""
+            total = 0.0
+            for a_i, b_i, lo, hi in zip(alpha, beta, edges, edges[1:]):
+                if b_i == 0:
+                    lo2, hi2 = (lo, hi) if a_i <= v else (lo, lo)
+                elif b_i > 0:
+                    lo2, hi2 = lo, min(hi, max(lo, (v - a_i) / b_i))
+                else:
+                    lo2, hi2 = min(hi, max(lo, (v - a_i) / b_i)), hi
+                if hi2 > lo2:
+                    total += _std_norm_cdf(z_of(hi2)) - _std_norm_cdf(z_of(lo2))
+            return total
+
+        monotone = all(b >= 0 for b in beta) or all(b <= 0 for b in beta)
+        if not monotone and not (math.isfinite(f_min) and math.isfinite(f_max)):
+            raise ValueError(f"Unbounded non-monotone payoff for {strategy}")
+        levels = sorted(set(bounds)) if not monotone else []
+        cdf_levels = [cdf(v) for v in levels]
+        quant = {}
+        for q in (5, 50, 95):
+            if monotone:
+                p = q / 100.0 if all(b >= 0 for b in beta) else 1.0 - q / 100.0
+                quant[q] = f_at(S0 * math.exp(m + s * _NORMAL.inv_cdf(p)))
+                continue
+            # F jumps at plateau levels and is continuous in between: find the bracket first
+            j = next(i for i, c in enumerate(cdf_levels) if c >= q / 100.0 - 1e-12)
+            if j == 0 or cdf(levels[j] - 1e-9 * (1.0 + abs(levels[j]))) < q / 100.0:
+                quant[q] = levels[j]
+                continue
+            lo_v, hi_v = levels[j - 1], levels[j]
+            for _ in range(50):
+                mid = 0.5 * (lo_v + hi_v)
+                if cdf(mid) >= q / 100.0:
+                    hi_v = mid
+                else:
+                    lo_v = mid
+            quant[q] = hi_v
+        prob_profit = 1.0 - cdf(0.0)
+
+        # Annualized ROI: Gauss-Legendre on each smooth segment of z
+        zs = [min(max(z, -_Z_RANGE), _Z_RANGE) for z in z_edges]
+        breaks = np.unique(np.array(zs + [-_Z_RANGE, _Z_RANGE]))
+        a_seg, b_seg = breaks[:-1, None], breaks[1:, None]
+        half = 0.5 * (b_seg - a_seg)
+        z = (a_seg + half * (_GL_X + 1.0)).ravel()
+        w = (half * _GL_W).ravel() * np.exp(-0.5 * z * z) / math.sqrt(2.0 * math.pi)
+        S_z = S0 * np.exp(m + s * z)
+        idx = np.searchsorted(np.array(kinks), S_z, side="left")
+        f_z = np.array(alpha)[idx] + np.array(beta)[idx] * S_z
+        with np.errstate(invalid="ignore", divide="ignore", over="ignore"):
+            roi_z = safe_annualize_roi(f_z / capital_per_share, days)
+        fin = np.isfinite(roi_z)
+        mass = float(w[fin].sum())
+        if mass > 0:
+            roi_mean = float(np.sum(w[fin] * roi_z[fin]) / mass)
+            roi_std = math.sqrt(max(float(np.sum(w[fin] * roi_z[fin] ** 2) / mass) - roi_mean**2, 0.0))
+        else:
+            roi_mean = roi_std = float("nan")
+
+    out = {
+        "collateral": 100.0 * capital_per_share,
+        "capital_per_share": capital_per_share,
+        "days": days,
+        "paths": 0,
+        "method": "analytic",
+        "pnl_expected": 100.0 * mean,
+        "pnl_std": 100.0 * std,
+        "pnl_p5": 100.0 * quant[5],
+        "pnl_p50": 100.0 * quant[50],
+        "pnl_p95": 100.0 * quant[95],
+        "pnl_min": 100.0 * f_min,
+        "pnl_max": 100.0 * f_max,
+        "roi_ann_expected": roi_mean,
+        "roi_ann_std": roi_std,
+        "roi_ann_p5": ann(quant[5]),
+        "roi_ann_p50": ann(quant[50]),
+        "roi_ann_p95": ann(quant[95]),
+        "roi_ann_min": ann(f_min),
+        "roi_ann_max": ann(f_max),
+        "prob_profit": float(prob_profit),
+    }
+    if days > 0 and out["pnl_std"] > 0:
+        out["sharpe"] = out["pnl_expected"] / out["pnl_std"] * math.sqrt(365.0 / days)
+    else:
+        out["sharpe"] = float("nan")
+    out["summary"] = {"mean_pnl_per_share": float(mean), "mean_roi_ann": roi_mean}
+    return out
+
+def _apply_theoretical_min(strategy, params, out, capital_contract, days):
+    """
+    Theoretical min payoff override for bounded credit strategies (in place on `out`).
+
+    In rare cases with low volatility + few MC paths the tail (max loss) might not be sampled,
+    leading to an unrealistic pnl_min equal to the net credit. Expose true worst-case risk.
+    """
     try:
         # Only override if distribution shows variance (i.e., we actually sampled some loss paths)
         pnl_std = out.get("pnl_std")
@@ -808,4 +1429,4 @@ def mc_pnl(strategy, params, n_paths=20000, mu=0.0, seed=None, rf=0.0):
     except Exception:
         pass
     
-    return out
+
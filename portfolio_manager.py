@@ -13,7 +13,7 @@ Created: 2025-11-15
 from __future__ import annotations
 
 from dataclasses import dataclass
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Optional, Tuple
 import logging
 
@@ -217,9 +217,14 @@ class PortfolioManager:
             'Max Position %': f'{self.metrics.max_position_pct:.1f}%',
         }
     
-    def get_greeks_by_underlying(self) -> pd.DataFrame:
+    def get_greeks_by_underlying(self, var_result=None) -> pd.DataFrame:
         """Aggregate Greeks by underlying symbol.
         
+        Args:
+            var_result: Optional VaRResult (see calculate_var); when it carries a risk
+                        attribution, adds Component VaR, % of VaR, Incremental VaR and
+                        Tail Loss (CVaR) per underlying
+        
         Returns:
             DataFrame with Greeks summed by underlying
         """
@@ -260,6 +265,14 @@ class PortfolioManager:
             })
         
         df = pd.DataFrame(data)
+        attribution = getattr(var_result, 'attribution', None)
+        if not df.empty and attribution is not None:
+            risk = attribution.by_underlying.reindex(df['Symbol'])
+            fmt = lambda v, f: f.format(v) if pd.notna(v) else 'N/A'
+            df['Component VaR'] = [fmt(v, "${:,.2f}") for v in risk['component_var']]
+            df['% of VaR'] = [fmt(v, "{:.1f}%") for v in risk['pct_of_var']]
+            df['Incremental VaR'] = [fmt(v, "${:,.2f}") for v in risk['incremental_var']]
+            df['Tail Loss (CVaR)'] = [fmt(v, "${:,.2f}") for v in risk['component_cvar']]
         if not df.empty:
             # Sort by absolute value
             df['_abs_value'] = df['Value'].str.replace('$', '').str.replace(',', '').astype(float).abs()
@@ -302,15 +315,20 @@ class PortfolioManager:
         historical_prices: Optional[pd.DataFrame] = None,
         confidence_level: float = 0.95,
         time_horizon_days: int = 1,
-        method: str = 'historical'
+        method: str = 'historical',
+        n_paths: int = 20000,
+        seed: Optional[int] = None
     ) -> Optional[VaRResult]:
         """Calculate portfolio Value at Risk.
         
         Args:
             historical_prices: DataFrame with columns=symbols, index=dates
+                (None = ~1 year of adjusted closes from the local price store)
             confidence_level: Confidence level (0.90, 0.95, or 0.99)
             time_horizon_days: Time horizon in days (typically 1 or 10)
-            method: 'parametric' or 'historical'
+            method: 'historical', 'parametric' or 'monte_carlo'
+            n_paths: Monte Carlo paths (method='monte_carlo')
+            seed: Monte Carlo random seed (None = fresh draws)
             
         Returns:
             VaRResult or None if VaR calculation unavailable
@@ -322,6 +340,14 @@ class PortfolioManager:
         if not self.positions:
             return None
         
+        if historical_prices is None:
+            try:
+                from price_store import get_price_store
+                start = datetime.now().date() - timedelta(days=365)
+                historical_prices = get_price_store().closes(sorted({pos.symbol for pos in self.positions}), start=start)
+            except Exception as e:
+                logger.warning(f"Price store unavailable for VaR history: {e}")
+        
         if historical_prices is None or historical_prices.empty:
             logger.warning("No historical price data provided for VaR calculation")
             return None
@@ -364,7 +390,9 @@ class PortfolioManager:
                 historical_prices=historical_prices,
                 confidence_level=confidence_level,
                 time_horizon_days=time_horizon_days,
-                method=method
+                method=method,
+                n_paths=n_paths,
+                seed=seed
             )
             return var_result
         except Exception as e:
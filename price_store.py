@@ -0,0 +1,333 @@
+"""
+Daily Price Store
+
+Local time-series store of daily OHLCV bars per symbol, shared by prescreen_tickers
+(average volume, HV), YFinanceProvider.get_technicals (200-DMA, 52-week range) and
+the Portfolio Risk tab (VaR price history). A symbol's history is downloaded once;
+after that only the missing tail days are fetched, at most once a day.
+
+Layout, one directory per symbol and one raw little-endian column file per field:
+
+    <dir>/<SYMBOL>/date.i8                                   int64 days since 1970-01-01
+    <dir>/<SYMBOL>/{open,high,low,close,volume,dividend}.f8
+    <dir>/<SYMBOL>/meta.json                                 {"rows": n, "checked": "YYYY-MM-DD"}
+
+Columns are append-only and read through np.memmap. meta.json is replaced atomically
+after each append and its "rows" is the commit point: a crashed append leaves
+trailing bytes that readers ignore and the next append truncates.
+
+Only completed sessions (dates before today) are stored. "close" is the provider's
+split-adjusted, dividend-unadjusted close; dividend-adjusted prices (what yfinance
+returns with auto_adjust=True) are derived on read from the dividend column, so a
+new dividend never rewrites stored rows. A split does change every earlier close,
+so an update whose overlap day no longer matches the stored close rebuilds the
+symbol from scratch.
+
+Knobs: PRICE_STORE_MODE ("on" default; "off" fetches every request directly, no
+disk access), PRICE_STORE_DIR (default ./.price_store), PRICE_STORE_BACKFILL_DAYS
+(calendar days fetched for a new symbol, default 730).
+
+    store = get_price_store()
+    store.history("AAPL", start=date.today() - timedelta(days=92))   # yfinance-shaped bars
+    store.closes(["AAPL", "MSFT"], start=date.today() - timedelta(days=365))   # aligned matrix
+"""
+
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+FIELDS = ("open", "high", "low", "close", "volume", "dividend")
+_BAR_COLUMNS = {"open": "Open", "high": "High", "low": "Low", "close": "Close", "volume": "Volume",
+                "dividend": "Dividends"}
+_EPOCH = date(1970, 1, 1)
+_SPLIT_TOLERANCE = 1e-4  # relative change of a stored close that forces a rebuild
+
+
+def get_store_config() -> dict:
+    """Resolve mode/dir/backfill from env vars (read on every call so tests/CLI can flip them)."""
+    mode = str(os.getenv("PRICE_STORE_MODE", "on")).strip().lower()
+    if mode not in ("on", "off"):
+        mode = "on"
+    try:
+        backfill = max(30, int(os.getenv("PRICE_STORE_BACKFILL_DAYS", "730")))
+    except Exception:
+        backfill = 730
+    return {"mode": mode, "dir": os.getenv("PRICE_STORE_DIR") or ".price_store", "backfill_days": backfill}
+
+
+def yfinance_bars(symbol: str, start: date, end: date) -> pd.DataFrame:
+    """Daily bars in [start, end) from yfinance: Open/High/Low/Close (not dividend-adjusted), Volume, Dividends."""
+    import yfinance as yf
+
+    return yf.Ticker(symbol).history(start=start.isoformat(), end=end.isoformat(),
+                                     auto_adjust=False, actions=True)
+
+
+# ----------------------------- Column helpers -----------------------------
+
+def _day(d: date) -> int:
+    return (d - _EPOCH).days
+
+
+def _frame_columns(df: pd.DataFrame | None, before: date) -> dict:
+    """Fetched bars as sorted, de-duplicated column arrays, keeping sessions before `before`."""
+    if df is None or len(df) == 0 or "Close" not in df.columns:
+        return {"date": np.empty(0, dtype=np.int64), **{f: np.empty(0) for f in FIELDS}}
+    idx = pd.DatetimeIndex(df.index)
+    if idx.tz is not None:
+        idx = idx.tz_localize(None)  # exchange-local midnight -> same wall date
+    days = idx.normalize().values.astype("datetime64[D]").astype(np.int64)
+    cols = {f: (pd.to_numeric(df[c], errors="coerce").to_numpy(dtype=float) if c in df.columns
+                else np.zeros(len(df)))
+            for f, c in _BAR_COLUMNS.items()}
+    cols["dividend"] = np.nan_to_num(cols["dividend"], nan=0.0)
+    keep = (days < _day(before)) & np.isfinite(cols["close"])
+    order = np.argsort(days[keep], kind="stable")
+    days = days[keep][order]
+    last = np.r_[days[1:] != days[:-1], True] if len(days) else np.empty(0, dtype=bool)  # last row per date
+    out = {"date": days[last]}
+    for f in FIELDS:
+        out[f] = cols[f][keep][order][last]
+    return out
+
+
+def adjustment_factors(close: np.ndarray, dividend: np.ndarray) -> np.ndarray:
+    """
+    Back-adjustment factor per row for dividends paid on later rows
+    (yfinance convention: each ex-date scales all earlier prices by 1 - D / previous close).
+    """
+    close = np.asarray(close, dtype=float)
+    ratio = np.ones(len(close))
+    if len(close) > 1:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            r = 1.0 - np.asarray(dividend, dtype=float)[1:] / close[:-1]
+        ratio[1:] = np.where(np.isfinite(r) & (r > 0), r, 1.0)
+    # factor[j] = prod(ratio[j + 1:])
+    return np.append(np.cumprod(ratio[::-1])[::-1][1:], 1.0)
+
+
+def _bars_frame(cols: dict, adjusted: bool) -> pd.DataFrame:
+    index = pd.DatetimeIndex(cols["date"].astype("datetime64[D]"), name="Date")
+    if adjusted:
+        factor = adjustment_factors(cols["close"], cols["dividend"])
+        data = {_BAR_COLUMNS[f]: cols[f] * factor for f in ("open", "high", "low", "close")}
+        data["Volume"] = cols["volume"]
+    else:
+        data = {_BAR_COLUMNS[f]: cols[f] for f in FIELDS}
+    return pd.DataFrame(data, index=index)
+
+
+def _bounds(days: np.ndarray, start: date | None, end: date | None) -> tuple:
+    lo = 0 if start is None else int(np.searchsorted(days, _day(start), side="left"))
+    hi = len(days) if end is None else int(np.searchsorted(days, _day(end), side="left"))
+    return lo, max(lo, hi)
+
+
+# ----------------------------- Store -----------------------------
+
+class PriceStore:
+    """Append-only daily OHLCV store (see module docstring). Thread-safe per symbol."""
+
+    def __init__(self, directory: str | None = None, fetcher=None, backfill_days: int | None = None,
+                 mode: str | None = None):
+        cfg = get_store_config()
+        self.directory = directory or cfg["dir"]
+        self.fetcher = fetcher or yfinance_bars
+        self.backfill_days = int(backfill_days or cfg["backfill_days"])
+        self.mode = mode or cfg["mode"]
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    def _lock(self, symbol: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(symbol, threading.Lock())
+
+    def _path(self, symbol: str, name: str = "") -> str:
+        safe = str(symbol).upper().replace(os.sep, "_").replace("/", "_") or "_"
+        return os.path.join(self.directory, safe, name)
+
+    # -- disk --
+
+    def _meta(self, symbol: str) -> dict:
+        try:
+            with open(self._path(symbol, "meta.json"), "r", encoding="utf-8") as fh:
+                meta = json.load(fh)
+            return {"rows": int(meta.get("rows", 0)), "checked": meta.get("checked")}
+        except (OSError, ValueError):
+            return {"rows": 0, "checked": None}
+
+    def _write_meta(self, symbol: str, rows: int, checked: date) -> None:
+        path = self._path(symbol, "meta.json")
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump({"rows": int(rows), "checked": checked.isoformat()}, fh)
+        os.replace(tmp, path)  # atomic commit of the appended rows
+
+    def _read(self, symbol: str, rows: int, fields=FIELDS) -> dict:
+        """Committed rows of the date column and `fields` (memory-mapped, read-only)."""
+        if rows <= 0:
+            return {"date": np.empty(0, dtype=np.int64), **{f: np.empty(0) for f in fields}}
+        try:
+            out = {"date": np.memmap(self._path(symbol, "date.i8"), dtype="<i8", mode="r", shape=(rows,))}
+            for f in fields:
+                out[f] = np.memmap(self._path(symbol, f"{f}.f8"), dtype="<f8", mode="r", shape=(rows,))
+            return out
+        except (OSError, ValueError) as e:  # columns shorter than meta (interrupted rebuild): refetch
+            logger.warning(f"price store: unreadable columns for {symbol} ({e}); rebuilding")
+            return self._read(symbol, 0, fields)
+
+    def _append(self, symbol: str, cols: dict, rows: int, checked: date) -> None:
+        os.makedirs(self._path(symbol), exist_ok=True)
+        for name, dtype in (("date.i8", "<i8"), *((f"{f}.f8", "<f8") for f in FIELDS)):
+            values = cols[name.split(".")[0]]
+            path = self._path(symbol, name)
+            with open(path, "r+b" if os.path.exists(path) else "wb") as fh:
+                fh.truncate(rows * 8)  # drop bytes of an uncommitted append
+                fh.seek(rows * 8)
+                fh.write(np.ascontiguousarray(values, dtype=dtype).tobytes())
+        self._write_meta(symbol, rows + len(cols["date"]), checked)
+
+    # -- updates --
+
+    def update(self, symbol: str, today: date | None = None) -> int:
+        """Fetch the sessions missing since the last stored bar; returns the number of rows appended."""
+        if self.mode == "off":
+            return 0
+        symbol = str(symbol).upper()
+        today = today or date.today()
+        with self._lock(symbol):
+            meta = self._meta(symbol)
+            if meta["checked"] == today.isoformat():
+                return 0
+            stored = self._read(symbol, meta["rows"])
+            rows = len(stored["date"])
+            if rows:
+                last = _EPOCH + timedelta(days=int(stored["date"][-1]))
+                if (pd.Timestamp(last) + pd.offsets.BDay(1)).date() >= today:
+                    return 0  # no completed session can be missing
+                start = last  # one overlapping day detects splits / revisions
+            else:
+                start = today - timedelta(days=self.backfill_days)
+            try:
+                new = _frame_columns(self.fetcher(symbol, start, today), today)
+            except Exception as e:
+                logger.debug(f"price store: fetch failed for {symbol}: {e}")
+                return 0
+
+            if rows:
+                overlap = new["date"] == stored["date"][-1]
+                if overlap.any():
+                    old, fresh = float(stored["close"][-1]), float(new["close"][overlap][0])
+                    if abs(fresh - old) > _SPLIT_TOLERANCE * abs(old):
+                        first = _EPOCH + timedelta(days=int(stored["date"][0]))
+                        return self._rebuild(symbol, min(first, today - timedelta(days=self.backfill_days)), today)
+                tail = new["date"] > stored["date"][-1]
+                new = {k: v[tail] for k, v in new.items()}
+            elif not len(new["date"]):
+                return 0  # unknown / delisted symbol: nothing to create
+            self._append(symbol, new, rows, today)
+            return len(new["date"])
+
+    def _rebuild(self, symbol: str, start: date, today: date) -> int:
+        logger.info(f"price store: {symbol} history changed (split or revision); refetching from {start}")
+        try:
+            cols = _frame_columns(self.fetcher(symbol, start, today), today)
+        except Exception as e:
+            logger.debug(f"price store: rebuild fetch failed for {symbol}: {e}")
+            return 0
+        if not len(cols["date"]):
+            return 0
+        self._append(symbol, cols, 0, today)
+        return len(cols["date"])
+
+    def update_many(self, symbols, today: date | None = None, max_workers: int = 8) -> dict:
+        """update() for many symbols in parallel (network bound); {symbol: rows appended}."""
+        symbols = list(dict.fromkeys(str(s).upper() for s in symbols))
+        if len(symbols) <= 1 or max_workers <= 1:
+            return {s: self.update(s, today) for s in symbols}
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(symbols))) as pool:
+            return dict(zip(symbols, pool.map(lambda s: self.update(s, today), symbols)))
+
+    # -- reads --
+
+    def _columns(self, symbol: str, start: date | None, update: bool, fields=FIELDS) -> dict:
+        symbol = str(symbol).upper()
+        if self.mode == "off":
+            today = date.today()
+            try:
+                # Fetch through today: dividends after the requested window still adjust it
+                return _frame_columns(self.fetcher(symbol, start or today - timedelta(days=self.backfill_days),
+                                                   today), today)
+            except Exception as e:
+                logger.debug(f"price store: fetch failed for {symbol}: {e}")
+                return _frame_columns(None, today)
+        if update:
+            self.update(symbol)
+        with self._lock(symbol):
+            cols = self._read(symbol, self._meta(symbol)["rows"], fields)
+            return {k: np.array(v) for k, v in cols.items()}
+
+    def bars(self, symbol: str, start: date | None = None, end: date | None = None, *,
+             update: bool = True) -> pd.DataFrame:
+        """Stored bars in [start, end): Open/High/Low/Close (not dividend-adjusted), Volume, Dividends."""
+        cols = self._columns(symbol, start, update)
+        lo, hi = _bounds(cols["date"], start, end)
+        return _bars_frame(cols, adjusted=False).iloc[lo:hi]
+
+    def history(self, symbol: str, start: date | None = None, end: date | None = None, *,
+                adjusted: bool = True, update: bool = True) -> pd.DataFrame:
+        """
+        yfinance-shaped daily bars (Open/High/Low/Close/Volume) in [start, end), completed
+        sessions only. adjusted=True matches history(auto_adjust=True); False matches
+        auto_adjust=False (split- but not dividend-adjusted). Empty frame if unknown.
+        """
+        cols = self._columns(symbol, start, update)
+        lo, hi = _bounds(cols["date"], start, end)
+        # Adjust over the full series: dividends after `end` still scale the window
+        return _bars_frame(cols, adjusted=adjusted).iloc[lo:hi][["Open", "High", "Low", "Close", "Volume"]]
+
+    def closes(self, symbols, start: date | None = None, end: date | None = None, *,
+               adjusted: bool = True, update: bool = True, max_workers: int = 8) -> pd.DataFrame:
+        """Aligned (dates x symbols) close matrix in [start, end); NaN where a symbol has no bar."""
+        symbols = list(dict.fromkeys(str(s).upper() for s in symbols))
+        if update and self.mode != "off":
+            self.update_many(symbols, max_workers=max_workers)
+        found, days, values = [], [], []
+        for s in symbols:
+            cols = self._columns(s, start, False, ("close", "dividend"))
+            lo, hi = _bounds(cols["date"], start, end)
+            if hi > lo:
+                close = cols["close"] * adjustment_factors(cols["close"], cols["dividend"]) if adjusted else cols["close"]
+                found.append(s)
+                days.append(cols["date"][lo:hi])
+                values.append(close[lo:hi])
+        if not found:
+            return pd.DataFrame(columns=symbols, dtype=float)
+        union = np.unique(np.concatenate(days))
+        mat = np.full((len(union), len(found)), np.nan)
+        for j, (d, v) in enumerate(zip(days, values)):
+            mat[np.searchsorted(union, d), j] = v
+        return pd.DataFrame(mat, index=pd.DatetimeIndex(union.astype("datetime64[D]"), name="Date"), columns=found)
+
+
+_STORE = None
+_STORE_GUARD = threading.Lock()
+
+
+def get_price_store() -> PriceStore:
+    """Process-wide store for the current PRICE_STORE_* settings."""
+    global _STORE
+    cfg = get_store_config()
+    with _STORE_GUARD:
+        if (_STORE is None or _STORE.directory != cfg["dir"] or _STORE.mode != cfg["mode"]
+                or _STORE.backfill_days != cfg["backfill_days"]):
+            _STORE = PriceStore(cfg["dir"], backfill_days=cfg["backfill_days"], mode=cfg["mode"])
+        return _STORE
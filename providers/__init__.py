@@ -34,6 +34,26 @@ class OptionsProvider(ABC):
         """
         pass
 
+    # True when chain_range_df() is cheaper than the per-expiration loop below (one request or
+    # provider-side concurrent fan-out)
+    supports_bulk_chain: bool = False
+
+    def chain_range_df(self, symbol: str, from_date: str, to_date: str) -> pd.DataFrame:
+        """
+        Get options chains for every expiration in [from_date, to_date] (YYYY-MM-DD, inclusive).
+
+        Same columns as chain_snapshot_df plus 'expiration' (YYYY-MM-DD) so callers can
+        split the result locally. This default makes one chain_snapshot_df call per
+        expiration; providers with a date-range endpoint override it with one request.
+        """
+        frames = []
+        for exp in self.expirations(symbol):
+            if from_date <= exp <= to_date:
+                df = self.chain_snapshot_df(symbol, exp)
+                if df is not None and not df.empty:
+                    frames.append(df.assign(expiration=exp))
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
     @abstractmethod
     def get_earnings_date(self, symbol: str) -> Optional[date]:
         """Get next earnings date (optional, may return None)."""
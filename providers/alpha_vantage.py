@@ -9,6 +9,8 @@ from typing import Optional, Dict
 import json
 from pathlib import Path
 
+from providers.rate_limit import get_rate_limiter, call_with_retry
+
 
 class AlphaVantageClient:
     """
@@ -34,6 +36,8 @@ class AlphaVantageClient:
             )
         
         self.base_url = "https://www.alphavantage.co/query"
+        # Keep-alive session; calls also pace through the shared alpha_vantage limiter
+        self.session = requests.Session()
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(exist_ok=True)
         
@@ -157,7 +161,8 @@ class AlphaVantageClient:
                 'apikey': self.api_key
             }
             
-            response = requests.get(self.base_url, params=params, timeout=10)
+            response = call_with_retry(self.session.get, self.base_url, params=params, timeout=10,
+                                       limiter=get_rate_limiter("alpha_vantage"), retries=1)
             response.raise_for_status()
             
             # Increment call count
@@ -0,0 +1,131 @@
+# providers/async_provider.py — Async options-provider interface and concurrent fan-out
+from __future__ import annotations
+
+import asyncio
+import os
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+import pandas as pd
+
+from providers import OptionsProvider
+from providers.rate_limit import TokenBucket, get_rate_limiter, call_with_retry_async
+
+
+class AsyncOptionsProvider(ABC):
+    """Async counterpart of OptionsProvider for the market-data calls a scan makes."""
+
+    name: str = "default"
+
+    @abstractmethod
+    async def last_price(self, symbol: str) -> float:
+        """Get the last trade price for a symbol."""
+
+    @abstractmethod
+    async def expirations(self, symbol: str) -> List[str]:
+        """Get list of expiration dates in YYYY-MM-DD format."""
+
+    @abstractmethod
+    async def chain_snapshot_df(self, symbol: str, expiration: str) -> pd.DataFrame:
+        """Get calls+puts for one expiration (same columns as OptionsProvider.chain_snapshot_df)."""
+
+    async def aclose(self) -> None:
+        """Release pooled resources."""
+
+
+def _provider_name(provider: OptionsProvider) -> str:
+    return type(provider).__name__.lower().replace("provider", "") or "default"
+
+
+class AsyncProviderAdapter(AsyncOptionsProvider):
+    """
+    Async wrapper around a synchronous OptionsProvider.
+
+    The sync clients keep their pooled keep-alive sessions (requests.Session for
+    Polygon, schwab-py's HTTP client for Schwab); calls run on a bounded executor so
+    at most `max_concurrency` requests are in flight. Every call goes through the
+    provider's process-wide token bucket (shared with sync data_fetching calls) and
+    is retried with backoff on 429/5xx/timeouts.
+    """
+
+    def __init__(self, provider: OptionsProvider, *, name: Optional[str] = None,
+                 max_concurrency: Optional[int] = None, limiter: Optional[TokenBucket] = None,
+                 retries: int = 3):
+        self.provider = provider
+        self.name = name or _provider_name(provider)
+        try:
+            default = int(os.environ.get("PROVIDER_MAX_CONCURRENCY", "8"))
+        except Exception:
+            default = 8
+        self.max_concurrency = max(1, int(max_concurrency or default))
+        self.limiter = limiter or get_rate_limiter(self.name)
+        self.retries = retries
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency,
+                                            thread_name_prefix=f"{self.name}-io")
+
+    async def _call(self, method: str, *args):
+        fn = getattr(self.provider, method)
+        loop = asyncio.get_running_loop()
+
+        async def _once():
+            return await loop.run_in_executor(self._executor, lambda: fn(*args))
+
+        return await call_with_retry_async(_once, limiter=self.limiter, retries=self.retries)
+
+    async def last_price(self, symbol: str) -> float:
+        return float(await self._call("last_price", symbol))
+
+    async def expirations(self, symbol: str) -> List[str]:
+        return list(await self._call("expirations", symbol) or [])
+
+    async def chain_snapshot_df(self, symbol: str, expiration: str) -> pd.DataFrame:
+        return await self._call("chain_snapshot_df", symbol, expiration)
+
+    async def aclose(self) -> None:
+        self._executor.shutdown(wait=False)
+
+
+# ----------------------------- Fan-out -----------------------------
+
+async def fetch_chains_async(provider: AsyncOptionsProvider, requests: Mapping[str, Iterable[str]], *,
+                             max_concurrency: Optional[int] = None) -> Dict[Tuple[str, str], object]:
+    """
+    Fetch N tickers x M expirations concurrently.
+
+    Args:
+        provider: Async provider (its token bucket enforces the request quota)
+        requests: {ticker: expirations}
+        max_concurrency: Cap on in-flight requests (default: provider.max_concurrency or 8)
+
+    Returns:
+        {(ticker, expiration): DataFrame or the Exception raised for that chain}
+    """
+    limit = max(1, int(max_concurrency or getattr(provider, "max_concurrency", 8)))
+    sem = asyncio.Semaphore(limit)
+    keys = [(t, e) for t, exps in requests.items() for e in exps]
+
+    async def _one(t, e):
+        async with sem:
+            return await provider.chain_snapshot_df(t, e)
+
+    results = await asyncio.gather(*(_one(t, e) for t, e in keys), return_exceptions=True)
+    return dict(zip(keys, results))
+
+
+def fetch_chains(provider, requests: Mapping[str, Iterable[str]], *,
+                 max_concurrency: Optional[int] = None) -> Dict[Tuple[str, str], object]:
+    """
+    Synchronous entry point for fetch_chains_async (not for use inside a running event loop).
+    Accepts an AsyncOptionsProvider or a plain OptionsProvider (wrapped in AsyncProviderAdapter).
+    """
+    async def _run():
+        owned = not isinstance(provider, AsyncOptionsProvider)
+        ap = AsyncProviderAdapter(provider, max_concurrency=max_concurrency) if owned else provider
+        try:
+            return await fetch_chains_async(ap, requests, max_concurrency=max_concurrency)
+        finally:
+            if owned:
+                await ap.aclose()
+
+    return asyncio.run(_run())
@@ -4,6 +4,11 @@
 from __future__ import annotations
 import requests
 import os
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 
 import json
 import math
@@ -192,24 +197,47 @@ class PolygonError(RuntimeError):
     pass
 
 
+logger = logging.getLogger(__name__)
+
+
 class PolygonClient:
     """
     Lightweight Polygon.io wrapper for:
       - last trade price (equity)
       - expirations (reference contracts)
       - chain snapshots (calls+puts) incl. greeks/IV/OI
+
+    Chain snapshots push expiration/strike filters into the query. chain_range_df fans
+    out one filtered query per expiration over a bounded, connection-pooled session
+    (POLYGON_MAX_CONCURRENCY, default 4) and keeps the result for `snapshot_ttl`
+    seconds, so per-expiration calls during the same scan are served locally.
+    Queries that stop at `max_pages` with more pages left are recorded in
+    `self.truncated` and flagged via df.attrs["truncated"].
     """
 
-    def __init__(self, api_key: str | None = None, base_url: str = "https://api.polygon.io", timeout: int = 20):
+    def __init__(self, api_key: str | None = None, base_url: str = "https://api.polygon.io", timeout: int = 20,
+                 max_concurrency: int | None = None, snapshot_ttl: float = 60.0):
         self.base_url = base_url.rstrip("/")
         self.api_key = api_key or os.environ.get("POLYGON_API_KEY")
         if not self.api_key:
             raise PolygonError(
                 "POLYGON_API_KEY missing. Export it or pass api_key=...")
         self.timeout = timeout
+        try:
+            self.max_concurrency = max(1, int(max_concurrency or os.environ.get("POLYGON_MAX_CONCURRENCY", 4)))
+        except Exception:
+            self.max_concurrency = 4
+        self.snapshot_ttl = float(snapshot_ttl)
         self.sess = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.max_concurrency, pool_maxsize=self.max_concurrency)
+        self.sess.mount("https://", adapter)
+        self.sess.mount("http://", adapter)
         self.sess.headers.update(
             {"Authorization": f"Bearer {self.api_key}", "User-Agent": "strategy-lab/1.0"})
+        self._cache_lock = threading.Lock()
+        self._range_cache: dict = {}   # underlying -> [(fetched_at, from_date, to_date, df)]
+        self._exp_cache: dict = {}     # underlying -> (fetched_at, [expirations])
+        self.truncated: dict = {}      # (underlying, expiration) -> pages fetched
 
     def _get(self, path: str, params: dict | None = None) -> dict:
         url = f"{self.base_url}{path}"
@@ -221,6 +249,25 @@ class PolygonClient:
         except Exception as e:
             raise PolygonError(f"JSON decode error for {url}: {e}") from e
 
+    def _paged(self, path: str, params: dict | None, max_pages: int) -> tuple[list, bool]:
+        """Follow next_url cursors. Returns (results, truncated) where truncated means pages were left."""
+        results, page = [], 0
+        while page < max_pages and path:
+            d = self._get(path, params=params)
+            results.extend((d or {}).get("results") or [])
+            path = (d or {}).get("next_url")
+            if path:
+                path = path.replace(self.base_url, "")
+                params = None
+            page += 1
+        return results, bool(path)
+
+    def clear_cache(self) -> None:
+        """Drop cached snapshots/expirations (e.g. between scans)."""
+        with self._cache_lock:
+            self._range_cache.clear()
+            self._exp_cache.clear()
+
     # ---------- Equity price ----------
     def last_price(self, symbol: str) -> float:
         # Try real-time last trade; fall back to prev close
@@ -242,103 +289,159 @@ class PolygonClient:
         """
         Collect distinct expiration dates from reference contracts.
         """
+        with self._cache_lock:
+            hit = self._exp_cache.get(underlying)
+        if hit is not None and time.monotonic() - hit[0] < self.snapshot_ttl:
+            return list(hit[1])
         params = {
             "underlying_ticker": underlying,
             "expired": "false",
-            "limit": 250,
+            "limit": 1000,
             "order": "asc",
             "sort": "expiration_date",
         }
-        out, page = set(), 0
-        path = "/v3/reference/options/contracts"
-        while page < max_pages and path:
-            d = self._get(path, params=params)
-            results = (d or {}).get("results") or []
-            for r in results:
-                exp = r.get("expiration_date")
-                if exp:
-                    out.add(str(exp)[:10])
-            path = d.get("next_url")
-            if path:
-                path = path.replace(self.base_url, "")
-                params = None
-            page += 1
-        return sorted(out)
+        results, truncated = self._paged("/v3/reference/options/contracts", params, max_pages)
+        if truncated:
+            logger.warning("Polygon expirations for %s truncated after %d pages (far expirations missing)",
+                           underlying, max_pages)
+        out = sorted({str(r.get("expiration_date"))[:10] for r in results if r.get("expiration_date")})
+        with self._cache_lock:
+            self._exp_cache[underlying] = (time.monotonic(), out)
+        return list(out)
 
     # ---------- Chain snapshots (greeks, IV, OI) ----------
-    def chain_snapshot_df(self, underlying: str, expiration: str, max_pages: int = 10) -> pd.DataFrame:
+    @staticmethod
+    def _snapshot_row(r: dict, underlying: str) -> dict | None:
+        det = r.get("details") or {}
+        exp = (det.get("expiration_date") or "")[:10]
+        typ = (det.get("contract_type") or "").lower()
+        strike = det.get("strike_price")
+        lq = r.get("last_quote") or {}
+        lt = r.get("last_trade") or {}
+        gk = r.get("greeks") or {}
+        oi = r.get("open_interest")
+        try:
+            # Resolve prices with sensible fallbacks
+            bid_src = lq.get("bid_price", lq.get("bid", None))
+            ask_src = lq.get("ask_price", lq.get("ask", None))
+            bid_val = float(
+                bid_src) if bid_src is not None else float("nan")
+            ask_val = float(
+                ask_src) if ask_src is not None else float("nan")
+            last_trade = float(lt.get("price", 0.0) or 0.0)
+            day_close = float(
+                (r.get("day", {}) or {}).get("close", 0.0) or 0.0)
+            last_price = float(r.get("last_price", 0.0) or 0.0)
+            last_val = last_trade or last_price or day_close or 0.0
+            mark_val = None
+            if bid_val > 0 and ask_val > 0:
+                mark_val = (bid_val + ask_val) / 2.0
+            elif last_val > 0:
+                mark_val = last_val
+
+            return {
+                "symbol": underlying,
+                "type": typ,
+                "expiration": exp,
+                "strike": float(strike) if strike is not None else float("nan"),
+                # Use normalized prices
+                "bid": bid_val,
+                "ask": ask_val,
+                "last": last_val,
+                "lastPrice": last_val,
+                "openInterest": int(oi or 0),
+                # decimal IV: prefer top-level implied_volatility; fallback to greeks.iv
+                "impliedVolatility": (
+                    float(r.get("implied_volatility"))
+                    if r.get("implied_volatility") is not None else (
+                        float(gk.get("iv")) if gk.get(
+                            "iv") is not None else float("nan")
+                    )
+                ),
+                "delta": float(gk.get("delta", 0.0) or 0.0),
+                "gamma": float(gk.get("gamma", 0.0) or 0.0),
+                "theta": float(gk.get("theta", 0.0) or 0.0),
+                "vega": float(gk.get("vega", 0.0) or 0.0),
+                "volume": int(r.get("day", {}).get("volume", 0) or 0),
+                "mark": mark_val,
+            }
+        except Exception:
+            return None
+
+    @staticmethod
+    def _strike_filter(df: pd.DataFrame, strike_gte: float | None, strike_lte: float | None) -> pd.DataFrame:
+        if df.empty or (strike_gte is None and strike_lte is None):
+            return df
+        keep = pd.Series(True, index=df.index)
+        if strike_gte is not None:
+            keep &= df["strike"] >= float(strike_gte)
+        if strike_lte is not None:
+            keep &= df["strike"] <= float(strike_lte)
+        return df[keep].reset_index(drop=True)
+
+    def _cached_slice(self, underlying: str, expiration: str) -> pd.DataFrame | None:
+        now = time.monotonic()
+        with self._cache_lock:
+            entries = [e for e in self._range_cache.get(underlying, []) if now - e[0] < self.snapshot_ttl]
+            self._range_cache[underlying] = entries
+            for _, lo, hi, df in entries:
+                if lo <= expiration <= hi:
+                    part = df[df["expiration"] == expiration].reset_index(drop=True) if not df.empty else df.copy()
+                    part.attrs["truncated"] = expiration in df.attrs.get("truncated", [])
+                    return part
+        return None
+
+    def chain_snapshot_df(self, underlying: str, expiration: str, max_pages: int = 50,
+                          strike_gte: float | None = None, strike_lte: float | None = None) -> pd.DataFrame:
         """
-        Pull all contracts via snapshot (paged), filter by expiration date.
+        Snapshot of calls+puts for one expiration, filtered server-side
+        (expiration_date, optional strike_price.gte/.lte).
         Returns DataFrame with: type, strike, bid, ask, last, openInterest, impliedVolatility, delta, gamma, theta, vega, volume.
+        Served from the chain_range_df cache when a fresh range covers `expiration`.
         """
-        params = {"limit": 250}
-        path = f"/v3/snapshot/options/{underlying}"
-        rows, page = [], 0
-        while page < max_pages and path:
-            d = self._get(path, params=params)
-            results = (d or {}).get("results") or []
-            for r in results:
-                det = r.get("details") or {}
-                exp = (det.get("expiration_date") or "")[:10]
-                if exp != expiration:
-                    continue
-                typ = (det.get("contract_type") or "").lower()
-                strike = det.get("strike_price")
-                lq = r.get("last_quote") or {}
-                lt = r.get("last_trade") or {}
-                gk = r.get("greeks") or {}
-                oi = r.get("open_interest")
-                try:
-                    # Resolve prices with sensible fallbacks
-                    bid_src = lq.get("bid_price", lq.get("bid", None))
-                    ask_src = lq.get("ask_price", lq.get("ask", None))
-                    bid_val = float(
-                        bid_src) if bid_src is not None else float("nan")
-                    ask_val = float(
-                        ask_src) if ask_src is not None else float("nan")
-                    last_trade = float(lt.get("price", 0.0) or 0.0)
-                    day_close = float(
-                        (r.get("day", {}) or {}).get("close", 0.0) or 0.0)
-                    last_price = float(r.get("last_price", 0.0) or 0.0)
-                    last_val = last_trade or last_price or day_close or 0.0
-                    mark_val = None
-                    if bid_val > 0 and ask_val > 0:
-                        mark_val = (bid_val + ask_val) / 2.0
-                    elif last_val > 0:
-                        mark_val = last_val
-
-                    rows.append({
-                        "symbol": underlying,
-                        "type": typ,
-                        "expiration": exp,
-                        "strike": float(strike) if strike is not None else float("nan"),
-                        # Use normalized prices
-                        "bid": bid_val,
-                        "ask": ask_val,
-                        "last": last_val,
-                        "lastPrice": last_val,
-                        "openInterest": int(oi or 0),
-                        # decimal IV: prefer top-level implied_volatility; fallback to greeks.iv
-                        "impliedVolatility": (
-                            float(r.get("implied_volatility"))
-                            if r.get("implied_volatility") is not None else (
-                                float(gk.get("iv")) if gk.get(
-                                    "iv") is not None else float("nan")
-                            )
-                        ),
-                        "delta": float(gk.get("delta", 0.0) or 0.0),
-                        "gamma": float(gk.get("gamma", 0.0) or 0.0),
-                        "theta": float(gk.get("theta", 0.0) or 0.0),
-                        "vega": float(gk.get("vega", 0.0) or 0.0),
-                        "volume": int(r.get("day", {}).get("volume", 0) or 0),
-                        "mark": mark_val,
-                    })
-                except Exception:
-                    continue
-            path = d.get("next_url")
-            if path:
-                path = path.replace(self.base_url, "")
-                params = None
-            page += 1
+        cached = self._cached_slice(underlying, expiration)
+        if cached is not None:
+            return self._strike_filter(cached, strike_gte, strike_lte)
+
+        params: dict = {"expiration_date": expiration, "limit": 250}
+        if strike_gte is not None:
+            params["strike_price.gte"] = strike_gte
+        if strike_lte is not None:
+            params["strike_price.lte"] = strike_lte
+        results, truncated = self._paged(f"/v3/snapshot/options/{underlying}", params, max_pages)
+        rows = [row for row in (self._snapshot_row(r, underlying) for r in results)
+                if row is not None and row["expiration"] == expiration]
         df = pd.DataFrame(rows)
+        df.attrs["truncated"] = truncated
+        if truncated:
+            with self._cache_lock:
+                self.truncated[(underlying, expiration)] = max_pages
+            logger.warning("Polygon snapshot for %s %s truncated after %d pages (%d contracts)",
+                           underlying, expiration, max_pages, len(rows))
+        return df
+
+    def chain_range_df(self, underlying: str, from_date: str, to_date: str, max_pages: int = 50,
+                       strike_gte: float | None = None, strike_lte: float | None = None) -> pd.DataFrame:
+        """
+        Calls+puts for every expiration in [from_date, to_date] with an 'expiration' column.
+
+        Cursor pages can't be fetched out of order, so the work is split into one
+        filtered snapshot query per expiration, run concurrently (bounded by
+        max_concurrency). The combined frame is cached for snapshot_ttl seconds;
+        df.attrs["truncated"] lists expirations that hit max_pages.
+        """
+        exps = [e for e in self.expirations(underlying) if from_date <= e <= to_date]
+        frames: dict = {}
+        if exps:
+            with ThreadPoolExecutor(max_workers=min(len(exps), self.max_concurrency)) as pool:
+                futs = {e: pool.submit(self.chain_snapshot_df, underlying, e, max_pages, strike_gte, strike_lte)
+                        for e in exps}
+                for e in exps:
+                    frames[e] = futs[e].result()
+        parts = [frames[e] for e in exps if not frames[e].empty]
+        df = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame()
+        df.attrs["truncated"] = [e for e in exps if frames[e].attrs.get("truncated")]
+        if strike_gte is None and strike_lte is None:
+            with self._cache_lock:
+                self._range_cache.setdefault(underlying, []).append((time.monotonic(), from_date, to_date, df))
         return df
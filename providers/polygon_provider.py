@@ -0,0 +1,45 @@
+# providers/polygon_provider.py — Polygon.io adapter implementing OptionsProvider interface
+from __future__ import annotations
+from typing import List, Optional, Tuple
+from datetime import date
+import pandas as pd
+from providers import OptionsProvider
+from providers.polygon import PolygonClient, PolygonError
+
+
+class PolygonProvider(OptionsProvider):
+    """Polygon.io provider for options data (requires POLYGON_API_KEY)."""
+
+    # chain_range_df runs filtered per-expiration snapshots concurrently and caches them
+    supports_bulk_chain = True
+
+    def __init__(self):
+        """Initialize Polygon provider using the POLYGON_API_KEY environment variable."""
+        try:
+            self.client = PolygonClient()
+        except PolygonError as e:
+            raise RuntimeError(f"Failed to initialize Polygon provider: {e}")
+
+    def last_price(self, symbol: str) -> float:
+        """Get the last trade price for a symbol."""
+        return self.client.last_price(symbol)
+
+    def expirations(self, symbol: str) -> List[str]:
+        """Get list of expiration dates in YYYY-MM-DD format."""
+        return self.client.expirations(symbol)
+
+    def chain_snapshot_df(self, symbol: str, expiration: str) -> pd.DataFrame:
+        """Get calls and puts for a specific expiration (filtered server-side)."""
+        return self.client.chain_snapshot_df(symbol, expiration)
+
+    def chain_range_df(self, symbol: str, from_date: str, to_date: str) -> pd.DataFrame:
+        """All expirations in [from_date, to_date] ('expiration' column included)."""
+        return self.client.chain_range_df(symbol, from_date, to_date)
+
+    def get_earnings_date(self, symbol: str) -> Optional[date]:
+        """Polygon options snapshots don't include earnings dates; caller should handle None."""
+        return None
+
+    def get_technicals(self, symbol: str) -> Tuple[float, float, float]:
+        """Not implemented for Polygon; returns NaNs (sma200, year_low, year_high)."""
+        return (float("nan"), float("nan"), float("nan"))
@@ -0,0 +1,261 @@
+# providers/rate_limit.py — Per-provider token-bucket rate limiting, circuit breaking and retry with backoff
+from __future__ import annotations
+
+import asyncio
+import os
+import random
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+# Default quotas (requests/second, burst). Schwab documents 120 requests/minute for market
+# data; the others are conservative defaults. Override per provider with
+# <PROVIDER>_RATE_LIMIT, e.g. SCHWAB_RATE_LIMIT="120/min", POLYGON_RATE_LIMIT="50/s",
+# YFINANCE_RATE_LIMIT="0" (unlimited).
+_DEFAULT_LIMITS: Dict[str, tuple] = {
+    "schwab": (2.0, 10),
+    "polygon": (20.0, 20),
+    "yfinance": (5.0, 10),
+    "alpha_vantage": (5.0 / 60.0, 1),
+}
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket shared by sync callers (acquire) and asyncio callers
+    (acquire_async). rate <= 0 means unlimited.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = float(rate)
+        self.capacity = max(1.0, float(burst))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Take one token; return how long the caller must wait before using it."""
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1.0
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self) -> None:
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self) -> None:
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+def _parse_limit(text: str) -> Optional[tuple]:
+    """'120/min' | '5/s' | '5' (per second) | '0' (unlimited) -> (rate_per_sec, burst)."""
+    try:
+        text = text.strip().lower()
+        if "/" in text:
+            n, unit = text.split("/", 1)
+            per = {"s": 1.0, "sec": 1.0, "second": 1.0, "m": 60.0, "min": 60.0, "minute": 60.0,
+                   "h": 3600.0, "hour": 3600.0}[unit.strip()]
+            n = float(n)
+            return (n / per, max(1, int(min(n, 10))))
+        n = float(text)
+        return (n, max(1, int(n)))
+    except Exception:
+        return None
+
+
+_LIMITERS: Dict[str, TokenBucket] = {}
+_LIMITERS_LOCK = threading.Lock()
+
+
+def get_rate_limiter(provider: str) -> TokenBucket:
+    """Process-wide limiter for a provider name (one bucket per provider, shared by all threads/tasks)."""
+    name = (provider or "default").lower()
+    with _LIMITERS_LOCK:
+        bucket = _LIMITERS.get(name)
+        if bucket is None:
+            limit = _parse_limit(os.environ.get(f"{name.upper()}_RATE_LIMIT", "")) or _DEFAULT_LIMITS.get(name, (0.0, 1))
+            bucket = _LIMITERS[name] = TokenBucket(*limit)
+        return bucket
+
+
+def reset_rate_limiters() -> None:
+    """Forget configured buckets (env changes take effect on next use)."""
+    with _LIMITERS_LOCK:
+        _LIMITERS.clear()
+
+
+# ----------------------------- Circuit breaker -----------------------------
+
+# Default: open after 5 consecutive failed calls within 60s, probe again after 30s.
+# Override per provider with <PROVIDER>_CIRCUIT_BREAKER="failures/window_seconds[/cooldown_seconds]",
+# e.g. SCHWAB_CIRCUIT_BREAKER="3/30/120"; "0" disables the breaker.
+_DEFAULT_BREAKER = (5, 60.0, 30.0)
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a provider whose circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Thread-safe consecutive-failure breaker. After `threshold` failed calls in a row
+    (within `window` seconds of the first), the circuit opens and allow() refuses
+    calls for `cooldown` seconds; then one probe call is let through (half-open) and
+    its outcome closes or re-opens the circuit. threshold <= 0 means never open.
+    """
+
+    def __init__(self, threshold: int = 5, window: float = 60.0, cooldown: float = 30.0):
+        self.threshold = int(threshold)
+        self.window = float(window)
+        self.cooldown = float(cooldown)
+        self._failures = 0
+        self._first_failure = 0.0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            return "half_open" if time.monotonic() - self._opened_at >= self.cooldown else "open"
+
+    def allow(self) -> bool:
+        if self.threshold <= 0:
+            return True
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.cooldown or self._probing:
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self) -> None:
+        if self.threshold <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            if self._probing or self._opened_at is not None:
+                # Failed probe: stay open for another cooldown
+                self._opened_at = now
+                self._probing = False
+                return
+            if self._failures == 0 or now - self._first_failure > self.window:
+                self._failures = 0
+                self._first_failure = now
+            self._failures += 1
+            if self._failures >= self.threshold:
+                self._opened_at = now
+
+
+def _parse_breaker(text: str) -> Optional[tuple]:
+    """'5/60' | '5/60/120' | '0' (disabled) -> (threshold, window_seconds, cooldown_seconds)."""
+    try:
+        parts = [float(p) for p in text.strip().split("/")]
+        if parts[0] <= 0:
+            return (0, 0.0, 0.0)
+        window = parts[1] if len(parts) > 1 else _DEFAULT_BREAKER[1]
+        cooldown = parts[2] if len(parts) > 2 else window / 2.0
+        return (int(parts[0]), window, cooldown)
+    except Exception:
+        return None
+
+
+_BREAKERS: Dict[str, CircuitBreaker] = {}
+
+
+def get_circuit_breaker(provider: str) -> CircuitBreaker:
+    """Process-wide circuit breaker for a provider name (shared by all threads/tasks)."""
+    name = (provider or "default").lower()
+    with _LIMITERS_LOCK:
+        breaker = _BREAKERS.get(name)
+        if breaker is None:
+            cfg = _parse_breaker(os.environ.get(f"{name.upper()}_CIRCUIT_BREAKER", "")) or _DEFAULT_BREAKER
+            breaker = _BREAKERS[name] = CircuitBreaker(*cfg)
+        return breaker
+
+
+def reset_circuit_breakers() -> None:
+    """Close and forget every breaker (env changes take effect on next use)."""
+    with _LIMITERS_LOCK:
+        _BREAKERS.clear()
+
+
+# ----------------------------- Retry -----------------------------
+
+def is_retryable(exc: BaseException) -> bool:
+    """Rate-limit (429), server (5xx) and transient network errors are worth retrying."""
+    status = getattr(getattr(exc, "response", None), "status_code", None)
+    if isinstance(status, int):
+        return status == 429 or status >= 500
+    if isinstance(exc, (TimeoutError, ConnectionError)):
+        return True
+    name = type(exc).__name__.lower()
+    if "timeout" in name or "connection" in name:
+        return True
+    msg = str(exc).lower()
+    return any(k in msg for k in ("429", "too many requests", "rate limit", "timed out",
+                                  " 500", " 502", " 503", " 504"))
+
+
+def _backoff(attempt: int, base_delay: float, max_delay: float) -> float:
+    return min(max_delay, base_delay * (2 ** attempt)) * (0.5 + random.random() / 2.0)
+
+
+def call_with_retry(fn: Callable, *args, limiter: Optional[TokenBucket] = None, retries: int = 3,
+                    base_delay: float = 0.5, max_delay: float = 8.0,
+                    breaker: Optional[CircuitBreaker] = None, **kwargs):
+    """
+    Call fn through the limiter, retrying retryable errors with jittered exponential backoff.
+    With a `breaker`, raises CircuitOpenError without calling fn while the circuit is open;
+    the call (after its retries) counts as one success or failure.
+    """
+    if breaker is not None and not breaker.allow():
+        raise CircuitOpenError("circuit open")
+    for attempt in range(retries + 1):
+        if limiter is not None:
+            limiter.acquire()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            if attempt >= retries or not is_retryable(e):
+                if breaker is not None:
+                    breaker.record_failure()
+                raise
+            time.sleep(_backoff(attempt, base_delay, max_delay))
+        else:
+            if breaker is not None:
+                breaker.record_success()
+            return result
+
+
+async def call_with_retry_async(fn: Callable, *args, limiter: Optional[TokenBucket] = None, retries: int = 3,
+                                base_delay: float = 0.5, max_delay: float = 8.0, **kwargs):
+    """Async variant of call_with_retry; `fn` is a coroutine function."""
+    for attempt in range(retries + 1):
+        if limiter is not None:
+            await limiter.acquire_async()
+        try:
+            return await fn(*args, **kwargs)
+        except Exception as e:
+            if attempt >= retries or not is_retryable(e):
+                raise
+            await asyncio.sleep(_backoff(attempt, base_delay, max_delay))
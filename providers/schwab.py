@@ -141,7 +141,24 @@ class SchwabClient:
         """
         List option expiration dates for the underlying symbol.
         Returns dates in YYYY-MM-DD format.
+
+        Uses the lightweight expiration-chain endpoint; falls back to reading the keys
+        of a full option chain if that endpoint fails.
         """
+        try:
+            response = self.client.get_option_expiration_chain(symbol.upper())
+            response.raise_for_status()
+            data = response.json()
+            expirations = {
+                str(item.get("expirationDate", ""))[:10]
+                for item in (data.get("expirationList") or [])
+                if item.get("expirationDate")
+            }
+            if expirations:
+                return sorted(expirations)
+        except Exception:
+            pass  # fall back to the full chain below
+
         try:
             response = self.client.get_option_chain(
                 symbol.upper(),
@@ -194,46 +211,55 @@ class SchwabClient:
                 to_date=datetime.strptime(expiration, "%Y-%m-%d"),
             )
             response.raise_for_status()
-            data = response.json()
-            
-            rows = []
-            
-            # Process puts
-            put_map = data.get("putExpDateMap", {})
-            for exp_key, strike_map in put_map.items():
-                exp_date = exp_key.split(":")[0]
-                if exp_date != expiration:
-                    continue
-                    
-                for strike_key, contracts in strike_map.items():
-                    for contract in contracts:
-                        rows.append(self._parse_contract(contract, "put", symbol))
-            
-            # Process calls
-            call_map = data.get("callExpDateMap", {})
-            for exp_key, strike_map in call_map.items():
+            return self._chain_df(response.json(), symbol, expiration, expiration)
+        except Exception as e:
+            raise SchwabError(f"Failed to get option chain for {symbol} on {expiration}: {e}")
+
+    def chain_range_df(self, symbol: str, from_date: str, to_date: str) -> pd.DataFrame:
+        """
+        Return calls+puts for every expiration in [from_date, to_date] with ONE request.
+
+        Same columns as chain_snapshot_df; the 'expiration' column (YYYY-MM-DD) lets the
+        caller split the frame per expiration locally.
+        """
+        try:
+            response = self.client.get_option_chain(
+                symbol.upper(),
+                contract_type=client.Client.Options.ContractType.ALL,
+                from_date=datetime.strptime(from_date, "%Y-%m-%d"),
+                to_date=datetime.strptime(to_date, "%Y-%m-%d"),
+            )
+            response.raise_for_status()
+            return self._chain_df(response.json(), symbol, from_date, to_date)
+        except Exception as e:
+            raise SchwabError(f"Failed to get option chains for {symbol} {from_date}..{to_date}: {e}")
+
+    def _chain_df(self, data: dict, symbol: str, from_date: str, to_date: str) -> pd.DataFrame:
+        """Flatten a get_option_chain response, keeping expirations in [from_date, to_date]."""
+        rows = []
+        for contract_type, map_key in (("put", "putExpDateMap"), ("call", "callExpDateMap")):
+            for exp_key, strike_map in (data.get(map_key, {}) or {}).items():
                 exp_date = exp_key.split(":")[0]
-                if exp_date != expiration:
+                if not (from_date <= exp_date <= to_date):
                     continue
-                    
                 for strike_key, contracts in strike_map.items():
                     for contract in contracts:
-                        rows.append(self._parse_contract(contract, "call", symbol))
-            
-            df = pd.DataFrame(rows)
-            
-            # Normalize types
-            if not df.empty:
-                df["type"] = df["type"].astype(str).str.lower()
-                
-                # Calculate mark if not present
-                if "mark" in df.columns:
-                    mask = df["mark"].isna()
-                    df.loc[mask, "mark"] = (df.loc[mask, "bid"] + df.loc[mask, "ask"]) / 2.0
-            
-            return df
-        except Exception as e:
-            raise SchwabError(f"Failed to get option chain for {symbol} on {expiration}: {e}")
+                        row = self._parse_contract(contract, contract_type, symbol)
+                        row["expiration"] = exp_date
+                        rows.append(row)
+
+        df = pd.DataFrame(rows)
+
+        # Normalize types
+        if not df.empty:
+            df["type"] = df["type"].astype(str).str.lower()
+
+            # Calculate mark if not present
+            if "mark" in df.columns:
+                mask = df["mark"].isna()
+                df.loc[mask, "mark"] = (df.loc[mask, "bid"] + df.loc[mask, "ask"]) / 2.0
+
+        return df
 
     def _parse_contract(self, contract: dict, contract_type: str, symbol: str) -> dict:
         """Parse a single contract from Schwab API response."""
@@ -34,6 +34,12 @@ class SchwabProvider(OptionsProvider):
         # Return both calls and puts (removed puts-only filter for Iron Condor support)
         return df
 
+    supports_bulk_chain = True
+
+    def chain_range_df(self, symbol: str, from_date: str, to_date: str) -> pd.DataFrame:
+        """All expirations in [from_date, to_date] with one Schwab request ('expiration' column included)."""
+        return self.client.chain_range_df(symbol, from_date, to_date)
+
     def get_earnings_date(self, symbol: str) -> Optional[date]:
         """
         Schwab API doesn't provide earnings dates directly.
@@ -1,11 +1,12 @@
 # providers/yfinance_provider.py — YFinance adapter implementing OptionsProvider interface
 from __future__ import annotations
 from typing import List, Optional, Tuple
-from datetime import date
+from datetime import date, timedelta
 import pandas as pd
 import yfinance as yf
 from datetime import datetime
 from providers import OptionsProvider
+from price_store import get_price_store
 
 
 class YFinanceProvider(OptionsProvider):
@@ -99,9 +100,9 @@ class YFinanceProvider(OptionsProvider):
         Get technical indicators: 200-DMA and 52-week low/high.
         Returns: (sma200, year_low, year_high)
         """
-        stock = yf.Ticker(symbol)
         try:
-            hist = stock.history(period="1y", auto_adjust=False)
+            # Completed sessions from the local price store (only missing days are fetched)
+            hist = get_price_store().history(symbol, start=date.today() - timedelta(days=365), adjusted=False)
             if hist.empty:
                 return (float("nan"), float("nan"), float("nan"))
             close = hist["Close"]
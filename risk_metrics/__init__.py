@@ -1,9 +1,9 @@
 """Risk Metrics Package - VaR, CVaR, and Risk Analytics.
 
 This package provides industry-standard risk metrics for portfolio management:
-- Value at Risk (VaR) - Parametric and Historical methods
+- Value at Risk (VaR) - Parametric, Historical and Monte Carlo methods
 - Conditional Value at Risk (CVaR) - Expected shortfall
-- Position-level risk contributions
+- Component, marginal and incremental VaR per position, underlying and strategy
 - Stress testing scenarios
 
 Author: Options Strategy Lab
@@ -15,7 +15,9 @@ from .var_calculator import (
     calculate_historical_var,
     calculate_cvar,
     calculate_portfolio_var,
+    calculate_monte_carlo_var,
     VaRResult,
+    RiskAttribution,
 )
 
 __all__ = [
@@ -23,7 +25,9 @@ __all__ = [
     'calculate_historical_var',
     'calculate_cvar',
     'calculate_portfolio_var',
+    'calculate_monte_carlo_var',
     'VaRResult',
+    'RiskAttribution',
 ]
 
 __version__ = '1.0.0'
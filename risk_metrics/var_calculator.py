@@ -27,11 +27,25 @@ import numpy as np
 import pandas as pd
 from scipy import stats
 
+from options_math import IV_LOWER, bs_price_vec, implied_vol_vec
+
 logger = logging.getLogger(__name__)
 
 # Standard US equity options contract multiplier
 CONTRACT_MULTIPLIER = 100
 
+# Monte Carlo VaR defaults
+MC_DEFAULT_PATHS = 20000
+MC_CHUNK_ELEMENTS = 1_000_000  # paths x positions revalued per chunk (bounds peak memory)
+MC_VOL_OF_VOL = 0.8  # Annualized volatility of log implied-vol changes
+MC_SPOT_VOL_CORR = -0.6  # Correlation of an underlying's IV shock with its own spot shock
+
+# Volatility for option legs whose premium implies none (expired, missing or off-market quote)
+FALLBACK_IV = 0.30
+
+# Euler (component) VaR: scenarios averaged on each side of the VaR order statistic, as a fraction of all scenarios
+EULER_BAND = 0.01
+
 
 def _bs_call_price(S: float, K: float, T: float, r: float, sigma: float) -> float:
     """Calculate Black-Scholes call option price.
@@ -85,114 +99,25 @@ def _bs_put_price(S: float, K: float, T: float, r: float, sigma: float) -> float
     return K * exp(-r * T) * stats.norm.cdf(-d2) - S * stats.norm.cdf(-d1)
 
 
-def _implied_vol_call_simple(C0: float, S: float, K: float, T: float, r: float) -> float:
-    """Estimate implied volatility for a call option using simple search.
-    
-    Args:
-        C0: Current call price
-        S: Current underlying price
-        K: Strike price
-        T: Time to expiration in years
-        r: Risk-free rate
-        
-    Returns:
-        Estimated implied volatility
-    """
-    if T <= 0 or C0 <= 0:
-        return 0.30  # Default 30% vol
-    
-    # Intrinsic value
-    intrinsic = max(S - K, 0.0)
-    if C0 <= intrinsic + 0.01:
-        return 0.10  # Very low vol for deep ITM
-    
-    # For ATM/OTM options, use approximation as initial guess
-    # C ≈ 0.4 * S * σ * sqrt(T) for ATM
-    time_value = C0 - intrinsic
-    if time_value > 0 and T > 0:
-        sigma_guess = time_value / (0.4 * S * np.sqrt(T))
-        # Sanity check the guess
-        if 0.05 <= sigma_guess <= 2.0:
-            # Use the approximation directly if reasonable
-            return sigma_guess
-    
-    # Simple bisection search as fallback
-    vol_low, vol_high = 0.01, 3.0
-    
-    for iteration in range(30):  # Increase iterations
-        vol_mid = (vol_low + vol_high) / 2.0
-        price_mid = _bs_call_price(S, K, T, r, vol_mid)
-        
-        if abs(price_mid - C0) < 0.001:  # Tighter tolerance
-            return vol_mid
-        
-        if price_mid < C0:
-            vol_low = vol_mid
-        else:
-            vol_high = vol_mid
-    
-    # If bisection didn't converge, return midpoint but warn if it's extreme
-    result = (vol_low + vol_high) / 2.0
-    if result < 0.10:
-        logger.warning(f"IV solver returned very low vol {result:.4f} for C0=${C0:.2f}, S=${S:.2f}, K=${K:.2f}, T={T:.4f}")
-        # Use approximation as fallback
-        if time_value > 0 and T > 0:
-            result = max(time_value / (0.4 * S * np.sqrt(T)), 0.20)  # Minimum 20% vol
-    return result
-
-
-def _implied_vol_put_simple(P0: float, S: float, K: float, T: float, r: float) -> float:
-    """Estimate implied volatility for a put option using simple search.
-    
-    Args:
-        P0: Current put price
-        S: Current underlying price
-        K: Strike price
-        T: Time to expiration in years
-        r: Risk-free rate
-        
-    Returns:
-        Estimated implied volatility
+@dataclass
+class RiskAttribution:
+    """Where the tail risk of one VaR run sits: per leg, per underlying and per strategy tag.
+    
+    Every table has columns:
+    - component_var: Euler allocation E[-P&L | portfolio loss at VaR], estimated on the
+      scenarios ranked nearest the VaR quantile and scaled so the legs sum to VaR
+    - pct_of_var: component_var as a percentage of VaR
+    - incremental_var: VaR minus the VaR of the book without the leg / group,
+      re-ranked on the same scenarios (no re-simulation)
+    - component_cvar: E[-P&L | loss >= VaR]; sums to CVaR
+    by_position is indexed by leg label and adds symbol, strategy, quantity and
+    marginal_var (dVaR/dquantity: VaR change per additional share or contract).
+    by_underlying / by_strategy add positions (leg count).
     """
-    if T <= 0 or P0 <= 0:
-        return 0.30  # Default 30% vol
-    
-    # Intrinsic value
-    intrinsic = max(K - S, 0.0)
-    if P0 <= intrinsic + 0.01:
-        return 0.10  # Very low vol for deep ITM
-    
-    # For ATM/OTM options, use approximation as initial guess
-    time_value = P0 - intrinsic
-    if time_value > 0 and T > 0:
-        sigma_guess = time_value / (0.4 * S * np.sqrt(T))
-        # Sanity check the guess
-        if 0.05 <= sigma_guess <= 2.0:
-            return sigma_guess
-    
-    # Simple bisection search as fallback
-    vol_low, vol_high = 0.01, 3.0
-    
-    for iteration in range(30):  # Increase iterations
-        vol_mid = (vol_low + vol_high) / 2.0
-        price_mid = _bs_put_price(S, K, T, r, vol_mid)
-        
-        if abs(price_mid - P0) < 0.001:  # Tighter tolerance
-            return vol_mid
-        
-        if price_mid < P0:
-            vol_low = vol_mid
-        else:
-            vol_high = vol_mid
     
-    # If bisection didn't converge, return midpoint but warn if it's extreme
-    result = (vol_low + vol_high) / 2.0
-    if result < 0.10:
-        logger.warning(f"IV solver returned very low vol {result:.4f} for P0=${P0:.2f}, S=${S:.2f}, K=${K:.2f}, T={T:.4f}")
-        # Use approximation as fallback
-        if time_value > 0 and T > 0:
-            result = max(time_value / (0.4 * S * np.sqrt(T)), 0.20)  # Minimum 20% vol
-    return result
+    by_position: pd.DataFrame
+    by_underlying: pd.DataFrame
+    by_strategy: pd.DataFrame
 
 
 @dataclass
@@ -215,8 +140,10 @@ class VaRResult:
     skewness: Optional[float] = None
     kurtosis: Optional[float] = None
     
-    # Breakdown by position (if available)
-    position_contributions: Optional[Dict[str, float]] = None
+    # Breakdown by underlying (if available)
+    position_contributions: Optional[Dict[str, float]] = None  # Component VaR per symbol (sums to VaR)
+    cvar_contributions: Optional[Dict[str, float]] = None  # Tail loss per symbol (sums to CVaR)
+    attribution: Optional[RiskAttribution] = None  # Component / marginal / incremental VaR tables
     
     # Calculation metadata
     calculated_at: Optional[datetime] = None
@@ -272,11 +199,11 @@ def calculate_parametric_var(
     var_percent = var_return * 100.0
     
     # Estimate CVaR for normal distribution
-    # CVaR = E[Loss | Loss > VaR] = μ + σ * φ(z) / (1 - Φ(z))
+    # CVaR = E[Loss | Loss > VaR] = -μ + σ * φ(z) / (1 - Φ(z))
     # Where φ is PDF and Φ is CDF
     tail_prob = 1.0 - confidence_level
     pdf_at_z = stats.norm.pdf(z_score)
-    cvar_return = -(scaled_mean + scaled_volatility * pdf_at_z / tail_prob)
+    cvar_return = -(scaled_mean - scaled_volatility * pdf_at_z / tail_prob)
     cvar_amount = portfolio_value * cvar_return
     cvar_percent = cvar_return * 100.0
     
@@ -327,15 +254,8 @@ def calculate_historical_var(
         raise ValueError("historical_returns cannot be empty")
     
     # Scale returns for time horizon if needed
-    if time_horizon_days > 1:
-        # Use overlapping windows for time horizon
-        scaled_returns = []
-        for i in range(len(historical_returns) - time_horizon_days + 1):
-            window_return = np.sum(historical_returns[i:i+time_horizon_days])
-            scaled_returns.append(window_return)
-        returns_to_use = np.array(scaled_returns)
-    else:
-        returns_to_use = historical_returns
+    # Use overlapping windows for time horizon
+    returns_to_use = window_sums(historical_returns, time_horizon_days)
     
     # Calculate percentile (lower tail = losses)
     percentile = (1.0 - confidence_level) * 100.0
@@ -408,20 +328,447 @@ def calculate_cvar(
 
 
 
+# ----------------------------- Scenario Engine -----------------------------
+
+RISK_FREE_RATE = 0.03  # Rate used to imply and reprice option legs
+TRADING_DAYS_PER_YEAR = 252.0
+
+
+def window_sums(x: np.ndarray, window: int) -> np.ndarray:
+    """Sums over every `window` consecutive rows (overlapping windows) from one cumulative sum.
+
+    Args:
+        x: 1-D series or 2-D (rows x columns) array
+        window: Window length in rows
+
+    Returns:
+        Array with len(x) - window + 1 rows (x itself when window <= 1)
+    """
+    x = np.asarray(x, dtype=float)
+    if window <= 1:
+        return x
+    if len(x) < window:
+        return x[:0]
+    csum = np.cumsum(x, axis=0)
+    out = csum[window - 1:].copy()
+    out[1:] -= csum[:-window]
+    return out
+
+
+def _position_value(pos: Dict) -> float:
+    """Absolute position value: contracts * premium * multiplier for options, shares * price for stock."""
+    if pos.get('position_type') in ['CALL', 'PUT']:
+        return abs(pos['quantity']) * pos.get('option_price', 0.0) * CONTRACT_MULTIPLIER
+    return abs(pos['quantity']) * pos.get('underlying_price', 0.0)
+
+
+def _years_to_expiry(expiration_str: str, now: datetime) -> float:
+    """Trading-year time to expiration (floored at one day; 30 days if unparseable)."""
+    try:
+        days_to_exp = (datetime.strptime(expiration_str, '%Y-%m-%d') - now).days
+        return max(days_to_exp / TRADING_DAYS_PER_YEAR, 1.0 / TRADING_DAYS_PER_YEAR)
+    except Exception as e:
+        T0 = 30.0 / TRADING_DAYS_PER_YEAR
+        logger.warning(f"Could not parse expiration '{expiration_str}': {e}, using T0={T0:.4f}")
+        return T0
+
+
+def historical_scenarios(positions: List[Dict], historical_prices: pd.DataFrame) -> Tuple[np.ndarray, List[str]]:
+    """One-day return scenarios for the positions' underlyings.
+
+    Each symbol's returns come from its own non-missing closes; all series are cut
+    to the shortest one (most recent days), so row i is the same day for every symbol.
+
+    Returns:
+        (returns, symbols): (scenarios x symbols) simple returns and their column labels.
+        Symbols without at least two prices are left out.
+    """
+    series = {}
+    for symbol in dict.fromkeys(pos['symbol'] for pos in positions):
+        if symbol in historical_prices.columns:
+            prices = historical_prices[symbol].to_numpy(dtype=float)
+            prices = prices[~np.isnan(prices)]
+            if len(prices) > 1:
+                series[symbol] = prices[1:] / prices[:-1] - 1.0
+    if not series:
+        return np.empty((0, 0)), []
+    n = min(len(r) for r in series.values())
+    symbols = list(series)
+    return np.column_stack([series[s][len(series[s]) - n:] for s in symbols]), symbols
+
+
+@dataclass
+class _Book:
+    """Positions unpacked into arrays once per VaR run (stock legs and option legs)."""
+    n_positions: int
+    included: np.ndarray  # positions whose symbol has scenarios
+    stock_idx: List[int]
+    stock_qty: np.ndarray
+    stock_spot: np.ndarray
+    stock_col: List[int]  # scenario column of each stock leg's underlying
+    opt_idx: List[int]
+    opt_qty: np.ndarray
+    opt_spot: np.ndarray
+    opt_strike: np.ndarray
+    opt_premium: np.ndarray
+    opt_T0: np.ndarray
+    opt_sigma: np.ndarray  # implied from the current premium
+    opt_is_call: np.ndarray
+    opt_col: List[int]
+
+
+def _implied_vols(premium: np.ndarray, spot: np.ndarray, strike: np.ndarray, T0: np.ndarray,
+                  is_call: np.ndarray) -> np.ndarray:
+    """Volatility implied by each leg's premium, solved for all legs at once.
+
+    Premiums at or below discounted intrinsic value imply (almost) no time value and
+    get the solver's lower bound, so the leg reprices at its premium; legs with no
+    solution otherwise (expired, missing quote) fall back to FALLBACK_IV.
+    """
+    sigma, converged = implied_vol_vec(premium, spot, strike, T0, RISK_FREE_RATE, 0.0, is_call)
+    missing = ~np.isfinite(sigma)
+    if missing.any():
+        floor = bs_price_vec(spot, strike, RISK_FREE_RATE, IV_LOWER, T0, is_call)
+        sigma = np.where(missing, np.where(premium <= floor, IV_LOWER, FALLBACK_IV), sigma)
+    unsolved = int(np.count_nonzero((missing | ~converged) & (T0 > 0) & (premium > 0)))
+    if unsolved:
+        logger.warning(f"Implied volatility did not converge for {unsolved} of {len(premium)} option legs; "
+                       f"using intrinsic-value or {FALLBACK_IV:.0%} fallback vols")
+    return sigma
+
+
+def _unpack_book(positions: List[Dict], symbols: List[str]) -> _Book:
+    """Split positions into stock and option legs; imply each option leg's volatility once."""
+    col = {s: i for i, s in enumerate(symbols)}
+    included = np.array([pos['symbol'] in col for pos in positions], dtype=bool)
+
+    stock_idx, opt_idx = [], []
+    for j, pos in enumerate(positions):
+        if included[j]:
+            (opt_idx if pos['position_type'] in ['CALL', 'PUT'] else stock_idx).append(j)
+
+    now = datetime.now()
+    n = len(opt_idx)
+    qty, spot, strike, premium, T0 = (np.empty(n) for _ in range(5))
+    is_call = np.empty(n, dtype=bool)
+    for k, j in enumerate(opt_idx):
+        pos = positions[j]
+        spot[k] = pos['underlying_price']
+        premium[k] = pos.get('option_price', 0.0)
+        strike[k] = pos.get('strike', spot[k])
+        qty[k] = pos['quantity']
+        is_call[k] = pos['position_type'] == 'CALL'
+        if abs(spot[k] - strike[k]) < 0.01:
+            logger.warning(
+                f"⚠️ {pos['symbol']}: underlying price (${spot[k]:.2f}) equals strike (${strike[k]:.2f}). "
+                f"This is suspicious and likely indicates the underlying price fetch failed. "
+                f"VaR calculation will be inaccurate!"
+            )
+        T0[k] = _years_to_expiry(pos.get('expiration', ''), now)
+
+    sigma = _implied_vols(premium, spot, strike, T0, is_call)
+    if logger.isEnabledFor(logging.DEBUG):
+        for k, j in enumerate(opt_idx):
+            pos = positions[j]
+            logger.debug(
+                f"{pos['position_type']} {pos['symbol']} K={strike[k]:.2f} exp={pos.get('expiration', '')} "
+                f"qty={qty[k]} S=${spot[k]:.2f} premium=${premium[k]:.2f} T0={T0[k]:.4f} iv={sigma[k]:.4f}"
+            )
+
+    return _Book(
+        n_positions=len(positions),
+        included=included,
+        stock_idx=stock_idx,
+        stock_qty=np.array([positions[j]['quantity'] for j in stock_idx], dtype=float),
+        stock_spot=np.array([positions[j]['underlying_price'] for j in stock_idx], dtype=float),
+        stock_col=[col[positions[j]['symbol']] for j in stock_idx],
+        opt_idx=opt_idx, opt_qty=qty, opt_spot=spot, opt_strike=strike, opt_premium=premium,
+        opt_T0=T0, opt_sigma=sigma, opt_is_call=is_call,
+        opt_col=[col[positions[j]['symbol']] for j in opt_idx],
+    )
+
+
+def _revalue(book: _Book, shocks: np.ndarray, horizon_years: float,
+             log_vol_shocks: Optional[np.ndarray] = None) -> np.ndarray:
+    """(scenarios x positions) dollar P&L for underlying returns `shocks` (scenarios x symbols).
+
+    Option legs are repriced in one broadcast Black-Scholes call, `horizon_years`
+    closer to expiration (T <= 0 prices at intrinsic), at their implied volatility
+    scaled by exp(log_vol_shocks) when given.
+    """
+    pnl = np.zeros((shocks.shape[0], book.n_positions))
+    if book.stock_idx:
+        pnl[:, book.stock_idx] = book.stock_qty * book.stock_spot * shocks[:, book.stock_col]
+    if book.opt_idx:
+        # Transform per underlying (scenarios x symbols) before gathering per leg
+        S1 = book.opt_spot * (1.0 + shocks)[:, book.opt_col]
+        sigma1 = book.opt_sigma if log_vol_shocks is None else book.opt_sigma * np.exp(log_vol_shocks)[:, book.opt_col]
+        T1 = np.maximum(book.opt_T0 - horizon_years, 0.0)
+        repriced = bs_price_vec(S1, book.opt_strike, RISK_FREE_RATE, sigma1, T1, book.opt_is_call)
+        # No loss cap needed - Black-Scholes bounds option prices at zero
+        pnl[:, book.opt_idx] = book.opt_qty * (repriced - book.opt_premium) * CONTRACT_MULTIPLIER
+    return pnl
+
+
+def scenario_pnl_matrix(positions: List[Dict], returns: np.ndarray, symbols: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Full-revaluation dollar P&L of every position under every scenario.
+
+    Builds the (scenarios x positions) underlying shock matrix and reprices all
+    option legs in one broadcast Black-Scholes call, one trading day closer to
+    expiration, at the volatility implied by each leg's current premium.
+    Stocks: P&L = quantity * price * return.
+
+    Args:
+        positions: Position dicts (see calculate_portfolio_var)
+        returns: (scenarios x symbols) simple returns of the underlyings
+        symbols: Column labels of `returns`
+
+    Returns:
+        (pnl, included): (scenarios x positions) P&L, and a boolean mask of positions
+        whose symbol has scenarios (columns of excluded positions are zero).
+    """
+    book = _unpack_book(positions, symbols)
+    return _revalue(book, np.asarray(returns, dtype=float), 1.0 / TRADING_DAYS_PER_YEAR), book.included
+
+
+def _portfolio_value(positions: List[Dict]) -> float:
+    """Total portfolio value (sum of absolute market values)."""
+    return sum(abs(pos['market_value']) if 'market_value' in pos else _position_value(pos) for pos in positions)
+
+
+def _var_from_losses(losses: np.ndarray, confidence_level: float) -> Tuple[float, float, np.ndarray]:
+    """(VaR, CVaR, tail mask) of a loss distribution (losses positive); VaR floored at zero."""
+    # VaR should always be positive (representing a loss amount)
+    var_dollar = float(np.percentile(losses, confidence_level * 100.0))
+    
+    # Ensure VaR is non-negative (can't have negative loss)
+    if var_dollar < 0:
+        logger.warning(
+            f"VaR calculation resulted in negative value (${var_dollar:.2f}), "
+            f"indicating most scenarios show gains. Setting VaR to $0. "
+            f"This may indicate data issues (e.g., wrong underlying price)."
+        )
+        var_dollar = 0.0
+    
+    # CVaR: average of losses at or beyond the VaR threshold
+    tail = losses >= var_dollar
+    cvar_dollar = float(np.mean(losses[tail])) if tail.any() else var_dollar
+    return var_dollar, cvar_dollar, tail
+
+
+# ----------------------------- Risk Attribution -----------------------------
+
+def _strategy_tag(pos: Dict) -> str:
+    """Position's 'strategy' tag, else its leg type (STOCK, LONG_CALL, SHORT_PUT, ...)."""
+    tag = pos.get('strategy')
+    if tag:
+        return str(tag)
+    if pos['position_type'] not in ['CALL', 'PUT']:
+        return 'STOCK'
+    return f"{'LONG' if pos['quantity'] > 0 else 'SHORT'}_{pos['position_type']}"
+
+
+def _leg_labels(positions: List[Dict]) -> List[str]:
+    """Unique, readable label per position ('AAPL PUT 180 2026-01-16', '#2' on repeats)."""
+    labels, seen = [], {}
+    for pos in positions:
+        if pos['position_type'] in ['CALL', 'PUT']:
+            label = f"{pos['symbol']} {pos['position_type']} {float(pos.get('strike') or 0):g} {pos.get('expiration', '')}".rstrip()
+        else:
+            label = f"{pos['symbol']} {pos['position_type']}"
+        seen[label] = seen.get(label, 0) + 1
+        labels.append(label if seen[label] == 1 else f"{label} #{seen[label]}")
+    return labels
+
+
+def _group_index(keys: List[str]) -> Tuple[List[str], np.ndarray]:
+    names = list(dict.fromkeys(keys))
+    lookup = {k: i for i, k in enumerate(names)}
+    return names, np.array([lookup[k] for k in keys], dtype=np.intp)
+
+
+class _AttributionColumns:
+    """Leg P&L columns plus per-underlying and per-strategy sums, in that order."""
+
+    def __init__(self, positions: List[Dict], included: np.ndarray):
+        self.legs = np.flatnonzero(included)
+        legs = [positions[j] for j in self.legs]
+        self.labels = _leg_labels(legs)
+        self.symbols, sym_idx = _group_index([pos['symbol'] for pos in legs])
+        self.tags, tag_idx = _group_index([_strategy_tag(pos) for pos in legs])
+        self.quantity = np.array([pos['quantity'] for pos in legs], dtype=float)
+        self.groups = [sym_idx, tag_idx]
+        self.sizes = [len(self.labels), len(self.symbols), len(self.tags)]
+        # Leg -> group indicator: group P&L columns are one matrix product per chunk
+        self._groups = np.zeros((self.sizes[0], sum(self.sizes[1:])))
+        self._groups[np.arange(self.sizes[0]), sym_idx] = 1.0
+        self._groups[np.arange(self.sizes[0]), self.sizes[1] + tag_idx] = 1.0
+
+    def __call__(self, pnl: np.ndarray) -> np.ndarray:
+        """(scenarios x positions) P&L -> (scenarios x legs + underlyings + tags)."""
+        out = np.empty((len(pnl), sum(self.sizes)))
+        legs = out[:, :self.sizes[0]]
+        legs[...] = pnl if len(self.legs) == pnl.shape[1] else pnl[:, self.legs]
+        np.matmul(legs, self._groups, out=out[:, self.sizes[0]:])
+        return out
+
+    def tables(self, component_var: np.ndarray, incremental_var: np.ndarray, component_cvar: np.ndarray,
+               var_dollar: float) -> RiskAttribution:
+        def _frame(lo, hi, index, leading, marginal=None):
+            comp = component_var[lo:hi]
+            cols = dict(leading)
+            cols['component_var'] = comp
+            cols['pct_of_var'] = comp / var_dollar * 100.0 if var_dollar > 0 else np.full(len(comp), np.nan)
+            if marginal is not None:
+                cols['marginal_var'] = marginal
+            cols['incremental_var'] = incremental_var[lo:hi]
+            cols['component_cvar'] = component_cvar[lo:hi]
+            return pd.DataFrame(cols, index=pd.Index(index, dtype=object))
+
+        n_leg, n_sym, n_tag = self.sizes
+        sym_idx, tag_idx = self.groups
+        with np.errstate(divide='ignore', invalid='ignore'):
+            marginal = np.where(self.quantity != 0, component_var[:n_leg] / self.quantity, np.nan)
+        by_position = _frame(0, n_leg, self.labels, {
+            'symbol': [self.symbols[i] for i in sym_idx],
+            'strategy': [self.tags[i] for i in tag_idx],
+            'quantity': self.quantity,
+        }, marginal)
+        by_underlying = _frame(n_leg, n_leg + n_sym, self.symbols,
+                               {'positions': np.bincount(sym_idx, minlength=n_sym)})
+        by_strategy = _frame(n_leg + n_sym, None, self.tags, {'positions': np.bincount(tag_idx, minlength=n_tag)})
+        return RiskAttribution(by_position, by_underlying, by_strategy)
+
+
+def _percentile_of_top(top: np.ndarray, n: int, confidence_level: float) -> np.ndarray:
+    """np.percentile(x, 100 * c, axis=0) of n values per column from the k largest (sorted ascending)."""
+    k = len(top)
+    pos = (n - 1) * confidence_level
+    lo = int(np.floor(pos))
+    hi = min(lo + 1, n - 1)
+    frac = pos - lo
+    return top[lo - (n - k)] * (1.0 - frac) + top[hi - (n - k)] * frac
+
+
+class _TailScenarios:
+    """Streaming record of what attribution needs from a loss distribution.
+    
+    Keeps the `keep` worst scenarios (portfolio loss and attribution columns) and,
+    per column, the `keep` largest portfolio losses with that column removed, so
+    component, incremental and tail attributions come out of one pass over chunks.
+    """
+
+    def __init__(self, keep: int, n_cols: int):
+        self.keep = int(keep)
+        self.loss = np.empty(0)
+        self.cols = np.empty((0, n_cols))
+        self.without = np.empty((0, n_cols))
+        self.n = 0
+
+    def add(self, loss: np.ndarray, cols: np.ndarray) -> None:
+        self.n += len(loss)
+        # Loss of the book without column k = portfolio loss + P&L of k
+        without = cols + loss[:, None]
+        if len(self.without) == self.keep:
+            # Rows below every column's current keep-th largest cannot enter any top set
+            without = without[(without > self.without.min(axis=0)).any(axis=1)]
+        if len(without) > self.keep:
+            without = np.partition(without, len(without) - self.keep, axis=0)[-self.keep:]
+        if len(loss) > self.keep:
+            top = np.argpartition(loss, len(loss) - self.keep)[-self.keep:]
+            loss, cols = loss[top], cols[top]
+        loss = np.concatenate([self.loss, loss])
+        cols = np.concatenate([self.cols, cols])
+        without = np.concatenate([self.without, without])
+        if len(loss) > self.keep:
+            top = np.argpartition(loss, len(loss) - self.keep)[-self.keep:]
+            loss, cols = loss[top], cols[top]
+        if len(without) > self.keep:
+            without = np.partition(without, len(without) - self.keep, axis=0)[-self.keep:]
+        self.loss, self.cols, self.without = loss, cols, without
+
+    def attribute(self, var_dollar: float, confidence_level: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(component VaR, incremental VaR, component CVaR) per column (legs sum to VaR / CVaR)."""
+        order = np.argsort(self.loss, kind='stable')
+        loss, cols = self.loss[order], self.cols[order]
+        first = self.n - len(loss)  # global rank of loss[0]
+        pos = (self.n - 1) * confidence_level
+        band = max(1, int(round(EULER_BAND * self.n)))
+        lo = max(int(np.floor(pos)) - band, first)
+        hi = min(int(np.ceil(pos)) + band, self.n - 1)
+        component = -cols[lo - first:hi - first + 1].mean(axis=0)
+        
+        tail = loss >= var_dollar
+        component_cvar = -cols[tail].mean(axis=0) if tail.any() else component.copy()
+        
+        without = _percentile_of_top(np.sort(self.without, axis=0), self.n, confidence_level)
+        incremental = var_dollar - np.maximum(without, 0.0)
+        return component, incremental, component_cvar
+
+
+def _attribution(tail: _TailScenarios, columns: _AttributionColumns, var_dollar: float,
+                 confidence_level: float) -> Tuple[RiskAttribution, Dict, Dict]:
+    """RiskAttribution plus the per-symbol component VaR and CVaR dicts of VaRResult."""
+    component, incremental, component_cvar = tail.attribute(var_dollar, confidence_level)
+    n_leg = columns.sizes[0]
+    total = float(component[:n_leg].sum())
+    # Band average ~= VaR; rescale so legs add up to it exactly (groups are sums of legs)
+    component = component * (var_dollar / total) if total > 0 else component * 0.0
+    attribution = columns.tables(component, incremental, component_cvar, var_dollar)
+    by_symbol = attribution.by_underlying
+    return (attribution, {s: float(v) for s, v in by_symbol['component_var'].items()},
+            {s: float(v) for s, v in by_symbol['component_cvar'].items()})
+
+
+def _parametric_attribution(positions: List[Dict], included: np.ndarray, pnl: np.ndarray,
+                            var_result: VaRResult) -> Tuple[RiskAttribution, Dict, Dict]:
+    """Closed-form Euler attribution under the normal model fitted to daily P&L."""
+    columns = _AttributionColumns(positions, included)
+    cols = columns(pnl)
+    portfolio = pnl.sum(axis=1)
+    h = var_result.time_horizon_days
+    z = stats.norm.ppf(var_result.confidence_level)
+    es = stats.norm.pdf(z) / (1.0 - var_result.confidence_level)
+    sd = float(np.std(portfolio))
+    mean_cols = cols.mean(axis=0)
+    cov = ((cols - mean_cols) * (portfolio - portfolio.mean())[:, None]).mean(axis=0)
+    beta = cov / sd if sd > 0 else np.zeros_like(cov)
+    component = -mean_cols * h + z * np.sqrt(h) * beta
+    component_cvar = -mean_cols * h + es * np.sqrt(h) * beta
+    # VaR without column k: normal fit to portfolio - column k
+    var_without = (-(portfolio.mean() - mean_cols) * h
+                   + z * np.sqrt(h) * np.sqrt(np.maximum(sd ** 2 - 2.0 * cov + cols.var(axis=0), 0.0)))
+    var_dollar = max(var_result.var_amount, 0.0)
+    incremental = var_dollar - np.maximum(var_without, 0.0)
+    attribution = columns.tables(component, incremental, component_cvar, var_dollar)
+    by_symbol = attribution.by_underlying
+    return (attribution, {s: float(v) for s, v in by_symbol['component_var'].items()},
+            {s: float(v) for s, v in by_symbol['component_cvar'].items()})
+
+
 def calculate_portfolio_var(
     positions: List[Dict],
     historical_prices: pd.DataFrame,
     confidence_level: float = 0.95,
     time_horizon_days: int = 1,
-    method: str = 'historical'
+    method: str = 'historical',
+    n_paths: int = MC_DEFAULT_PATHS,
+    seed: Optional[int] = None
 ) -> VaRResult:
     """Calculate portfolio-level VaR with proper risk modeling for each position type.
     
-    Uses scenario-based simulation:
+    Uses scenario-based full revaluation (see scenario_pnl_matrix):
     - For stocks: P&L = quantity * price * return
-    - For options: P&L = delta * quantity * 100 * underlying_price * return
-    - For long options: Cap max loss at premium paid
-    - For short options: No cap on losses
+    - For options: Black-Scholes repricing of every leg under every scenario
+      (losses are naturally bounded for long options, unbounded for short ones)
+    
+    Methods:
+    - 'historical': replay of daily underlying returns; multi-day horizons sum the
+      daily P&L over overlapping windows
+    - 'parametric': normal distribution fitted to the historical daily portfolio P&L,
+      scaled by the square root of time
+    - 'monte_carlo': correlated spot and IV shocks over the whole horizon
+      (see calculate_monte_carlo_var; n_paths / seed apply to this method only)
     
     Args:
         positions: List of position dicts with keys:
@@ -438,222 +785,82 @@ def calculate_portfolio_var(
         historical_prices: DataFrame with columns = symbols, rows = dates
         confidence_level: Confidence level (0.90, 0.95, or 0.99)
         time_horizon_days: Time horizon in days
-        method: 'parametric' or 'historical'
+        method: 'historical', 'parametric' or 'monte_carlo'
+        n_paths: Monte Carlo paths
+        seed: Monte Carlo random seed (None = fresh draws)
         
     Returns:
-        VaRResult with portfolio VaR and position contributions
+        VaRResult with portfolio VaR and its attribution (component / incremental VaR and tail loss)
     """
-    if not positions:
-        return VaRResult(
-            var_amount=0.0,
-            var_percent=0.0,
-            confidence_level=confidence_level,
-            time_horizon_days=time_horizon_days,
-            method=method,
-            calculated_at=datetime.now()
+    if method == 'monte_carlo':
+        return calculate_monte_carlo_var(
+            positions, historical_prices, confidence_level=confidence_level,
+            time_horizon_days=time_horizon_days, n_paths=n_paths, seed=seed
         )
     
-    # Calculate total portfolio value (sum of absolute market values)
-    portfolio_value = 0.0
-    for pos in positions:
-        if 'market_value' in pos:
-            portfolio_value += abs(pos['market_value'])
-        else:
-            # Calculate market value based on position type
-            if pos.get('position_type') in ['CALL', 'PUT']:
-                # Options: quantity (contracts) * option_price (per share) * CONTRACT_MULTIPLIER
-                pos_value = abs(pos['quantity']) * pos.get('option_price', 0) * CONTRACT_MULTIPLIER
-            else:
-                # Stock: quantity * stock_price
-                pos_value = abs(pos['quantity']) * pos.get('underlying_price', 0)
-            portfolio_value += pos_value
+    empty = VaRResult(
+        var_amount=0.0,
+        var_percent=0.0,
+        confidence_level=confidence_level,
+        time_horizon_days=time_horizon_days,
+        method=method,
+        calculated_at=datetime.now()
+    )
+    if not positions:
+        return empty
     
+    portfolio_value = _portfolio_value(positions)
     if portfolio_value == 0:
-        return VaRResult(
-            var_amount=0.0,
-            var_percent=0.0,
-            confidence_level=confidence_level,
-            time_horizon_days=time_horizon_days,
-            method=method,
-            calculated_at=datetime.now()
-        )
-    
-    # Extract symbols from positions
-    symbols = list(set(pos['symbol'] for pos in positions))
-    
-    # Calculate returns for each symbol
-    returns_dict = {}
-    for symbol in symbols:
-        if symbol in historical_prices.columns:
-            prices = historical_prices[symbol].dropna()
-            if len(prices) > 1:
-                returns = prices.pct_change().dropna().values
-                returns_dict[symbol] = returns
+        return empty
     
-    if not returns_dict:
+    returns, symbols = historical_scenarios(positions, historical_prices)
+    if not symbols:
         logger.warning("No historical price data available for VaR calculation")
-        return VaRResult(
-            var_amount=0.0,
-            var_percent=0.0,
-            confidence_level=confidence_level,
-            time_horizon_days=time_horizon_days,
-            method=method,
-            calculated_at=datetime.now()
-        )
-    
-    # Get minimum common length across all return series
-    # Get minimum common length across all return series
-    min_length = min(len(returns) for returns in returns_dict.values())
-    
-    # Build scenario-based P&L in dollar space using proper option repricing
-    # For options: reprice under each scenario using Black-Scholes
-    # For stocks: use linear P&L = quantity * price * return
-    portfolio_pnl = np.zeros(min_length)
-    position_contributions = {}
-    
-    # Constants for option pricing
-    RISK_FREE_RATE = 0.03  # 3% risk-free rate
-    TRADING_DAYS_PER_YEAR = 252.0
-    
-    for pos in positions:
-        symbol = pos['symbol']
-        if symbol not in returns_dict:
-            continue
-        
-        symbol_returns = returns_dict[symbol][-min_length:]
-        quantity = pos['quantity']  # Signed: + for long, - for short
-        underlying_price = pos['underlying_price']
-        position_type = pos['position_type']
-        
-        # Calculate position market value (consistent units)
-        if position_type in ['CALL', 'PUT']:
-            option_price = pos.get('option_price', 0.0)
-            position_value = abs(quantity) * option_price * CONTRACT_MULTIPLIER
-        else:
-            position_value = abs(quantity) * underlying_price
-        
-        if position_type == 'STOCK':
-            # Stock P&L: quantity * spot price * return
-            position_pnl = quantity * underlying_price * symbol_returns
-            
-        else:  # CALL or PUT option - use Black-Scholes repricing
-            option_price = pos.get('option_price', 0.0)
-            strike = pos.get('strike', underlying_price)
-            expiration_str = pos.get('expiration', '')
-            
-            logger.info(f"Processing {position_type} option: {symbol}")
-            logger.info(f"  Underlying price: ${underlying_price:.2f}")
-            logger.info(f"  Option price: ${option_price:.2f}/share")
-            logger.info(f"  Strike: ${strike:.2f}")
-            logger.info(f"  Expiration: {expiration_str}")
-            logger.info(f"  Quantity: {quantity}")
-            
-            # Validate data integrity
-            if abs(underlying_price - strike) < 0.01:
-                logger.warning(
-                    f"⚠️ Underlying price (${underlying_price:.2f}) equals strike (${strike:.2f}). "
-                    f"This is suspicious and likely indicates the underlying price fetch failed. "
-                    f"VaR calculation will be inaccurate!"
-                )
-            
-            # Calculate time to expiration in years
-            try:
-                exp_date = datetime.strptime(expiration_str, '%Y-%m-%d')
-                days_to_exp = (exp_date - datetime.now()).days
-                T0 = max(days_to_exp / TRADING_DAYS_PER_YEAR, 1.0 / TRADING_DAYS_PER_YEAR)
-                logger.info(f"  Days to expiration: {days_to_exp}, T0: {T0:.4f} years")
-            except Exception as e:
-                T0 = 30.0 / TRADING_DAYS_PER_YEAR  # Default 30 days
-                logger.warning(f"  Could not parse expiration '{expiration_str}': {e}, using T0={T0:.4f}")
-            
-            # Estimate implied volatility from current option price
-            if position_type == 'CALL':
-                sigma = _implied_vol_call_simple(option_price, underlying_price, strike, T0, RISK_FREE_RATE)
-            else:  # PUT
-                sigma = _implied_vol_put_simple(option_price, underlying_price, strike, T0, RISK_FREE_RATE)
-            
-            logger.info(f"  Implied volatility: {sigma:.4f} ({sigma*100:.2f}%)")
-            
-            # For each scenario, reprice the option
-            position_pnl = np.zeros(len(symbol_returns))
-            
-            for i, ret in enumerate(symbol_returns):
-                # New underlying price under this scenario
-                S1 = underlying_price * (1 + ret)
-                
-                # Time to expiration reduced by 1 day
-                T1 = max(T0 - 1.0 / TRADING_DAYS_PER_YEAR, 0.0)
-                
-                # Reprice option
-                if position_type == 'CALL':
-                    C1 = _bs_call_price(S1, strike, T1, RISK_FREE_RATE, sigma)
-                else:  # PUT
-                    C1 = _bs_put_price(S1, strike, T1, RISK_FREE_RATE, sigma)
-                
-                # P&L = change in option value * contracts * multiplier
-                # Note: (C1 - option_price) is per-share change
-                position_pnl[i] = quantity * (C1 - option_price) * CONTRACT_MULTIPLIER
-            
-            logger.info(f"  Position P&L range: ${position_pnl.min():.2f} to ${position_pnl.max():.2f}")
-            logger.info(f"  95th percentile loss: ${-np.percentile(position_pnl, 5):.2f}")
-            
-            # No need to cap losses - Black-Scholes naturally bounds option prices at zero
-        
-        # Accumulate to portfolio P&L (in dollars)
-        portfolio_pnl += position_pnl
-        
-        # Track position contribution (for risk attribution)
-        position_contributions[symbol] = position_value
-    
-    # Now portfolio_pnl[t] is the dollar P&L for each historical day
-    # Convert to losses (positive = loss, negative = gain)
-    losses = -portfolio_pnl
-    
-    # Scale for multi-day horizon if needed
-    if time_horizon_days > 1:
-        # Use overlapping windows
-        scaled_losses = []
-        for i in range(len(losses) - time_horizon_days + 1):
-            window_loss = np.sum(losses[i:i+time_horizon_days])
-            scaled_losses.append(window_loss)
-        losses = np.array(scaled_losses)
-    
-    # Calculate VaR as percentile of loss distribution
-    # VaR should always be positive (representing a loss amount)
-    percentile_level = confidence_level * 100.0
-    var_dollar = float(np.percentile(losses, percentile_level))
-    
-    # Ensure VaR is non-negative (can't have negative loss)
-    if var_dollar < 0:
-        logger.warning(
-            f"VaR calculation resulted in negative value (${var_dollar:.2f}), "
-            f"indicating most scenarios show gains. Setting VaR to $0. "
-            f"This may indicate data issues (e.g., wrong underlying price)."
-        )
-        var_dollar = 0.0
-    
-    # Debug logging
-    logger.info(f"VaR Calculation Debug:")
-    logger.info(f"  Portfolio value: ${portfolio_value:.2f}")
-    logger.info(f"  Number of scenarios: {len(losses)}")
-    logger.info(f"  Loss distribution: min=${losses.min():.2f}, max=${losses.max():.2f}, mean=${losses.mean():.2f}")
-    logger.info(f"  VaR (95th percentile): ${var_dollar:.2f}")
-    logger.info(f"  Positions: {len(positions)}")
-    for pos in positions:
-        logger.info(f"    {pos['symbol']}: {pos['position_type']}, qty={pos['quantity']}, price=${pos.get('option_price', pos['underlying_price']):.2f}")
-    
-    var_percent = (var_dollar / portfolio_value) * 100.0 if portfolio_value > 0 else 0.0
+        return empty
     
-    # Calculate CVaR (average of losses at or beyond VaR threshold)
-    tail_losses = losses[losses >= var_dollar]
-    cvar_dollar = float(np.mean(tail_losses)) if len(tail_losses) > 0 else var_dollar
-    cvar_percent = (cvar_dollar / portfolio_value) * 100.0 if portfolio_value > 0 else 0.0
+    # (days x positions) P&L in dollars; portfolio_pnl[t] is the P&L for historical day t
+    pnl, included = scenario_pnl_matrix(positions, returns, symbols)
+    portfolio_pnl = pnl.sum(axis=1)
     
     # Calculate statistics (convert P&L to returns for volatility/mean)
-    returns_for_stats = portfolio_pnl / portfolio_value if portfolio_value > 0 else portfolio_pnl
+    returns_for_stats = portfolio_pnl / portfolio_value
     volatility = float(np.std(returns_for_stats))
     mean_return = float(np.mean(returns_for_stats))
     
+    if method == 'parametric':
+        var_result = calculate_parametric_var(
+            portfolio_value=portfolio_value,
+            volatility=volatility,
+            mean_return=mean_return,
+            confidence_level=confidence_level,
+            time_horizon_days=time_horizon_days
+        )
+        var_result.data_points = len(portfolio_pnl)
+        (var_result.attribution, var_result.position_contributions,
+         var_result.cvar_contributions) = _parametric_attribution(positions, included, pnl, var_result)
+        return var_result
+    
+    # Horizon P&L per position over overlapping windows; losses are positive
+    horizon_pnl = window_sums(pnl, time_horizon_days)
+    losses = -horizon_pnl.sum(axis=1)
+    
+    var_dollar, cvar_dollar, _ = _var_from_losses(losses, confidence_level)
+    var_percent = (var_dollar / portfolio_value) * 100.0
+    cvar_percent = (cvar_dollar / portfolio_value) * 100.0
+    
+    # Component / incremental VaR and tail losses per leg, underlying and strategy
+    columns = _AttributionColumns(positions, included)
+    scenarios = _TailScenarios(len(losses), sum(columns.sizes))
+    scenarios.add(losses, columns(horizon_pnl))
+    attribution, position_contributions, cvar_contributions = _attribution(
+        scenarios, columns, var_dollar, confidence_level)
+    
+    logger.info(
+        f"Portfolio VaR: {len(positions)} positions ({int(included.sum())} with history), "
+        f"{len(losses)} scenarios, value=${portfolio_value:,.2f}, "
+        f"VaR{confidence_level:.0%}/{time_horizon_days}d=${var_dollar:,.2f}, CVaR=${cvar_dollar:,.2f}"
+    )
+    
     # Create result
     var_result = VaRResult(
         var_amount=var_dollar,
@@ -667,12 +874,182 @@ def calculate_portfolio_var(
         mean_return=mean_return,
         calculated_at=datetime.now(),
         data_points=len(portfolio_pnl),
-        position_contributions=position_contributions
+        position_contributions=position_contributions,
+        cvar_contributions=cvar_contributions,
+        attribution=attribution
     )
     
     return var_result
 
 
+# ----------------------------- Monte Carlo VaR -----------------------------
+
+def shrunk_covariance(returns: np.ndarray, shrinkage: Optional[float] = None) -> Tuple[np.ndarray, float]:
+    """Covariance of return columns, shrunk toward a scaled identity.
+    
+    With shrinkage=None the intensity is the Ledoit-Wolf (2004) estimate, which
+    keeps the matrix well conditioned (and positive definite) when there are few
+    days per underlying or near-duplicate series.
+    
+    Args:
+        returns: (days x symbols) returns
+        shrinkage: Fixed intensity in [0, 1], or None to estimate it
+        
+    Returns:
+        (covariance, shrinkage intensity used)
+    """
+    X = np.asarray(returns, dtype=float)
+    n, p = X.shape
+    X = X - X.mean(axis=0)
+    S = X.T @ X / n
+    target = (np.trace(S) / p) * np.eye(p)
+    if shrinkage is None:
+        d2 = float(((S - target) ** 2).sum())
+        b2 = float(((X ** 2).sum(axis=1) ** 2).sum() / n ** 2 - (S ** 2).sum() / n)
+        shrinkage = min(max(b2 / d2, 0.0), 1.0) if d2 > 0 else 1.0
+    shrinkage = float(shrinkage)
+    return shrinkage * target + (1.0 - shrinkage) * S, shrinkage
+
+
+def _cov_factor(cov: np.ndarray) -> np.ndarray:
+    """L with L @ L.T == cov (Cholesky; eigen-decomposition for semi-definite matrices)."""
+    try:
+        return np.linalg.cholesky(cov)
+    except np.linalg.LinAlgError:
+        w, v = np.linalg.eigh(cov)
+        return v * np.sqrt(np.clip(w, 0.0, None))
+
+
+def calculate_monte_carlo_var(
+    positions: List[Dict],
+    historical_prices: pd.DataFrame,
+    confidence_level: float = 0.95,
+    time_horizon_days: int = 1,
+    n_paths: int = MC_DEFAULT_PATHS,
+    seed: Optional[int] = None,
+    vol_of_vol: float = MC_VOL_OF_VOL,
+    spot_vol_corr: float = MC_SPOT_VOL_CORR,
+    shrinkage: Optional[float] = None,
+    chunk_size: Optional[int] = None
+) -> VaRResult:
+    """Monte Carlo VaR with correlated underlying and implied-volatility shocks.
+    
+    - Spot: horizon log-returns ~ N(0, h * Σ), Σ the shrunk covariance of daily log
+      returns from `historical_prices` (zero drift, conservative)
+    - IV: each underlying's implied vol moves by exp(x) with x ~ N(-v²/2, v²),
+      v = vol_of_vol * sqrt(h / 252), correlated `spot_vol_corr` with its own spot
+      shock (so IV shocks are correlated across underlyings through spot)
+    - Every path revalues the whole book at the horizon: stocks linearly, options by
+      Black-Scholes at the shocked spot and IV, h trading days closer to expiration
+    
+    Paths are simulated and revalued in chunks (chunk_size paths; default keeps
+    paths x positions near MC_CHUNK_ELEMENTS). Only the portfolio loss per path and
+    the position P&L of the worst paths are kept. With a fixed seed the result does
+    not depend on chunk_size.
+    
+    Args:
+        positions: Position dicts (see calculate_portfolio_var)
+        historical_prices: DataFrame with columns = symbols, rows = dates
+        confidence_level: Confidence level (0.90, 0.95, or 0.99)
+        time_horizon_days: Horizon in trading days
+        n_paths: Number of simulated paths
+        seed: Random seed (None = fresh draws)
+        vol_of_vol: Annualized volatility of log IV changes (0 keeps IV fixed)
+        spot_vol_corr: Correlation between an underlying's spot and IV shocks
+        shrinkage: Covariance shrinkage intensity (None = Ledoit-Wolf estimate)
+        chunk_size: Paths per chunk
+        
+    Returns:
+        VaRResult (method 'monte_carlo', data_points = n_paths) with its risk attribution
+    """
+    empty = VaRResult(
+        var_amount=0.0,
+        var_percent=0.0,
+        confidence_level=confidence_level,
+        time_horizon_days=time_horizon_days,
+        method='monte_carlo',
+        calculated_at=datetime.now()
+    )
+    if not positions:
+        return empty
+    
+    portfolio_value = _portfolio_value(positions)
+    if portfolio_value == 0:
+        return empty
+    
+    returns, symbols = historical_scenarios(positions, historical_prices)
+    if len(returns) < 2:
+        logger.warning("Not enough historical price data for Monte Carlo VaR")
+        return empty
+    
+    book = _unpack_book(positions, symbols)
+    cov, used_shrinkage = shrunk_covariance(np.log1p(returns), shrinkage)
+    L = _cov_factor(cov)
+    p = len(symbols)
+    h = max(int(time_horizon_days), 1)
+    std = np.sqrt(np.diag(cov))
+    std = np.where(std > 0, std, 1.0)
+    v = float(vol_of_vol) * np.sqrt(h / TRADING_DAYS_PER_YEAR)
+    rho = float(np.clip(spot_vol_corr, -1.0, 1.0))
+    
+    n_paths = max(int(n_paths), 1)
+    chunk = int(chunk_size) if chunk_size else max(256, MC_CHUNK_ELEMENTS // max(book.n_positions, 1))
+    rng = np.random.default_rng(seed)
+    # Worst paths kept for attribution: every loss >= VaR plus the Euler band below it
+    band = max(1, int(round(EULER_BAND * n_paths)))
+    keep = min(n_paths, int(np.ceil((1.0 - confidence_level) * n_paths)) + band + 2)
+    losses = np.empty(n_paths)
+    columns = _AttributionColumns(positions, book.included)
+    scenarios = _TailScenarios(keep, sum(columns.sizes))
+    
+    for start in range(0, n_paths, chunk):
+        m = min(chunk, n_paths - start)
+        # One (m x 2p) draw per chunk: row i always consumes the same 2p numbers,
+        # so the paths do not depend on the chunk size
+        z = rng.standard_normal((m, 2 * p))
+        x = (z[:, :p] @ L.T) * np.sqrt(h)
+        shocks = np.expm1(x)
+        log_vol = None
+        if v > 0:
+            z_spot = x / (std * np.sqrt(h))
+            log_vol = v * (rho * z_spot + np.sqrt(1.0 - rho * rho) * z[:, p:]) - 0.5 * v * v
+        pnl = _revalue(book, shocks, h / TRADING_DAYS_PER_YEAR, log_vol)
+        chunk_loss = -pnl.sum(axis=1)
+        losses[start:start + m] = chunk_loss
+        scenarios.add(chunk_loss, columns(pnl))
+    
+    var_dollar, cvar_dollar, _ = _var_from_losses(losses, confidence_level)
+    attribution, position_contributions, cvar_contributions = _attribution(
+        scenarios, columns, var_dollar, confidence_level)
+    
+    horizon_returns = -losses / portfolio_value
+    logger.info(
+        f"Monte Carlo VaR: {len(positions)} positions, {p} underlyings, {n_paths} paths "
+        f"(chunks of {chunk}), shrinkage={used_shrinkage:.2f}, "
+        f"VaR{confidence_level:.0%}/{h}d=${var_dollar:,.2f}, CVaR=${cvar_dollar:,.2f}"
+    )
+    
+    return VaRResult(
+        var_amount=var_dollar,
+        var_percent=(var_dollar / portfolio_value) * 100.0,
+        confidence_level=confidence_level,
+        time_horizon_days=time_horizon_days,
+        method='monte_carlo',
+        cvar_amount=cvar_dollar,
+        cvar_percent=(cvar_dollar / portfolio_value) * 100.0,
+        # Daily-equivalent statistics, comparable with the historical method
+        volatility=float(np.std(horizon_returns) / np.sqrt(h)),
+        mean_return=float(np.mean(horizon_returns) / h),
+        skewness=float(stats.skew(horizon_returns)),
+        kurtosis=float(stats.kurtosis(horizon_returns)),
+        calculated_at=datetime.now(),
+        data_points=n_paths,
+        position_contributions=position_contributions,
+        cvar_contributions=cvar_contributions,
+        attribution=attribution
+    )
+
+
 def format_var_report(var_result: VaRResult) -> str:
     """Format VaR result as a readable report.
     
@@ -687,7 +1064,7 @@ def format_var_report(var_result: VaRResult) -> str:
     report = f"""
 Value at Risk Report
 {'=' * 60}
-Method:             {var_result.method.title()}
+Method:             {var_result.method.replace('_', ' ').title()}
 Confidence Level:   {confidence_pct:.1f}%
 Time Horizon:       {var_result.time_horizon_days} day(s)
 
@@ -723,7 +1100,7 @@ Distribution Statistics:
         report += f"  Kurtosis:         {var_result.kurtosis:.3f}\n"
     
     if var_result.position_contributions:
-        report += f"\nPosition Contributions:\n"
+        report += f"\nComponent VaR by Underlying:\n"
         for symbol, contrib in sorted(
             var_result.position_contributions.items(),
             key=lambda x: abs(x[1]),
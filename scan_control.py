@@ -0,0 +1,99 @@
+"""
+Scan Control
+
+Deadlines, cooperative cancellation and degraded-data notes for one ticker's scan.
+
+scan_executor runs each ticker inside ticker_scope(); code on the scan path calls
+checkpoint() at safe points (MarketSnapshot.chain, every provider request in
+data_fetching), which raises ScanTimeout once the ticker's deadline has passed or
+ScanCancelled once the whole scan was cancelled. Both derive from BaseException
+(like asyncio.CancelledError) so the analyzers' defensive `except Exception`
+fallbacks don't swallow them. Outside a scope checkpoint() is a no-op.
+
+note_degraded() records that a ticker was served by a fallback (provider error or
+open circuit breaker); ScanReport collects timeouts, failures and degraded tickers
+for a whole scan.
+"""
+
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+
+class ScanCancelled(BaseException):
+    """The scan this ticker belongs to was cancelled (overall deadline or caller)."""
+
+
+class ScanTimeout(ScanCancelled):
+    """The ticker ran past its own deadline."""
+
+
+@dataclass
+class TickerScope:
+    ticker: str
+    deadline: float | None = None  # time.monotonic() value
+    cancel: threading.Event | None = None
+    degraded: list = field(default_factory=list)  # [(source, reason), ...]
+
+    def check(self) -> None:
+        if self.cancel is not None and self.cancel.is_set():
+            raise ScanCancelled(f"{self.ticker}: scan cancelled")
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            raise ScanTimeout(f"{self.ticker}: per-ticker deadline exceeded")
+
+
+_SCOPE = contextvars.ContextVar("ticker_scope", default=None)
+
+
+@contextmanager
+def ticker_scope(ticker, timeout: float | None = None, cancel: threading.Event | None = None):
+    """Run one ticker's scan with an optional deadline (seconds from now) and cancel event."""
+    scope = TickerScope(str(ticker), None if timeout is None else time.monotonic() + float(timeout), cancel)
+    token = _SCOPE.set(scope)
+    try:
+        yield scope
+    finally:
+        _SCOPE.reset(token)
+
+
+def checkpoint() -> None:
+    """Raise ScanTimeout / ScanCancelled if the current ticker should stop (no-op outside a scope)."""
+    scope = _SCOPE.get()
+    if scope is not None:
+        scope.check()
+
+
+def note_degraded(source: str, reason) -> None:
+    """Record that the current ticker fell back from `source` (ignored outside a scope)."""
+    scope = _SCOPE.get()
+    if scope is not None:
+        note = (str(source), str(reason).strip().splitlines()[-1][:200] if str(reason).strip() else "")
+        if note not in scope.degraded:
+            scope.degraded.append(note)
+
+
+@dataclass
+class ScanReport:
+    """Tickers that timed out, were cancelled, failed, or were served by a fallback."""
+    timed_out: list = field(default_factory=list)
+    cancelled: list = field(default_factory=list)
+    failed: list = field(default_factory=list)
+    degraded: dict = field(default_factory=dict)  # {ticker: [(source, reason), ...]}
+
+    def add_degraded(self, ticker, notes) -> None:
+        if notes:
+            seen = self.degraded.setdefault(ticker, [])
+            seen.extend(n for n in notes if n not in seen)
+
+    def as_dict(self) -> dict:
+        return {
+            "timed_out": list(self.timed_out),
+            "cancelled": list(self.cancelled),
+            "failed": list(self.failed),
+            "degraded": {t: [f"{s}: {r}" if r else s for s, r in notes] for t, notes in self.degraded.items()},
+        }
+
+    def __bool__(self) -> bool:
+        return bool(self.timed_out or self.cancelled or self.failed or self.degraded)
@@ -0,0 +1,427 @@
+#!/usr/bin/env python3
+"""
+Headless Scan Engine
+
+Multi-strategy scan without Streamlit: runs the same eight analyzers as the Strategy
+Lab "Scan Strategies" button (CSP, CC, Collar, Iron Condor, Bull Put, Bear Call, PMCC,
+Synthetic Collar) with the same parameters, and writes results to Parquet/CSV.
+strategy_lab.run_scans is a cached wrapper around run_scans() here; stream_scans()
+yields the same scan ticker by ticker with progress/ETA for live display.
+
+Nothing in this module's import graph imports streamlit/altair/strategy_lab, so
+cron-driven pre-market scans start quickly:
+
+    python scan_engine.py SPY QQQ AAPL --out scans/ --format parquet
+    python scan_engine.py --tickers-file watchlist.txt --param min_roi_csp=0.25 --executor process
+    python scan_engine.py SPY --cache readwrite        # later: --cache replay (no network)
+    python scan_engine.py --tickers-file sp500.txt --mc-top-k 50   # MC only for the best 50 per strategy
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from dataclasses import dataclass, field
+from datetime import datetime
+
+import pandas as pd
+
+from scan_control import ScanReport
+from scan_executor import execute_two_phase, iter_scan
+from scan_profile import ScanProfile, profile_enabled
+from strategy_analysis import _get_scan_perf_config
+from data_fetching import set_chain_provider
+
+
+# Output order of run_scans() frames; also used for output file names
+STRATEGIES = ("csp", "cc", "collar", "iron_condor", "bull_put_spread",
+              "bear_call_spread", "pmcc", "synthetic_collar")
+
+# Sidebar defaults from strategy_lab (keep in sync with the UI)
+DEFAULT_SCAN_PARAMS = {
+    "min_days": 10,
+    "days_limit": 45,
+    "min_otm_csp": 8.0,
+    "min_roi_csp": 0.20,
+    "min_cushion": 0.75,
+    "min_poew": 0.60,
+    "min_otm_cc": 3.0,
+    "min_roi_cc": 0.08,
+    "include_div_cc": True,
+    "call_delta_tgt": 0.30,
+    "put_delta_tgt": 0.10,
+    "include_div_col": True,
+    "min_net_credit": 0.0,
+    "ic_target_delta": 0.16,
+    "ic_spread_width_put": 5.0,
+    "ic_spread_width_call": 5.0,
+    "ic_min_roi": 15.0,
+    "ic_min_cushion": 0.5,
+    "cs_spread_width": 5.0,
+    "cs_target_delta": 0.20,
+    "cs_min_roi": 20.0,
+    # PMCC controls
+    "pmcc_long_delta": 0.80,
+    "pmcc_long_days_min": 180,
+    "pmcc_long_days_max": 400,
+    "pmcc_short_days_min": 21,
+    "pmcc_short_days_max": 60,
+    "pmcc_short_delta_lo": 0.20,
+    "pmcc_short_delta_hi": 0.35,
+    "pmcc_min_buffer_days": 120,
+    "pmcc_avoid_exdiv": True,
+    "pmcc_long_leg_min_oi": 50,
+    "pmcc_long_leg_max_spread": 15.0,
+    # Synthetic Collar controls
+    "syn_long_delta": 0.80,
+    "syn_put_delta_abs": 0.15,
+    "syn_long_days_min": 180,
+    "syn_long_days_max": 400,
+    "syn_short_days_min": 21,
+    "syn_short_days_max": 60,
+    "syn_short_delta_lo": 0.20,
+    "syn_short_delta_hi": 0.35,
+    "syn_min_buffer_days": 120,
+    "syn_avoid_exdiv": True,
+    "syn_min_floor_sigma": 1.0,
+    "syn_long_leg_min_oi": 50,
+    "syn_long_leg_max_spread": 15.0,
+    "syn_put_leg_min_oi": 50,
+    "syn_put_leg_max_spread": 15.0,
+    # Shared controls
+    "min_oi": 200,
+    "max_spread": 10.0,
+    "earn_window": 5,
+    "risk_free": 0.0,
+    "per_contract_cap": None,
+    "bill_yield": 0.0,
+    "require_nonneg_mc": True,
+}
+
+
+# ----------------------------- Scan -----------------------------
+
+def _print_error(ticker, err):
+    print(f"Error scanning {ticker}: {err.strip().splitlines()[-1]}", file=sys.stderr)
+
+
+@dataclass
+class ScanUpdate:
+    """
+    One stream_scans() event. Per-ticker events carry that ticker's frames (or its
+    error); the last event has ticker=None and `result` set to the run_scans() tuple.
+    """
+    ticker: str | None
+    frames: dict = field(default_factory=dict)  # {strategy: DataFrame} with rows only
+    error: str | None = None
+    done: int = 0
+    total: int = 0
+    elapsed: float = 0.0
+    eta: float | None = None  # seconds left, extrapolated from the average ticker so far
+    result: tuple | None = None
+    report: ScanReport | None = None  # timed-out / cancelled / failed / degraded tickers so far
+    profile: ScanProfile | None = None  # stage timers, when the scan is profiled
+
+    @property
+    def progress(self) -> float:
+        return self.done / self.total if self.total else 1.0
+
+
+def _merge_results(results, params, tickers, report, profile=None):
+    """run_scans() tuple from {ticker: scan_ticker tuple}, merged in input ticker order."""
+    frames = {k: [] for k in STRATEGIES}
+    scan_counters = {"CSP": {}, "report": report.as_dict()}
+    if profile is not None:
+        scan_counters["profile"] = profile.as_dict()
+    for ticker in tickers:
+        res = results.get(ticker)
+        if res is None:
+            continue
+        csp, csp_cnt, cc, col, ic, bps, bcs, pmcc, syn = res
+        for key, df in zip(STRATEGIES, (csp, cc, col, ic, bps, bcs, pmcc, syn)):
+            if df is not None and not df.empty:
+                frames[key].append(df)
+        for k, v in csp_cnt.items():
+            scan_counters["CSP"][k] = scan_counters["CSP"].get(k, 0) + int(v)
+
+    out = []
+    for key in STRATEGIES:
+        df = pd.concat(frames[key], ignore_index=True) if frames[key] else pd.DataFrame()
+        # Optional hard filter: drop negative MC expected P&L rows (keep NaN = MC not run)
+        if params.get("require_nonneg_mc", False) and not df.empty and "MC_ExpectedPnL" in df.columns:
+            df = df[(df["MC_ExpectedPnL"].isna()) | (df["MC_ExpectedPnL"] >= 0)].reset_index(drop=True)
+        out.append(df)
+    return tuple(out) + (scan_counters,)
+
+
+def stream_scans(tickers, params, *, on_error=None, scanner=None):
+    """
+    Generator form of run_scans(): yields a ScanUpdate as each ticker finishes
+    (completion order), then a final ScanUpdate whose `result` is exactly what
+    run_scans() returns. Per-ticker frames are unfiltered by require_nonneg_mc.
+
+    Two-phase (mc_top_k) scans only have results once every ticker is done; their
+    per-ticker updates arrive together at the end. Per-ticker / overall deadlines
+    (scan_ticker_timeout / scan_timeout), the scan report and stage profiling
+    (scan_profile) apply to every path: default, incremental (`scanner`) and two-phase.
+    """
+    tickers = list(tickers)
+    on_error = on_error or _print_error
+    start = time.perf_counter()
+    report = ScanReport()
+    profile = ScanProfile() if profile_enabled(params) else None
+    top_k = params.get("mc_top_k") or _get_scan_perf_config().get("mc_top_k")
+    if scanner is not None:
+        source = scanner.iter_execute(tickers, params, report=report, profile=profile)
+    elif top_k:
+        source = execute_two_phase(tickers, params, int(top_k), report=report, profile=profile)
+    else:
+        source = iter_scan(tickers, params, report=report, profile=profile)
+
+    results = {}
+    done = 0
+    for ticker, res, err in source:
+        done += 1
+        elapsed = time.perf_counter() - start
+        eta = elapsed / done * (len(tickers) - done)
+        if err is not None:
+            if ticker not in report.timed_out + report.cancelled + report.failed:
+                report.failed.append(ticker)
+            on_error(ticker, err)
+            yield ScanUpdate(ticker, error=err, done=done, total=len(tickers), elapsed=elapsed, eta=eta,
+                             report=report, profile=profile)
+            continue
+        results[ticker] = res
+        csp, _, *rest = res
+        frames = {key: df for key, df in zip(STRATEGIES, [csp] + rest) if df is not None and not df.empty}
+        yield ScanUpdate(ticker, frames=frames, done=done, total=len(tickers), elapsed=elapsed, eta=eta,
+                         report=report, profile=profile)
+
+    if profile is not None:
+        profile.finish()
+    yield ScanUpdate(None, done=done, total=len(tickers), elapsed=time.perf_counter() - start, eta=0.0,
+                     result=_merge_results(results, params, tickers, report, profile), report=report,
+                     profile=profile)
+
+
+# Columns shown in the cross-strategy leaderboard (when the strategy has them)
+LEADERBOARD_COLUMNS = ["Strategy", "Ticker", "Exp", "Days", "ROI%_ann", "MC_ExpectedPnL", "UnifiedScore", "Score"]
+
+
+def leaderboard(frames, n=25) -> pd.DataFrame:
+    """
+    Top `n` rows across strategies by UnifiedScore (then Score), from an iterable of
+    (strategy, DataFrame) pairs such as the accumulated ScanUpdate.frames items.
+    """
+    parts = []
+    for key, df in frames:
+        if df is None or df.empty:
+            continue
+        # Each analyzer output is already sorted best-first; only its head can make the board
+        part = df.head(n).assign(Strategy=key.upper())
+        parts.append(part[[c for c in LEADERBOARD_COLUMNS if c in part.columns]])
+    if not parts:
+        return pd.DataFrame(columns=LEADERBOARD_COLUMNS)
+    board = pd.concat(parts, ignore_index=True)
+    keys = [c for c in ("UnifiedScore", "Score") if c in board.columns]
+    if keys:
+        board = board.sort_values(keys, ascending=False, na_position="last", kind="stable")
+    return board.head(n).reset_index(drop=True)
+
+
+def run_scans(tickers, params, *, on_error=None, scanner=None):
+    """
+    Run CSP, CC, Collar, Iron Condor, Bull Put Spread, Bear Call Spread plus PMCC & Synthetic Collar scans across tickers.
+
+    Args:
+        tickers: Ticker symbols
+        params: Scan parameters (see DEFAULT_SCAN_PARAMS for keys)
+        on_error: Callback(ticker, traceback_str) for tickers that failed; defaults to
+            a one-line message on stderr. Failed tickers are skipped.
+        scanner: Optional incremental_scan.IncrementalScanner; when given, only blocks
+            whose chains or parameters changed since its previous scans are recomputed.
+
+    params["mc_top_k"] (or SCAN_MC_TOP_K / the scan_mc_top_k session key) switches to a
+    two-phase scan: candidates are generated and pre-scored for every ticker without
+    Monte Carlo, then only the global top-K per strategy are enriched and returned.
+    Ignored when `scanner` is given.
+
+    Returns:
+        (df_csp, df_cc, df_collar, df_iron_condor, df_bull_put_spread, df_bear_call_spread,
+         df_pmcc, df_synthetic_collar, scan_counters); scan_counters["report"] lists tickers
+        that timed out, were cancelled, failed, or were served by a provider fallback;
+        scan_counters["profile"] holds ScanProfile.as_dict() when params["scan_profile"]
+        (or SCAN_PROFILE=1) is set.
+    """
+    if not tickers:
+        return tuple(pd.DataFrame() for _ in STRATEGIES) + ({"CSP": {}, "report": ScanReport().as_dict()},)
+    # Results are merged in input order so the frames are deterministic
+    for update in stream_scans(tickers, params, on_error=on_error, scanner=scanner):
+        if update.result is not None:
+            return update.result
+
+
+# ----------------------------- Output -----------------------------
+
+def write_results(results, out_dir, *, fmt="parquet", prefix=None) -> dict:
+    """
+    Write run_scans() output: one file per strategy with rows, plus <prefix>_counters.json.
+
+    Parquet needs pyarrow (or fastparquet); without it the frames are written as CSV.
+
+    Returns:
+        {strategy: path} for the files written (counters under "counters").
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    prefix = prefix or datetime.now().strftime("scan_%Y%m%d_%H%M%S")
+    written = {}
+    for key, df in zip(STRATEGIES, results[:len(STRATEGIES)]):
+        if df is None or df.empty:
+            continue
+        path = os.path.join(out_dir, f"{prefix}_{key}")
+        if fmt == "parquet":
+            try:
+                df.to_parquet(path + ".parquet", index=False)
+                written[key] = path + ".parquet"
+                continue
+            except ImportError:
+                print("Parquet engine not installed; writing CSV", file=sys.stderr)
+                fmt = "csv"
+        df.to_csv(path + ".csv", index=False)
+        written[key] = path + ".csv"
+    counters_path = os.path.join(out_dir, f"{prefix}_counters.json")
+    with open(counters_path, "w", encoding="utf-8") as fh:
+        json.dump(results[-1], fh, indent=2, default=str)
+    written["counters"] = counters_path
+    return written
+
+
+# ----------------------------- CLI -----------------------------
+
+def _parse_value(text):
+    """--param values: JSON literals (numbers, true/false/null), else the raw string."""
+    try:
+        return json.loads(text)
+    except Exception:
+        return text
+
+
+def build_params(params_file=None, overrides=None) -> dict:
+    """DEFAULT_SCAN_PARAMS updated from an optional JSON file, then KEY=VALUE overrides."""
+    params = dict(DEFAULT_SCAN_PARAMS)
+    if params_file:
+        with open(params_file, "r", encoding="utf-8") as fh:
+            params.update(json.load(fh))
+    for item in overrides or []:
+        if "=" not in item:
+            raise ValueError(f"--param expects KEY=VALUE, got {item!r}")
+        key, value = item.split("=", 1)
+        params[key.strip()] = _parse_value(value.strip())
+    return params
+
+
+def _read_tickers(args) -> list:
+    tickers = []
+    for t in args.tickers:
+        tickers.extend(t.split(","))
+    if args.tickers_file:
+        with open(args.tickers_file, "r", encoding="utf-8") as fh:
+            for line in fh:
+                line = line.split("#", 1)[0]
+                tickers.extend(line.replace(",", " ").split())
+    seen = set()
+    out = []
+    for t in (t.strip().upper() for t in tickers):
+        if t and t not in seen:
+            seen.add(t)
+            out.append(t)
+    return out
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Headless multi-strategy options scan (CSP, CC, Collar, IC, credit spreads, PMCC, Synthetic Collar)")
+    parser.add_argument("tickers", nargs="*", help="Ticker symbols (space or comma separated)")
+    parser.add_argument("--tickers-file", help="File with tickers (whitespace/comma separated, # comments)")
+    parser.add_argument("--out", default="scan_results", help="Output directory (default: scan_results)")
+    parser.add_argument("--format", choices=("parquet", "csv"), default="parquet", help="Output format")
+    parser.add_argument("--prefix", default=None, help="Output file prefix (default: scan_<timestamp>)")
+    parser.add_argument("--params", dest="params_file", help="JSON file of scan parameters (overrides defaults)")
+    parser.add_argument("--param", action="append", default=[], metavar="KEY=VALUE",
+                        help="Override one scan parameter, e.g. --param min_roi_csp=0.25 (repeatable)")
+    parser.add_argument("--executor", choices=("thread", "process"), default=None,
+                        help="Scan executor (default: SCAN_EXECUTOR env or thread)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker count")
+    parser.add_argument("--ticker-timeout", type=float, default=None, metavar="SECONDS",
+                        help="Per-ticker deadline (default: SCAN_TICKER_TIMEOUT env or 120; 0 = none)")
+    parser.add_argument("--timeout", type=float, default=None, metavar="SECONDS",
+                        help="Deadline for the whole scan (default: SCAN_TIMEOUT env or none)")
+    parser.add_argument("--profile", action="store_true",
+                        help="Time fetch/analyzer/MC/scoring stages; written to <prefix>_counters.json")
+    parser.add_argument("--mc-top-k", type=int, default=None, metavar="K",
+                        help="Two-phase scan: Monte Carlo and output only for the global top K "
+                             "candidates per strategy by preliminary score")
+    parser.add_argument("--provider", choices=("schwab", "polygon", "yfinance"), default=None,
+                        help="Options provider for bulk chain requests (one request per expiration window)")
+    parser.add_argument("--cache", choices=("off", "readwrite", "replay"), default=None,
+                        help="On-disk market-data cache mode (default: CHAIN_CACHE_MODE env or off); "
+                             "replay re-runs against cached data with no network access")
+    parser.add_argument("--cache-dir", default=None, help="Cache directory (default: CHAIN_CACHE_DIR or ./.chain_cache)")
+    args = parser.parse_args(argv)
+
+    tickers = _read_tickers(args)
+    if not tickers:
+        parser.error("no tickers given")
+    try:
+        params = build_params(args.params_file, args.param)
+    except Exception as e:
+        parser.error(str(e))
+    if args.executor:
+        params["scan_executor"] = args.executor
+    if args.workers:
+        params["scan_workers"] = args.workers
+    if args.mc_top_k:
+        params["mc_top_k"] = args.mc_top_k
+    if args.profile:
+        params["scan_profile"] = True
+    if args.ticker_timeout is not None:
+        params["scan_ticker_timeout"] = args.ticker_timeout
+    if args.timeout is not None:
+        params["scan_timeout"] = args.timeout
+    # Env vars so process-pool workers and data_fetching see the same cache settings
+    if args.cache:
+        os.environ["CHAIN_CACHE_MODE"] = args.cache
+    if args.cache_dir:
+        os.environ["CHAIN_CACHE_DIR"] = args.cache_dir
+    if args.provider:
+        try:
+            from providers import get_provider
+            set_chain_provider(get_provider(args.provider))
+        except Exception as e:
+            print(f"Provider {args.provider} unavailable ({e}); fetching chains per expiration", file=sys.stderr)
+
+    start = time.perf_counter()
+    results = run_scans(tickers, params)
+    elapsed = time.perf_counter() - start
+    written = write_results(results, args.out, fmt=args.format, prefix=args.prefix)
+
+    counts = " | ".join(f"{k}={len(df)}" for k, df in zip(STRATEGIES, results[:len(STRATEGIES)]))
+    print(f"Scanned {len(tickers)} tickers in {elapsed:.1f}s: {counts}")
+    report = results[-1].get("report", {})
+    for key in ("timed_out", "cancelled", "failed"):
+        if report.get(key):
+            print(f"  {key.replace('_', ' ')}: {', '.join(report[key])}", file=sys.stderr)
+    for ticker, notes in report.get("degraded", {}).items():
+        print(f"  degraded {ticker}: {'; '.join(notes)}", file=sys.stderr)
+    prof = results[-1].get("profile")
+    if prof:
+        top = sorted(prof["stages"].items(), key=lambda kv: -kv[1]["seconds"])
+        print("  profile: " + ", ".join(f"{k}={v['seconds']:.2f}s/{v['count']}" for k, v in top))
+    for key, path in written.items():
+        print(f"  {key}: {path}")
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    sys.exit(main())
@@ -0,0 +1,715 @@
+"""
+Scan Executor
+
+Runs the eight strategy analyzers for a list of tickers. Two execution modes:
+
+- "thread" (default): one thread per ticker does everything (fetch + analyze),
+  capped at 8 workers. Best when chains are not cached and the scan is I/O bound.
+- "process": market data is fetched on a thread pool (I/O), then each ticker's
+  snapshot is shipped to a ProcessPoolExecutor as compact NumPy column arrays
+  (MarketSnapshot.to_payload) for the CPU-bound analyzer + Monte Carlo stage, so
+  the scan is no longer serialized by the GIL. Workers never touch the network.
+
+execute_scan returns results in input ticker order, so merged output is
+deterministic regardless of completion order; iter_scan yields the same results
+as each ticker finishes (for progress display / live leaderboards).
+
+execute_two_phase() splits the scan in two passes: every analyzer first runs with
+Monte Carlo switched off and records each candidate's preliminary score; then only
+the global top-K candidates per strategy (across all tickers) are re-run with Monte
+Carlo enrichment. The output holds just those enriched rows.
+
+Configuration (params dict keys take precedence over env vars):
+  - scan_executor / SCAN_EXECUTOR: "thread" | "process"
+  - scan_workers / SCAN_WORKERS: worker count (thread default 8, process default cpu count)
+  - scan_ticker_timeout / SCAN_TICKER_TIMEOUT: seconds per ticker, fetch + analysis
+    (default 120; 0 = no limit)
+  - scan_timeout / SCAN_TIMEOUT: seconds for the whole scan (default: no limit)
+  - SCAN_IO_WORKERS: fetch threads in process mode (default 8)
+  - SCAN_MP_START: multiprocessing start method (default: platform default)
+
+Deadlines are cooperative (scan_control.checkpoint at every provider request and
+chain access): a ticker past its deadline stops at its next checkpoint. ScanSupervisor
+(behind iter_scan, execute_two_phase and the incremental scanner) stops waiting for
+a ticker SCAN_TIMEOUT_GRACE seconds (default 5) after its deadline even if it never
+reaches a checkpoint (e.g. a hung network call), reports it as timed out and moves
+on; when the overall deadline passes, queued tickers are cancelled and running ones
+are told to stop.
+"""
+
+import os
+import time
+import threading
+import traceback
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from market_snapshot import MarketSnapshot
+from strategy_analysis import (
+    analyze_csp,
+    analyze_cc,
+    analyze_collar,
+    analyze_iron_condor,
+    analyze_bull_put_spread,
+    analyze_bear_call_spread,
+    analyze_pmcc,
+    analyze_synthetic_collar,
+    fetch_market_snapshot,
+    scan_phase,
+    _get_scan_perf_config,
+)
+from chain_eval import pricing_aggressiveness
+from scan_control import ScanCancelled, ScanReport, ScanTimeout, ticker_scope
+from scan_profile import ScanProfile, TickerProfile, profiling, timer
+
+
+# ----------------------------- Per-ticker scan -----------------------------
+
+def _pmcc_kwargs(params: dict) -> dict:
+    return dict(
+        target_long_delta=params.get("pmcc_long_delta", 0.80),
+        long_min_days=params.get("pmcc_long_days_min", 180),
+        long_max_days=params.get("pmcc_long_days_max", 400),
+        short_min_days=params.get("pmcc_short_days_min", 21),
+        short_max_days=params.get("pmcc_short_days_max", 60),
+        short_delta_lo=params.get("pmcc_short_delta_lo", 0.20),
+        short_delta_hi=params.get("pmcc_short_delta_hi", 0.35),
+        min_oi=params.get("min_oi", 50),
+        max_spread=params.get("max_spread", 15.0),
+        earn_window=params.get("earn_window", 7),
+        risk_free=params.get("risk_free", 0.0),
+        bill_yield=params.get("bill_yield", 0.0),
+    )
+
+
+def _syn_kwargs(params: dict) -> dict:
+    return dict(
+        target_long_delta=params.get("syn_long_delta", 0.80),
+        put_delta_target=-abs(params.get("syn_put_delta_abs", 0.15)),
+        long_min_days=params.get("syn_long_days_min", 180),
+        long_max_days=params.get("syn_long_days_max", 400),
+        short_min_days=params.get("syn_short_days_min", 21),
+        short_max_days=params.get("syn_short_days_max", 60),
+        short_delta_lo=params.get("syn_short_delta_lo", 0.20),
+        short_delta_hi=params.get("syn_short_delta_hi", 0.35),
+        min_oi=params.get("min_oi", 50),
+        max_spread=params.get("max_spread", 15.0),
+        earn_window=params.get("earn_window", 7),
+        risk_free=params.get("risk_free", 0.0),
+        bill_yield=params.get("bill_yield", 0.0),
+    )
+
+
+def _csp_kwargs(params: dict) -> dict:
+    return dict(
+        min_days=params["min_days"],
+        days_limit=params["days_limit"],
+        min_otm=params["min_otm_csp"],
+        min_oi=params["min_oi"],
+        max_spread=params["max_spread"],
+        min_roi=params["min_roi_csp"],
+        min_cushion=params["min_cushion"],
+        min_poew=params["min_poew"],
+        earn_window=params["earn_window"],
+        risk_free=params["risk_free"],
+        per_contract_cap=params["per_contract_cap"],
+        bill_yield=params["bill_yield"],
+    )
+
+
+def _cc_kwargs(params: dict) -> dict:
+    return dict(
+        min_days=params["min_days"],
+        days_limit=params["days_limit"],
+        min_otm=params["min_otm_cc"],
+        min_oi=params["min_oi"],
+        max_spread=params["max_spread"],
+        min_roi=params["min_roi_cc"],
+        earn_window=params["earn_window"],
+        risk_free=params["risk_free"],
+        include_dividends=params["include_div_cc"],
+        bill_yield=params["bill_yield"],
+    )
+
+
+def _collar_kwargs(params: dict) -> dict:
+    return dict(
+        min_days=params["min_days"],
+        days_limit=params["days_limit"],
+        min_oi=params["min_oi"],
+        max_spread=params["max_spread"],
+        call_delta_target=params["call_delta_tgt"],
+        put_delta_target=params["put_delta_tgt"],
+        earn_window=params["earn_window"],
+        risk_free=params["risk_free"],
+        include_dividends=params["include_div_col"],
+        min_net_credit=params["min_net_credit"],
+        bill_yield=params["bill_yield"],
+    )
+
+
+def _ic_kwargs(params: dict) -> dict:
+    return dict(
+        min_days=params["min_days"],
+        days_limit=params["days_limit"],
+        min_oi=params["min_oi"],
+        max_spread=params["max_spread"],
+        min_roi=params["ic_min_roi"] / 100.0,
+        min_cushion=params["ic_min_cushion"],
+        earn_window=params["earn_window"],
+        risk_free=params["risk_free"],
+        spread_width_put=params["ic_spread_width_put"],
+        spread_width_call=params["ic_spread_width_call"],
+        target_delta_short=params["ic_target_delta"],
+        bill_yield=params["bill_yield"],
+    )
+
+
+def _credit_spread_kwargs(params: dict) -> dict:
+    return dict(
+        min_days=params["min_days"],
+        days_limit=params["days_limit"],
+        min_oi=params["min_oi"],
+        max_spread=params["max_spread"],
+        min_roi=params["cs_min_roi"] / 100.0,
+        min_cushion=params["min_cushion"],
+        min_poew=params["min_poew"],
+        earn_window=params["earn_window"],
+        risk_free=params["risk_free"],
+        spread_width=params["cs_spread_width"],
+        target_delta_short=params["cs_target_delta"],
+        bill_yield=params["bill_yield"],
+    )
+
+
+def _run_csp(t, kwargs, snap):
+    return analyze_csp(t, **kwargs, snapshot=snap)
+
+
+def _run_cc(t, kwargs, snap):
+    cc = analyze_cc(t, **kwargs, snapshot=snap)
+    if cc is not None and not cc.empty and "Symbol" not in cc.columns:
+        cc["Symbol"] = t
+    return cc, {}
+
+
+def _run_best_effort(analyzer):
+    # Credit spreads, PMCC & Synthetic Collar are best-effort: a failure yields no rows,
+    # not a failed ticker
+    def _run(t, kwargs, snap):
+        try:
+            return analyzer(t, **kwargs, snapshot=snap), {}
+        except Exception:
+            return pd.DataFrame(), {}
+    return _run
+
+
+def _run_plain(analyzer):
+    def _run(t, kwargs, snap):
+        return analyzer(t, **kwargs, snapshot=snap), {}
+    return _run
+
+
+# name -> (kwargs builder, runner(ticker, kwargs, snapshot) -> (DataFrame, counters)),
+# in scan_engine.STRATEGIES order
+STRATEGY_RUNNERS = {
+    "csp": (_csp_kwargs, _run_csp),
+    "cc": (_cc_kwargs, _run_cc),
+    "collar": (_collar_kwargs, _run_plain(analyze_collar)),
+    "iron_condor": (_ic_kwargs, _run_plain(analyze_iron_condor)),
+    "bull_put_spread": (_credit_spread_kwargs, _run_best_effort(analyze_bull_put_spread)),
+    "bear_call_spread": (_credit_spread_kwargs, _run_best_effort(analyze_bear_call_spread)),
+    "pmcc": (_pmcc_kwargs, _run_best_effort(analyze_pmcc)),
+    "synthetic_collar": (_syn_kwargs, _run_best_effort(analyze_synthetic_collar)),
+}
+
+
+def run_strategy(name: str, t, params: dict, snap: MarketSnapshot):
+    """Run one strategy's analyzer for a ticker; returns (DataFrame, counters)."""
+    build, run = STRATEGY_RUNNERS[name]
+    with timer("analyze", strategy=name):
+        return run(t, build(params), snap)
+
+
+def scan_ticker(t, params: dict, snapshot: MarketSnapshot | None = None):
+    """
+    Scan a single ticker for all strategies.
+
+    Returns:
+        (csp, csp_counters, cc, collar, iron_condor, bull_put, bear_call, pmcc, synthetic_collar)
+    """
+    # One market-data fetch per ticker shared by every analyzer (chains load lazily,
+    # once per expiration). Raises if price/expirations are unavailable.
+    snap = snapshot if snapshot is not None else fetch_market_snapshot(t)
+    # Bulk-load the scan windows (one provider request per run of expirations) when the
+    # provider has a range endpoint; anything not loaded falls back to per-expiration fetches.
+    snap.prefetch(scan_expirations(snap, params))
+
+    out = {name: run_strategy(name, t, params, snap) for name in STRATEGY_RUNNERS}
+    csp, csp_cnt = out["csp"]
+    return (csp, csp_cnt) + tuple(out[name][0] for name in list(STRATEGY_RUNNERS)[1:])
+
+
+def scan_expirations(snapshot: MarketSnapshot, params: dict) -> list:
+    """Expirations any analyzer may read for these params (the chains a worker needs)."""
+    windows = [(int(params["min_days"]), int(params["days_limit"]))]
+    for kw in (_pmcc_kwargs(params), _syn_kwargs(params)):
+        windows.append((int(kw["long_min_days"]), int(kw["long_max_days"])))
+        windows.append((int(kw["short_min_days"]), int(kw["short_max_days"])))
+    today = datetime.now(timezone.utc).date()
+    out = []
+    for exp in snapshot.expirations:
+        try:
+            D = (datetime.strptime(exp, "%Y-%m-%d").date() - today).days
+        except Exception:
+            continue
+        if any(lo <= D <= hi for lo, hi in windows):
+            out.append(exp)
+    return out
+
+
+# ----------------------------- Execution modes -----------------------------
+
+def get_scan_executor_config(params: dict | None = None) -> dict:
+    """Resolve executor mode and worker counts from params, then env vars."""
+    params = params or {}
+    mode = str(params.get("scan_executor") or os.getenv("SCAN_EXECUTOR", "thread")).strip().lower()
+    if mode not in ("thread", "process"):
+        mode = "thread"
+    workers = None
+    try:
+        w = params.get("scan_workers") or os.getenv("SCAN_WORKERS")
+        if w:
+            workers = max(1, int(w))
+    except Exception:
+        workers = None
+    if workers is None:
+        workers = 8 if mode == "thread" else (os.cpu_count() or 1)
+    try:
+        io_workers = max(1, int(os.getenv("SCAN_IO_WORKERS", "8")))
+    except Exception:
+        io_workers = 8
+    return {"mode": mode, "workers": workers, "io_workers": io_workers,
+            "ticker_timeout": _timeout(params.get("scan_ticker_timeout"), os.getenv("SCAN_TICKER_TIMEOUT"), 120.0),
+            "scan_timeout": _timeout(params.get("scan_timeout"), os.getenv("SCAN_TIMEOUT"), None),
+            "grace": _timeout(None, os.getenv("SCAN_TIMEOUT_GRACE"), 5.0) or 0.0}
+
+
+def _timeout(param, env, default):
+    """Seconds from a params value, else an env string, else `default`; 0/none = no limit."""
+    for value in (param, env):
+        if value is None or value == "":
+            continue
+        try:
+            if str(value).strip().lower() in ("none", "off"):
+                return None
+            value = float(value)
+            return value if value > 0 else None
+        except Exception:
+            continue
+    return default
+
+
+def _worker_env() -> dict:
+    """Scan knobs resolved in the parent (UI session state is not visible to workers)."""
+    perf = _get_scan_perf_config()
+    env = {"FAST_SCAN": "0", "SCAN_MC_PATHS": str(perf["mc_paths_scan"]),
+           "SCAN_BATCH_MC": "1" if perf["batch_mc"] else "0",
+           "SCAN_MC_SAMPLER": perf["mc_sampler"],
+           "SCAN_MC_SEED": "none" if perf["mc_seed"] is None else str(perf["mc_seed"]),
+           "SCAN_ANALYTIC_STRATEGIES": ",".join(sorted(perf["analytic_strategies"])) or "none"}
+    if perf["max_mc_per_exp"] is not None:
+        env["SCAN_MAX_MC_PER_EXP"] = str(perf["max_mc_per_exp"])
+    if perf["pre_mc_score_min"] is not None:
+        env["SCAN_PRE_MC_SCORE_MIN"] = str(perf["pre_mc_score_min"])
+    preset = pricing_aggressiveness()
+    if preset:
+        env["PRICING_AGGRESSIVENESS"] = str(preset)
+    return env
+
+
+def _worker_init(env: dict):
+    os.environ.update(env)
+
+
+def _scan_payload(payload: dict, params: dict):
+    snap = MarketSnapshot.from_payload(payload)
+    return scan_ticker(snap.ticker, params, snapshot=snap)
+
+
+def _prefetch_payload(t, params: dict) -> dict:
+    snap = fetch_market_snapshot(t)
+    exps = scan_expirations(snap, params)
+    snap.prefetch(exps)
+    return snap.to_payload(exps)
+
+
+def _collect_payload(payload: dict, params: dict):
+    snap = MarketSnapshot.from_payload(payload)
+    return collect_ticker(snap.ticker, params, snap)
+
+
+def _enrich_payload(payload: dict, params: dict, keys: dict):
+    snap = MarketSnapshot.from_payload(payload)
+    return enrich_ticker(snap.ticker, params, snap, keys)
+
+
+# ----------------------------- Deadlines -----------------------------
+
+def _start_ticker(t, timeout, scan_deadline, started: dict) -> float | None:
+    """Record when ticker `t` started (wall clock); return its seconds left, if limited."""
+    now = time.time()
+    deadline = now + timeout if timeout else None
+    if scan_deadline is not None:
+        deadline = scan_deadline if deadline is None else min(deadline, scan_deadline)
+    started[t] = deadline
+    return None if deadline is None else max(0.0, deadline - now)
+
+
+def _payload_guarded(fn, payload: dict, args: tuple, deadline, profile: bool):
+    """
+    Process-pool unit of work: fn(payload, *args) under the ticker's wall-clock deadline.
+    Returns (result, degraded notes, profile stats or None).
+    """
+    left = None if deadline is None else max(0.0, deadline - time.time())
+    prof = TickerProfile() if profile else None
+    with ticker_scope(payload["ticker"], left) as scope, profiling(prof):
+        return fn(payload, *args), scope.degraded, None if prof is None else prof.stats
+
+
+class ScanSupervisor:
+    """
+    Runs one scan's futures under its deadlines; shared by iter_scan, execute_two_phase
+    and incremental_scan.IncrementalScanner.
+
+    Units of work return (result, degraded notes, ..., profile stats) and record their
+    wall-clock deadline in `started` when they begin (run() does both for thread-pool
+    work). results() yields (stage, ticker, value, error) as futures finish; callers may
+    submit follow-up stages between items. A ticker SCAN_TIMEOUT_GRACE seconds past its
+    deadline is reported as timed out instead of awaited, and once the overall deadline
+    passes queued tickers are cancelled and running ones told to stop. Leaving the
+    `with` block shuts the pools down without waiting on abandoned threads.
+    """
+
+    def __init__(self, params: dict, report: ScanReport | None = None, profile: ScanProfile | None = None):
+        cfg = get_scan_executor_config(params)
+        self.ticker_timeout, self.grace = cfg["ticker_timeout"], cfg["grace"]
+        self.scan_deadline = time.time() + cfg["scan_timeout"] if cfg["scan_timeout"] else None
+        self.report = report if report is not None else ScanReport()
+        self.profile = profile
+        self.cancel = threading.Event()
+        self.started = {}  # ticker -> wall-clock deadline, set when its current stage starts
+        self.pending = {}  # future -> (stage, ticker)
+        self.pools = []
+        self.abandoned = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def add_pool(self, pool):
+        self.pools.append(pool)
+        return pool
+
+    def start(self, t) -> float | None:
+        """Start ticker `t`'s deadline clock; returns the wall-clock deadline (for process workers)."""
+        _start_ticker(t, self.ticker_timeout, self.scan_deadline, self.started)
+        return self.started[t]
+
+    def out_of_time(self) -> bool:
+        return self.cancel.is_set() or (self.scan_deadline is not None and time.time() > self.scan_deadline)
+
+    def run(self, t, fn, *args):
+        """Thread-pool unit of work: fn(*args) inside ticker `t`'s scope."""
+        left = _start_ticker(t, self.ticker_timeout, self.scan_deadline, self.started)
+        prof = TickerProfile() if self.profile is not None else None
+        with ticker_scope(t, left, self.cancel) as scope, profiling(prof):
+            return fn(*args), scope.degraded, None if prof is None else prof.stats
+
+    def submit(self, pool, stage: str, t, fn, *args) -> None:
+        self.pending[pool.submit(fn, *args)] = (stage, t)
+
+    def submit_guarded(self, pool, stage: str, t, fn, *args) -> None:
+        """Submit fn(*args) to a thread pool, run under ticker `t`'s deadline (see run)."""
+        self.submit(pool, stage, t, self.run, t, fn, *args)
+
+    def results(self):
+        limited = bool(self.ticker_timeout or self.scan_deadline)
+        report, pending = self.report, self.pending
+        while pending:
+            done, _ = wait(list(pending), timeout=0.25 if limited else None, return_when=FIRST_COMPLETED)
+            for fut in done:
+                stage, t = pending.pop(fut)
+                try:
+                    value = fut.result()
+                except ScanCancelled as e:
+                    (report.timed_out if isinstance(e, ScanTimeout) else report.cancelled).append(t)
+                    yield stage, t, None, traceback.format_exc()
+                    continue
+                except Exception:
+                    report.failed.append(t)
+                    yield stage, t, None, traceback.format_exc()
+                    continue
+                report.add_degraded(t, value[1])
+                if self.profile is not None:
+                    self.profile.add_ticker(t, value[-1])
+                yield stage, t, value, None
+
+            if not limited or not pending:
+                continue
+            now = time.time()
+            if self.scan_deadline is not None and now > self.scan_deadline + self.grace:
+                # Overall deadline: stop running tickers at their next checkpoint, drop queued ones
+                self.cancel.set()
+                self.abandoned = True
+                dropped = list(pending.items())
+                pending.clear()
+                for fut, (stage, t) in dropped:
+                    fut.cancel()
+                    report.cancelled.append(t)
+                    yield stage, t, None, f"ScanCancelled: {t}: overall scan deadline exceeded\n"
+                break
+            for fut, (stage, t) in list(pending.items()):
+                deadline = self.started.get(t)
+                if deadline is not None and now > deadline + self.grace:
+                    # Never reached a checkpoint (e.g. a hung request): report it and move on
+                    pending.pop(fut)
+                    self.abandoned = True
+                    report.timed_out.append(t)
+                    limit = f" ({self.ticker_timeout:g}s)" if self.ticker_timeout else ""
+                    yield stage, t, None, f"ScanTimeout: {t}: per-ticker deadline exceeded{limit}\n"
+
+    def close(self) -> None:
+        if self.pending:
+            self.abandoned = True
+            self.cancel.set()
+            self.pending.clear()
+        for pool in self.pools:
+            pool.shutdown(wait=not self.abandoned, cancel_futures=True)
+
+
+def _process_pools(sup: ScanSupervisor, n: int, cfg: dict, workers: int):
+    """(fetch thread pool, analyzer process pool) registered with `sup`."""
+    ctx = multiprocessing.get_context(os.getenv("SCAN_MP_START") or None)
+    io_pool = sup.add_pool(ThreadPoolExecutor(max_workers=min(n, cfg["io_workers"])))
+    cpu_pool = sup.add_pool(ProcessPoolExecutor(max_workers=min(n, workers), mp_context=ctx,
+                                                initializer=_worker_init, initargs=(_worker_env(),)))
+    return io_pool, cpu_pool
+
+
+def iter_scan(tickers, params: dict, *, mode: str | None = None, max_workers: int | None = None,
+              report: ScanReport | None = None, profile: ScanProfile | None = None):
+    """
+    Scan all tickers, yielding (ticker, result, error) as each ticker finishes
+    (completion order). `result` is the scan_ticker tuple (None on failure); `error`
+    is a formatted traceback (None on success). A slow ticker does not hold back
+    the others' results, and one past its deadline is reported instead of awaited.
+
+    `report` (a scan_control.ScanReport) collects tickers that timed out, were
+    cancelled, failed, or were served by a provider fallback. `profile` (a
+    scan_profile.ScanProfile) turns on stage timers and collects them per ticker.
+    """
+    cfg = get_scan_executor_config(params)
+    mode = mode or cfg["mode"]
+    workers = max_workers or cfg["workers"]
+    tickers = list(tickers)
+    if not tickers:
+        return
+
+    with ScanSupervisor(params, report, profile) as sup:
+        if mode == "process":
+            io_pool, cpu_pool = _process_pools(sup, len(tickers), cfg, workers)
+            for t in tickers:
+                sup.submit_guarded(io_pool, "fetch", t, _prefetch_payload, t, params)
+        else:
+            pool = sup.add_pool(ThreadPoolExecutor(max_workers=min(len(tickers), workers)))
+            for t in tickers:
+                sup.submit_guarded(pool, "scan", t, scan_ticker, t, params)
+
+        for stage, t, value, err in sup.results():
+            if err is not None:
+                yield t, None, err
+            elif stage == "fetch":
+                # Hand each ticker to the process pool as soon as its data is in (fetch/compute overlap)
+                sup.submit(cpu_pool, "scan", t, _payload_guarded, _scan_payload, value[0], (params,),
+                           sup.started[t], profile is not None)
+            else:
+                yield t, value[0], None
+
+
+def execute_scan(tickers, params: dict, *, mode: str | None = None, max_workers: int | None = None,
+                 report: ScanReport | None = None, profile: ScanProfile | None = None):
+    """
+    Scan all tickers.
+
+    Returns:
+        List of (ticker, result, error) in input order. `result` is the scan_ticker
+        tuple (None on failure); `error` is a formatted traceback (None on success).
+    """
+    tickers = list(tickers)
+    results = {t: (res, err) for t, res, err in
+               iter_scan(tickers, params, mode=mode, max_workers=max_workers, report=report, profile=profile)}
+    return [(t, *results.get(t, (None, None))) for t in tickers]
+
+
+# ----------------------------- Two-phase scan -----------------------------
+
+# Runners that pair expirations; phase 2 cannot restrict their snapshot by DTE
+_MULTI_EXPIRATION = ("pmcc", "synthetic_collar")
+
+
+def collect_ticker(t, params: dict, snap: MarketSnapshot):
+    """
+    Phase 1: every analyzer with Monte Carlo off.
+
+    Returns:
+        (csp_counters, [(runner_name, candidate_key, prelim_score), ...])
+    """
+    snap.prefetch(scan_expirations(snap, params))
+    prelim, csp_cnt = [], {}
+    for name in STRATEGY_RUNNERS:
+        with scan_phase("collect") as phase:
+            _, cnt = run_strategy(name, t, params, snap)
+        if name == "csp":
+            csp_cnt = cnt or {}
+        prelim.extend((name, key, score) for _, key, score in phase.prelim)
+    return csp_cnt, prelim
+
+
+def enrich_ticker(t, params: dict, snap: MarketSnapshot, keys: dict) -> dict:
+    """
+    Phase 2: re-run the analyzers that have survivors (`keys`: {runner_name: set of
+    candidate keys}) with Monte Carlo for those candidates only.
+
+    Returns:
+        {runner_name: DataFrame of the enriched rows}
+    """
+    out = {}
+    for name, allowed in keys.items():
+        view = snap
+        if name not in _MULTI_EXPIRATION:
+            # Only the expirations holding a survivor (candidate keys carry their DTE)
+            days = {dict(k[1:]).get("days") for k in allowed}
+            today = datetime.now(timezone.utc).date()
+            exps = []
+            for exp in snap.expirations:
+                try:
+                    if (datetime.strptime(exp, "%Y-%m-%d").date() - today).days in days:
+                        exps.append(exp)
+                except Exception:
+                    continue
+            view = snap.restrict(exps)
+        with scan_phase("enrich", allowed):
+            df, _ = run_strategy(name, t, params, view)
+        if df is not None and not df.empty and "MC_ExpectedPnL" in df.columns:
+            df = df[df["MC_ExpectedPnL"].notna()].reset_index(drop=True)
+        out[name] = df if df is not None else pd.DataFrame()
+    return out
+
+
+def select_top_k(prelim_by_ticker: dict, top_k: int) -> dict:
+    """
+    Global top-K per strategy by preliminary score (missing scores rank last; ties keep
+    input ticker order). Returns {ticker: {runner_name: set of candidate keys}}.
+    """
+    ranked = {}
+    for order, (t, prelim) in enumerate(prelim_by_ticker.items()):
+        for seq, (name, key, score) in enumerate(prelim):
+            try:
+                score = float(score)
+            except Exception:
+                score = float("nan")
+            rank = -score if score == score else float("inf")
+            ranked.setdefault(name, []).append((rank, order, seq, t, key))
+    keep = {}
+    for name, rows in ranked.items():
+        rows.sort(key=lambda r: r[:3])
+        for _, _, _, t, key in rows[:max(1, int(top_k))]:
+            keep.setdefault(t, {}).setdefault(name, set()).add(key)
+    return keep
+
+
+def _fetch_and_collect(t, params: dict):
+    snap = fetch_market_snapshot(t)
+    return snap, collect_ticker(t, params, snap)
+
+
+def execute_two_phase(tickers, params: dict, top_k: int, *, mode: str | None = None,
+                      max_workers: int | None = None, report: ScanReport | None = None,
+                      profile: ScanProfile | None = None):
+    """
+    Two-phase scan: cheap candidate generation for every ticker, then Monte Carlo
+    enrichment for the global top-K candidates per strategy only.
+
+    Same return shape as execute_scan; each result tuple holds only enriched rows.
+    Tickers with no survivors return empty frames (and their CSP counters).
+
+    Deadlines, `report` and `profile` work as in iter_scan. Phase 2 starts only once
+    every ticker is through phase 1, so the per-ticker limit applies to each phase
+    separately; the overall deadline covers both.
+    """
+    cfg = get_scan_executor_config(params)
+    mode = mode or cfg["mode"]
+    workers = max_workers or cfg["workers"]
+    tickers = list(tickers)
+    errors, inputs, collected, enriched = {}, {}, {}, {}
+    if not tickers:
+        return []
+
+    with ScanSupervisor(params, report, profile) as sup:
+        if mode == "process":
+            io_pool, cpu_pool = _process_pools(sup, len(tickers), cfg, workers)
+            for t in tickers:
+                sup.submit_guarded(io_pool, "fetch", t, _prefetch_payload, t, params)
+        else:
+            pool = sup.add_pool(ThreadPoolExecutor(max_workers=min(len(tickers), workers)))
+            for t in tickers:
+                sup.submit_guarded(pool, "collect", t, _fetch_and_collect, t, params)
+
+        # Phase 1: fetch + candidate generation for every ticker
+        for stage, t, value, err in sup.results():
+            if err is not None:
+                errors[t] = err
+            elif stage == "fetch":
+                inputs[t] = value[0]
+                sup.submit(cpu_pool, "collect", t, _payload_guarded, _collect_payload, value[0], (params,),
+                           sup.started[t], profile is not None)
+            elif mode == "process":
+                collected[t] = value[0]
+            else:
+                inputs[t], collected[t] = value[0]
+
+        # Phase 2: Monte Carlo for the survivors, with a fresh per-ticker deadline
+        keep = select_top_k({t: collected[t][1] for t in tickers if t in collected}, top_k)
+        for t in tickers:
+            if t not in keep:
+                continue
+            if sup.out_of_time():
+                sup.report.cancelled.append(t)
+                errors[t] = f"ScanCancelled: {t}: overall scan deadline exceeded\n"
+            elif mode == "process":
+                sup.submit(cpu_pool, "enrich", t, _payload_guarded, _enrich_payload, inputs[t], (params, keep[t]),
+                           sup.start(t), profile is not None)
+            else:
+                sup.submit_guarded(pool, "enrich", t, enrich_ticker, t, params, inputs[t], keep[t])
+        for _, t, value, err in sup.results():
+            if err is not None:
+                errors[t] = err
+            else:
+                enriched[t] = value[0]
+
+    out = []
+    for t in tickers:
+        if t in errors or t not in collected:
+            out.append((t, None, errors.get(t)))
+            continue
+        frames = enriched.get(t, {})
+        res = (frames.get("csp", pd.DataFrame()), collected[t][0]) + tuple(
+            frames.get(name, pd.DataFrame()) for name in list(STRATEGY_RUNNERS)[1:])
+        out.append((t, res, None))
+    return out
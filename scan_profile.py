@@ -0,0 +1,209 @@
+"""
+Scan Profile
+
+Hot-path timers and counters for scans, aggregated per ticker, per strategy and per
+provider, to see whether scan time goes to the network, pandas or Monte Carlo.
+
+Instrumented stages:
+  - fetch_price, fetch_expirations, dividends, earnings (strategy_analysis.fetch_market_snapshot)
+  - fetch_chain, fetch_chain_range (MarketSnapshot.chain / prefetch)
+  - request: every provider round trip (data_fetching), labelled with the provider
+  - analyze: one strategy's analyzer for one ticker (scan_executor.run_strategy)
+  - mc: Monte Carlo / closed-form P&L (strategy_analysis._maybe_mc / _mc_batch)
+  - score: unified_risk_reward_score
+Nested stages are attributed to the strategy whose analyzer is running, so a
+strategy's "filter" time (chain evaluation, filters, row building) is its analyze
+time minus the chain fetches, MC and scoring inside it. Stages overlap (a
+"request" runs inside a fetch_* stage), so stage totals do not add up to wall time.
+
+Profiling is off unless a scan asks for it (params["scan_profile"] or SCAN_PROFILE=1).
+When off, timer() is a ContextVar lookup returning a shared no-op context manager.
+
+    prof = TickerProfile()
+    with profiling(prof):
+        with timer("analyze", strategy="csp"):
+            ...
+    report = ScanProfile(); report.add_ticker("AAA", prof.stats); report.as_dict()
+"""
+
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+_ACTIVE = contextvars.ContextVar("scan_profile", default=None)
+_NULL = nullcontext()
+
+
+def profile_enabled(params: dict | None = None) -> bool:
+    """Scan profiling requested by params["scan_profile"], else SCAN_PROFILE=1."""
+    value = (params or {}).get("scan_profile")
+    if value is None:
+        value = os.getenv("SCAN_PROFILE", "")
+    return str(value).strip().lower() in ("1", "true", "yes", "on")
+
+
+class TickerProfile:
+    """Timings for one ticker: {(stage, strategy, provider): [count, seconds]} (single thread)."""
+
+    __slots__ = ("stats", "strategy")
+
+    def __init__(self):
+        self.stats = {}
+        self.strategy = None
+
+    def add(self, stage: str, seconds: float, provider: str | None = None) -> None:
+        key = (stage, self.strategy, provider)
+        entry = self.stats.get(key)
+        if entry is None:
+            self.stats[key] = [1, seconds]
+        else:
+            entry[0] += 1
+            entry[1] += seconds
+
+
+class _Timer:
+    __slots__ = ("profile", "stage", "provider", "strategy", "prev", "start")
+
+    def __init__(self, profile, stage, provider, strategy):
+        self.profile = profile
+        self.stage = stage
+        self.provider = provider
+        self.strategy = strategy
+
+    def __enter__(self):
+        if self.strategy is not None:
+            self.prev = self.profile.strategy
+            self.profile.strategy = self.strategy
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profile.add(self.stage, time.perf_counter() - self.start, self.provider)
+        if self.strategy is not None:
+            self.profile.strategy = self.prev
+        return False
+
+
+@contextmanager
+def profiling(profile: TickerProfile | None):
+    """Record timer() blocks in the current thread/task into `profile` (None = off)."""
+    token = _ACTIVE.set(profile)
+    try:
+        yield profile
+    finally:
+        _ACTIVE.reset(token)
+
+
+def timer(stage: str, *, provider: str | None = None, strategy: str | None = None):
+    """
+    Context manager timing one `stage`. `strategy` labels the block and everything
+    nested in it; `provider` labels network stages. No-op unless profiling() is active.
+    """
+    profile = _ACTIVE.get()
+    if profile is None:
+        return _NULL
+    return _Timer(profile, stage, provider, strategy)
+
+
+def profiled(stage: str):
+    """Decorator form of timer(stage)."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            profile = _ACTIVE.get()
+            if profile is None:
+                return fn(*args, **kwargs)
+            with _Timer(profile, stage, None, None):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# ----------------------------- Aggregation -----------------------------
+
+def _bump(table: dict, key, count: int, seconds: float) -> None:
+    entry = table.setdefault(key, {"count": 0, "seconds": 0.0})
+    entry["count"] += count
+    entry["seconds"] += seconds
+
+
+def _rounded(table: dict) -> dict:
+    return {k: {"count": v["count"], "seconds": round(v["seconds"], 6)} for k, v in table.items()}
+
+
+# Stages nested inside "analyze" (subtracted to get a strategy's filter time)
+_NESTED = ("fetch_chain", "fetch_chain_range", "mc", "score")
+
+
+class ScanProfile:
+    """Scan-wide aggregate of TickerProfile stats (thread-safe add)."""
+
+    def __init__(self):
+        self._stats = {}  # (ticker, stage, strategy, provider) -> [count, seconds]
+        self._lock = threading.Lock()
+        self.started = time.perf_counter()
+        self.wall_seconds = None
+
+    def add_ticker(self, ticker: str, stats: dict) -> None:
+        with self._lock:
+            for (stage, strategy, provider), (count, seconds) in (stats or {}).items():
+                entry = self._stats.setdefault((ticker, stage, strategy, provider), [0, 0.0])
+                entry[0] += count
+                entry[1] += seconds
+
+    def add(self, stage: str, seconds: float, *, ticker: str = "*", strategy: str | None = None) -> None:
+        """Record a stage outside any ticker (e.g. post-scan Kelly sizing)."""
+        self.add_ticker(ticker, {(stage, strategy, None): (1, seconds)})
+
+    def finish(self) -> None:
+        self.wall_seconds = time.perf_counter() - self.started
+
+    def as_dict(self) -> dict:
+        """JSON-ready report: totals by stage, ticker, strategy (with derived filter time) and provider."""
+        with self._lock:
+            items = list(self._stats.items())
+        stages, tickers, strategies, providers = {}, {}, {}, {}
+        for (ticker, stage, strategy, provider), (count, seconds) in items:
+            _bump(stages, stage, count, seconds)
+            _bump(tickers.setdefault(ticker, {}), stage, count, seconds)
+            if strategy is not None:
+                _bump(strategies.setdefault(strategy, {}), stage, count, seconds)
+            if provider is not None:
+                _bump(providers, provider, count, seconds)
+        for table in strategies.values():
+            if "analyze" in table:
+                nested = sum(table[s]["seconds"] for s in _NESTED if s in table)
+                table["filter"] = {"count": table["analyze"]["count"],
+                                   "seconds": max(0.0, table["analyze"]["seconds"] - nested)}
+        return {
+            "wall_seconds": None if self.wall_seconds is None else round(self.wall_seconds, 6),
+            "stages": _rounded(stages),
+            "tickers": {t: _rounded(v) for t, v in tickers.items()},
+            "strategies": {s: _rounded(v) for s, v in strategies.items()},
+            "providers": _rounded(providers),
+        }
+
+    def to_json(self, path: str | None = None, **kwargs) -> str:
+        text = json.dumps(self.as_dict(), indent=2, **kwargs)
+        if path:
+            with open(path, "w", encoding="utf-8") as fh:
+                fh.write(text)
+        return text
+
+
+def profile_frame(report: dict, by: str = "stages"):
+    """One section of ScanProfile.as_dict() as a DataFrame (rows: stage or ticker/strategy x stage)."""
+    import pandas as pd
+
+    section = report.get(by) or {}
+    if by in ("stages", "providers"):
+        rows = [{"name": k, **v} for k, v in section.items()]
+    else:
+        label = {"tickers": "ticker", "strategies": "strategy"}[by]
+        rows = [{label: k, "stage": s, **v} for k, table in section.items() for s, v in table.items()]
+    df = pd.DataFrame(rows)
+    return df.sort_values("seconds", ascending=False).reset_index(drop=True) if not df.empty else df
@@ -14,10 +14,14 @@ from typing import Dict, List, Optional, Tuple
 import logging
 
 from portfolio_manager import Position
-from options_math import call_delta, put_delta, option_gamma, option_vega, call_theta, put_theta
+from options_math import (call_delta, put_delta, option_gamma, option_vega, call_theta, put_theta,
+                          implied_vol_vec)
 
 logger = logging.getLogger(__name__)
 
+# Volatility used for Greeks when the premium does not imply one
+DEFAULT_IV = 0.30
+
 
 def fetch_schwab_positions(provider) -> Tuple[List[Position], Optional[str]]:
     """Fetch positions from Schwab API and convert to Position objects.
@@ -246,13 +250,22 @@ def _parse_schwab_position(pos_data: Dict, account_id: str, provider) -> Optiona
                 logger.info(f"Calculating Greeks: S=${underlying_price:.2f}, K=${strike:.2f}, C=${current_price:.2f}, DTE={dte}")
                 
                 if dte > 0:
-                    # Use implied volatility from option price or default
-                    iv = 0.30  # Default 30% IV, could enhance by backing out IV
                     risk_free_rate = 0.05  # 5% default
                     
                     # Calculate time to expiration in years
                     T = dte / 365.0
                     
+                    # Back out implied volatility from the per-share premium (default 30%)
+                    iv = DEFAULT_IV
+                    premium = abs(market_value) / (100.0 * abs(quantity))
+                    solved, converged = implied_vol_vec(premium, underlying_price, strike, T, risk_free_rate,
+                                                        0.0, position_type == 'CALL')
+                    if converged:
+                        iv = float(solved)
+                    else:
+                        logger.warning(f"Could not imply volatility for {symbol} from premium ${premium:.2f}; "
+                                       f"using {DEFAULT_IV:.0%}")
+                    
                     # Calculate Greeks using individual functions
                     if position_type == 'CALL':
                         delta = call_delta(underlying_price, strike, risk_free_rate, iv, T)
@@ -265,7 +278,7 @@ def _parse_schwab_position(pos_data: Dict, account_id: str, provider) -> Optiona
                     gamma = option_gamma(underlying_price, strike, risk_free_rate, iv, T)
                     vega = option_vega(underlying_price, strike, risk_free_rate, iv, T)
                     
-                    logger.info(f"Greeks calculated: delta={delta:.4f}, gamma={gamma:.4f}, vega={vega:.4f}, theta={theta:.4f}")
+                    logger.info(f"Greeks calculated: iv={iv:.4f}, delta={delta:.4f}, gamma={gamma:.4f}, vega={vega:.4f}, theta={theta:.4f}")
                 else:
                     logger.warning(f"DTE={dte} is not positive, skipping Greeks calculation")
                     
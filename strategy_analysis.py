@@ -23,6 +23,8 @@ import numpy as np
 import logging
 import sys
 import os
+import contextvars
+from contextlib import contextmanager
 
 # Configure logging to output to stderr (which shows in terminal)
 logging.basicConfig(
@@ -32,7 +34,7 @@ logging.basicConfig(
     force=True
 )
 import yfinance as yf
-from datetime import datetime, timezone
+from datetime import date, datetime, timedelta, timezone
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Import options math functions
@@ -42,15 +44,23 @@ from options_math import (
     option_gamma, option_vega,
     call_theta, put_theta,
     expected_move,
-    compute_spread_pct,
     trailing_dividend_info,
     get_earnings_date,
     get_earnings_date_cached,
     mc_pnl,
+    mc_pnl_batch,
+    mc_pnl_analytic,
+    MC_SAMPLERS,
+    ANALYTIC_STRATEGIES,
     _bs_d1_d2,
     _norm_cdf
 )
 from scoring_utils import apply_unified_score
+from chain_eval import evaluate_chain, nan_to_none, spread_widths
+from market_snapshot import MarketSnapshot
+from scan_profile import profiled, timer
+import chain_cache
+from price_store import get_price_store
 
 # Note: Data fetching functions (fetch_price, fetch_expirations, fetch_chain, etc.)
 # are imported inside each analyzer function to avoid circular imports.
@@ -65,18 +75,36 @@ def _get_scan_perf_config():
     Keys:
       - fast_scan (bool): If true, enable aggressive limits to speed scanning
       - mc_paths_scan (int): Monte Carlo paths to use during scanning
-      - max_mc_per_exp (int|None): Cap MC evaluations per expiration (None = unlimited)
+      - mc_sampler (str): "pseudo" | "stratified" | "sobol" variates (see options_math.mc_normals)
+      - mc_seed (int|None): Shared seed = common random numbers for every candidate (None = fresh draws)
+      - analytic_strategies (frozenset): Strategies scored with the closed-form P&L distribution
+        (options_math.mc_pnl_analytic) instead of simulation; PMCC/Synthetic Collar always simulate
+      - batch_mc (bool): Simulate each expiration once and evaluate all its candidates
+        against the shared paths (mc_pnl_batch); the per-expiration cap then does not apply
+      - max_mc_per_exp (int|None): Cap MC evaluations per expiration when not batched (None = unlimited)
       - pre_mc_score_min (float|None): Skip MC if preliminary score below this threshold
+      - mc_top_k (int|None): Two-phase scan; MC/enrichment only for the global top-K
+        candidates per strategy by preliminary score (see scan_executor.execute_two_phase)
     """
     fast = False
     # PERFORMANCE: Reduced defaults to prevent 30+ minute scans
     # 250 paths gives stable results in ~25% of time vs 1000 paths
     mc_paths = 250
-    # Cap MC at 10 best candidates per expiration (prevents exponential blowup)
+    # Stratified draws with one shared seed: every candidate sees the same variates and
+    # p5 estimates are stable run to run (5x fewer paths match pseudo-random stability)
+    mc_sampler = "stratified"
+    mc_seed = 0
+    # Terminal-payoff strategies have an exact P&L distribution: no simulation needed
+    analytic = ANALYTIC_STRATEGIES
+    # Batched MC covers every candidate of an expiration for about the cost of one run
+    batch_mc = True
+    # Unbatched fallback: cap MC at 10 candidates per expiration (prevents exponential blowup)
     max_mc = 10
     # Lower threshold for complex strategies (PMCC/Synthetic Collar have lower ROI profiles)
     # 0.10 allows capital-intensive strategies through while still filtering weak opportunities
     pre_mc_min = 0.10
+    # Two-phase scan off by default (every candidate is enriched inline)
+    mc_top_k = None
     # Env overrides (useful in headless/tests/CLI)
     try:
         env_fast = os.getenv("FAST_SCAN", "").strip().lower()
@@ -90,6 +118,31 @@ def _get_scan_perf_config():
             mc_paths = max(50, int(env_paths))
     except Exception:
         pass
+    try:
+        env_sampler = os.getenv("SCAN_MC_SAMPLER", "").strip().lower()
+        if env_sampler:
+            mc_sampler = env_sampler
+    except Exception:
+        pass
+    try:
+        env_seed = os.getenv("SCAN_MC_SEED", "").strip().lower()
+        if env_seed:
+            mc_seed = None if env_seed in ("none", "random", "off") else int(env_seed)
+    except Exception:
+        pass
+    try:
+        env_analytic = os.getenv("SCAN_ANALYTIC_STRATEGIES", "").strip().upper()
+        if env_analytic:
+            analytic = frozenset() if env_analytic in ("NONE", "0", "OFF") else frozenset(
+                x.strip() for x in env_analytic.split(",") if x.strip() in ANALYTIC_STRATEGIES)
+    except Exception:
+        pass
+    try:
+        env_batch = os.getenv("SCAN_BATCH_MC", "").strip().lower()
+        if env_batch in ("0", "false", "no", "off"):
+            batch_mc = False
+    except Exception:
+        pass
     try:
         env_max_mc = os.getenv("SCAN_MAX_MC_PER_EXP")
         if env_max_mc:
@@ -102,14 +155,27 @@ def _get_scan_perf_config():
             pre_mc_min = float(env_pre)
     except Exception:
         pass
+    try:
+        env_top_k = os.getenv("SCAN_MC_TOP_K")
+        if env_top_k:
+            mc_top_k = int(env_top_k) or None
+    except Exception:
+        pass
 
     # Streamlit sidebar/session overrides (if available)
     try:
-        import streamlit as st  # type: ignore
+        st = sys.modules.get("streamlit")  # only when running inside the app
+        if st is None:
+            raise ImportError("streamlit not loaded")
         fast = bool(st.session_state.get("fast_scan", fast))
         mc_paths = int(st.session_state.get("scan_mc_paths", mc_paths))
+        batch_mc = bool(st.session_state.get("scan_batch_mc", batch_mc))
+        mc_sampler = str(st.session_state.get("scan_mc_sampler", mc_sampler))
+        mc_seed = st.session_state.get("scan_mc_seed", mc_seed)
+        analytic = frozenset(st.session_state.get("scan_analytic_strategies", analytic)) & ANALYTIC_STRATEGIES
         max_mc = st.session_state.get("scan_max_mc_per_exp", max_mc)
         pre_mc_min = st.session_state.get("scan_pre_mc_score_min", pre_mc_min)
+        mc_top_k = st.session_state.get("scan_mc_top_k", mc_top_k) or None
     except Exception:
         pass
 
@@ -121,18 +187,133 @@ def _get_scan_perf_config():
     return {
         "fast_scan": fast,
         "mc_paths_scan": int(mc_paths),
+        "batch_mc": bool(batch_mc),
+        "mc_sampler": mc_sampler if mc_sampler in MC_SAMPLERS else "pseudo",
+        "mc_seed": None if mc_seed is None else int(mc_seed),
+        "analytic_strategies": frozenset(analytic),
         "max_mc_per_exp": None if (max_mc is None or (isinstance(max_mc, str) and not max_mc)) else int(max_mc),
         "pre_mc_score_min": None if (pre_mc_min is None or (isinstance(pre_mc_min, str) and not pre_mc_min)) else float(pre_mc_min),
+        "mc_top_k": None if not mc_top_k else max(1, int(mc_top_k)),
     }
 
 
+# ----------------------------- Two-phase scan -----------------------------
+
+class ScanPhase:
+    """
+    MC mode for analyzers running inside scan_phase():
+      - "collect": no MC; every candidate's (key, preliminary score) is recorded
+      - "enrich": MC only for candidates whose key is in `keys` (no score gate or cap)
+    """
+
+    def __init__(self, mode: str, keys=None):
+        self.mode = mode
+        self.keys = frozenset(keys or ())
+        self.prelim = []  # (strategy_name, key, prelim_score) in analyzer order
+
+
+_SCAN_PHASE = contextvars.ContextVar("scan_phase", default=None)
+
+
+@contextmanager
+def scan_phase(mode: str, keys=None):
+    """Run analyzers in a two-phase scan mode (per thread/task); yields the ScanPhase."""
+    phase = ScanPhase(mode, keys)
+    token = _SCAN_PHASE.set(phase)
+    try:
+        yield phase
+    finally:
+        _SCAN_PHASE.reset(token)
+
+
+def mc_candidate_key(strategy_name: str, mc_params: dict) -> tuple:
+    """Identity of one candidate across scan phases: strategy plus its MC inputs."""
+    items = []
+    for k, v in sorted(mc_params.items()):
+        try:
+            items.append((k, round(float(v), 6)))
+        except Exception:
+            items.append((k, v))
+    return (strategy_name,) + tuple(items)
+
+
+def _mc_nan() -> dict:
+    return {
+        "pnl_expected": float("nan"),
+        "roi_ann_expected": float("nan"),
+        "pnl_p5": float("nan"),
+        "roi_ann_p5": float("nan"),
+    }
+
+
+@profiled("mc")
+def _mc_batch(strategy_name: str, params_list: list, *, rf: float, mu: float, perf_cfg: dict) -> list:
+    """Batched MC for one expiration's candidates (one shared path set, see mc_pnl_batch).
+    Returns one mc_pnl-style dict per candidate, or Nones when batching is off or failed
+    (_maybe_mc then falls back to per-candidate runs under the per-expiration cap).
+    Strategies in perf_cfg["analytic_strategies"] get the closed-form result instead.
+    """
+    phase = _SCAN_PHASE.get()
+    if phase is not None:
+        if phase.mode != "enrich":
+            return [None] * len(params_list)
+        # Only the selected candidates; the rest stay None (and get no MC in _maybe_mc)
+        idx = [i for i, p in enumerate(params_list) if mc_candidate_key(strategy_name, p) in phase.keys]
+        out = [None] * len(params_list)
+        if idx:
+            sub = _mc_batch_unphased(strategy_name, [params_list[i] for i in idx], rf=rf, mu=mu, perf_cfg=perf_cfg)
+            for i, res in zip(idx, sub):
+                out[i] = res
+        return out
+    return _mc_batch_unphased(strategy_name, params_list, rf=rf, mu=mu, perf_cfg=perf_cfg)
+
+
+def _mc_batch_unphased(strategy_name: str, params_list: list, *, rf: float, mu: float, perf_cfg: dict) -> list:
+    if strategy_name in perf_cfg.get("analytic_strategies", ()):
+        out = []
+        for p in params_list:
+            try:
+                out.append(mc_pnl_analytic(strategy_name, p, mu=mu, rf=rf))
+            except Exception:
+                out.append(None)
+        return out
+    if not params_list or not perf_cfg.get("batch_mc", True):
+        return [None] * len(params_list)
+    try:
+        n_paths = int(perf_cfg.get("mc_paths_scan", 1000))
+    except Exception:
+        n_paths = 1000
+    try:
+        return mc_pnl_batch(strategy_name, params_list, n_paths=n_paths, mu=mu, rf=rf,
+                            seed=perf_cfg.get("mc_seed"), sampler=perf_cfg.get("mc_sampler", "pseudo"))
+    except Exception as e:
+        logging.debug(f"Batched MC failed for {strategy_name}: {e}")
+        return [None] * len(params_list)
+
+
+@profiled("mc")
 def _maybe_mc(strategy_name: str, mc_params: dict, *, rf: float, mu: float,
               prelim_score: float | None,
               perf_cfg: dict,
-              exp_counter: dict) -> dict:
+              exp_counter: dict,
+              precomputed: dict | None = None) -> dict:
     """Run Monte Carlo conditionally based on performance config; return dict like mc_pnl output or NaNs.
     exp_counter: mutable dict with 'count' to enforce per-expiration caps.
+    precomputed: this candidate's result from _mc_batch; returned (subject to the score gate)
+    without counting against the cap.
+    Inside scan_phase() the phase decides instead: "collect" records the preliminary score
+    and skips MC; "enrich" runs MC only for the selected candidates, ungated.
     """
+    phase = _SCAN_PHASE.get()
+    if phase is not None:
+        key = mc_candidate_key(strategy_name, mc_params)
+        if phase.mode != "enrich":
+            phase.prelim.append((strategy_name, key, prelim_score))
+            return _mc_nan()
+        if key not in phase.keys:
+            return _mc_nan()
+        perf_cfg = dict(perf_cfg, pre_mc_score_min=None, max_mc_per_exp=None)
+
     # Gate by preliminary score if configured
     pre_min = perf_cfg.get("pre_mc_score_min")
     if pre_min is not None and isinstance(prelim_score, (int, float)):
@@ -147,6 +328,16 @@ def _maybe_mc(strategy_name: str, mc_params: dict, *, rf: float, mu: float,
         except Exception:
             pass
 
+    if precomputed is not None:
+        return precomputed
+
+    # Closed-form distribution: exact and cheap, so not subject to the cap
+    if strategy_name in perf_cfg.get("analytic_strategies", ()):
+        try:
+            return mc_pnl_analytic(strategy_name, mc_params, mu=mu, rf=rf)
+        except Exception:
+            pass
+
     # Gate by per-expiration count cap
     cap = perf_cfg.get("max_mc_per_exp")
     if cap is not None:
@@ -165,7 +356,8 @@ def _maybe_mc(strategy_name: str, mc_params: dict, *, rf: float, mu: float,
     except Exception:
         n_paths = 1000
     try:
-        res = mc_pnl(strategy_name, mc_params, n_paths=n_paths, mu=mu, seed=None, rf=rf)
+        res = mc_pnl(strategy_name, mc_params, n_paths=n_paths, mu=mu, rf=rf,
+                     seed=perf_cfg.get("mc_seed"), sampler=perf_cfg.get("mc_sampler", "pseudo"))
         # Update counter on success
         exp_counter["count"] = int(exp_counter.get("count", 0)) + 1
         return res
@@ -196,6 +388,7 @@ def _norm(x: float, lo: float, hi: float) -> float:
         return 0.0
 
 
+@profiled("score")
 def unified_risk_reward_score(*, expected_roi_ann_dec: float | None,
                               p5_pnl: float | None,
                               capital: float | None,
@@ -258,26 +451,78 @@ def unified_risk_reward_score(*, expected_roi_ann_dec: float | None,
     return round(_clip01(score), 6)
 
 
+# ----------------------------- Market Snapshot -----------------------------
+
+def _iso_date(x) -> str | None:
+    try:
+        return pd.Timestamp(x).date().isoformat() if x is not None else None
+    except Exception:
+        return None
+
+
+def fetch_market_snapshot(ticker) -> MarketSnapshot:
+    """
+    Fetch everything the analyzers share for one ticker (spot, expirations, dividends,
+    ex-div estimate, earnings date). Chains are loaded lazily by the snapshot itself.
+
+    Raises if the spot price or expirations cannot be fetched.
+    """
+    from data_fetching import fetch_price, fetch_expirations, estimate_next_ex_div
+
+    with timer("fetch_price"):
+        S = fetch_price(ticker)
+    with timer("fetch_expirations"):
+        expirations = tuple(fetch_expirations(ticker))
+    # Dividend/earnings metadata also goes through the on-disk cache (replay needs no network)
+    meta = chain_cache.load("meta", "yfinance", ticker)
+    if meta is None:
+        stock = yf.Ticker(ticker)
+        with timer("dividends"):
+            div_ps_annual, div_y = trailing_dividend_info(stock, S)
+            next_ex_div, next_ex_div_amt = estimate_next_ex_div(stock)
+        with timer("earnings"):
+            earnings_date = get_earnings_date_cached(ticker)
+        chain_cache.store("meta", "yfinance", ticker, "", {
+            "div_ps_annual": div_ps_annual,
+            "div_y": div_y,
+            "next_ex_div": _iso_date(next_ex_div),
+            "next_ex_div_amt": next_ex_div_amt,
+            "earnings_date": _iso_date(earnings_date),
+        })
+    else:
+        div_ps_annual, div_y = meta["div_ps_annual"], meta["div_y"]
+        next_ex_div_amt = meta["next_ex_div_amt"]
+        next_ex_div = date.fromisoformat(meta["next_ex_div"]) if meta["next_ex_div"] else None
+        earnings_date = date.fromisoformat(meta["earnings_date"]) if meta["earnings_date"] else None
+    return MarketSnapshot(
+        ticker=ticker,
+        spot=S,
+        expirations=expirations,
+        div_ps_annual=div_ps_annual,
+        div_y=div_y,
+        next_ex_div=next_ex_div,
+        next_ex_div_amt=next_ex_div_amt,
+        earnings_date=earnings_date,
+    )
+
+
 def analyze_csp(ticker, *, min_days=0, days_limit, min_otm, min_oi, max_spread, min_roi, min_cushion,
-                min_poew, earn_window, risk_free, per_contract_cap=None, bill_yield=0.0):
+                min_poew, earn_window, risk_free, per_contract_cap=None, bill_yield=0.0,
+                snapshot: MarketSnapshot | None = None):
     # Import from data_fetching to avoid circular import
-    from data_fetching import (
-        fetch_price, fetch_expirations, fetch_chain,
-        _get_num_from_row, _safe_int, effective_credit, 
-        effective_debit, estimate_next_ex_div, check_expiration_risk
-    )
+    from data_fetching import check_expiration_risk
     
-    stock = yf.Ticker(ticker)
     try:
-        S = fetch_price(ticker)
+        snap = snapshot if snapshot is not None else fetch_market_snapshot(ticker)
     except Exception:
         return pd.DataFrame(), {}
+    S = snap.spot
 
-    expirations = fetch_expirations(ticker)
+    expirations = snap.expirations
 
-    earn_date = get_earnings_date_cached(ticker)
+    earn_date = snap.earnings_date
     # dividend yield for q
-    div_ps_annual, div_y = trailing_dividend_info(stock, S)
+    div_y = snap.div_y
     q = div_y  # continuous dividend yield proxy
 
     rows = []
@@ -307,111 +552,94 @@ def analyze_csp(ticker, *, min_days=0, days_limit, min_otm, min_oi, max_spread,
         if earn_date is not None and abs((earn_date - ed).days) <= int(earn_window):
             continue
 
-        chain_all = fetch_chain(ticker, exp)
+        chain_all = snap.chain(exp)
         if chain_all is None or chain_all.empty:
             continue
         counters["expirations"] += 1
-        if "type" in chain_all.columns:
-            chain = chain_all[chain_all["type"].str.lower() == "put"].copy()
-        else:
-            chain = chain_all.copy()
+        chain = snap.normalized(exp, "put")
         if chain.empty:
             continue
 
         counters["rows"] += len(chain)
         T = D / 365.0
         mc_counter = {"count": 0}
-        for _, r in chain.iterrows():
-            K = _get_num_from_row(
-                r, ["strike", "Strike", "k", "K"], float("nan"))
-            if not (K == K and K > 0):
-                continue
 
-            bid = _get_num_from_row(r, ["bid", "Bid", "b"])  # may be NaN
-            ask = _get_num_from_row(r, ["ask", "Ask", "a"])  # may be NaN
-            last = _get_num_from_row(r, ["lastPrice", "last", "mark", "mid"])
-            prem = effective_credit(
-                bid, ask, last,
-                oi=_safe_int(_get_num_from_row(r, ["openInterest", "oi", "open_interest", "OI"], 0), 0),
-                volume=_safe_int(_get_num_from_row(r, ["volume", "Volume", "vol"], 0), 0),
-                dte=D
-            )
-            if prem != prem or prem <= 0:
-                continue
-            counters["premium_pass"] += 1
-
-            iv_raw = _get_num_from_row(
-                r, ["impliedVolatility", "iv", "IV"], float("nan"))
-            # Normalize IV to decimal if provided in vol points
-            if iv_raw == iv_raw and iv_raw > 3.0:
-                iv_dec = iv_raw / 100.0
-            else:
-                iv_dec = iv_raw
-            # Treat zero/negative IV as missing and use default for calculations
-            iv_for_calc = iv_dec if (
-                iv_dec == iv_dec and iv_dec > 0.0) else 0.20
-            d1, d2 = _bs_d1_d2(S, K, risk_free, iv_for_calc, T, q)
-            poew = _norm_cdf(d2) if d2 == d2 else float("nan")
-
-            otm_pct = (S - K) / S * 100.0
-            if otm_pct < float(min_otm):
-                continue
-            counters["otm_pass"] += 1
+        # Vectorized evaluation of the whole expiration; filters below are boolean
+        # masks applied in the same order as the per-row checks so counters are exact.
+        ev = evaluate_chain(chain, S=S, T=T, r=risk_free, q=q, right="put",
+                            fill="credit", dte=D, iv_default=0.20, fills=snap.fills(exp, "put", dte=D))
+        Ks = ev["strike"].to_numpy()
+        prems = ev["prem"].to_numpy()
+        oi_raw = ev["oi"].to_numpy()
+        oi_arr = ev["oi_i"].to_numpy()
+        spreads = ev["spread_pct"].to_numpy()
+        with np.errstate(invalid="ignore", divide="ignore"):
+            ok = (Ks > 0) & (prems > 0)
+            counters["premium_pass"] += int(ok.sum())
+
+            ok &= ~(ev["otm_pct"].to_numpy() < float(min_otm))
+            counters["otm_pass"] += int(ok.sum())
 
             # ROI on collateral (K) and on net cash (K - prem)
-            roi_ann_collat = (prem / K) * (365.0 / D)
-            roi_ann_net = (prem / max(K - prem, 1e-9)) * \
-                (365.0 / D) if K > prem else float("nan")
-            if roi_ann_collat != roi_ann_collat or roi_ann_collat < float(min_roi):
-                continue
-            counters["roi_pass"] += 1
+            if D > 0:
+                roi_collat_arr = (prems / Ks) * (365.0 / D)
+                roi_net_arr = np.where(Ks > prems, (prems / np.maximum(Ks - prems, 1e-9)) * (365.0 / D), np.nan)
+            else:
+                roi_collat_arr = np.full(len(Ks), np.nan)
+                roi_net_arr = np.full(len(Ks), np.nan)
+            ok &= roi_collat_arr >= float(min_roi)
+            roi_before = counters["roi_pass"]
+            counters["roi_pass"] += int(ok.sum())
 
-            # Get OI and volume - use NaN as default to detect missing values
-            oi_val = _get_num_from_row(
-                r, ["openInterest", "oi", "open_interest", "OI"], float("nan"))
-            vol_val = _get_num_from_row(
-                r, ["volume", "Volume", "vol"], float("nan"))
-            
-            # Convert to int, treating NaN as 0
-            oi = _safe_int(oi_val, 0)
-            vol = _safe_int(vol_val, 0)
-            
             # DEBUG: Log first 5 options that passed ROI to see OI filter decisions
-            if counters["roi_pass"] <= 5:
-                logging.info(f"ROI-passed option #{counters['roi_pass']}: ticker={ticker}, strike={K}, OI={oi} (raw={oi_val}), min_oi={min_oi}, will_reject_OI={min_oi and oi_val == oi_val and oi < int(min_oi)}")
-            
-            # Only apply OI filter if we have valid data (not NaN)
-            if min_oi and oi_val == oi_val and oi < int(min_oi):  # oi_val == oi_val checks for not NaN
-                continue
-            counters["oi_pass"] += 1
-
-            mid = prem
-            spread_pct = compute_spread_pct(bid, ask, mid)
-            if (spread_pct is not None) and (spread_pct > float(max_spread)):
-                continue
-            counters["spread_pass"] += 1
-
-            exp_mv = expected_move(S, iv_for_calc, T)
-            cushion_sigma = ((S - K) / exp_mv) if (exp_mv ==
-                                                   exp_mv and exp_mv > 0) else float("nan")
-            if cushion_sigma == cushion_sigma and cushion_sigma < float(min_cushion):
-                continue
-            counters["cushion_pass"] += 1
-
-            if poew == poew and poew < float(min_poew):
-                continue
-            counters["poew_pass"] += 1
+            for n, i in enumerate(np.flatnonzero(ok)[:max(0, 5 - roi_before)], start=roi_before + 1):
+                logging.info(f"ROI-passed option #{n}: ticker={ticker}, strike={Ks[i]}, OI={int(oi_arr[i])} (raw={oi_raw[i]}), min_oi={min_oi}, will_reject_OI={min_oi and oi_raw[i] == oi_raw[i] and oi_arr[i] < int(min_oi)}")
 
+            # Only apply OI filter if we have valid data (not NaN)
+            if min_oi:
+                ok &= ~(~np.isnan(oi_raw) & (oi_arr < int(min_oi)))
+            counters["oi_pass"] += int(ok.sum())
+
+            ok &= ~(spreads > float(max_spread))
+            counters["spread_pass"] += int(ok.sum())
+
+            ok &= ~(ev["cushion"].to_numpy() < float(min_cushion))
+            counters["cushion_pass"] += int(ok.sum())
+
+            ok &= ~(ev["poew"].to_numpy() < float(min_poew))
+            counters["poew_pass"] += int(ok.sum())
+
+            if per_contract_cap is not None:
+                ok &= ~(Ks * 100.0 > float(per_contract_cap))
+            counters["cap_pass"] += int(ok.sum())
+
+        cand = np.flatnonzero(ok)
+        iv_calc_arr = ev["iv_calc"].to_numpy()
+        mc_params_list = [dict(S0=S, days=D, iv=float(iv_calc_arr[i]), Kp=float(Ks[i]),
+                               put_premium=float(prems[i]), div_ps_annual=0.0, use_net_collateral=False)
+                          for i in cand]
+        mc_batch = _mc_batch("CSP", mc_params_list, rf=risk_free, mu=0.0, perf_cfg=perf_cfg)
+
+        for j, i in enumerate(cand):
+            c = ev.iloc[i]
+            K = float(c["strike"])
+            prem = float(c["prem"])
+            iv_dec = float(c["iv"])
+            poew = float(c["poew"])
+            otm_pct = float(c["otm_pct"])
+            roi_ann_collat = float(roi_collat_arr[i])
+            roi_ann_net = float(roi_net_arr[i])
+            oi = int(c["oi_i"])
+            vol = int(c["volume_i"])
+            spread_pct = nan_to_none(c["spread_pct"])
+            cushion_sigma = float(c["cushion"])
             collateral = K * 100.0
-            if per_contract_cap is not None and collateral > float(per_contract_cap):
-                continue
-            counters["cap_pass"] += 1
 
             excess_vs_bills = roi_ann_collat - float(bill_yield)
 
-            # Calculate Greeks for theta/gamma ratio
-            put_theta_val = put_theta(S, K, risk_free, iv_for_calc, T, q)
-            gamma_val = option_gamma(S, K, risk_free, iv_for_calc, T, q)
+            # Greeks for theta/gamma ratio (computed with the chain arrays)
+            put_theta_val = float(c["theta"])
+            gamma_val = float(c["gamma"])
 
             # Theta/Gamma ratio (higher is better for sellers)
             # Theta is negative for long, but we're short, so use absolute value
@@ -507,17 +735,10 @@ def analyze_csp(ticker, *, min_days=0, days_limit, min_otm, min_oi, max_spread,
 
             # Quick Monte Carlo for expected P&L to enrich output and enable UI guardrails
             try:
-                mc_params = dict(
-                    S0=S,
-                    days=D,
-                    iv=iv_for_calc,
-                    Kp=float(K),
-                    put_premium=float(prem),
-                    div_ps_annual=0.0,
-                    use_net_collateral=False,
-                )
+                mc_params = mc_params_list[j]
                 prelim = score  # use current heuristic score as prelim
-                mc_result = _maybe_mc("CSP", mc_params, rf=risk_free, mu=0.0, prelim_score=prelim, perf_cfg=perf_cfg, exp_counter=mc_counter)
+                mc_result = _maybe_mc("CSP", mc_params, rf=risk_free, mu=0.0, prelim_score=prelim, perf_cfg=perf_cfg, exp_counter=mc_counter,
+                                      precomputed=mc_batch[j])
                 mc_expected_pnl = mc_result.get('pnl_expected', float("nan"))
                 mc_roi_ann = mc_result.get('roi_ann_expected', float("nan"))
                 mc_pnl_p5 = mc_result.get('pnl_p5', float("nan"))
@@ -546,7 +767,6 @@ def analyze_csp(ticker, *, min_days=0, days_limit, min_otm, min_oi, max_spread,
             assignment_risk = 0.0
             try:
                 from risk_metrics.assignment_risk import calculate_assignment_risk_score
-                from datetime import datetime
                 exp_date = datetime.strptime(exp, "%Y-%m-%d") if isinstance(exp, str) else None
                 assignment_risk = calculate_assignment_risk_score(
                     ticker=ticker,
@@ -617,25 +837,22 @@ def analyze_csp(ticker, *, min_days=0, days_limit, min_otm, min_oi, max_spread,
 
 def analyze_cc(ticker, *, min_days=0, days_limit, min_otm, min_oi, max_spread, min_roi,
                earn_window, risk_free, include_dividends=True, bill_yield=0.0,
-               _relaxed: bool = False, _final_relax: bool = False):
+               _relaxed: bool = False, _final_relax: bool = False,
+               snapshot: MarketSnapshot | None = None):
     # Import from strategy_lab to avoid circular import at module level
-    from data_fetching import (
-        fetch_price, fetch_expirations, fetch_chain,
-        _get_num_from_row, _safe_int, effective_credit, 
-        effective_debit, estimate_next_ex_div, check_expiration_risk
-    )
+    from data_fetching import check_expiration_risk
     
-    stock = yf.Ticker(ticker)
     try:
-        S = fetch_price(ticker)
+        snap = snapshot if snapshot is not None else fetch_market_snapshot(ticker)
     except Exception:
         return pd.DataFrame()
-    expirations = fetch_expirations(ticker)
-    earn_date = get_earnings_date_cached(ticker)
+    S = snap.spot
+    expirations = snap.expirations
+    earn_date = snap.earnings_date
     # Performance configuration (was previously missing causing MC to be skipped in tests)
     perf_cfg = _get_scan_perf_config()
 
-    div_ps_annual, div_y = trailing_dividend_info(stock, S)  # per share annual
+    div_ps_annual, div_y = snap.div_ps_annual, snap.div_y  # per share annual
     
     # Debug counters
     counters = {
@@ -660,14 +877,11 @@ def analyze_cc(ticker, *, min_days=0, days_limit, min_otm, min_oi, max_spread, m
         if earn_date is not None and abs((earn_date - ed).days) <= int(earn_window):
             continue
 
-        chain_all = fetch_chain(ticker, exp)
+        chain_all = snap.chain(exp)
         if chain_all is None or chain_all.empty:
             continue
         counters["expirations"] += 1
-        if "type" in chain_all.columns:
-            chain = chain_all[chain_all["type"].str.lower() == "call"].copy()
-        else:
-            chain = chain_all.copy()
+        chain = snap.normalized(exp, "call")
         if chain.empty:
             continue
 
@@ -675,74 +889,63 @@ def analyze_cc(ticker, *, min_days=0, days_limit, min_otm, min_oi, max_spread, m
 
         T = D / 365.0
         mc_counter = {"count": 0}
-        for _, r in chain.iterrows():
-            K = _get_num_from_row(
-                r, ["strike", "Strike", "k", "K"], float("nan"))
-            if not (K == K and K > 0):
-                continue
-            bid = _get_num_from_row(r, ["bid", "Bid", "b"])  # may be NaN
-            ask = _get_num_from_row(r, ["ask", "Ask", "a"])  # may be NaN
-            last = _get_num_from_row(r, ["lastPrice", "last", "mark", "mid"])
-            prem = effective_credit(
-                bid, ask, last,
-                oi=_safe_int(_get_num_from_row(r, ["openInterest", "oi", "open_interest", "OI"], 0), 0),
-                volume=_safe_int(_get_num_from_row(r, ["volume", "Volume", "vol"], 0), 0),
-                dte=D
-            )
-            if prem != prem or prem <= 0:
-                continue
-            counters["premium_pass"] += 1
-            iv_raw = _get_num_from_row(
-                r, ["impliedVolatility", "iv", "IV"], float("nan"))
-            if iv_raw == iv_raw and iv_raw > 3.0:
-                iv_dec = iv_raw / 100.0
-            else:
-                iv_dec = iv_raw
-            iv_for_calc = iv_dec if (
-                iv_dec == iv_dec and iv_dec > 0.0) else 0.20
-            d1, d2 = _bs_d1_d2(S, K, risk_free, iv_for_calc, T, div_y)
-            # Prob(call expires worthless)
-            poec = _norm_cdf(-d2) if d2 == d2 else float("nan")
-            otm_pct = (K - S) / S * 100.0
-            if otm_pct < float(min_otm):
-                continue
-            counters["otm_pass"] += 1
+
+        # Vectorized evaluation; masks mirror the per-row filter order (counters exact)
+        ev = evaluate_chain(chain, S=S, T=T, r=risk_free, q=div_y, right="call",
+                            fill="credit", dte=D, iv_default=0.20, fills=snap.fills(exp, "call", dte=D))
+        Ks = ev["strike"].to_numpy()
+        prems = ev["prem"].to_numpy()
+        oi_arr = ev["oi_i"].to_numpy()
+        with np.errstate(invalid="ignore", divide="ignore"):
+            ok = (Ks > 0) & (prems > 0)
+            counters["premium_pass"] += int(ok.sum())
+
+            ok &= ~(ev["otm_pct"].to_numpy() < float(min_otm))
+            counters["otm_pass"] += int(ok.sum())
 
             # Annualized ROI on stock capital (S)
             # Guard against 0-day expirations which would explode annualization
             if D <= 0:
                 # Skip same-day expirations for CC to avoid pathological annualization
                 continue
-            roi_ann = (prem / S) * (365.0 / D)
+            roi_arr = (prems / S) * (365.0 / D)
             if include_dividends and div_ps_annual > 0:
-                roi_ann += (div_ps_annual / S)
-
-            if roi_ann != roi_ann or roi_ann < float(min_roi):
-                continue
-            counters["roi_pass"] += 1
-
-            oi = _safe_int(_get_num_from_row(
-                r, ["openInterest", "oi", "open_interest"], 0), 0)
-            vol = _safe_int(_get_num_from_row(
-                r, ["volume", "Volume", "vol"], 0), 0)
-            
-            if min_oi and oi < int(min_oi):
-                continue
-            counters["oi_pass"] += 1
-
-            mid = prem
-            spread_pct = compute_spread_pct(bid, ask, mid)
-            if (spread_pct is not None) and (spread_pct > float(max_spread)):
-                continue
-            counters["spread_pass"] += 1
-
-            exp_mv = expected_move(S, iv_for_calc, T)
-            cushion_sigma = ((K - S) / exp_mv) if (exp_mv ==
-                                                   exp_mv and exp_mv > 0) else float("nan")
-
-            # Calculate Greeks for theta/gamma ratio
-            call_theta_val = call_theta(S, K, risk_free, iv_for_calc, T, div_y)
-            gamma_val = option_gamma(S, K, risk_free, iv_for_calc, T, div_y)
+                roi_arr = roi_arr + (div_ps_annual / S)
+            ok &= roi_arr >= float(min_roi)
+            counters["roi_pass"] += int(ok.sum())
+
+            if min_oi:
+                ok &= ~(oi_arr < int(min_oi))
+            counters["oi_pass"] += int(ok.sum())
+
+            ok &= ~(ev["spread_pct"].to_numpy() > float(max_spread))
+            counters["spread_pass"] += int(ok.sum())
+
+        cand = np.flatnonzero(ok)
+        iv_arr = ev["iv"].to_numpy()
+        mc_params_list = [{"S0": S, "days": D,
+                           "iv": float(iv_arr[i]) if (iv_arr[i] == iv_arr[i] and iv_arr[i] > 0.0) else 0.20,
+                           "Kc": float(Ks[i]), "call_premium": float(prems[i]), "div_ps_annual": div_ps_annual}
+                          for i in cand]
+        mc_batch = _mc_batch("CC", mc_params_list, rf=risk_free, mu=0.03, perf_cfg=perf_cfg)
+
+        for j, i in enumerate(cand):
+            c = ev.iloc[i]
+            K = float(c["strike"])
+            prem = float(c["prem"])
+            iv_dec = float(c["iv"])
+            # Prob(call expires worthless)
+            poec = float(c["poew"])
+            otm_pct = float(c["otm_pct"])
+            roi_ann = float(roi_arr[i])
+            oi = int(c["oi_i"])
+            vol = int(c["volume_i"])
+            spread_pct = nan_to_none(c["spread_pct"])
+            cushion_sigma = float(c["cushion"])
+
+            # Greeks for theta/gamma ratio (computed with the chain arrays)
+            call_theta_val = float(c["theta"])
+            gamma_val = float(c["gamma"])
 
             # Theta/Gamma ratio (higher is better for sellers)
             theta_gamma_ratio = float("nan")
@@ -827,17 +1030,11 @@ def analyze_cc(ticker, *, min_days=0, days_limit, min_otm, min_oi, max_spread, m
 
             # ===== MONTE CARLO PENALTY: Validate against realistic price paths =====
             # Run quick MC simulation during scan to filter negative expected value
-            mc_params = {
-                "S0": S,
-                "days": D,
-                "iv": iv_dec if (iv_dec == iv_dec and iv_dec > 0.0) else 0.20,
-                "Kc": K,  # Call strike for CC strategy
-                "call_premium": prem,  # Premium received
-                "div_ps_annual": div_ps_annual  # Annual dividend per share
-            }
+            mc_params = mc_params_list[j]  # S0, days, iv, Kc, call_premium, div_ps_annual
             try:
                 prelim = score
-                mc_result = _maybe_mc("CC", mc_params, rf=risk_free, mu=0.03, prelim_score=prelim, perf_cfg=perf_cfg, exp_counter=mc_counter)
+                mc_result = _maybe_mc("CC", mc_params, rf=risk_free, mu=0.03, prelim_score=prelim, perf_cfg=perf_cfg, exp_counter=mc_counter,
+                                      precomputed=mc_batch[j])
                 mc_expected_pnl = mc_result['pnl_expected']
                 mc_roi_ann = mc_result['roi_ann_expected']
                 mc_pnl_p5 = mc_result.get('pnl_p5', float("nan"))
@@ -908,7 +1105,6 @@ def analyze_cc(ticker, *, min_days=0, days_limit, min_otm, min_oi, max_spread, m
             assignment_risk = 0.0
             try:
                 from risk_metrics.assignment_risk import calculate_assignment_risk_score
-                from datetime import datetime
                 exp_date = datetime.strptime(exp, "%Y-%m-%d") if isinstance(exp, str) else None
                 assignment_risk = calculate_assignment_risk_score(
                     ticker=ticker,
@@ -986,6 +1182,7 @@ def analyze_cc(ticker, *, min_days=0, days_limit, min_otm, min_oi, max_spread, m
                 include_dividends=include_dividends,
                 bill_yield=bill_yield,
                 _relaxed=True,
+                snapshot=snap,
                 _final_relax=False,
             )
         except Exception:
@@ -1006,6 +1203,7 @@ def analyze_cc(ticker, *, min_days=0, days_limit, min_otm, min_oi, max_spread, m
                 include_dividends=include_dividends,
                 bill_yield=bill_yield,
                 _relaxed=True,
+                snapshot=snap,
                 _final_relax=True,
             )
         except Exception:
@@ -1015,6 +1213,52 @@ def analyze_cc(ticker, *, min_days=0, days_limit, min_otm, min_oi, max_spread, m
         df = df.sort_values(["UnifiedScore", "Score", "ROI%_ann"], ascending=[False, False, False]).reset_index(drop=True)
     return df
 
+# ----------------------------- Shared diagonal-leg selection -----------------------------
+def _long_call_candidates(calls: pd.DataFrame, *, exp: str, D: int, S: float, risk_free: float,
+                          div_y: float, target_long_delta: float,
+                          min_oi_long, max_spread_long, fills=None) -> list:
+    """Deep ITM long call (LEAPS) candidates for one expiration (PMCC / Synthetic Collar).
+    Vectorized over the normalized chain; returns dicts in chain order.
+    """
+    ev = evaluate_chain(calls, S=S, T=D / 365.0, r=risk_free, q=div_y, right="call",
+                        fill="debit", dte=None, iv_default=0.25, use_volume=False, fills=fills)
+    Ks = ev["strike"].to_numpy()
+    prems = ev["prem"].to_numpy()
+    oi_arr = ev["oi_i"].to_numpy()
+    spreads = ev["spread_pct"].to_numpy()
+    deltas = _norm_cdf(ev["d1"].to_numpy())
+    with np.errstate(invalid="ignore"):
+        # Deep ITM: strike well below spot, delta within tolerance of target
+        ok = (Ks > 0) & (Ks < S * 0.95) & (prems > 0)
+        ok &= np.abs(deltas - target_long_delta) <= 0.10
+        # Per-leg liquidity constraints (long LEAPS)
+        if min_oi_long:
+            ok &= ~((oi_arr > 0) & (oi_arr < int(min_oi_long)))
+        ok &= ~(spreads > float(max_spread_long))
+    return [
+        {"Exp": exp, "Days": D, "Strike": float(Ks[i]), "Premium": float(prems[i]),
+         "Δ": float(deltas[i]), "IV": float(ev["iv_calc"].iat[i]) * 100.0,
+         "Spread%": nan_to_none(spreads[i]), "OI": int(oi_arr[i])}
+        for i in np.flatnonzero(ok)
+    ]
+
+
+def _short_call_candidates(calls: pd.DataFrame, *, D: int, S: float, risk_free: float,
+                           div_y: float, long_strike: float, delta_lo: float, delta_hi: float,
+                           max_spread: float, fills=None) -> pd.DataFrame:
+    """OTM short call candidates above the long strike with N(d1) in [delta_lo, delta_hi]."""
+    ev = evaluate_chain(calls, S=S, T=D / 365.0, r=risk_free, q=div_y, right="call",
+                        fill="credit", dte=None, iv_default=0.25, use_volume=False, fills=fills)
+    Ks = ev["strike"].to_numpy()
+    ev["delta_n"] = _norm_cdf(ev["d1"].to_numpy())
+    with np.errstate(invalid="ignore"):
+        # Short leg must be OTM relative to spot & above long strike
+        ok = (Ks > 0) & (Ks > S) & (Ks > long_strike) & (ev["prem"].to_numpy() > 0)
+        ok &= (ev["delta_n"].to_numpy() >= delta_lo) & (ev["delta_n"].to_numpy() <= delta_hi)
+        ok &= ~(ev["spread_pct"].to_numpy() > max_spread)
+    return ev.loc[ok]
+
+
 # ----------------------------- PMCC (Poor Man's Covered Call) -----------------------------
 def analyze_pmcc(ticker, *, target_long_delta=0.80, long_min_days=180, long_max_days=400,
                  short_min_days=21, short_max_days=60, short_delta_lo=0.20, short_delta_hi=0.35,
@@ -1022,22 +1266,23 @@ def analyze_pmcc(ticker, *, target_long_delta=0.80, long_min_days=180, long_max_
                  pmcc_min_buffer_days: int = 120,
                  pmcc_avoid_exdiv: bool = True,
                  pmcc_long_leg_min_oi: int | None = None,
-                 pmcc_long_leg_max_spread: float | None = None):
+                 pmcc_long_leg_max_spread: float | None = None,
+                 snapshot: MarketSnapshot | None = None):
     """Scan for PMCC setups.
     Simplified approach:
       1. Pick a deep ITM LEAPS call (delta ~ target_long_delta, long_min_days..long_max_days)
       2. Pick a short-term call (short_min_days..short_max_days) with delta in [short_delta_lo, short_delta_hi]
     Returns DataFrame of candidates with estimated annualized ROI based on short call credit vs net debit.
     """
-    from data_fetching import fetch_price, fetch_expirations, fetch_chain, effective_credit, effective_debit, _get_num_from_row, _safe_int, check_expiration_risk, estimate_next_ex_div
-    stock = yf.Ticker(ticker)
+    from data_fetching import check_expiration_risk
     try:
-        S = fetch_price(ticker)
+        snap = snapshot if snapshot is not None else fetch_market_snapshot(ticker)
     except Exception:
         return pd.DataFrame()
-    expirations = fetch_expirations(ticker)
-    earn_date = get_earnings_date_cached(ticker)
-    div_ps_annual, div_y = trailing_dividend_info(stock, S)
+    S = snap.spot
+    expirations = snap.expirations
+    earn_date = snap.earnings_date
+    div_y = snap.div_y
 
     # Select LEAPS expiration
     leaps_exps = []
@@ -1060,42 +1305,19 @@ def analyze_pmcc(ticker, *, target_long_delta=0.80, long_min_days=180, long_max_
     long_candidates = []
     perf_cfg = _get_scan_perf_config()
     for exp, D in leaps_exps:
-        chain_all = fetch_chain(ticker, exp)
+        chain_all = snap.chain(exp)
         if chain_all is None or chain_all.empty:
             continue
-        calls = chain_all[chain_all["type"].str.lower() == "call"].copy() if "type" in chain_all.columns else chain_all.copy()
+        calls = snap.normalized(exp, "call")
         if calls.empty:
             continue
-        T = D / 365.0
-        for _, r in calls.iterrows():
-            K = _get_num_from_row(r, ["strike", "Strike", "K"]) or float("nan")
-            if not (K == K and K > 0):
-                continue
-            # Deep ITM: strike well below spot
-            if K >= S * 0.95:
-                continue
-            bid = _get_num_from_row(r, ["bid", "Bid"]) or float("nan")
-            ask = _get_num_from_row(r, ["ask", "Ask"]) or float("nan")
-            last = _get_num_from_row(r, ["lastPrice", "last", "mark", "mid"]) or float("nan")
-            oi_long = _safe_int(_get_num_from_row(r, ["openInterest", "OI"], 0), 0)
-            prem = effective_debit(bid, ask, last, oi=oi_long)
-            if not (prem == prem and prem > 0):
-                continue
-            iv_raw = _get_num_from_row(r, ["impliedVolatility", "iv", "IV"], float("nan"))
-            iv_dec = iv_raw/100.0 if (iv_raw == iv_raw and iv_raw > 3.0) else iv_raw
-            iv_for_calc = iv_dec if (iv_dec == iv_dec and iv_dec > 0) else 0.25
-            d1, d2 = _bs_d1_d2(S, K, risk_free, iv_for_calc, T, div_y)
-            delta = _norm_cdf(d1)
-            if abs(delta - target_long_delta) <= 0.10:  # within tolerance
-                spread_pct = compute_spread_pct(bid, ask, prem)
-                # Per-leg liquidity constraints (long LEAPS)
-                min_oi_long = pmcc_long_leg_min_oi if pmcc_long_leg_min_oi is not None else min_oi
-                max_spread_long = pmcc_long_leg_max_spread if pmcc_long_leg_max_spread is not None else max_spread
-                if (min_oi_long and oi_long > 0 and oi_long < int(min_oi_long)):
-                    continue
-                if (spread_pct is not None) and (float(spread_pct) > float(max_spread_long)):
-                    continue
-                long_candidates.append({"Exp": exp, "Days": D, "Strike": K, "Premium": prem, "Δ": delta, "IV": iv_for_calc*100.0, "Spread%": spread_pct, "OI": oi_long})
+        long_candidates.extend(_long_call_candidates(
+            calls, exp=exp, D=D, S=S, risk_free=risk_free, div_y=div_y,
+            target_long_delta=target_long_delta,
+            min_oi_long=pmcc_long_leg_min_oi if pmcc_long_leg_min_oi is not None else min_oi,
+            max_spread_long=pmcc_long_leg_max_spread if pmcc_long_leg_max_spread is not None else max_spread,
+            fills=snap.fills(exp, "call", use_volume=False),
+        ))
     if not long_candidates:
         return pd.DataFrame()
     # Pick candidate whose delta closest to target
@@ -1103,7 +1325,7 @@ def analyze_pmcc(ticker, *, target_long_delta=0.80, long_min_days=180, long_max_
 
     # Short leg candidates - initialize ex-dividend info for assignment risk checks
     rows = []
-    next_ex_date, next_div = estimate_next_ex_div(stock)
+    next_ex_date, next_div = snap.next_ex_div, snap.next_ex_div_amt
     # Per-expiration MC counter to enforce caps
     exp_mc_counters = {}
     
@@ -1113,37 +1335,31 @@ def analyze_pmcc(ticker, *, target_long_delta=0.80, long_min_days=180, long_max_
         # Initialize MC counter for this expiration
         if exp not in exp_mc_counters:
             exp_mc_counters[exp] = {"count": 0}
-        chain_all = fetch_chain(ticker, exp)
+        chain_all = snap.chain(exp)
         if chain_all is None or chain_all.empty:
             continue
-        calls = chain_all[chain_all["type"].str.lower() == "call"].copy() if "type" in chain_all.columns else chain_all.copy()
+        calls = snap.normalized(exp, "call")
         if calls.empty:
             continue
-        T = D / 365.0
-        for _, r in calls.iterrows():
-            K = _get_num_from_row(r, ["strike", "Strike", "K"]) or float("nan")
-            if not (K == K and K > 0):
-                continue
-            # Short leg must be OTM relative to spot & above long strike
-            if not (K > S and K > long_sel["Strike"]):
-                continue
-            bid = _get_num_from_row(r, ["bid", "Bid"]) or float("nan")
-            ask = _get_num_from_row(r, ["ask", "Ask"]) or float("nan")
-            last = _get_num_from_row(r, ["lastPrice", "last", "mark", "mid"]) or float("nan")
-            oi_short = _safe_int(_get_num_from_row(r, ["openInterest", "OI"], 0), 0)
-            prem_short = effective_credit(bid, ask, last, oi=oi_short)
-            if not (prem_short == prem_short and prem_short > 0):
-                continue
-            iv_raw = _get_num_from_row(r, ["impliedVolatility", "iv", "IV"], float("nan"))
-            iv_dec = iv_raw/100.0 if (iv_raw == iv_raw and iv_raw > 3.0) else iv_raw
-            iv_for_calc = iv_dec if (iv_dec == iv_dec and iv_dec > 0) else 0.25
-            d1, d2 = _bs_d1_d2(S, K, risk_free, iv_for_calc, T, div_y)
-            delta_short = _norm_cdf(d1)
-            if not (short_delta_lo <= delta_short <= short_delta_hi):
-                continue
-            spread_pct = compute_spread_pct(bid, ask, prem_short)
-            if spread_pct and spread_pct > max_spread:
-                continue
+        shorts = _short_call_candidates(
+            calls, D=D, S=S, risk_free=risk_free, div_y=div_y,
+            long_strike=float(long_sel["Strike"]),
+            delta_lo=short_delta_lo, delta_hi=short_delta_hi, max_spread=max_spread,
+            fills=snap.fills(exp, "call", use_volume=False))
+        mc_params_list = [dict(
+            S0=S, days=D, iv=float(c.iv_calc),
+            long_call_strike=float(long_sel["Strike"]), long_call_cost=float(long_sel["Premium"]), long_days_total=int(long_sel["Days"]), long_iv=float(long_sel["IV"])/100.0,
+            short_call_strike=float(c.strike), short_call_premium=float(c.prem), short_iv=float(c.iv_calc)
+        ) for c in shorts.itertuples(index=False)]
+        mc_batch = _mc_batch("PMCC", mc_params_list, rf=risk_free, mu=0.0, perf_cfg=perf_cfg)
+        for j, c in enumerate(shorts.itertuples(index=False)):
+            K = float(c.strike)
+            prem_short = float(c.prem)
+            iv_for_calc = float(c.iv_calc)
+            delta_short = float(c.delta_n)
+            spread_pct = nan_to_none(c.spread_pct)
+            oi_short = int(c.oi_i)
+            vol_short = int(c.volume_i)
             # LEAPS buffer after short expiry
             try:
                 if (int(long_sel["Days"]) - int(D)) < int(pmcc_min_buffer_days):
@@ -1174,30 +1390,26 @@ def analyze_pmcc(ticker, *, target_long_delta=0.80, long_min_days=180, long_max_
                 p5_pnl=None,  # No MC yet
                 capital=net_debit*100.0,
                 spread_pct=spread_pct,
-                oi=_safe_int(_get_num_from_row(r, ["openInterest", "OI"], 0), 0),
-                volume=_safe_int(_get_num_from_row(r, ["volume", "Volume"], 0), 0),
+                oi=oi_short,
+                volume=vol_short,
                 cushion_sigma=float("nan")
             )
             
             exp_risk = check_expiration_risk(
                 expiration_str=exp,
                 strategy="CC",
-                open_interest=_safe_int(_get_num_from_row(r, ["openInterest", "OI"], 0), 0),
+                open_interest=oi_short,
                 bid_ask_spread_pct=spread_pct or 0.0
             )
 
             # Monte Carlo approximation with gating
-            mc_params = dict(
-                S0=S, days=D, iv=iv_for_calc,
-                long_call_strike=float(long_sel["Strike"]), long_call_cost=float(long_sel["Premium"]), long_days_total=int(long_sel["Days"]), long_iv=float(long_sel["IV"])/100.0,
-                short_call_strike=float(K), short_call_premium=float(prem_short), short_iv=iv_for_calc
-            )
+            mc_params = mc_params_list[j]
             try:
                 # Use preliminary score for gating and shared exp_counter
                 # Note: PMCC typically has lower ROI (capital-intensive), so MC may be gated
                 mc = _maybe_mc("PMCC", mc_params, rf=risk_free, mu=0.0, 
                               prelim_score=prelim_score, perf_cfg=perf_cfg, 
-                              exp_counter=exp_mc_counters[exp])
+                              exp_counter=exp_mc_counters[exp], precomputed=mc_batch[j])
                 mc_expected = mc.get("pnl_expected", float("nan"))
                 mc_roi_ann = mc.get("roi_ann_expected", float("nan"))
                 mc_p5 = mc.get("pnl_p5", float("nan"))
@@ -1212,8 +1424,8 @@ def analyze_pmcc(ticker, *, target_long_delta=0.80, long_min_days=180, long_max_
                 p5_pnl=mc_p5,
                 capital=net_debit*100.0,
                 spread_pct=spread_pct,
-                oi=_safe_int(_get_num_from_row(r, ["openInterest", "OI"], 0), 0),
-                volume=_safe_int(_get_num_from_row(r, ["volume", "Volume"], 0), 0),
+                oi=oi_short,
+                volume=vol_short,
                 cushion_sigma=float("nan")
             )
             rows.append({
@@ -1253,21 +1465,22 @@ def analyze_synthetic_collar(ticker, *, target_long_delta=0.80, put_delta_target
                               syn_long_leg_min_oi: int | None = None,
                               syn_long_leg_max_spread: float | None = None,
                               syn_put_leg_min_oi: int | None = None,
-                              syn_put_leg_max_spread: float | None = None):
+                              syn_put_leg_max_spread: float | None = None,
+                             snapshot: MarketSnapshot | None = None):
     """Options-only collar: Long deep ITM call (synthetic stock) + Long put + Short OTM call.
     Simplified scanning similar to PMCC with added put leg.
     """
-    from data_fetching import fetch_price, fetch_expirations, fetch_chain, effective_credit, effective_debit, _get_num_from_row, _safe_int, check_expiration_risk, estimate_next_ex_div
-    stock = yf.Ticker(ticker)
+    from data_fetching import check_expiration_risk
     try:
-        S = fetch_price(ticker)
+        snap = snapshot if snapshot is not None else fetch_market_snapshot(ticker)
     except Exception:
         return pd.DataFrame()
-    expirations = fetch_expirations(ticker)
-    earn_date = get_earnings_date_cached(ticker)
+    S = snap.spot
+    expirations = snap.expirations
+    earn_date = snap.earnings_date
     # Performance configuration for conditional MC
     perf_cfg = _get_scan_perf_config()
-    div_ps_annual, div_y = trailing_dividend_info(stock, S)
+    div_y = snap.div_y
     today = datetime.now(timezone.utc).date()
     leaps_exps = []
     short_exps = []
@@ -1286,46 +1499,25 @@ def analyze_synthetic_collar(ticker, *, target_long_delta=0.80, put_delta_target
     # Long call selection (same as PMCC)
     long_candidates = []
     for exp, D in leaps_exps:
-        chain_all = fetch_chain(ticker, exp)
+        chain_all = snap.chain(exp)
         if chain_all is None or chain_all.empty:
             continue
-        calls = chain_all[chain_all["type"].str.lower() == "call"].copy() if "type" in chain_all.columns else chain_all.copy()
+        calls = snap.normalized(exp, "call")
         if calls.empty:
             continue
-        T = D / 365.0
-        for _, r in calls.iterrows():
-            K = _get_num_from_row(r, ["strike", "Strike", "K"]) or float("nan")
-            if not (K == K and K > 0):
-                continue
-            if K >= S * 0.95:
-                continue
-            bid = _get_num_from_row(r, ["bid", "Bid"]) or float("nan")
-            ask = _get_num_from_row(r, ["ask", "Ask"]) or float("nan")
-            last = _get_num_from_row(r, ["lastPrice", "last", "mark", "mid"]) or float("nan")
-            oi_long = _safe_int(_get_num_from_row(r, ["openInterest", "OI"], 0), 0)
-            prem = effective_debit(bid, ask, last, oi=oi_long)
-            if not (prem == prem and prem > 0):
-                continue
-            iv_raw = _get_num_from_row(r, ["impliedVolatility", "iv", "IV"], float("nan"))
-            iv_dec = iv_raw/100.0 if (iv_raw == iv_raw and iv_raw > 3.0) else iv_raw
-            iv_for_calc = iv_dec if (iv_dec == iv_dec and iv_dec > 0) else 0.25
-            d1, d2 = _bs_d1_d2(S, K, risk_free, iv_for_calc, T, div_y)
-            delta = _norm_cdf(d1)
-            if abs(delta - target_long_delta) <= 0.10:
-                spread_pct = compute_spread_pct(bid, ask, prem)
-                min_oi_long = syn_long_leg_min_oi if syn_long_leg_min_oi is not None else min_oi
-                max_spread_long = syn_long_leg_max_spread if syn_long_leg_max_spread is not None else max_spread
-                if (min_oi_long and oi_long > 0 and oi_long < int(min_oi_long)):
-                    continue
-                if (spread_pct is not None) and (float(spread_pct) > float(max_spread_long)):
-                    continue
-                long_candidates.append({"Exp": exp, "Days": D, "Strike": K, "Premium": prem, "Δ": delta, "IV": iv_for_calc*100.0, "Spread%": spread_pct, "OI": oi_long})
+        long_candidates.extend(_long_call_candidates(
+            calls, exp=exp, D=D, S=S, risk_free=risk_free, div_y=div_y,
+            target_long_delta=target_long_delta,
+            min_oi_long=syn_long_leg_min_oi if syn_long_leg_min_oi is not None else min_oi,
+            max_spread_long=syn_long_leg_max_spread if syn_long_leg_max_spread is not None else max_spread,
+            fills=snap.fills(exp, "call", use_volume=False),
+        ))
     if not long_candidates:
         return pd.DataFrame()
     long_sel = sorted(long_candidates, key=lambda x: abs(x["Δ"] - target_long_delta))[0]
 
     # Initialize ex-dividend info for assignment risk checks
-    next_ex_date, next_div = estimate_next_ex_div(stock)
+    next_ex_date, next_div = snap.next_ex_div, snap.next_ex_div_amt
     # Per-expiration MC counter to enforce caps
     exp_mc_counters = {}
     
@@ -1336,70 +1528,60 @@ def analyze_synthetic_collar(ticker, *, target_long_delta=0.80, put_delta_target
         # Initialize MC counter for this expiration
         if exp not in exp_mc_counters:
             exp_mc_counters[exp] = {"count": 0}
-        chain_all = fetch_chain(ticker, exp)
+        chain_all = snap.chain(exp)
         if chain_all is None or chain_all.empty:
             continue
-        calls = chain_all[chain_all["type"].str.lower() == "call"].copy() if "type" in chain_all.columns else chain_all.copy()
-        puts = chain_all[chain_all["type"].str.lower() == "put"].copy() if "type" in chain_all.columns else chain_all.copy()
+        calls, puts = snap.sides(exp)
         if calls.empty or puts.empty:
             continue
         T = D / 365.0
-        # Select protective put near desired delta
+        # Select protective put near desired delta (first qualifying strike in chain order)
         put_choice = None
-        for _, r in puts.iterrows():
-            Kp = _get_num_from_row(r, ["strike", "Strike", "K"]) or float("nan")
-            if not (Kp == Kp and Kp > 0):
-                continue
-            if Kp >= S * 0.98:  # want OTM put
-                continue
-            bid = _get_num_from_row(r, ["bid", "Bid"]) or float("nan")
-            ask = _get_num_from_row(r, ["ask", "Ask"]) or float("nan")
-            last = _get_num_from_row(r, ["lastPrice", "last", "mark", "mid"]) or float("nan")
-            oi_put = _safe_int(_get_num_from_row(r, ["openInterest", "OI"], 0), 0)
-            prem_put = effective_debit(bid, ask, last, oi=oi_put)
-            if not (prem_put == prem_put and prem_put > 0):
-                continue
-            iv_raw = _get_num_from_row(r, ["impliedVolatility", "iv", "IV"], float("nan"))
-            iv_dec = iv_raw/100.0 if (iv_raw == iv_raw and iv_raw > 3.0) else iv_raw
-            iv_for_calc = iv_dec if (iv_dec == iv_dec and iv_dec > 0) else 0.25
-            d1, d2 = _bs_d1_d2(S, Kp, risk_free, iv_for_calc, T, div_y)
-            delta_put = _norm_cdf(d1) - 1.0  # convert to put delta approximation
-            spread_put = compute_spread_pct(bid, ask, prem_put)
-            min_oi_put = syn_put_leg_min_oi if syn_put_leg_min_oi is not None else min_oi
-            max_spread_put = syn_put_leg_max_spread if syn_put_leg_max_spread is not None else max_spread
-            if (min_oi_put and oi_put > 0 and oi_put < int(min_oi_put)):
-                continue
-            if (spread_put is not None) and (float(spread_put) > float(max_spread_put)):
-                continue
-            if abs(delta_put - put_delta_target) <= 0.05:
-                put_choice = {"Strike": Kp, "Premium": prem_put, "Δ": delta_put, "IV": iv_for_calc*100.0, "Spread%": spread_put, "OI": oi_put}
-                break
+        pev = evaluate_chain(puts, S=S, T=T, r=risk_free, q=div_y, right="put",
+                             fill="debit", dte=None, iv_default=0.25, use_volume=False,
+                             fills=snap.fills(exp, "put", use_volume=False))
+        Kps = pev["strike"].to_numpy()
+        put_prems = pev["prem"].to_numpy()
+        put_oi = pev["oi_i"].to_numpy()
+        put_spreads = pev["spread_pct"].to_numpy()
+        delta_puts = _norm_cdf(pev["d1"].to_numpy()) - 1.0  # convert to put delta approximation
+        min_oi_put = syn_put_leg_min_oi if syn_put_leg_min_oi is not None else min_oi
+        max_spread_put = syn_put_leg_max_spread if syn_put_leg_max_spread is not None else max_spread
+        with np.errstate(invalid="ignore"):
+            ok_put = (Kps > 0) & (Kps < S * 0.98) & (put_prems > 0)  # want OTM put
+            if min_oi_put:
+                ok_put &= ~((put_oi > 0) & (put_oi < int(min_oi_put)))
+            ok_put &= ~(put_spreads > float(max_spread_put))
+            ok_put &= np.abs(delta_puts - put_delta_target) <= 0.05
+        hits = np.flatnonzero(ok_put)
+        if hits.size:
+            j = int(hits[0])
+            put_choice = {"Strike": float(Kps[j]), "Premium": float(put_prems[j]), "Δ": float(delta_puts[j]),
+                          "IV": float(pev["iv_calc"].iat[j]) * 100.0, "Spread%": nan_to_none(put_spreads[j]),
+                          "OI": int(put_oi[j])}
         if not put_choice:
             continue
         # Short call candidates
-        for _, r in calls.iterrows():
-            K = _get_num_from_row(r, ["strike", "Strike", "K"]) or float("nan")
-            if not (K == K and K > 0):
-                continue
-            if not (K > S and K > long_sel["Strike"]):
-                continue
-            bid = _get_num_from_row(r, ["bid", "Bid"]) or float("nan")
-            ask = _get_num_from_row(r, ["ask", "Ask"]) or float("nan")
-            last = _get_num_from_row(r, ["lastPrice", "last", "mark", "mid"]) or float("nan")
-            oi_short = _safe_int(_get_num_from_row(r, ["openInterest", "OI"], 0), 0)
-            prem_short = effective_credit(bid, ask, last, oi=oi_short)
-            if not (prem_short == prem_short and prem_short > 0):
-                continue
-            iv_raw = _get_num_from_row(r, ["impliedVolatility", "iv", "IV"], float("nan"))
-            iv_dec = iv_raw/100.0 if (iv_raw == iv_raw and iv_raw > 3.0) else iv_raw
-            iv_for_calc = iv_dec if (iv_dec == iv_dec and iv_dec > 0) else 0.25
-            d1, d2 = _bs_d1_d2(S, K, risk_free, iv_for_calc, T, div_y)
-            delta_short = _norm_cdf(d1)
-            if not (short_delta_lo <= delta_short <= short_delta_hi):
-                continue
-            spread_pct = compute_spread_pct(bid, ask, prem_short)
-            if spread_pct and spread_pct > max_spread:
-                continue
+        shorts = _short_call_candidates(
+            calls, D=D, S=S, risk_free=risk_free, div_y=div_y,
+            long_strike=float(long_sel["Strike"]),
+            delta_lo=short_delta_lo, delta_hi=short_delta_hi, max_spread=max_spread,
+            fills=snap.fills(exp, "call", use_volume=False))
+        mc_params_list = [dict(
+            S0=S, days=D, iv=float(c.iv_calc),
+            long_call_strike=float(long_sel["Strike"]), long_call_cost=float(long_sel["Premium"]), long_days_total=int(long_sel["Days"]), long_iv=float(long_sel["IV"])/100.0,
+            put_strike=float(put_choice["Strike"]), put_cost=float(put_choice["Premium"]), put_iv=float(put_choice["IV"])/100.0,
+            short_call_strike=float(c.strike), short_call_premium=float(c.prem), short_iv=float(c.iv_calc)
+        ) for c in shorts.itertuples(index=False)]
+        mc_batch = _mc_batch("SYNTHETIC_COLLAR", mc_params_list, rf=risk_free, mu=0.0, perf_cfg=perf_cfg)
+        for j, c in enumerate(shorts.itertuples(index=False)):
+            K = float(c.strike)
+            prem_short = float(c.prem)
+            iv_for_calc = float(c.iv_calc)
+            delta_short = float(c.delta_n)
+            spread_pct = nan_to_none(c.spread_pct)
+            oi_short = int(c.oi_i)
+            vol_short = int(c.volume_i)
             # LEAPS time buffer
             try:
                 if (int(long_sel["Days"]) - int(D)) < int(syn_min_buffer_days):
@@ -1430,29 +1612,24 @@ def analyze_synthetic_collar(ticker, *, target_long_delta=0.80, put_delta_target
                 p5_pnl=None,  # No MC yet
                 capital=net_debit*100.0,
                 spread_pct=spread_pct,
-                oi=_safe_int(_get_num_from_row(r, ["openInterest", "OI"], 0), 0),
-                volume=_safe_int(_get_num_from_row(r, ["volume", "Volume"], 0), 0),
+                oi=oi_short,
+                volume=vol_short,
                 cushion_sigma=float("nan")
             )
             
             exp_risk = check_expiration_risk(
                 expiration_str=exp,
                 strategy="COLLAR",
-                open_interest=_safe_int(_get_num_from_row(r, ["openInterest", "OI"], 0), 0),
+                open_interest=oi_short,
                 bid_ask_spread_pct=spread_pct or 0.0
             )
-            mc_params = dict(
-                S0=S, days=D, iv=iv_for_calc,
-                long_call_strike=float(long_sel["Strike"]), long_call_cost=float(long_sel["Premium"]), long_days_total=int(long_sel["Days"]), long_iv=float(long_sel["IV"])/100.0,
-                put_strike=float(put_choice["Strike"]), put_cost=float(put_choice["Premium"]), put_iv=float(put_choice["IV"])/100.0,
-                short_call_strike=float(K), short_call_premium=float(prem_short), short_iv=iv_for_calc
-            )
+            mc_params = mc_params_list[j]
             try:
                 # Use preliminary score for gating and shared exp_counter
                 # Note: Synthetic Collar typically has lower ROI (capital-intensive), so MC may be gated
                 mc = _maybe_mc("SYNTHETIC_COLLAR", mc_params, rf=risk_free, mu=0.0, 
                               prelim_score=prelim_score, perf_cfg=perf_cfg, 
-                              exp_counter=exp_mc_counters[exp])
+                              exp_counter=exp_mc_counters[exp], precomputed=mc_batch[j])
                 mc_expected = mc.get("pnl_expected", float("nan"))
                 mc_roi_ann = mc.get("roi_ann_expected", float("nan"))
                 mc_p5 = mc.get("pnl_p5", float("nan"))
@@ -1466,8 +1643,8 @@ def analyze_synthetic_collar(ticker, *, target_long_delta=0.80, put_delta_target
                 p5_pnl=mc_p5,
                 capital=net_debit*100.0,
                 spread_pct=spread_pct,
-                oi=_safe_int(_get_num_from_row(r, ["openInterest", "OI"], 0), 0),
-                volume=_safe_int(_get_num_from_row(r, ["volume", "Volume"], 0), 0),
+                oi=oi_short,
+                volume=vol_short,
                 cushion_sigma=float("nan")
             )
             # Floor cushion sigma using put IV
@@ -1505,25 +1682,43 @@ def analyze_synthetic_collar(ticker, *, target_long_delta=0.80, put_delta_target
     return df
 
 
+def _leg_frame(ev: pd.DataFrame, mask=None) -> pd.DataFrame:
+    """Compact per-leg table (K, prem, delta, iv, spread%, oi, volume, bid, ask) for rows with a
+    valid strike and positive fill price; `mask` further restricts the rows (e.g. OTM only)."""
+    with np.errstate(invalid="ignore"):
+        ok = (ev["strike"].to_numpy() > 0) & (ev["prem"].to_numpy() > 0)
+    if mask is not None:
+        ok &= np.asarray(mask, dtype=bool)
+    sub = ev.loc[ok]
+    return pd.DataFrame({
+        "K": sub["strike"].to_numpy(),
+        "prem": sub["prem"].to_numpy(),
+        "delta": sub["delta"].to_numpy(),
+        "iv": sub["iv_calc"].to_numpy(),
+        "spread%": sub["spread_pct"].to_numpy(),
+        "oi": sub["oi_i"].to_numpy().astype(int),
+        "volume": sub["volume_i"].to_numpy().astype(int),
+        "bid": sub["bid"].to_numpy(),
+        "ask": sub["ask"].to_numpy(),
+    })
+
+
 def analyze_collar(ticker, *, min_days=0, days_limit, min_oi, max_spread,
                    call_delta_target, put_delta_target, earn_window, risk_free,
-                   include_dividends=True, min_net_credit=None, bill_yield=0.0):
+                   include_dividends=True, min_net_credit=None, bill_yield=0.0,
+                   snapshot: MarketSnapshot | None = None):
     # Import from strategy_lab to avoid circular import at module level
-    from data_fetching import (
-        fetch_price, fetch_expirations, fetch_chain,
-        _get_num_from_row, _safe_int, effective_credit, 
-        effective_debit, estimate_next_ex_div, check_expiration_risk
-    )
+    from data_fetching import _safe_int, check_expiration_risk
     
-    stock = yf.Ticker(ticker)
     try:
-        S = fetch_price(ticker)
+        snap = snapshot if snapshot is not None else fetch_market_snapshot(ticker)
     except Exception:
         return pd.DataFrame()
+    S = snap.spot
 
-    expirations = fetch_expirations(ticker)
-    earn_date = get_earnings_date_cached(ticker)
-    div_ps_annual, div_y = trailing_dividend_info(stock, S)
+    expirations = snap.expirations
+    earn_date = snap.earnings_date
+    div_ps_annual, div_y = snap.div_ps_annual, snap.div_y
     rows = []
     # Performance configuration (previously missing)
     perf_cfg = _get_scan_perf_config()
@@ -1540,89 +1735,20 @@ def analyze_collar(ticker, *, min_days=0, days_limit, min_oi, max_spread,
             continue
 
         T = D / 365.0
-        chain_all = fetch_chain(ticker, exp)
+        chain_all = snap.chain(exp)
         if chain_all is None or chain_all.empty:
             continue
-        if "type" in chain_all.columns:
-            calls = chain_all[chain_all["type"].str.lower() == "call"].copy()
-            puts = chain_all[chain_all["type"].str.lower() == "put"].copy()
-        else:
-            # assume both present in separate calls; not ideal but fallback
-            calls = chain_all.copy()
-            puts = chain_all.copy()
+        # Normalized call/put legs (both are the full chain if 'type' is missing)
+        calls, puts = snap.sides(exp)
 
-        pred_ex, next_div = estimate_next_ex_div(stock)
+        pred_ex, next_div = snap.next_ex_div, snap.next_ex_div_amt
         ex_div_in_window = bool(pred_ex and 0 <= (pred_ex - datetime.now(timezone.utc).date()
                                                   ).days <= D)
 
-        def _add_call_delta(df):
-            out = []
-            for _, r in df.iterrows():
-                K = _get_num_from_row(
-                    r, ["strike", "Strike", "k", "K"], float("nan"))
-                if not (K == K and K > 0):
-                    continue
-                iv = _get_num_from_row(
-                    r, ["impliedVolatility", "iv", "IV"], 0.20)
-                if iv == iv and iv > 3.0:
-                    iv = iv / 100.0
-                cd = call_delta(S, K, risk_free, iv, T, div_y)
-                prem = effective_credit(
-                    _get_num_from_row(r, ["bid", "Bid", "b"]),
-                    _get_num_from_row(r, ["ask", "Ask", "a"]),
-                    _get_num_from_row(r, ["lastPrice", "last", "mark", "mid"]),
-                    oi=_safe_int(_get_num_from_row(r, ["openInterest", "oi", "open_interest"], 0), 0),
-                    volume=_safe_int(_get_num_from_row(r, ["volume", "Volume", "vol"], 0), 0),
-                    dte=D
-                )
-                if prem != prem or prem <= 0:
-                    continue
-                spread_pct = compute_spread_pct(
-                    _get_num_from_row(r, ["bid", "Bid", "b"]),
-                    _get_num_from_row(r, ["ask", "Ask", "a"]),
-                    prem)
-                oi = _safe_int(_get_num_from_row(
-                    r, ["openInterest", "oi", "open_interest"], 0), 0)
-                vol = _safe_int(_get_num_from_row(
-                    r, ["volume", "Volume", "vol"], 0), 0)
-                out.append({"K": K, "prem": prem, "delta": cd,
-                           "iv": iv, "spread%": spread_pct, "oi": oi, "volume": vol})
-            return pd.DataFrame(out)
-
-        def _add_put_delta(df):
-            out = []
-            for _, r in df.iterrows():
-                K = _get_num_from_row(
-                    r, ["strike", "Strike", "k", "K"], float("nan"))
-                if not (K == K and K > 0):
-                    continue
-                iv = _get_num_from_row(
-                    r, ["impliedVolatility", "iv", "IV"], 0.20)
-                if iv == iv and iv > 3.0:
-                    iv = iv / 100.0
-                pdlt = put_delta(S, K, risk_free, iv, T, div_y)
-                bidv = _get_num_from_row(r, ["bid", "Bid", "b"])
-                askv = _get_num_from_row(r, ["ask", "Ask", "a"])
-                lastv = _get_num_from_row(r, ["lastPrice", "last", "mark", "mid"])
-                oi_v = _safe_int(_get_num_from_row(r, ["openInterest", "oi", "open_interest"], 0), 0)
-                vol_v = _safe_int(_get_num_from_row(r, ["volume", "Volume", "vol"], 0), 0)
-                prem = effective_debit(bidv, askv, lastv, oi=oi_v, volume=vol_v, dte=D)
-                if prem != prem or prem <= 0:
-                    continue
-                spread_pct = compute_spread_pct(
-                    _get_num_from_row(r, ["bid", "Bid", "b"]),
-                    _get_num_from_row(r, ["ask", "Ask", "a"]),
-                    prem)
-                oi = _safe_int(_get_num_from_row(
-                    r, ["openInterest", "oi", "open_interest"], 0), 0)
-                vol = _safe_int(_get_num_from_row(
-                    r, ["volume", "Volume", "vol"], 0), 0)
-                out.append({"K": K, "prem": prem, "delta": pdlt,
-                           "iv": iv, "spread%": spread_pct, "oi": oi, "volume": vol})
-            return pd.DataFrame(out)
-
-        cdf = _add_call_delta(calls)
-        pdf = _add_put_delta(puts)
+        cdf = _leg_frame(evaluate_chain(calls, S=S, T=T, r=risk_free, q=div_y, right="call",
+                                        fill="credit", dte=D, fills=snap.fills(exp, "call", dte=D)))
+        pdf = _leg_frame(evaluate_chain(puts, S=S, T=T, r=risk_free, q=div_y, right="put",
+                                        fill="debit", dte=D, fills=snap.fills(exp, "put", dte=D)))
         if cdf.empty or pdf.empty:
             continue
 
@@ -1819,7 +1945,8 @@ def analyze_collar(ticker, *, min_days=0, days_limit, min_oi, max_spread,
 def analyze_iron_condor(ticker, *, min_days=1, days_limit, min_oi, max_spread,
                         min_roi, min_cushion, earn_window, risk_free,
                         spread_width_put=5.0, spread_width_call=5.0,
-                        target_delta_short=0.16, bill_yield=0.0):
+                        target_delta_short=0.16, bill_yield=0.0,
+                        snapshot: MarketSnapshot | None = None):
     """
     Scan for Iron Condor opportunities (sell OTM put spread + sell OTM call spread).
     
@@ -1832,21 +1959,17 @@ def analyze_iron_condor(ticker, *, min_days=1, days_limit, min_oi, max_spread,
     Returns DataFrame with ranked Iron Condor opportunities.
     """
     # Import from strategy_lab to avoid circular import at module level
-    from data_fetching import (
-        fetch_price, fetch_expirations, fetch_chain,
-        _get_num_from_row, _safe_int, effective_credit, 
-        effective_debit, estimate_next_ex_div, check_expiration_risk
-    )
+    from data_fetching import check_expiration_risk
     
-    stock = yf.Ticker(ticker)
     try:
-        S = fetch_price(ticker)
+        snap = snapshot if snapshot is not None else fetch_market_snapshot(ticker)
     except Exception:
         return pd.DataFrame()
+    S = snap.spot
 
-    expirations = fetch_expirations(ticker)
-    earn_date = get_earnings_date_cached(ticker)
-    div_ps_annual, div_y = trailing_dividend_info(stock, S)
+    expirations = snap.expirations
+    earn_date = snap.earnings_date
+    div_y = snap.div_y
     
     rows = []
     # Performance configuration for MC gating
@@ -1864,90 +1987,26 @@ def analyze_iron_condor(ticker, *, min_days=1, days_limit, min_oi, max_spread,
             continue
 
         T = D / 365.0
-        chain_all = fetch_chain(ticker, exp)
+        chain_all = snap.chain(exp)
         if chain_all is None or chain_all.empty:
             continue
         
-        if "type" in chain_all.columns:
-            calls = chain_all[chain_all["type"].str.lower() == "call"].copy()
-            puts = chain_all[chain_all["type"].str.lower() == "put"].copy()
-        else:
-            calls = chain_all.copy()
-            puts = chain_all.copy()
-        
-        # Find short put (sell) - target delta around -0.16 (84% POEW)
-        puts_sell = []
-        for _, r in puts.iterrows():
-            K = _get_num_from_row(r, ["strike", "Strike", "k", "K"], float("nan"))
-            if not (K == K and K > 0 and K < S):  # OTM puts
-                continue
-            
-            iv = _get_num_from_row(r, ["impliedVolatility", "iv", "IV"], 0.20)
-            if iv == iv and iv > 3.0:
-                iv = iv / 100.0
-            
-            pd_val = put_delta(S, K, risk_free, iv, T, div_y)
-            bid = _get_num_from_row(r, ["bid", "Bid", "b"])
-            ask = _get_num_from_row(r, ["ask", "Ask", "a"])
-            last = _get_num_from_row(r, ["lastPrice", "last", "mark", "mid"])
-            prem = effective_credit(
-                bid, ask, last,
-                oi=_safe_int(_get_num_from_row(r, ["openInterest", "oi", "open_interest"], 0), 0),
-                volume=_safe_int(_get_num_from_row(r, ["volume", "Volume", "vol"], 0), 0),
-                dte=D
-            )
-            
-            if prem != prem or prem <= 0:
-                continue
-            
-            oi = _safe_int(_get_num_from_row(r, ["openInterest", "oi", "open_interest"], 0), 0)
-            vol = _safe_int(_get_num_from_row(r, ["volume", "Volume", "vol"], 0), 0)
-            spread_pct = compute_spread_pct(bid, ask, prem)
-            
-            puts_sell.append({
-                "K": K, "prem": prem, "delta": pd_val, "iv": iv,
-                "spread%": spread_pct, "oi": oi, "volume": vol, "bid": bid, "ask": ask
-            })
-        
-        # Find short call (sell) - target delta around +0.16 (84% POEW)
-        calls_sell = []
-        for _, r in calls.iterrows():
-            K = _get_num_from_row(r, ["strike", "Strike", "k", "K"], float("nan"))
-            if not (K == K and K > 0 and K > S):  # OTM calls
-                continue
-            
-            iv = _get_num_from_row(r, ["impliedVolatility", "iv", "IV"], 0.20)
-            if iv == iv and iv > 3.0:
-                iv = iv / 100.0
-            
-            cd_val = call_delta(S, K, risk_free, iv, T, div_y)
-            bid = _get_num_from_row(r, ["bid", "Bid", "b"])
-            ask = _get_num_from_row(r, ["ask", "Ask", "a"])
-            last = _get_num_from_row(r, ["lastPrice", "last", "mark", "mid"])
-            prem = effective_credit(
-                bid, ask, last,
-                oi=_safe_int(_get_num_from_row(r, ["openInterest", "oi", "open_interest"], 0), 0),
-                volume=_safe_int(_get_num_from_row(r, ["volume", "Volume", "vol"], 0), 0),
-                dte=D
-            )
-            
-            if prem != prem or prem <= 0:
-                continue
-            
-            oi = _safe_int(_get_num_from_row(r, ["openInterest", "oi", "open_interest"], 0), 0)
-            vol = _safe_int(_get_num_from_row(r, ["volume", "Volume", "vol"], 0), 0)
-            spread_pct = compute_spread_pct(bid, ask, prem)
-            
-            calls_sell.append({
-                "K": K, "prem": prem, "delta": cd_val, "iv": iv,
-                "spread%": spread_pct, "oi": oi, "volume": vol, "bid": bid, "ask": ask
-            })
-        
-        if not puts_sell or not calls_sell:
+        calls, puts = snap.sides(exp)
+        put_ev = evaluate_chain(puts, S=S, T=T, r=risk_free, q=div_y, right="put",
+                                fill="credit", dte=D, fills=snap.fills(exp, "put", dte=D))
+        call_ev = evaluate_chain(calls, S=S, T=T, r=risk_free, q=div_y, right="call",
+                                 fill="credit", dte=D, fills=snap.fills(exp, "call", dte=D))
+
+        # Short put (sell) candidates - OTM puts; target delta around -0.16 (84% POEW)
+        with np.errstate(invalid="ignore"):
+            ps_df = _leg_frame(put_ev, put_ev["strike"].to_numpy() < S)
+            # Short call (sell) candidates - OTM calls; target delta around +0.16
+            cs_df = _leg_frame(call_ev, call_ev["strike"].to_numpy() > S)
+
+        if ps_df.empty or cs_df.empty:
             continue
         
         # Find best short put (closest to target delta)
-        ps_df = pd.DataFrame(puts_sell)
         ps_df = ps_df[ps_df["oi"] >= min_oi]
         if ps_df.empty:
             continue
@@ -1955,7 +2014,6 @@ def analyze_iron_condor(ticker, *, min_days=1, days_limit, min_oi, max_spread,
         ps_row = ps_df.sort_values("delta_diff").iloc[0]
         
         # Find best short call (closest to target delta)
-        cs_df = pd.DataFrame(calls_sell)
         cs_df = cs_df[cs_df["oi"] >= min_oi]
         if cs_df.empty:
             continue
@@ -1976,30 +2034,18 @@ def analyze_iron_condor(ticker, *, min_days=1, days_limit, min_oi, max_spread,
         Kcs = float(cs_row["K"])
         Kcl = Kcs + spread_width_call
         
-        # Get premiums for long legs
-        put_long = puts[puts.apply(lambda r: abs(_get_num_from_row(r, ["strike", "Strike", "k", "K"], 0) - Kpl) < 0.5, axis=1)]
-        call_long = calls[calls.apply(lambda r: abs(_get_num_from_row(r, ["strike", "Strike", "k", "K"], 0) - Kcl) < 0.5, axis=1)]
-        
-        if put_long.empty or call_long.empty:
+        # Locate long legs by strike (first strike within tolerance, chain order)
+        j_pl = int(snap.strike_index(exp, "put").find(Kpl))
+        j_cl = int(snap.strike_index(exp, "call").find(Kcl))
+
+        if j_pl < 0 or j_cl < 0:
             continue
         
-        # Get long put premium (debit)
-        pl_row = put_long.iloc[0]
-        pl_bid = _get_num_from_row(pl_row, ["bid", "Bid", "b"])
-        pl_ask = _get_num_from_row(pl_row, ["ask", "Ask", "a"])
-        pl_last = _get_num_from_row(pl_row, ["lastPrice", "last", "mark", "mid"])
-        pl_oi = _safe_int(_get_num_from_row(pl_row, ["openInterest", "oi", "open_interest"], 0), 0)
-        pl_vol = _safe_int(_get_num_from_row(pl_row, ["volume", "Volume", "vol"], 0), 0)
-        pl_prem = effective_debit(pl_bid, pl_ask, pl_last, oi=pl_oi, volume=pl_vol, dte=D)
-        
-        # Get long call premium (debit)
-        cl_row = call_long.iloc[0]
-        cl_bid = _get_num_from_row(cl_row, ["bid", "Bid", "b"])
-        cl_ask = _get_num_from_row(cl_row, ["ask", "Ask", "a"])
-        cl_last = _get_num_from_row(cl_row, ["lastPrice", "last", "mark", "mid"])
-        cl_oi = _safe_int(_get_num_from_row(cl_row, ["openInterest", "oi", "open_interest"], 0), 0)
-        cl_vol = _safe_int(_get_num_from_row(cl_row, ["volume", "Volume", "vol"], 0), 0)
-        cl_prem = effective_debit(cl_bid, cl_ask, cl_last, oi=cl_oi, volume=cl_vol, dte=D)
+        # Long wing premiums (debit) from the shared fill table
+        pl_oi = int(put_ev["oi_i"].iat[j_pl])
+        pl_prem = float(put_ev["debit_fill"].iat[j_pl])
+        cl_oi = int(call_ev["oi_i"].iat[j_cl])
+        cl_prem = float(call_ev["debit_fill"].iat[j_cl])
         
         if pl_prem != pl_prem or pl_prem <= 0 or cl_prem != cl_prem or cl_prem <= 0:
             continue
@@ -2241,7 +2287,8 @@ def analyze_iron_condor(ticker, *, min_days=1, days_limit, min_oi, max_spread,
 
 def analyze_bull_put_spread(ticker, *, min_days=1, days_limit, min_oi, max_spread,
                              min_roi, min_cushion, min_poew, earn_window, risk_free,
-                             spread_width=5.0, target_delta_short=0.20, bill_yield=0.0):
+                             spread_width=5.0, target_delta_short=0.20, bill_yield=0.0,
+                            snapshot: MarketSnapshot | None = None):
     """
     Scan for Bull Put Spread opportunities (bullish/neutral credit spread with defined risk).
     
@@ -2254,26 +2301,26 @@ def analyze_bull_put_spread(ticker, *, min_days=1, days_limit, min_oi, max_sprea
     - Max Loss = Spread Width - Net Credit
     - Breakeven = Short Strike - Net Credit
     
+    spread_width may be a sequence (e.g. [1, 2.5, 5, 10]) to scan several widths in
+    one pass; the "Spread" column tells the rows apart.
+    
     Returns DataFrame with ranked Bull Put Spread opportunities.
     """
     # Import from strategy_lab to avoid circular import at module level
-    from data_fetching import (
-        fetch_price, fetch_expirations, fetch_chain,
-        _get_num_from_row, _safe_int, effective_credit, 
-        effective_debit, estimate_next_ex_div, check_expiration_risk
-    )
+    from data_fetching import check_expiration_risk
     
-    stock = yf.Ticker(ticker)
     try:
-        S = fetch_price(ticker)
+        snap = snapshot if snapshot is not None else fetch_market_snapshot(ticker)
     except Exception:
         return pd.DataFrame()
+    S = snap.spot
 
-    expirations = fetch_expirations(ticker)
-    earn_date = get_earnings_date_cached(ticker)
-    div_ps_annual, div_y = trailing_dividend_info(stock, S)
+    expirations = snap.expirations
+    earn_date = snap.earnings_date
+    div_y = snap.div_y
     
     rows = []
+    widths = spread_widths(spread_width)
     # Performance configuration for MC gating
     perf_cfg = _get_scan_perf_config()
     
@@ -2289,61 +2336,33 @@ def analyze_bull_put_spread(ticker, *, min_days=1, days_limit, min_oi, max_sprea
             continue
 
         T = D / 365.0
-        chain_all = fetch_chain(ticker, exp)
+        chain_all = snap.chain(exp)
         if chain_all is None or chain_all.empty:
             continue
         
-        if "type" in chain_all.columns:
-            puts = chain_all[chain_all["type"].str.lower() == "put"].copy()
-        else:
-            puts = chain_all.copy()
+        puts = snap.normalized(exp, "put")
         
         if puts.empty:
             continue
         
-        # Find potential short puts (sell) - OTM puts with target delta
-        puts_sell = []
-        for _, r in puts.iterrows():
-            K = _get_num_from_row(r, ["strike", "Strike", "k", "K"], float("nan"))
-            if not (K == K and K > 0 and K < S):  # Must be OTM (below stock price)
-                continue
-            
-            iv = _get_num_from_row(r, ["impliedVolatility", "iv", "IV"], 0.20)
-            if iv == iv and iv > 3.0:
-                iv = iv / 100.0
-            
-            # Calculate put delta (negative for puts)
-            pd_val = put_delta(S, K, risk_free, iv, T, div_y)
-            
-            bid = _get_num_from_row(r, ["bid", "Bid", "b"])
-            ask = _get_num_from_row(r, ["ask", "Ask", "a"])
-            last = _get_num_from_row(r, ["lastPrice", "last", "mark", "mid"])
-            prem = effective_credit(
-                bid, ask, last,
-                oi=_safe_int(_get_num_from_row(r, ["openInterest", "oi", "open_interest"], 0), 0),
-                volume=_safe_int(_get_num_from_row(r, ["volume", "Volume", "vol"], 0), 0),
-                dte=D
-            )
-            
-            if prem != prem or prem <= 0:
-                continue
-            
-            oi = _safe_int(_get_num_from_row(r, ["openInterest", "oi", "open_interest"], 0), 0)
-            vol = _safe_int(_get_num_from_row(r, ["volume", "Volume", "vol"], 0), 0)
-            spread_pct = compute_spread_pct(bid, ask, prem)
-            
-            puts_sell.append({
-                "K": K, "prem": prem, "delta": pd_val, "iv": iv,
-                "spread%": spread_pct, "oi": oi, "volume": vol, "bid": bid, "ask": ask
-            })
+        # Potential short puts (sell) - OTM puts below the stock price, vectorized over the chain
+        put_ev = evaluate_chain(puts, S=S, T=T, r=risk_free, q=div_y, right="put",
+                                fill="credit", dte=D, fills=snap.fills(exp, "put", dte=D))
+        with np.errstate(invalid="ignore"):
+            puts_sell = _leg_frame(put_ev, put_ev["strike"].to_numpy() < S).to_dict("records")
         
         if not puts_sell:
             continue
         
-        # For each potential short put, find corresponding long put
-        for ps in puts_sell:
+        # Long put for every (short put, width) pair: one sorted-strike lookup for all of them
+        j_longs = snap.strike_index(exp, "put").find(
+            np.array([ps["K"] for ps in puts_sell])[:, None] - widths[None, :])
+        
+        for ps, width, j_long in ((ps, float(w), int(j)) for ps, row_j in zip(puts_sell, j_longs)
+                                  for w, j in zip(widths, row_j)):
+            ps["spread%"] = nan_to_none(ps["spread%"])
             Ks = float(ps["K"])  # Short strike (higher)
-            Kl = Ks - spread_width  # Long strike (lower)
+            Kl = Ks - width  # Long strike (lower)
             
             # Check OI and spread on short leg
             if ps["oi"] < min_oi:
@@ -2351,23 +2370,13 @@ def analyze_bull_put_spread(ticker, *, min_days=1, days_limit, min_oi, max_sprea
             if ps["spread%"] is not None and ps["spread%"] > max_spread:
                 continue
             
-            # Find matching long put at Kl
-            put_long = puts[puts.apply(
-                lambda r: abs(_get_num_from_row(r, ["strike", "Strike", "k", "K"], 0) - Kl) < 0.5, 
-                axis=1
-            )]
-            
-            if put_long.empty:
+            # Matching long put at Kl (first strike within tolerance)
+            if j_long < 0:
                 continue
             
-            # Get long put premium (what we pay)
-            pl_row = put_long.iloc[0]
-            pl_bid = _get_num_from_row(pl_row, ["bid", "Bid", "b"])
-            pl_ask = _get_num_from_row(pl_row, ["ask", "Ask", "a"])
-            pl_last = _get_num_from_row(pl_row, ["lastPrice", "last", "mark", "mid"])
-            pl_oi = _safe_int(_get_num_from_row(pl_row, ["openInterest", "oi", "open_interest"], 0), 0)
-            pl_vol = _safe_int(_get_num_from_row(pl_row, ["volume", "Volume", "vol"], 0), 0)
-            pl_prem = effective_debit(pl_bid, pl_ask, pl_last, oi=pl_oi, volume=pl_vol, dte=D)
+            # Get long put premium (what we pay) from the shared fill table
+            pl_oi = int(put_ev["oi_i"].iat[j_long])
+            pl_prem = float(put_ev["debit_fill"].iat[j_long])
             
             if pl_prem != pl_prem or pl_prem <= 0:
                 continue
@@ -2383,7 +2392,7 @@ def analyze_bull_put_spread(ticker, *, min_days=1, days_limit, min_oi, max_sprea
                 continue
             
             # Calculate risk metrics
-            max_loss = spread_width - net_credit
+            max_loss = width - net_credit
             capital_at_risk = max_loss * 100.0  # Per contract
             
             # ROI calculations
@@ -2412,9 +2421,7 @@ def analyze_bull_put_spread(ticker, *, min_days=1, days_limit, min_oi, max_sprea
             # Calculate combined Greeks (net position)
             # Short put theta (positive for us)
             ps_theta = put_theta(S, Ks, risk_free, ps["iv"], T, div_y)
-            pl_iv = _get_num_from_row(pl_row, ["impliedVolatility", "iv", "IV"], 0.20)
-            if pl_iv == pl_iv and pl_iv > 3.0:
-                pl_iv = pl_iv / 100.0
+            pl_iv = float(put_ev["iv_calc"].iat[j_long])
             pl_theta = put_theta(S, Kl, risk_free, pl_iv, T, div_y)
             
             # Net theta (short - long, since we're selling short and buying long)
@@ -2602,7 +2609,7 @@ def analyze_bull_put_spread(ticker, *, min_days=1, days_limit, min_oi, max_sprea
                 "Days": D,
                 "SellStrike": float(Ks),  # Short strike (higher)
                 "BuyStrike": float(Kl),   # Long strike (lower)
-                "Spread": float(spread_width),
+                "Spread": width,
                 "NetCredit": round(net_credit, 2),
                 "MaxLoss": round(max_loss, 2),
                 "OTM%": round(otm_pct, 2),
@@ -2646,7 +2653,8 @@ def analyze_bull_put_spread(ticker, *, min_days=1, days_limit, min_oi, max_sprea
 
 def analyze_bear_call_spread(ticker, *, min_days=1, days_limit, min_oi, max_spread,
                               min_roi, min_cushion, min_poew, earn_window, risk_free,
-                              spread_width=5.0, target_delta_short=0.20, bill_yield=0.0):
+                              spread_width=5.0, target_delta_short=0.20, bill_yield=0.0,
+                             snapshot: MarketSnapshot | None = None):
     """
     Scan for Bear Call Spread opportunities (bearish/neutral credit spread with defined risk).
     
@@ -2659,26 +2667,26 @@ def analyze_bear_call_spread(ticker, *, min_days=1, days_limit, min_oi, max_spre
     - Max Loss = Spread Width - Net Credit
     - Breakeven = Short Strike + Net Credit
     
+    spread_width may be a sequence (e.g. [1, 2.5, 5, 10]) to scan several widths in
+    one pass; the "Spread" column tells the rows apart.
+    
     Returns DataFrame with ranked Bear Call Spread opportunities.
     """
     # Import from strategy_lab to avoid circular import at module level
-    from data_fetching import (
-        fetch_price, fetch_expirations, fetch_chain,
-        _get_num_from_row, _safe_int, effective_credit, 
-        effective_debit, estimate_next_ex_div, check_expiration_risk
-    )
+    from data_fetching import check_expiration_risk
     
-    stock = yf.Ticker(ticker)
     try:
-        S = fetch_price(ticker)
+        snap = snapshot if snapshot is not None else fetch_market_snapshot(ticker)
     except Exception:
         return pd.DataFrame()
+    S = snap.spot
 
-    expirations = fetch_expirations(ticker)
-    earn_date = get_earnings_date_cached(ticker)
-    div_ps_annual, div_y = trailing_dividend_info(stock, S)
+    expirations = snap.expirations
+    earn_date = snap.earnings_date
+    div_y = snap.div_y
     
     rows = []
+    widths = spread_widths(spread_width)
     # Performance configuration for MC gating
     perf_cfg = _get_scan_perf_config()
     
@@ -2694,61 +2702,33 @@ def analyze_bear_call_spread(ticker, *, min_days=1, days_limit, min_oi, max_spre
             continue
 
         T = D / 365.0
-        chain_all = fetch_chain(ticker, exp)
+        chain_all = snap.chain(exp)
         if chain_all is None or chain_all.empty:
             continue
         
-        if "type" in chain_all.columns:
-            calls = chain_all[chain_all["type"].str.lower() == "call"].copy()
-        else:
-            calls = chain_all.copy()
+        calls = snap.normalized(exp, "call")
         
         if calls.empty:
             continue
         
-        # Find potential short calls (sell) - OTM calls with target delta
-        calls_sell = []
-        for _, r in calls.iterrows():
-            K = _get_num_from_row(r, ["strike", "Strike", "k", "K"], float("nan"))
-            if not (K == K and K > 0 and K > S):  # Must be OTM (above stock price)
-                continue
-            
-            iv = _get_num_from_row(r, ["impliedVolatility", "iv", "IV"], 0.20)
-            if iv == iv and iv > 3.0:
-                iv = iv / 100.0
-            
-            # Calculate call delta (positive for calls)
-            cd_val = call_delta(S, K, risk_free, iv, T, div_y)
-            
-            bid = _get_num_from_row(r, ["bid", "Bid", "b"])
-            ask = _get_num_from_row(r, ["ask", "Ask", "a"])
-            last = _get_num_from_row(r, ["lastPrice", "last", "mark", "mid"])
-            prem = effective_credit(
-                bid, ask, last,
-                oi=_safe_int(_get_num_from_row(r, ["openInterest", "oi", "open_interest"], 0), 0),
-                volume=_safe_int(_get_num_from_row(r, ["volume", "Volume", "vol"], 0), 0),
-                dte=D
-            )
-            
-            if prem != prem or prem <= 0:
-                continue
-            
-            oi = _safe_int(_get_num_from_row(r, ["openInterest", "oi", "open_interest"], 0), 0)
-            vol = _safe_int(_get_num_from_row(r, ["volume", "Volume", "vol"], 0), 0)
-            spread_pct = compute_spread_pct(bid, ask, prem)
-            
-            calls_sell.append({
-                "K": K, "prem": prem, "delta": cd_val, "iv": iv,
-                "spread%": spread_pct, "oi": oi, "volume": vol, "bid": bid, "ask": ask
-            })
+        # Potential short calls (sell) - OTM calls above the stock price, vectorized over the chain
+        call_ev = evaluate_chain(calls, S=S, T=T, r=risk_free, q=div_y, right="call",
+                                fill="credit", dte=D, fills=snap.fills(exp, "call", dte=D))
+        with np.errstate(invalid="ignore"):
+            calls_sell = _leg_frame(call_ev, call_ev["strike"].to_numpy() > S).to_dict("records")
         
         if not calls_sell:
             continue
         
-        # For each potential short call, find corresponding long call
-        for cs in calls_sell:
+        # Long call for every (short call, width) pair: one sorted-strike lookup for all of them
+        j_longs = snap.strike_index(exp, "call").find(
+            np.array([cs["K"] for cs in calls_sell])[:, None] + widths[None, :])
+        
+        for cs, width, j_long in ((cs, float(w), int(j)) for cs, row_j in zip(calls_sell, j_longs)
+                                  for w, j in zip(widths, row_j)):
+            cs["spread%"] = nan_to_none(cs["spread%"])
             Ks = float(cs["K"])  # Short strike (lower)
-            Kl = Ks + spread_width  # Long strike (higher)
+            Kl = Ks + width  # Long strike (higher)
             
             # Check OI and spread on short leg
             if cs["oi"] < min_oi:
@@ -2756,23 +2736,13 @@ def analyze_bear_call_spread(ticker, *, min_days=1, days_limit, min_oi, max_spre
             if cs["spread%"] is not None and cs["spread%"] > max_spread:
                 continue
             
-            # Find matching long call at Kl
-            call_long = calls[calls.apply(
-                lambda r: abs(_get_num_from_row(r, ["strike", "Strike", "k", "K"], 0) - Kl) < 0.5, 
-                axis=1
-            )]
-            
-            if call_long.empty:
+            # Matching long call at Kl (first strike within tolerance)
+            if j_long < 0:
                 continue
             
-            # Get long call premium (what we pay)
-            cl_row = call_long.iloc[0]
-            cl_bid = _get_num_from_row(cl_row, ["bid", "Bid", "b"])
-            cl_ask = _get_num_from_row(cl_row, ["ask", "Ask", "a"])
-            cl_last = _get_num_from_row(cl_row, ["lastPrice", "last", "mark", "mid"])
-            cl_oi = _safe_int(_get_num_from_row(cl_row, ["openInterest", "oi", "open_interest"], 0), 0)
-            cl_vol = _safe_int(_get_num_from_row(cl_row, ["volume", "Volume", "vol"], 0), 0)
-            cl_prem = effective_debit(cl_bid, cl_ask, cl_last, oi=cl_oi, volume=cl_vol, dte=D)
+            # Get long call premium (what we pay) from the shared fill table
+            cl_oi = int(call_ev["oi_i"].iat[j_long])
+            cl_prem = float(call_ev["debit_fill"].iat[j_long])
             
             if cl_prem != cl_prem or cl_prem <= 0:
                 continue
@@ -2788,7 +2758,7 @@ def analyze_bear_call_spread(ticker, *, min_days=1, days_limit, min_oi, max_spre
                 continue
             
             # Calculate risk metrics
-            max_loss = spread_width - net_credit
+            max_loss = width - net_credit
             capital_at_risk = max_loss * 100.0  # Per contract
             
             # ROI calculations
@@ -2817,9 +2787,7 @@ def analyze_bear_call_spread(ticker, *, min_days=1, days_limit, min_oi, max_spre
             # Calculate combined Greeks (net position)
             # Short call theta (positive for us)
             cs_theta = call_theta(S, Ks, risk_free, cs["iv"], T, div_y)
-            cl_iv = _get_num_from_row(cl_row, ["impliedVolatility", "iv", "IV"], 0.20)
-            if cl_iv == cl_iv and cl_iv > 3.0:
-                cl_iv = cl_iv / 100.0
+            cl_iv = float(call_ev["iv_calc"].iat[j_long])
             cl_theta = call_theta(S, Kl, risk_free, cl_iv, T, div_y)
             
             # Net theta (short - long, since we're selling short and buying long)
@@ -3004,7 +2972,7 @@ def analyze_bear_call_spread(ticker, *, min_days=1, days_limit, min_oi, max_spre
                 "Days": D,
                 "SellStrike": float(Ks),  # Short strike (lower)
                 "BuyStrike": float(Kl),   # Long strike (higher)
-                "Spread": float(spread_width),
+                "Spread": width,
                 "NetCredit": round(net_credit, 2),
                 "MaxLoss": round(max_loss, 2),
                 "OTM%": round(otm_pct, 2),
@@ -3100,9 +3068,10 @@ def prescreen_tickers(tickers, min_price=5.0, max_price=1000.0, min_avg_volume=1
             except Exception:
                 provider = None
 
-            # Fetch 3 months of history (for avg volume and HV) via yfinance for speed/availability
+            # 3 months of daily bars (avg volume, HV) from the local price store, which only
+            # fetches the sessions missing since the last run
             stock = yf.Ticker(ticker)
-            hist = stock.history(period="3mo")
+            hist = get_price_store().history(ticker, start=date.today() - timedelta(days=92))
 
             if hist.empty or len(hist) < 20:
                 return None
@@ -43,11 +43,11 @@ import pandas as pd
 import numpy as np
 import altair as alt
 import yfinance as yf
-from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Options math (Black-Scholes, Greeks, Monte Carlo)
 from options_math import (
-    bs_call_price, bs_put_price,
+    bs_call_price, bs_put_price,  # noqa: F401 - re-exported for scripts importing from strategy_lab
+    bs_greeks,
     call_delta, put_delta,
     option_gamma, option_vega,
     call_theta, put_theta,
@@ -139,14 +139,17 @@ from utils import (
 from strategy_analysis import (
     analyze_csp,
     analyze_cc as _analyze_cc_impl,
-    analyze_collar,
-    analyze_iron_condor,
+    # Re-exported for scripts importing the analyzers from strategy_lab
+    analyze_collar,  # noqa: F401
+    analyze_iron_condor,  # noqa: F401
     analyze_bull_put_spread as _analyze_bull_put_spread_impl,
     analyze_bear_call_spread as _analyze_bear_call_spread_impl,
-    analyze_pmcc,
-    analyze_synthetic_collar,
+    analyze_pmcc,  # noqa: F401
+    analyze_synthetic_collar,  # noqa: F401
     prescreen_tickers
 )
+from scan_engine import run_scans as _engine_run_scans, stream_scans as _engine_stream_scans, leaderboard
+from scan_profile import profile_frame
 # Thread-safe diagnostics counters (accessible from worker threads)
 _diagnostics_lock = threading.Lock()
 _diagnostics_counters = {
@@ -1105,6 +1108,7 @@ def analyze_cc(
     risk_free: float,
     include_dividends: bool = True,
     bill_yield: float = 0.0,
+    snapshot=None,
 ):
     """Wrapper around full analyze_cc to ensure expected columns for tests."""
     # Call underlying implementation and normalize return type to DataFrame
@@ -1121,6 +1125,7 @@ def analyze_cc(
             risk_free=risk_free,
             include_dividends=include_dividends,
             bill_yield=bill_yield,
+            snapshot=snapshot,
         )
     else:
         res = pd.DataFrame()
@@ -1169,6 +1174,7 @@ def analyze_bull_put_spread(
                 spread_width=kwargs.get("spread_width", 5.0),
                 target_delta_short=kwargs.get("target_delta_short", 0.20),
                 bill_yield=kwargs.get("bill_yield", 0.0),
+                snapshot=kwargs.get("snapshot"),
             )
         except Exception:
             return pd.DataFrame()
@@ -1254,6 +1260,7 @@ def analyze_bear_call_spread(
                 spread_width=kwargs.get("spread_width", 5.0),
                 target_delta_short=kwargs.get("target_delta_short", 0.20),
                 bill_yield=kwargs.get("bill_yield", 0.0),
+                snapshot=kwargs.get("snapshot"),
             )
         except Exception:
             return pd.DataFrame()
@@ -2428,13 +2435,23 @@ def run_stress(strategy, row, *, shocks_pct, horizon_days, r, div_y,
     shocks_pct = list(shocks_pct)
     shocks_pct.sort()
 
+    # Shock grid: every leg is re-marked across all shocks in one vectorized BS call
+    sp_arr = np.asarray(shocks_pct, dtype=float)
+    S1_grid = S0 * (1.0 + sp_arr / 100.0)
+    iv1_grid = np.maximum(0.02, iv_base + np.where(sp_arr < 0, iv_down_shift, iv_up_shift))
+
+    def _marks(K_leg, T_leg, kind):
+        g = bs_greeks(S1_grid, float(K_leg), r, iv1_grid, max(T_leg, 1e-6), div_y)
+        return g["call_price" if kind == "call" else "put_price"]
+
     if strategy == "CSP":
         K = float(row["Strike"])
         prem_entry = float(row["Premium"])  # per share
-        for sp in shocks_pct:
-            S1 = S0 * (1.0 + sp / 100.0)
-            iv1 = max(0.02, iv_base + (iv_down_shift if sp < 0 else iv_up_shift))
-            put_now = bs_put_price(S1, K, r, div_y, iv1, T)
+        put_marks = _marks(K, T, "put")
+
+        for i, sp in enumerate(shocks_pct):
+            S1 = float(S1_grid[i])
+            put_now = float(put_marks[i])
             # short put P&L: entry credit - current mark
             pnl_put = (prem_entry - put_now) * 100.0
             total = pnl_put
@@ -2461,17 +2478,18 @@ def run_stress(strategy, row, *, shocks_pct, horizon_days, r, div_y,
         short_prem = float(row["ShortPrem"])  # per share credit
         long_days_total = int(row.get("LongDays", int(row["Days"])) or int(row["Days"]))
 
-        for sp in shocks_pct:
-            S1 = S0 * (1.0 + sp / 100.0)
-            iv1 = max(0.02, iv_base + (iv_down_shift if sp < 0 else iv_up_shift))
-            # Remaining time for short leg after horizon
-            T_short = max(T, 1e-6)
-            # Remaining time for long after horizon
-            long_days_rem = max(long_days_total - max(horizon_days, 0), 1)
-            T_long = max(long_days_rem / 365.0, 1e-6)
+        # Remaining time for short leg after horizon
+        T_short = max(T, 1e-6)
+        # Remaining time for long after horizon
+        long_days_rem = max(long_days_total - max(horizon_days, 0), 1)
+        T_long = max(long_days_rem / 365.0, 1e-6)
+        long_call_marks = _marks(K_long, T_long, "call")
+        short_call_marks = _marks(K_short, T_short, "call")
 
-            long_call_now = bs_call_price(S1, K_long, r, div_y, iv1, T_long)
-            short_call_now = bs_call_price(S1, K_short, r, div_y, iv1, T_short)
+        for i, sp in enumerate(shocks_pct):
+            S1 = float(S1_grid[i])
+            long_call_now = float(long_call_marks[i])
+            short_call_now = float(short_call_marks[i])
 
             pnl_long_call = (long_call_now - long_cost) * 100.0
             pnl_short_call = (short_prem - short_call_now) * 100.0
@@ -2501,17 +2519,19 @@ def run_stress(strategy, row, *, shocks_pct, horizon_days, r, div_y,
         short_prem = float(row["ShortPrem"]) # per share credit
         long_days_total = int(row.get("LongDays", int(row["Days"])) or int(row["Days"]))
 
-        for sp in shocks_pct:
-            S1 = S0 * (1.0 + sp / 100.0)
-            iv1 = max(0.02, iv_base + (iv_down_shift if sp < 0 else iv_up_shift))
-            # Remaining times
-            T_short = max(T, 1e-6)  # put and short call share the short expiry
-            long_days_rem = max(long_days_total - max(horizon_days, 0), 1)
-            T_long = max(long_days_rem / 365.0, 1e-6)
+        # Remaining times
+        T_short = max(T, 1e-6)  # put and short call share the short expiry
+        long_days_rem = max(long_days_total - max(horizon_days, 0), 1)
+        T_long = max(long_days_rem / 365.0, 1e-6)
+        long_call_marks = _marks(K_long, T_long, "call")
+        put_marks = _marks(K_put, T_short, "put")
+        short_call_marks = _marks(K_short, T_short, "call")
 
-            long_call_now = bs_call_price(S1, K_long, r, div_y, iv1, T_long)
-            put_now = bs_put_price(S1, K_put, r, div_y, iv1, T_short)
-            short_call_now = bs_call_price(S1, K_short, r, div_y, iv1, T_short)
+        for i, sp in enumerate(shocks_pct):
+            S1 = float(S1_grid[i])
+            long_call_now = float(long_call_marks[i])
+            put_now = float(put_marks[i])
+            short_call_now = float(short_call_marks[i])
 
             pnl_long_call = (long_call_now - long_cost) * 100.0
             pnl_put = (put_now - put_cost) * 100.0
@@ -2535,10 +2555,11 @@ def run_stress(strategy, row, *, shocks_pct, horizon_days, r, div_y,
     if strategy == "CC":
         K = float(row["Strike"])
         call_entry = float(row["Premium"])  # per share
-        for sp in shocks_pct:
-            S1 = S0 * (1.0 + sp / 100.0)
-            iv1 = max(0.02, iv_base + (iv_down_shift if sp < 0 else iv_up_shift))
-            call_now = bs_call_price(S1, K, r, div_y, iv1, T)
+        call_marks = _marks(K, T, "call")
+
+        for i, sp in enumerate(shocks_pct):
+            S1 = float(S1_grid[i])
+            call_now = float(call_marks[i])
             pnl_call = (call_entry - call_now) * 100.0    # short call
             pnl_shares = (S1 - S0) * 100.0
             total = pnl_shares + pnl_call
@@ -2564,11 +2585,13 @@ def run_stress(strategy, row, *, shocks_pct, horizon_days, r, div_y,
         call_entry = float(row["CallPrem"])  # per share credit
         put_entry = float(row["PutPrem"])    # per share debit
         # Collars often have different IVs per wing; use a single IV with shifts for simplicity
-        for sp in shocks_pct:
-            S1 = S0 * (1.0 + sp / 100.0)
-            iv1 = max(0.02, iv_base + (iv_down_shift if sp < 0 else iv_up_shift))
-            call_now = bs_call_price(S1, Kc, r, div_y, iv1, T)
-            put_now = bs_put_price(S1, Kp, r, div_y, iv1, T)
+        call_marks = _marks(Kc, T, "call")
+        put_marks = _marks(Kp, T, "put")
+
+        for i, sp in enumerate(shocks_pct):
+            S1 = float(S1_grid[i])
+            call_now = float(call_marks[i])
+            put_now = float(put_marks[i])
             pnl_call = (call_entry - call_now) * 100.0  # short call
             pnl_put = (put_now - put_entry) * 100.0    # long put
             pnl_shares = (S1 - S0) * 100.0
@@ -2597,15 +2620,19 @@ def run_stress(strategy, row, *, shocks_pct, horizon_days, r, div_y,
         Kcl = float(row["CallLongStrike"])
         net_credit = float(row["NetCredit"])  # per share
         
-        for sp in shocks_pct:
-            S1 = S0 * (1.0 + sp / 100.0)
-            iv1 = max(0.02, iv_base + (iv_down_shift if sp < 0 else iv_up_shift))
+        put_short_marks = _marks(Kps, T, "put")
+        put_long_marks = _marks(Kpl, T, "put")
+        call_short_marks = _marks(Kcs, T, "call")
+        call_long_marks = _marks(Kcl, T, "call")
+
+        for i, sp in enumerate(shocks_pct):
+            S1 = float(S1_grid[i])
             
             # Calculate mark prices for all 4 legs
-            put_short_now = bs_put_price(S1, Kps, r, div_y, iv1, T)
-            put_long_now = bs_put_price(S1, Kpl, r, div_y, iv1, T)
-            call_short_now = bs_call_price(S1, Kcs, r, div_y, iv1, T)
-            call_long_now = bs_call_price(S1, Kcl, r, div_y, iv1, T)
+            put_short_now = float(put_short_marks[i])
+            put_long_now = float(put_long_marks[i])
+            call_short_now = float(call_short_marks[i])
+            call_long_now = float(call_long_marks[i])
             
             # Current spread marks (what we'd pay to close)
             # Put spread: short Kps @ put_short_now, long Kpl @ put_long_now
@@ -2655,13 +2682,15 @@ def run_stress(strategy, row, *, shocks_pct, horizon_days, r, div_y,
         buy_strike = float(row["BuyStrike"])
         net_credit = float(row["NetCredit"])  # per share
         
-        for sp in shocks_pct:
-            S1 = S0 * (1.0 + sp / 100.0)
-            iv1 = max(0.02, iv_base + (iv_down_shift if sp < 0 else iv_up_shift))
+        sell_put_marks = _marks(sell_strike, T, "put")
+        buy_put_marks = _marks(buy_strike, T, "put")
+
+        for i, sp in enumerate(shocks_pct):
+            S1 = float(S1_grid[i])
             
             # Calculate mark prices for both legs
-            sell_put_now = bs_put_price(S1, sell_strike, r, div_y, iv1, T)
-            buy_put_now = bs_put_price(S1, buy_strike, r, div_y, iv1, T)
+            sell_put_now = float(sell_put_marks[i])
+            buy_put_now = float(buy_put_marks[i])
             
             # Spread mark (what we'd pay to close)
             spread_mark = sell_put_now - buy_put_now
@@ -2693,13 +2722,15 @@ def run_stress(strategy, row, *, shocks_pct, horizon_days, r, div_y,
         buy_strike = float(row["BuyStrike"])
         net_credit = float(row["NetCredit"])  # per share
         
-        for sp in shocks_pct:
-            S1 = S0 * (1.0 + sp / 100.0)
-            iv1 = max(0.02, iv_base + (iv_down_shift if sp < 0 else iv_up_shift))
+        sell_call_marks = _marks(sell_strike, T, "call")
+        buy_call_marks = _marks(buy_strike, T, "call")
+
+        for i, sp in enumerate(shocks_pct):
+            S1 = float(S1_grid[i])
             
             # Calculate mark prices for both legs
-            sell_call_now = bs_call_price(S1, sell_strike, r, div_y, iv1, T)
-            buy_call_now = bs_call_price(S1, buy_strike, r, div_y, iv1, T)
+            sell_call_now = float(sell_call_marks[i])
+            buy_call_now = float(buy_call_marks[i])
             
             # Spread mark (what we'd pay to close)
             spread_mark = sell_call_now - buy_call_now
@@ -3340,6 +3371,47 @@ with st.sidebar:
         help="Drops any candidates whose Monte Carlo expected P&L is negative. Keeps rows where MC couldn't be computed (NaN)."
     )
 
+    incremental_scan = st.checkbox(
+        "Incremental rescan",
+        value=False,
+        key="scan_incremental",
+        help="Reuse results for expirations whose quotes and settings are unchanged since the last scan; "
+             "tightening min OI / max spread re-filters existing rows instead of re-running Monte Carlo."
+    )
+
+    live_scan = st.checkbox(
+        "Live results while scanning",
+        value=True,
+        key="scan_live",
+        help="Show progress, ETA and a running leaderboard as each ticker finishes. "
+             "Live scans skip the 2-minute results cache."
+    )
+
+    ticker_timeout = st.number_input(
+        "Per-ticker timeout (s, 0 = none)",
+        min_value=0, max_value=3600, value=120, step=30,
+        key="scan_ticker_timeout",
+        help="Tickers still fetching or analyzing after this long are reported as timed out and "
+             "skipped, so one hung request cannot stall the whole scan."
+    )
+
+    profile_scan = st.checkbox(
+        "Profile scan",
+        value=False,
+        key="scan_profile",
+        help="Time network fetches, analyzers, Monte Carlo, scoring and Kelly sizing per ticker, "
+             "strategy and provider; shown in the Scan profile expander."
+    )
+
+    mc_top_k = st.number_input(
+        "Monte Carlo top-K per strategy (0 = all)",
+        min_value=0, max_value=1000, value=0, step=10,
+        key="scan_mc_top_k",
+        help="Two-phase scan: pre-score every candidate without Monte Carlo, then run Monte Carlo "
+             "only for the best K per strategy across all tickers. Only those K rows are shown. "
+             "Not used with incremental rescan."
+    )
+
     st.divider()
     st.subheader("Covered Call")
     min_otm_cc = st.slider("Min OTM % (CC)", 0.0, 20.0,
@@ -3436,247 +3508,53 @@ with st.sidebar:
     run_btn = st.button("🔎 Scan Strategies")
 
 
+def _scan_warn(ticker, err):
+    # Log error but continue with other tickers
+    st.warning(f"⚠️ Error scanning {ticker}: {err.strip().splitlines()[-1]}")
+    st.text(err)
+
+
 @st.cache_data(show_spinner=True, ttl=120)
 def run_scans(tickers, params):
     """
     Run CSP, CC, Collar, Iron Condor, Bull Put Spread, Bear Call Spread plus PMCC & Synthetic Collar scans across tickers.
-    Primary six strategies are scanned in parallel; PMCC & Synthetic Collar are computed per-ticker inside the worker.
+    Cached UI wrapper around scan_engine.run_scans (the headless engine); per-ticker errors are shown as warnings.
     """
-    # Handle empty ticker list
-    if not tickers or len(tickers) == 0:
-        return (pd.DataFrame(), pd.DataFrame(), pd.DataFrame(), pd.DataFrame(), pd.DataFrame(),
-                pd.DataFrame(), pd.DataFrame(), pd.DataFrame(), {"CSP": {}})
-
-    csp_all = []
-    cc_all = []
-    col_all = []
-    ic_all = []
-    bps_all = []  # Bull Put Spread
-    bcs_all = []  # Bear Call Spread
-    pmcc_all = []  # PMCC
-    syn_all = []   # Synthetic Collar
-    scan_counters = {"CSP": {}}
-
-    def scan_ticker(t):
-        """Scan a single ticker for all strategies (returns tuple of DataFrames)."""
-        # CSP scan
-        csp, csp_cnt = analyze_csp(
-            t,
-            min_days=params["min_days"],
-            days_limit=params["days_limit"],
-            min_otm=params["min_otm_csp"],
-            min_oi=params["min_oi"],
-            max_spread=params["max_spread"],
-            min_roi=params["min_roi_csp"],
-            min_cushion=params["min_cushion"],
-            min_poew=params["min_poew"],
-            earn_window=params["earn_window"],
-            risk_free=params["risk_free"],
-            per_contract_cap=params["per_contract_cap"],
-            bill_yield=params["bill_yield"]
-        )
-
-        # CC scan
-        cc = analyze_cc(
-            t,
-            min_days=params["min_days"],
-            days_limit=params["days_limit"],
-            min_otm=params["min_otm_cc"],
-            min_oi=params["min_oi"],
-            max_spread=params["max_spread"],
-            min_roi=params["min_roi_cc"],
-            earn_window=params["earn_window"],
-            risk_free=params["risk_free"],
-            include_dividends=params["include_div_cc"],
-            bill_yield=params["bill_yield"]
-        )
-
-        # Collar scan
-        col = analyze_collar(
-            t,
-            min_days=params["min_days"],
-            days_limit=params["days_limit"],
-            min_oi=params["min_oi"],
-            max_spread=params["max_spread"],
-            call_delta_target=params["call_delta_tgt"],
-            put_delta_target=params["put_delta_tgt"],
-            earn_window=params["earn_window"],
-            risk_free=params["risk_free"],
-            include_dividends=params["include_div_col"],
-            min_net_credit=params["min_net_credit"],
-            bill_yield=params["bill_yield"]
-        )
+    return _engine_run_scans(tickers, params, on_error=_scan_warn)
 
-        # Iron Condor scan
-        ic = analyze_iron_condor(
-            t,
-            min_days=params["min_days"],
-            days_limit=params["days_limit"],
-            min_oi=params["min_oi"],
-            max_spread=params["max_spread"],
-            min_roi=params["ic_min_roi"] / 100.0,
-            min_cushion=params["ic_min_cushion"],
-            earn_window=params["earn_window"],
-            risk_free=params["risk_free"],
-            spread_width_put=params["ic_spread_width_put"],
-            spread_width_call=params["ic_spread_width_call"],
-            target_delta_short=params["ic_target_delta"],
-            bill_yield=params["bill_yield"]
-        )
 
-        # Bull Put Spread scan
-        bps = analyze_bull_put_spread(
-            t,
-            min_days=params["min_days"],
-            days_limit=params["days_limit"],
-            min_oi=params["min_oi"],
-            max_spread=params["max_spread"],
-            min_roi=params["cs_min_roi"] / 100.0,
-            min_cushion=params["min_cushion"],
-            min_poew=params["min_poew"],
-            earn_window=params["earn_window"],
-            risk_free=params["risk_free"],
-            spread_width=params["cs_spread_width"],
-            target_delta_short=params["cs_target_delta"],
-            bill_yield=params["bill_yield"]
-        )
-
-        # Bear Call Spread scan
-        bcs = analyze_bear_call_spread(
-            t,
-            min_days=params["min_days"],
-            days_limit=params["days_limit"],
-            min_oi=params["min_oi"],
-            max_spread=params["max_spread"],
-            min_roi=params["cs_min_roi"] / 100.0,
-            min_cushion=params["min_cushion"],
-            min_poew=params["min_poew"],
-            earn_window=params["earn_window"],
-            risk_free=params["risk_free"],
-            spread_width=params["cs_spread_width"],
-            target_delta_short=params["cs_target_delta"],
-            bill_yield=params["bill_yield"]
-        )
-
-        # PMCC & Synthetic Collar (best-effort)
-        try:
-            pmcc = analyze_pmcc(
-                t,
-                target_long_delta=params.get("pmcc_long_delta", 0.80),
-                long_min_days=params.get("pmcc_long_days_min", 180),
-                long_max_days=params.get("pmcc_long_days_max", 400),
-                short_min_days=params.get("pmcc_short_days_min", 21),
-                short_max_days=params.get("pmcc_short_days_max", 60),
-                short_delta_lo=params.get("pmcc_short_delta_lo", 0.20),
-                short_delta_hi=params.get("pmcc_short_delta_hi", 0.35),
-                min_oi=params.get("min_oi", 50),
-                max_spread=params.get("max_spread", 15.0),
-                earn_window=params.get("earn_window", 7),
-                risk_free=params.get("risk_free", 0.0),
-                bill_yield=params.get("bill_yield", 0.0),
-            )
-        except Exception:
-            pmcc = pd.DataFrame()
-        try:
-            syn = analyze_synthetic_collar(
-                t,
-                target_long_delta=params.get("syn_long_delta", 0.80),
-                put_delta_target=-abs(params.get("syn_put_delta_abs", 0.15)),
-                long_min_days=params.get("syn_long_days_min", 180),
-                long_max_days=params.get("syn_long_days_max", 400),
-                short_min_days=params.get("syn_short_days_min", 21),
-                short_max_days=params.get("syn_short_days_max", 60),
-                short_delta_lo=params.get("syn_short_delta_lo", 0.20),
-                short_delta_hi=params.get("syn_short_delta_hi", 0.35),
-                min_oi=params.get("min_oi", 50),
-                max_spread=params.get("max_spread", 15.0),
-                earn_window=params.get("earn_window", 7),
-                risk_free=params.get("risk_free", 0.0),
-                bill_yield=params.get("bill_yield", 0.0),
-            )
-        except Exception:
-            syn = pd.DataFrame()
-
-        return csp, csp_cnt, cc, col, ic, bps, bcs, pmcc, syn
-
-    # Parallel execution with ThreadPoolExecutor
-    max_workers = min(len(tickers), 8)  # Cap at 8 concurrent workers
-
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        # Submit all ticker scans
-        future_to_ticker = {executor.submit(
-            scan_ticker, t): t for t in tickers}
-
-        # Collect results as they complete
-        for future in as_completed(future_to_ticker):
-            ticker = future_to_ticker[future]
-            try:
-                csp, csp_cnt, cc, col, ic, bps, bcs, pmcc, syn = future.result()
-
-                # Accumulate results
-                if not csp.empty:
-                    csp_all.append(csp)
-                if not cc.empty:
-                    cc_all.append(cc)
-                if not col.empty:
-                    col_all.append(col)
-                if not ic.empty:
-                    ic_all.append(ic)
-                if not bps.empty:
-                    bps_all.append(bps)
-                if not bcs.empty:
-                    bcs_all.append(bcs)
-                if not pmcc.empty:
-                    pmcc_all.append(pmcc)
-                if not syn.empty:
-                    syn_all.append(syn)
-
-                # Aggregate counters
-                for k, v in csp_cnt.items():
-                    scan_counters["CSP"][k] = scan_counters["CSP"].get(
-                        k, 0) + int(v)
-
-            except Exception as e:
-                # Log error but continue with other tickers
-                st.warning(f"⚠️ Error scanning {ticker}: {str(e)}")
-                import traceback
-                st.text(traceback.format_exc())
-
-    # Combine all results
-    df_csp = pd.concat(
-        csp_all, ignore_index=True) if csp_all else pd.DataFrame()
-    df_cc = pd.concat(cc_all, ignore_index=True) if cc_all else pd.DataFrame()
-    df_col = pd.concat(
-        col_all, ignore_index=True) if col_all else pd.DataFrame()
-    df_ic = pd.concat(
-        ic_all, ignore_index=True) if ic_all else pd.DataFrame()
-    df_bps = pd.concat(
-        bps_all, ignore_index=True) if bps_all else pd.DataFrame()
-    df_bcs = pd.concat(
-        bcs_all, ignore_index=True) if bcs_all else pd.DataFrame()
-    df_pmcc = pd.concat(pmcc_all, ignore_index=True) if pmcc_all else pd.DataFrame()
-    df_synthetic_collar = pd.concat(syn_all, ignore_index=True) if syn_all else pd.DataFrame()
-
-    # Optional hard filter: drop negative MC expected P&L rows across all strategies
-    if params.get("require_nonneg_mc", False):
-        def _apply_mc_filter(df: pd.DataFrame) -> pd.DataFrame:
-            if df is None or df.empty:
-                return df
-            if 'MC_ExpectedPnL' not in df.columns:
-                return df
-            return df[(df['MC_ExpectedPnL'].isna()) | (df['MC_ExpectedPnL'] >= 0)].reset_index(drop=True)
+def run_scans_incremental(tickers, params):
+    """
+    Uncached alternative to run_scans: the session's IncrementalScanner recomputes only
+    the (ticker, expiration, strategy) blocks whose chains or parameters changed.
+    """
+    from incremental_scan import IncrementalScanner
+    scanner = st.session_state.get("incremental_scanner")
+    if scanner is None:
+        scanner = st.session_state["incremental_scanner"] = IncrementalScanner()
+    return _engine_run_scans(tickers, params, on_error=_scan_warn, scanner=scanner)
 
-        df_csp = _apply_mc_filter(df_csp)
-        df_cc = _apply_mc_filter(df_cc)
-        df_col = _apply_mc_filter(df_col)
-        df_ic = _apply_mc_filter(df_ic)
-        df_bps = _apply_mc_filter(df_bps)
-        df_bcs = _apply_mc_filter(df_bcs)
-        df_pmcc = _apply_mc_filter(df_pmcc)
-        df_synthetic_collar = _apply_mc_filter(df_synthetic_collar)
 
-    return (df_csp, df_cc, df_col, df_ic, df_bps, df_bcs,
-            df_pmcc, df_synthetic_collar, scan_counters)
+def run_scans_live(tickers, params):
+    """
+    Uncached alternative to run_scans that renders progress, ETA and a cross-strategy
+    leaderboard while tickers complete; returns the same tuple as run_scans.
+    """
+    progress = st.progress(0.0, text=f"Scanning {len(tickers)} tickers...")
+    board = st.empty()
+    seen = []
+    try:
+        for update in _engine_stream_scans(tickers, params, on_error=_scan_warn):
+            if update.result is not None:
+                return update.result
+            seen.extend(update.frames.items())
+            eta = f" · ~{update.eta:.0f}s left" if update.eta is not None else ""
+            progress.progress(update.progress, text=f"Scanned {update.done}/{update.total} ({update.ticker}){eta}")
+            if seen:
+                board.dataframe(leaderboard(seen, 25), width='stretch', hide_index=True)
+    finally:
+        progress.empty()
+        board.empty()
 
 
 # Run scans
@@ -3736,12 +3614,17 @@ if run_btn:
             earn_window=int(earn_window), risk_free=float(risk_free),
             per_contract_cap=per_contract_cap,
             bill_yield=float(t_bill_yield),
-            require_nonneg_mc=bool(require_nonneg_mc)
+            require_nonneg_mc=bool(require_nonneg_mc),
+            mc_top_k=int(mc_top_k) or None,
+            scan_ticker_timeout=int(ticker_timeout),
+            scan_profile=bool(profile_scan),
         )
         try:
             with st.spinner("Scanning..."):
                 (df_csp, df_cc, df_collar, df_iron_condor, df_bull_put_spread, df_bear_call_spread,
-                 df_pmcc, df_synthetic_collar, scan_counters) = run_scans(tickers, opts)
+                 df_pmcc, df_synthetic_collar, scan_counters) = (
+                    run_scans_incremental if incremental_scan
+                    else run_scans_live if live_scan else run_scans)(tickers, opts)
             _record_scan_end()
 
             st.session_state["df_csp"] = df_csp
@@ -3754,6 +3637,12 @@ if run_btn:
             st.session_state["df_synthetic_collar"] = df_synthetic_collar
             st.session_state["scan_counters"] = scan_counters
 
+            report = scan_counters.get("report") or {}
+            if report.get("timed_out") or report.get("cancelled"):
+                st.warning("⏱️ Timed out: " + ", ".join(report.get("timed_out", []) + report.get("cancelled", [])))
+            if report.get("degraded"):
+                st.info("⚠️ Served by a fallback data source: " + ", ".join(report["degraded"]))
+
             # Show results summary
             total_results = (len(df_csp) + len(df_cc) + len(df_pmcc) + len(df_synthetic_collar) +
                              len(df_collar) + len(df_iron_condor) + len(df_bull_put_spread) + len(df_bear_call_spread))
@@ -3971,12 +3860,44 @@ def _add_kelly_sizing(df: pd.DataFrame, strategy_type: str) -> pd.DataFrame:
     
     return df
 
+# Kelly sizing time per strategy (shown in the Scan profile expander)
+kelly_timing = {}
+
+
+def _timed_kelly_sizing(df: pd.DataFrame, strategy_type: str) -> pd.DataFrame:
+    started = time.perf_counter()
+    out = _add_kelly_sizing(df, strategy_type)
+    kelly_timing[strategy_type.lower()] = {"count": len(out), "seconds": round(time.perf_counter() - started, 6)}
+    return out
+
+
 if st.session_state.get('enable_kelly', False):
-    df_csp = _add_kelly_sizing(df_csp, 'CSP')
-    df_cc = _add_kelly_sizing(df_cc, 'CC')
-    df_iron_condor = _add_kelly_sizing(df_iron_condor, 'IRON_CONDOR')
-    df_bull_put_spread = _add_kelly_sizing(df_bull_put_spread, 'BULL_PUT_SPREAD')
-    df_bear_call_spread = _add_kelly_sizing(df_bear_call_spread, 'BEAR_CALL_SPREAD')
+    df_csp = _timed_kelly_sizing(df_csp, 'CSP')
+    df_cc = _timed_kelly_sizing(df_cc, 'CC')
+    df_iron_condor = _timed_kelly_sizing(df_iron_condor, 'IRON_CONDOR')
+    df_bull_put_spread = _timed_kelly_sizing(df_bull_put_spread, 'BULL_PUT_SPREAD')
+    df_bear_call_spread = _timed_kelly_sizing(df_bear_call_spread, 'BEAR_CALL_SPREAD')
+
+_scan_prof = (st.session_state.get("scan_counters") or {}).get("profile")
+if _scan_prof:
+    with st.expander("⏱️ Scan profile", expanded=False):
+        st.caption(f"Wall time {(_scan_prof.get('wall_seconds') or 0.0):.2f}s. Stages overlap "
+                   "(requests run inside fetches; MC and scoring inside analyzers), so they don't sum to wall time.")
+        st.markdown("**By stage**")
+        st.dataframe(profile_frame(_scan_prof, "stages"), width='stretch', hide_index=True)
+        st.markdown("**By strategy** (filter = analyzer time excluding chain fetches, MC and scoring)")
+        _by_strategy = profile_frame(_scan_prof, "strategies")
+        if kelly_timing:
+            _by_strategy = pd.concat([_by_strategy, pd.DataFrame(
+                [{"strategy": k, "stage": "kelly", **v} for k, v in kelly_timing.items()])], ignore_index=True)
+        st.dataframe(_by_strategy, width='stretch', hide_index=True)
+        st.markdown("**By provider** (network round trips)")
+        st.dataframe(profile_frame(_scan_prof, "providers"), width='stretch', hide_index=True)
+        st.markdown("**By ticker**")
+        st.dataframe(profile_frame(_scan_prof, "tickers"), width='stretch', hide_index=True)
+        st.download_button("Download profile (JSON)",
+                           data=json.dumps(dict(_scan_prof, kelly=kelly_timing), indent=2),
+                           file_name="scan_profile.json", mime="application/json")
 
 # Apply expiration safety filtering
 allow_nonstandard = st.session_state.get("allow_nonstandard", False)
@@ -4532,10 +4453,17 @@ with tabs[0]:
             with col3:
                 var_method = st.selectbox(
                     "Method",
-                    options=['historical', 'parametric'],
+                    options=['historical', 'parametric', 'monte_carlo'],
                     index=0,
-                    format_func=lambda x: x.title()
+                    format_func=lambda x: x.replace('_', ' ').title(),
+                    help="Monte Carlo simulates correlated spot and implied-vol shocks over the whole horizon"
                 )
+            var_paths = 20000
+            if var_method == 'monte_carlo':
+                var_paths = int(st.number_input(
+                    "Monte Carlo paths", min_value=1000, max_value=500000, value=20000, step=5000,
+                    help="More paths = more stable tail estimate; simulated in memory-bounded chunks"
+                ))
             
             # Fetch historical prices for VaR calculation
             if st.button("🔢 Calculate VaR", help="Fetch historical data and calculate portfolio VaR"):
@@ -4548,56 +4476,25 @@ with tabs[0]:
                             st.warning("No symbols found in portfolio")
                             st.stop()
                         
-                        # Fetch historical prices (252 trading days ~= 1 year)
-                        import yfinance as yf
+                        # ~1 year of dividend-adjusted closes (252 trading days) from the local
+                        # price store; only sessions missing since the last run are downloaded
                         from datetime import timedelta
+                        from price_store import get_price_store
                         
-                        end_date = datetime.now()
-                        start_date = end_date - timedelta(days=365)
-                        
-                        # Download data
-                        data = yf.download(
-                            symbols,
-                            start=start_date,
-                            end=end_date,
-                            progress=False
-                        )
+                        start_date = datetime.now().date() - timedelta(days=365)
+                        hist_prices = get_price_store().closes(symbols, start=start_date)
                         
-                        # Handle different yfinance return formats
-                        if data.empty:
+                        if hist_prices.empty:
                             st.error("No historical data retrieved")
                             st.stop()
                         
-                        # Check if columns are MultiIndex
-                        if isinstance(data.columns, pd.MultiIndex):
-                            # MultiIndex format: extract Adj Close level
-                            if 'Adj Close' in data.columns.get_level_values(0):
-                                hist_prices = data.xs('Adj Close', level=0, axis=1)
-                            else:
-                                # Try Close as fallback
-                                hist_prices = data.xs('Close', level=0, axis=1)
-                        else:
-                            # Simple columns format
-                            if 'Adj Close' in data.columns:
-                                hist_prices = data[['Adj Close']]
-                                hist_prices.columns = symbols
-                            elif 'Close' in data.columns:
-                                hist_prices = data[['Close']]
-                                hist_prices.columns = symbols
-                            else:
-                                st.error(f"Cannot find price data. Available columns: {data.columns.tolist()}")
-                                st.stop()
-                        
-                        # Ensure we have a DataFrame
-                        if isinstance(hist_prices, pd.Series):
-                            hist_prices = hist_prices.to_frame()
-                        
                         # Calculate VaR
                         var_result = portfolio_mgr.calculate_var(
                             historical_prices=hist_prices,
                             confidence_level=confidence_level,
                             time_horizon_days=time_horizon,
-                            method=var_method
+                            method=var_method,
+                            n_paths=var_paths
                         )
                         
                         if var_result:
@@ -4652,7 +4549,7 @@ with tabs[0]:
                 tail_prob = 100 - confidence_pct
                 
                 st.info(f"""
-                **Interpretation ({var_result.method.title()} Method):**
+                **Interpretation ({var_result.method.replace('_', ' ').title()} Method):**
                 
                 There is a **{tail_prob:.0f}% chance** of losing more than **${var_result.var_amount:,.2f}** 
                 ({var_result.var_percent:.2f}% of portfolio) over the next **{var_result.time_horizon_days} day(s)**.
@@ -4682,35 +4579,48 @@ with tabs[0]:
                             else:
                                 st.caption("✅ Normal tail behavior")
                 
-                # Position contributions if available
-                if var_result.position_contributions:
-                    with st.expander("🎯 Risk Attribution by Position"):
-                        contrib_data = []
-                        total_value = sum(abs(v) for v in var_result.position_contributions.values())
+                # Component / incremental VaR attribution if available
+                if getattr(var_result, 'attribution', None) is not None:
+                    with st.expander("🎯 Risk Attribution (Component VaR)"):
+                        st.caption(
+                            "Component VaR: each leg's share of VaR (sums to VaR). "
+                            "Marginal VaR: VaR change per additional share/contract. "
+                            "Incremental VaR: VaR reduction from closing the leg or group. "
+                            "Tail Loss: expected loss beyond VaR (sums to CVaR)."
+                        )
                         
-                        for symbol, value in sorted(
-                            var_result.position_contributions.items(),
-                            key=lambda x: abs(x[1]),
-                            reverse=True
-                        ):
-                            pct = (abs(value) / total_value * 100) if total_value > 0 else 0
-                            contrib_data.append({
-                                'Symbol': symbol,
-                                'Value': f"${value:,.2f}",
-                                'Weight': f"{pct:.1f}%"
+                        def _attribution_view(df, index_name):
+                            view = df.sort_values('component_var', key=abs, ascending=False)
+                            view = view.rename(columns={
+                                'symbol': 'Symbol', 'strategy': 'Strategy', 'quantity': 'Qty',
+                                'positions': 'Positions', 'component_var': 'Component VaR',
+                                'pct_of_var': '% of VaR', 'marginal_var': 'Marginal VaR',
+                                'incremental_var': 'Incremental VaR', 'component_cvar': 'Tail Loss (CVaR)',
                             })
+                            view = view.rename_axis(index_name).reset_index()
+                            for col in ['Component VaR', 'Marginal VaR', 'Incremental VaR', 'Tail Loss (CVaR)']:
+                                if col in view:
+                                    view[col] = view[col].map(lambda v: f"${v:,.2f}" if pd.notna(v) else "N/A")
+                            view['% of VaR'] = view['% of VaR'].map(lambda v: f"{v:.1f}%" if pd.notna(v) else "N/A")
+                            return view
                         
-                        st.dataframe(
-                            pd.DataFrame(contrib_data),
-                            width='stretch',
-                            hide_index=True
-                        )
+                        attr = var_result.attribution
+                        tab_und, tab_leg, tab_strat = st.tabs(["By Underlying", "By Position", "By Strategy"])
+                        with tab_und:
+                            st.dataframe(_attribution_view(attr.by_underlying, 'Underlying'),
+                                         width='stretch', hide_index=True)
+                        with tab_leg:
+                            st.dataframe(_attribution_view(attr.by_position.drop(columns=['symbol']), 'Position'),
+                                         width='stretch', hide_index=True)
+                        with tab_strat:
+                            st.dataframe(_attribution_view(attr.by_strategy, 'Strategy'),
+                                         width='stretch', hide_index=True)
             
             st.divider()
             
             # Greeks by underlying
             st.subheader("Greeks by Underlying")
-            greeks_df = portfolio_mgr.get_greeks_by_underlying()
+            greeks_df = portfolio_mgr.get_greeks_by_underlying(_ss_get('var_result', None))
             if not greeks_df.empty:
                 st.dataframe(greeks_df, width='stretch', hide_index=True)
             
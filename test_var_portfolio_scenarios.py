@@ -361,10 +361,12 @@ def test_case_10_mixed_portfolio():
     # Total portfolio: ~$46,000
     # SPY position hedged, NVDA calls add speculative exposure
     # VaR should reflect hedged downside on SPY but full loss potential on NVDA calls
+    # Premiums imply ~14% IV on the put (delta ≈ -0.3) and ~20% on the calls, so the
+    # put offsets a good part of the stock's ~$1,180 VaR: ~$700-$750 overall
     return VaRTestCase(
         name="Mixed Portfolio",
         positions=positions,
-        expected_var_range=(800, 1800),
+        expected_var_range=(500, 1100),
         description="Hedged stock + speculative calls. VaR < unhedged stock"
     )
 
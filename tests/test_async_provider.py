@@ -0,0 +1,107 @@
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from providers.async_provider import fetch_chains
+from providers.rate_limit import (CircuitBreaker, CircuitOpenError, TokenBucket, call_with_retry,
+                                  get_rate_limiter, reset_rate_limiters)
+
+
+class _FakeProvider:
+    """Sync provider that records peak concurrency and fails one chain."""
+
+    def __init__(self, delay=0.02):
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def chain_snapshot_df(self, symbol, expiration):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            time.sleep(self.delay)
+            if symbol == "BAD":
+                raise ValueError("no chain")
+            return pd.DataFrame({"symbol": [symbol], "expiration": [expiration]})
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+def test_token_bucket_paces_after_burst():
+    bucket = TokenBucket(rate=50.0, burst=2)
+    start = time.monotonic()
+    for _ in range(7):
+        bucket.acquire()
+    # 2 from the burst, then 5 at 50/s -> ~0.1s
+    assert time.monotonic() - start >= 0.08
+
+
+def test_rate_limiter_env_override(monkeypatch):
+    monkeypatch.setenv("SCHWAB_RATE_LIMIT", "120/min")
+    reset_rate_limiters()
+    try:
+        bucket = get_rate_limiter("schwab")
+        assert bucket.rate == pytest.approx(2.0)
+        assert get_rate_limiter("SCHWAB") is bucket
+    finally:
+        reset_rate_limiters()
+
+
+def test_call_with_retry_retries_rate_limit_only():
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise RuntimeError("HTTP 429 Too Many Requests")
+        return "ok"
+
+    assert call_with_retry(flaky, retries=3, base_delay=0.001) == "ok"
+    assert len(calls) == 3
+
+    def broken():
+        calls.append(1)
+        raise ValueError("bad symbol")
+
+    calls.clear()
+    with pytest.raises(ValueError):
+        call_with_retry(broken, retries=3, base_delay=0.001)
+    assert len(calls) == 1
+
+
+def test_circuit_breaker_opens_then_probes():
+    breaker = CircuitBreaker(threshold=2, window=60.0, cooldown=0.05)
+    calls = []
+
+    def down():
+        calls.append(1)
+        raise ValueError("401 Unauthorized")
+
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            call_with_retry(down, retries=3, base_delay=0.001, breaker=breaker)
+    assert len(calls) == 2 and breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        call_with_retry(down, breaker=breaker)
+    assert len(calls) == 2  # no request while open
+
+    time.sleep(0.06)
+    assert breaker.state == "half_open"
+    assert call_with_retry(lambda: "ok", breaker=breaker) == "ok"
+    assert breaker.state == "closed"
+
+
+def test_fetch_chains_fans_out_with_cap():
+    prov = _FakeProvider()
+    requests = {"AAA": ["2030-01-18", "2030-02-15"], "BBB": ["2030-01-18"], "BAD": ["2030-01-18"]}
+    out = fetch_chains(prov, requests, max_concurrency=2)
+
+    assert set(out) == {("AAA", "2030-01-18"), ("AAA", "2030-02-15"), ("BBB", "2030-01-18"), ("BAD", "2030-01-18")}
+    assert isinstance(out[("BAD", "2030-01-18")], ValueError)
+    assert out[("AAA", "2030-02-15")]["expiration"].iloc[0] == "2030-02-15"
+    assert prov.peak <= 2
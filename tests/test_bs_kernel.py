@@ -0,0 +1,87 @@
+import math
+
+import numpy as np
+
+import options_math as om
+from risk_metrics import var_calculator as vc
+
+
+def _grid():
+    rng = np.random.default_rng(11)
+    n = 300
+    S = rng.uniform(20.0, 200.0, n)
+    K = S * rng.uniform(0.6, 1.4, n)
+    sigma = rng.uniform(0.05, 1.2, n)
+    T = rng.uniform(1.0 / 365.0, 2.0, n)
+    q = rng.uniform(0.0, 0.04, n)
+    # invalid inputs must fall back exactly like the scalar helpers
+    sigma[::23] = 0.0
+    T[::29] = 0.0
+    K[::31] = np.nan
+    return S, K, sigma, T, q
+
+
+def _same(a, b, tol=1e-10):
+    return (a != a and b != b) or math.isclose(a, b, rel_tol=tol, abs_tol=1e-12)
+
+
+def test_bs_greeks_matches_scalar_helpers():
+    S, K, sigma, T, q = _grid()
+    r = 0.045
+    g = om.bs_greeks(S, K, r, sigma, np.maximum(T, 1e-6), q)
+    gt = om.bs_greeks(S, K, r, sigma, T, q)
+    for i in range(len(S)):
+        args = (S[i], K[i], r, sigma[i], T[i], q[i])
+        assert _same(g["call_price"][i], om.bs_call_price(S[i], K[i], r, q[i], sigma[i], T[i]))
+        assert _same(g["put_price"][i], om.bs_put_price(S[i], K[i], r, q[i], sigma[i], T[i]))
+        assert _same(gt["call_delta"][i], om.call_delta(*args))
+        assert _same(gt["put_delta"][i], om.put_delta(*args))
+        assert _same(gt["gamma"][i], om.option_gamma(*args))
+        assert _same(gt["vega"][i], om.option_vega(*args))
+        assert _same(gt["call_theta"][i], om.call_theta(*args))
+        assert _same(gt["put_theta"][i], om.put_theta(*args))
+
+
+def test_bs_greeks_broadcasts_scalars_and_grids():
+    g = om.bs_greeks(100.0, 95.0, 0.03, 0.25, 0.5)
+    assert g["call_price"].shape == ()
+    assert math.isclose(float(g["call_price"]), om.bs_call_price(100.0, 95.0, 0.03, 0.0, 0.25, 0.5), rel_tol=1e-12)
+
+    S = np.linspace(80.0, 120.0, 5)[:, None]
+    K = np.array([90.0, 100.0, 110.0])[None, :]
+    g = om.bs_greeks(S, K, 0.03, 0.25, 0.5)
+    assert g["put_price"].shape == (5, 3)
+    # put-call parity holds across the whole grid
+    parity = g["call_price"] - g["put_price"] - (S - K * math.exp(-0.03 * 0.5))
+    assert np.allclose(parity, 0.0, atol=1e-10)
+
+
+def test_var_calculator_scalar_pricers_agree_with_kernel():
+    S = np.array([80.0, 100.0, 120.0])
+    for T in (0.0, 1.0 / 252.0, 0.25):
+        g = om.bs_greeks(S, 100.0, 0.03, 0.3, T)
+        for i, s in enumerate(S):
+            assert math.isclose(g["call_price"][i], vc._bs_call_price(s, 100.0, T, 0.03, 0.3), rel_tol=1e-9, abs_tol=1e-12)
+            assert math.isclose(g["put_price"][i], vc._bs_put_price(s, 100.0, T, 0.03, 0.3), rel_tol=1e-9, abs_tol=1e-12)
+
+
+def test_implied_vol_vec_round_trips_and_flags_bad_quotes():
+    S, K, sigma, T, q = _grid()
+    is_call = np.arange(len(S)) % 2 == 0
+    price = om.bs_price_vec(S, K, 0.045, sigma, T, is_call, q)
+    iv, converged = om.implied_vol_vec(price, S, K, T, 0.045, q, is_call)
+    assert iv.shape == converged.shape == S.shape
+
+    vega = om.bs_greeks(S, K, 0.045, sigma, T, q)["vega"]
+    identified = (vega > 1e-4) & (sigma > 0) & (T > 0) & np.isfinite(K)
+    assert converged[identified].all()
+    np.testing.assert_allclose(iv[identified], sigma[identified], atol=1e-5)
+    repriced = om.bs_price_vec(S, K, 0.045, iv, T, is_call, q)
+    assert np.abs(repriced - price)[converged].max() < 1e-7
+    assert not converged[T == 0].any() and np.isnan(iv[T == 0]).all()
+
+    # below intrinsic, non-positive price, scalar in / 0-d out
+    iv, ok = om.implied_vol_vec([0.5, 0.0, 10.0], 100.0, 110.0, 0.1, 0.0, 0.0, [False, False, True])
+    assert np.isnan(iv[:2]).all() and ok.tolist() == [False, False, True]
+    iv, ok = om.implied_vol_vec(10.0, 100.0, 100.0, 0.5)
+    assert iv.shape == () and ok and abs(om.bs_call_price(100.0, 100.0, 0.0, 0.0, float(iv), 0.5) - 10.0) < 1e-8
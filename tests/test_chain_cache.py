@@ -0,0 +1,81 @@
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import chain_cache
+import strategy_analysis as sa
+import data_fetching as df
+
+
+@pytest.fixture
+def cache_env(monkeypatch, tmp_path):
+    monkeypatch.setenv("CHAIN_CACHE_DIR", str(tmp_path))
+    monkeypatch.setenv("CHAIN_CACHE_TTL", "300")
+    monkeypatch.setenv("CHAIN_CACHE_MODE", "readwrite")
+    return monkeypatch
+
+
+def _frame():
+    return pd.DataFrame({"type": ["call", "put"], "strike": [100.0, 95.0], "bid": [1.0, np.nan],
+                         "openInterest": [10, 20]})
+
+
+def test_readwrite_persists_across_processes_then_replays_offline(cache_env):
+    calls = []
+
+    def _fetch(symbol, expiration):
+        calls.append(expiration)
+        return _frame()
+
+    fetch = chain_cache.disk_cached("chain", provider="test")(_fetch)
+    first = fetch("xyz", "2030-01-18")
+    again = fetch("xyz", "2030-01-18")  # e.g. after a restart: served from disk
+    assert calls == ["2030-01-18"]
+    pd.testing.assert_frame_equal(first, again)
+
+    cache_env.setenv("CHAIN_CACHE_MODE", "replay")
+    pd.testing.assert_frame_equal(fetch("xyz", "2030-01-18"), first)
+    with pytest.raises(chain_cache.ReplayMiss):
+        fetch("xyz", "2030-02-15")
+    assert calls == ["2030-01-18"]
+
+
+def test_ttl_buckets_and_uncacheable_values(cache_env):
+    assert chain_cache.store("price", "p", "XYZ", "", 101.5, now=1000.0)
+    assert chain_cache.load("price", "p", "XYZ", now=1100.0) == 101.5
+    assert chain_cache.load("price", "p", "XYZ", now=1000.0 + 300.0) is None  # next bucket
+    assert not chain_cache.store("price", "p", "ABC", "", float("nan"))
+    assert not chain_cache.store("chain", "p", "ABC", "e", pd.DataFrame())
+
+    cache_env.setenv("CHAIN_CACHE_MODE", "off")
+    assert chain_cache.load("price", "p", "XYZ", now=1100.0) is None
+
+
+def test_missing_pyarrow_warns_instead_of_silently_skipping_chains(cache_env):
+    cache_env.setitem(sys.modules, "pyarrow", None)
+    with pytest.warns(RuntimeWarning, match="pyarrow"):
+        assert not chain_cache.store("chain", "p", "XYZ", "e", _frame())
+    assert chain_cache.store("price", "p", "XYZ", "", 101.5)
+
+
+def test_snapshot_metadata_replays_without_network(cache_env):
+    n = {"divs": 0}
+
+    def _divs(stock, S):
+        n["divs"] += 1
+        return (1.0, 0.01)
+
+    cache_env.setattr(df, "fetch_price", lambda t: 100.0)
+    cache_env.setattr(df, "fetch_expirations", lambda t: ["2030-01-18"])
+    cache_env.setattr(df, "estimate_next_ex_div", lambda stock: (pd.Timestamp("2030-01-05").date(), 0.25))
+    cache_env.setattr(sa, "trailing_dividend_info", _divs)
+    cache_env.setattr(sa, "get_earnings_date_cached", lambda t: pd.Timestamp("2030-01-10"))
+
+    live = sa.fetch_market_snapshot("XYZ")
+    cache_env.setenv("CHAIN_CACHE_MODE", "replay")
+    replayed = sa.fetch_market_snapshot("XYZ")
+    assert n["divs"] == 1
+    assert replayed.next_ex_div == live.next_ex_div and replayed.div_y == 0.01
+    assert str(replayed.earnings_date) == "2030-01-10"
@@ -0,0 +1,138 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+import options_math as om
+import utils
+from chain_eval import StrikeIndex, normalize_chain, evaluate_chain, first_index_near, spread_pct_array, spread_widths
+
+
+def _quotes():
+    rng = np.random.default_rng(7)
+    n = 200
+    bid = rng.uniform(0.0, 5.0, n)
+    ask = bid + rng.uniform(-0.2, 1.5, n)  # includes crossed markets
+    bid[::17] = np.nan
+    last = rng.uniform(0.0, 6.0, n)
+    last[::11] = np.nan
+    oi = rng.integers(0, 5000, n).astype(float)
+    oi[::13] = np.nan
+    vol = rng.integers(0, 2000, n).astype(float)
+    return bid, ask, last, oi, vol
+
+
+def test_fill_arrays_match_scalar():
+    bid, ask, last, oi, vol = _quotes()
+    oi_i = utils._int_like_array(oi)
+    for preset in (None, "conservative", "aggressive"):
+        for dte in (3, 30):
+            cr = utils.effective_credit_array(bid, ask, last, oi=oi_i, volume=vol, dte=dte, aggressiveness=preset)
+            db = utils.effective_debit_array(bid, ask, last, oi=oi_i, volume=vol, dte=dte, aggressiveness=preset)
+            for i in range(len(bid)):
+                o = utils._safe_int(oi[i], 0)
+                v = int(vol[i])
+                c = utils.effective_credit(bid[i], ask[i], last[i], oi=o, volume=v, dte=dte, aggressiveness=preset)
+                d = utils.effective_debit(bid[i], ask[i], last[i], oi=o, volume=v, dte=dte, aggressiveness=preset)
+                assert (c != c and cr[i] != cr[i]) or math.isclose(c, cr[i], rel_tol=1e-12)
+                assert (d != d and db[i] != db[i]) or math.isclose(d, db[i], rel_tol=1e-12)
+
+
+def test_fill_price_table_matches_fill_arrays():
+    bid, ask, last, oi, vol = _quotes()
+    oi_i = utils._int_like_array(oi)
+    tbl = utils.fill_price_table(bid, ask, last, oi=oi_i, volume=vol, dte=5, aggressiveness="aggressive")
+    kw = dict(oi=oi_i, volume=vol, dte=5, aggressiveness="aggressive")
+    np.testing.assert_array_equal(tbl["credit_fill"], utils.effective_credit_array(bid, ask, last, **kw))
+    np.testing.assert_array_equal(tbl["debit_fill"], utils.effective_debit_array(bid, ask, last, **kw))
+    np.testing.assert_array_equal(tbl["alpha"], utils.dynamic_alpha_array(bid, ask, **kw))
+
+
+def test_spread_pct_array_matches_scalar():
+    bid, ask, last, _, _ = _quotes()
+    sp = spread_pct_array(bid, ask, last)
+    for i in range(len(bid)):
+        ref = om.compute_spread_pct(bid[i], ask[i], last[i])
+        assert (ref is None and np.isnan(sp[i])) or math.isclose(ref, sp[i], rel_tol=1e-12)
+
+
+def test_normalize_chain_coalesces_provider_columns():
+    raw = pd.DataFrame({
+        "type": ["PUT", "call", "put"],
+        "strike": [95.0, 105.0, np.nan],
+        "Strike": [np.nan, np.nan, 90.0],
+        "bid": [1.0, 2.0, 0.5],
+        "ask": [1.2, 2.4, 0.7],
+        "last": [1.1, np.nan, 0.6],
+        "mark": [9.9, 2.2, 9.9],
+        "oi": [100, None, 300],
+        "impliedVolatility": [25.0, 0.3, np.nan],
+    })
+    puts = normalize_chain(raw, right="put")
+    assert list(puts["strike"]) == [95.0, 90.0]
+    assert list(puts["last"]) == [1.1, 0.6]
+    assert math.isclose(puts["iv"].iloc[0], 0.25)
+    assert np.isnan(puts["iv"].iloc[1])
+    assert np.isnan(puts["volume"]).all()
+
+    calls = normalize_chain(raw, right="call")
+    assert calls["last"].iloc[0] == 2.2
+    assert np.isnan(calls["oi"].iloc[0])
+
+
+def test_evaluate_chain_matches_scalar_greeks():
+    S, r, q, D = 100.0, 0.04, 0.01, 30
+    T = D / 365.0
+    strikes = np.arange(70.0, 131.0, 2.5)
+    ivs = np.linspace(0.15, 0.6, len(strikes))
+    ivs[3] = np.nan
+    raw = pd.DataFrame({"strike": strikes, "bid": 1.0, "ask": 1.1, "lastPrice": 1.05,
+                        "openInterest": 1000, "volume": 100, "impliedVolatility": ivs})
+    for right in ("put", "call"):
+        ev = evaluate_chain(normalize_chain(raw), S=S, T=T, r=r, q=q, right=right, dte=D)
+        for i, K in enumerate(strikes):
+            sig = ev["iv_calc"].iat[i]
+            if i == 3:
+                # missing IV is implied from the 1.05 mid (OTM put); the ITM call's mid is
+                # below intrinsic, so it keeps the 0.20 default
+                implied, ok = om.implied_vol_vec(1.05, S, K, T, r, q, right == "call")
+                assert bool(ok) == (right == "put")
+                assert sig == (float(implied) if ok else 0.20)
+                assert not ok or abs(om.bs_put_price(S, K, r, q, sig, T) - 1.05) < 1e-7
+            else:
+                assert sig == ivs[i]
+            d1, d2 = om._bs_d1_d2(S, K, r, sig, T, q)
+            assert math.isclose(ev["d2"].iat[i], d2, rel_tol=1e-12, abs_tol=1e-12)
+            assert math.isclose(ev["gamma"].iat[i], om.option_gamma(S, K, r, sig, T, q), rel_tol=1e-10)
+            if right == "put":
+                assert math.isclose(ev["delta"].iat[i], om.put_delta(S, K, r, sig, T, q), rel_tol=1e-10, abs_tol=1e-12)
+                assert math.isclose(ev["theta"].iat[i], om.put_theta(S, K, r, sig, T, q), rel_tol=1e-10, abs_tol=1e-12)
+            else:
+                assert math.isclose(ev["delta"].iat[i], om.call_delta(S, K, r, sig, T, q), rel_tol=1e-10, abs_tol=1e-12)
+                assert math.isclose(ev["theta"].iat[i], om.call_theta(S, K, r, sig, T, q), rel_tol=1e-10, abs_tol=1e-12)
+
+
+def test_first_index_near():
+    strikes = np.array([np.nan, 85.0, 90.0, 90.25, 95.0])
+    assert first_index_near(strikes, 90.0) == 2
+    assert first_index_near(strikes, 0.2) == 0  # missing strikes are treated as 0 (legacy lookup)
+    assert first_index_near(strikes, 100.0) is None
+
+
+def test_strike_index_matches_first_index_near():
+    rng = np.random.default_rng(3)
+    strikes = np.concatenate([np.arange(50.0, 150.0, 2.5), np.arange(80.0, 120.0, 0.5), [np.nan, 90.25]])
+    rng.shuffle(strikes)
+    idx = StrikeIndex(strikes)
+    targets = np.concatenate([rng.uniform(40.0, 160.0, 300), np.arange(50.0, 150.0, 2.5), [0.2, np.nan]])
+    found = idx.find(targets[:, None] - np.array([1.0, 2.5, 5.0])[None, :])
+    assert found.shape == (len(targets), 3)
+    for i, t in enumerate(targets):
+        for j, w in enumerate((1.0, 2.5, 5.0)):
+            ref = first_index_near(strikes, t - w)
+            assert found[i, j] == (-1 if ref is None else ref)
+
+
+def test_spread_widths():
+    assert spread_widths(5).tolist() == [5.0]
+    assert spread_widths([5, 1, 2.5, 5, 0, -1, 10]).tolist() == [5.0, 1.0, 2.5, 10.0]
@@ -0,0 +1,121 @@
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+
+import strategy_analysis as sa
+import data_fetching as df
+import scan_engine
+from incremental_scan import IncrementalScanner
+
+_KEY = ["Ticker", "Exp", "Strike", "SellStrike", "BuyStrike", "CallStrike", "PutStrike"]
+
+
+def _make_exp(days):
+    return (datetime.now(timezone.utc).date() + timedelta(days=days)).strftime("%Y-%m-%d")
+
+
+def _chain(S, skew=0.0):
+    rows = []
+    for K in np.arange(round(S * 0.6), S * 1.4, 2.5):
+        for typ in ("call", "put"):
+            itm = (S - K) if typ == "call" else (K - S)
+            mid = max(itm, 0.0) + 0.02 * S * np.exp(-abs(K - S) / (0.1 * S)) + 0.05 + skew
+            half = 0.01 + 0.002 * abs(K - S)  # spread% varies across strikes
+            rows.append({"type": typ, "strike": float(K), "bid": round(mid - half, 2), "ask": round(mid + half, 2),
+                         "lastPrice": mid, "openInterest": 2000, "volume": 500, "impliedVolatility": 0.35})
+    return pd.DataFrame(rows)
+
+
+def _setup(monkeypatch, exps, chains):
+    monkeypatch.setattr(df, "fetch_price", lambda t: 100.0)
+    monkeypatch.setattr(df, "fetch_expirations", lambda t: exps)
+    monkeypatch.setattr(df, "fetch_chain", lambda t, e: chains[e].copy())
+    monkeypatch.setattr(df, "estimate_next_ex_div", lambda stock: (None, 0.0))
+    monkeypatch.setattr(sa, "trailing_dividend_info", lambda stock, S: (0.0, 0.0))
+    monkeypatch.setattr(sa, "get_earnings_date_cached", lambda t: None)
+    monkeypatch.setenv("SCAN_MC_PATHS", "100")
+
+
+def _params(**kw):
+    params = dict(scan_engine.DEFAULT_SCAN_PARAMS, min_oi=0, max_spread=100.0, min_poew=0.0, min_cushion=0.0,
+                  min_roi_csp=0.0, min_otm_csp=0.0, min_roi_cc=0.0, min_otm_cc=0.0, cs_min_roi=0.0,
+                  ic_min_roi=0.0, ic_min_cushion=0.0, require_nonneg_mc=False, scan_executor="thread")
+    params.update(kw)
+    return params
+
+
+def _same(a, b):
+    assert len(a) == len(b)
+    if a.empty:
+        return
+    key = [c for c in _KEY if c in a.columns]
+    a = a.sort_values(key).reset_index(drop=True)
+    b = b.sort_values(key).reset_index(drop=True)
+    pd.testing.assert_frame_equal(a[b.columns], b)
+
+
+def test_incremental_matches_full_scan_and_reuses_blocks(monkeypatch):
+    exps = [_make_exp(d) for d in (14, 35)]
+    chains = {e: _chain(100.0) for e in exps}
+    _setup(monkeypatch, exps, chains)
+    scanner = IncrementalScanner()
+    params = _params()
+
+    first = scan_engine.run_scans(["AAA"], params, scanner=scanner)
+    full = scan_engine.run_scans(["AAA"], params)
+    for a, b in zip(first[:8], full[:8]):
+        _same(a, b)
+    assert first[-1] == full[-1]
+    computed = scanner.stats["computed"]
+    assert computed == 5 * len(exps) + 3
+
+    # Nothing changed: every block reused
+    scan_engine.run_scans(["AAA"], params, scanner=scanner)
+    assert scanner.stats["computed"] == computed
+
+    # One expiration's quotes move: only its blocks (and the cross-expiration strategies) rerun
+    chains[exps[1]] = _chain(100.0, skew=0.05)
+    again = scan_engine.run_scans(["AAA"], params, scanner=scanner)
+    assert scanner.stats["computed"] == computed + 5 + 3
+    for a, b in zip(again[:8], scan_engine.run_scans(["AAA"], params)[:8]):
+        _same(a, b)
+
+
+def test_tightening_row_filters_refilters_cached_rows(monkeypatch):
+    exps = [_make_exp(d) for d in (14, 35)]
+    chains = {e: _chain(100.0) for e in exps}
+    _setup(monkeypatch, exps, chains)
+    scanner = IncrementalScanner()
+    scan_engine.run_scans(["AAA"], _params(), scanner=scanner)
+    computed = scanner.stats["computed"]
+
+    tight = _params(max_spread=8.0, min_days=20)
+    out = scan_engine.run_scans(["AAA"], tight, scanner=scanner)
+    # CSP/credit spreads re-filter; collar and condor pick legs after filtering and CC's
+    # block spans the DTE window -> recompute
+    assert scanner.stats["refiltered"] == 3
+    assert scanner.stats["computed"] == computed + 2 + 3
+    full = scan_engine.run_scans(["AAA"], tight)
+    assert len(out[0]) < len(scan_engine.run_scans(["AAA"], _params())[0])
+    for a, b in zip(out[:8], full[:8]):
+        _same(a, b)
+
+
+def test_cc_relaxed_retry_matches_full_scan(monkeypatch):
+    # Only the near expiration clears min_roi_cc; a per-expiration scan would relax the far one
+    exps = [_make_exp(d) for d in (14, 35)]
+    chains = {exps[0]: _chain(100.0, skew=1.5), exps[1]: _chain(100.0)}
+    _setup(monkeypatch, exps, chains)
+    scanner = IncrementalScanner()
+    params = _params(min_roi_cc=0.5, min_oi=100)
+
+    inc = scan_engine.run_scans(["AAA"], params, scanner=scanner)
+    full = scan_engine.run_scans(["AAA"], params)
+    assert not full[1].empty
+    _same(inc[1], full[1])
+
+    # Tightening OI can empty the strict result and trigger the relaxed retry: recompute
+    tight = dict(params, min_oi=5000)
+    inc = scan_engine.run_scans(["AAA"], tight, scanner=scanner)
+    _same(inc[1], scan_engine.run_scans(["AAA"], tight)[1])
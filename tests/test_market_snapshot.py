@@ -0,0 +1,155 @@
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+
+import strategy_analysis as sa
+import data_fetching as df
+from chain_eval import evaluate_chain
+from market_snapshot import MarketSnapshot
+
+
+def _make_exp(days):
+    return (datetime.now(timezone.utc).date() + timedelta(days=days)).strftime("%Y-%m-%d")
+
+
+def _chain(S):
+    rows = []
+    for K in np.arange(S * 0.6, S * 1.4, 2.5):
+        for typ in ("call", "put"):
+            itm = (S - K) if typ == "call" else (K - S)
+            mid = max(itm, 0.0) + 1.5
+            rows.append({"type": typ, "strike": float(K), "bid": mid - 0.05, "ask": mid + 0.05,
+                         "last": mid, "openInterest": 2000, "volume": 500, "impliedVolatility": 0.30})
+    return pd.DataFrame(rows)
+
+
+def test_snapshot_fetches_each_chain_once_across_analyzers(monkeypatch):
+    S = 100.0
+    exps = [_make_exp(d) for d in (10, 30, 45, 200, 300)]
+    calls = {"price": 0, "expirations": 0, "dividends": 0, "chain": []}
+
+    def _price(t):
+        calls["price"] += 1
+        return S
+
+    def _exps(t):
+        calls["expirations"] += 1
+        return exps
+
+    def _divs(stock, px):
+        calls["dividends"] += 1
+        return (0.0, 0.0)
+
+    def _fetch_chain(t, e):
+        calls["chain"].append(e)
+        return _chain(S)
+
+    monkeypatch.setattr(df, "fetch_price", _price)
+    monkeypatch.setattr(df, "fetch_expirations", _exps)
+    monkeypatch.setattr(df, "fetch_chain", _fetch_chain)
+    monkeypatch.setattr(df, "estimate_next_ex_div", lambda stock: (None, 0.0))
+    monkeypatch.setattr(sa, "trailing_dividend_info", _divs)
+    monkeypatch.setattr(sa, "get_earnings_date_cached", lambda t: None)
+    monkeypatch.setenv("SCAN_MC_PATHS", "50")
+
+    snap = sa.fetch_market_snapshot("TEST")
+    assert snap.spot == S and snap.expirations == tuple(exps)
+
+    common = dict(min_oi=0, max_spread=100.0, earn_window=0, risk_free=0.0, snapshot=snap)
+    sa.analyze_csp("TEST", days_limit=60, min_otm=0.0, min_roi=0.0, min_cushion=0.0, min_poew=0.0, **common)
+    sa.analyze_cc("TEST", days_limit=60, min_otm=0.0, min_roi=0.0, **common)
+    sa.analyze_collar("TEST", days_limit=60, call_delta_target=0.3, put_delta_target=-0.3, **common)
+    sa.analyze_iron_condor("TEST", days_limit=60, min_roi=0.0, min_cushion=0.0, **common)
+    sa.analyze_bull_put_spread("TEST", days_limit=60, min_roi=0.0, min_cushion=0.0, min_poew=0.0, **common)
+    sa.analyze_bear_call_spread("TEST", days_limit=60, min_roi=0.0, min_cushion=0.0, min_poew=0.0, **common)
+    sa.analyze_pmcc("TEST", **common)
+    sa.analyze_synthetic_collar("TEST", **common)
+
+    assert calls["price"] == 1 and calls["expirations"] == 1 and calls["dividends"] == 1
+    assert sorted(calls["chain"]) == sorted(set(calls["chain"]))
+    assert snap.chains_loaded == len(calls["chain"])
+
+
+def _skewed_chain(S):
+    rows = []
+    for K in np.arange(S * 0.6, S * 1.4, 2.5):
+        for typ in ("call", "put"):
+            itm = (S - K) if typ == "call" else (K - S)
+            mid = max(itm, 0.0) + 0.03 * S * np.exp(-abs(K - S) / (0.08 * S)) + 0.05
+            rows.append({"type": typ, "strike": float(K), "bid": round(mid * 0.98, 2), "ask": round(mid * 1.02, 2),
+                         "last": mid, "openInterest": 2000, "volume": 1500, "impliedVolatility": 0.30})
+    return pd.DataFrame(rows)
+
+
+def test_credit_spreads_scan_several_widths_in_one_pass():
+    exps = (_make_exp(30),)
+    snap = MarketSnapshot(ticker="X", spot=100.0, expirations=exps, chain_loader=lambda t, e: _skewed_chain(100.0))
+    common = dict(min_days=1, days_limit=60, min_oi=0, max_spread=100.0, min_roi=0.0, min_cushion=0.0,
+                  min_poew=0.0, earn_window=0, risk_free=0.02, snapshot=snap)
+    key = ["Exp", "SellStrike", "BuyStrike", "Spread", "NetCredit", "MaxLoss"]
+    for fn in (sa.analyze_bull_put_spread, sa.analyze_bear_call_spread):
+        multi = fn("X", spread_width=[2.5, 5.0, 10.0], **common)
+        single = pd.concat([fn("X", spread_width=w, **common) for w in (2.5, 5.0, 10.0)], ignore_index=True)
+        assert set(multi["Spread"]) == {2.5, 5.0, 10.0}
+        pd.testing.assert_frame_equal(multi[key].sort_values(key).reset_index(drop=True),
+                                      single[key].sort_values(key).reset_index(drop=True))
+
+
+def test_snapshot_caches_failed_chain_and_normalized_sides():
+    n = {"calls": 0}
+
+    def _loader(t, e):
+        n["calls"] += 1
+        if e == "bad":
+            raise ValueError("no chain")
+        return _chain(50.0)
+
+    snap = MarketSnapshot(ticker="X", spot=50.0, expirations=("good", "bad"), chain_loader=_loader)
+    assert snap.chain("bad") is None and snap.chain("bad") is None
+    calls, puts = snap.sides("good")
+    assert set(calls["type"]) == {"call"} and set(puts["type"]) == {"put"}
+    assert snap.normalized("good", "put") is puts
+    assert n["calls"] == 2
+
+
+def test_snapshot_memoizes_fill_table_per_side_and_settings():
+    snap = MarketSnapshot(ticker="X", spot=50.0, expirations=("e1",), chain_loader=lambda t, e: _chain(50.0))
+    puts = snap.normalized("e1", "put")
+    fills = snap.fills("e1", "put", dte=30)
+    assert snap.fills("e1", "put", dte=45) is fills  # same fill model outside the <= 7 DTE overlay
+    assert snap.fills("e1", "put", dte=3) is not fills
+    assert snap.fills("e1", "put", dte=30, aggressiveness="aggressive") is not fills
+    assert len(fills) == len(puts)
+
+    ev = evaluate_chain(puts, S=50.0, T=30 / 365.0, right="put", fill="credit", dte=30, fills=fills)
+    ref = evaluate_chain(puts, S=50.0, T=30 / 365.0, right="put", fill="debit", dte=30)
+    np.testing.assert_array_equal(ev["debit_fill"], ref["prem"])
+    np.testing.assert_array_equal(ev["prem"], fills["credit_fill"])
+
+
+def test_prefetch_uses_one_range_request_per_contiguous_run():
+    exps = ("e1", "e2", "e3", "e4", "e5")
+    ranges, singles = [], []
+
+    def _range(t, lo, hi):
+        ranges.append((lo, hi))
+        if lo == "e5":
+            raise ValueError("provider down")
+        run = [e for e in exps if lo <= e <= hi and e != "e2"]  # e2 missing from the response
+        return pd.concat([_chain(50.0).assign(expiration=e) for e in run], ignore_index=True)
+
+    def _single(t, e):
+        singles.append(e)
+        return _chain(50.0)
+
+    snap = MarketSnapshot(ticker="X", spot=50.0, expirations=exps, chain_loader=_single, chain_range_loader=_range)
+    assert snap.prefetch(["e5", "e1", "e3", "e2"]) == 1
+    assert ranges == [("e1", "e3"), ("e5", "e5")]
+    assert set(snap.chain("e1")["expiration"]) == {"e1"} and snap.chain("e3") is not None
+    assert singles == []
+    # Missing from the bulk response / failed run -> lazy per-expiration fetch
+    snap.chain("e2")
+    snap.chain("e5")
+    assert singles == ["e2", "e5"]
+    assert snap.prefetch(exps) == 1 and ranges[-1] == ("e4", "e4")
@@ -0,0 +1,133 @@
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import data_fetching as df
+import strategy_analysis as sa
+from options_math import mc_normals, mc_pnl, mc_pnl_analytic, mc_pnl_batch
+
+_STATS = ["pnl_expected", "pnl_std", "pnl_p5", "pnl_p50", "pnl_p95", "pnl_min", "pnl_max",
+          "roi_ann_expected", "roi_ann_p5", "sharpe", "collateral"]
+
+CASES = [
+    ("CSP", [dict(S0=100, days=30, iv=0.30, Kp=K, put_premium=p) for K, p in ((90, 0.6), (95, 1.2), (100, 3.1))]),
+    ("CC", [dict(S0=100, days=30, iv=iv, Kc=K, call_premium=1.0, div_ps_annual=2.0)
+            for K, iv in ((103, 0.25), (105, 0.27), (110, 0.30))]),
+    ("BULL_PUT_SPREAD", [dict(S0=100, days=30, iv=0.05, sell_strike=90, buy_strike=85, net_credit=0.3),
+                         dict(S0=100, days=30, iv=0.25, sell_strike=95, buy_strike=90, net_credit=1.1)]),
+    ("PMCC", [dict(S0=100, days=30, iv=0.25, long_call_strike=80, long_call_cost=23, long_days_total=300,
+                   long_iv=0.28, short_call_strike=K, short_call_premium=p) for K, p in ((105, 1.1), (110, 0.5))]),
+]
+
+
+@pytest.mark.parametrize("strategy,params_list", CASES)
+def test_batch_matches_per_candidate_mc(strategy, params_list):
+    # Same seed -> same shared normals as each per-candidate run, so stats agree exactly
+    batch = mc_pnl_batch(strategy, params_list, n_paths=2000, seed=11, rf=0.03)
+    assert len(batch) == len(params_list)
+    for params, res in zip(params_list, batch):
+        ref = mc_pnl(strategy, params, n_paths=2000, seed=11, rf=0.03)
+        for key in _STATS:
+            assert res[key] == pytest.approx(ref[key], rel=1e-12, nan_ok=True), key
+        assert res.get("pnl_min_theoretical") == ref.get("pnl_min_theoretical")
+        assert np.allclose(res["pnl_paths"], ref["pnl_paths"])
+
+
+def test_batch_handles_empty_and_days_zero():
+    assert mc_pnl_batch("CSP", []) == []
+    res = mc_pnl_batch("CSP", [dict(S0=100, days=0, iv=0.3, Kp=95, put_premium=1.0)], n_paths=100, seed=1)[0]
+    assert np.isnan(res["roi_ann_expected"]) and np.isnan(res["sharpe"])
+
+
+@pytest.mark.parametrize("sampler", ["stratified", "sobol"])
+def test_quasi_mc_samplers_stabilize_tail(sampler):
+    params = dict(S0=100, days=30, iv=0.30, Kp=95, put_premium=1.2)
+    pseudo = [mc_pnl("CSP", params, n_paths=250)["pnl_p5"] for _ in range(40)]
+    qmc = [mc_pnl("CSP", params, n_paths=250, sampler=sampler)["pnl_p5"] for _ in range(40)]
+    assert np.std(qmc) < 0.5 * np.std(pseudo)
+    z = mc_normals(256, seed=3, sampler=sampler)
+    assert abs(z.mean()) < 0.02 and abs(z.std() - 1.0) < 0.05
+
+
+def test_common_random_numbers_with_fixed_seed():
+    params = dict(S0=100, days=30, iv=0.30, Kp=95, put_premium=1.2)
+    a = mc_pnl("CSP", params, n_paths=100, seed=5, sampler="stratified")
+    b = mc_pnl("CSP", dict(params, Kp=90), n_paths=100, seed=5, sampler="stratified")
+    assert np.array_equal(a["S_T"], b["S_T"])
+    assert mc_normals(100, seed=5) is mc_normals(100, seed=5)  # cached, read-only
+    assert not mc_normals(100, seed=5).flags.writeable
+
+
+ANALYTIC_CASES = [
+    ("CSP", dict(S0=100, days=30, iv=0.30, Kp=95, put_premium=1.2)),
+    ("CC", dict(S0=100, days=45, iv=0.25, Kc=105, call_premium=1.5, div_ps_annual=2.0)),
+    ("COLLAR", dict(S0=100, days=30, iv=0.30, Kc=108, call_premium=1.0, Kp=92, put_premium=1.4)),
+    ("IRON_CONDOR", dict(S0=100, days=30, iv=0.30, put_long_strike=85, put_short_strike=90,
+                         call_short_strike=110, call_long_strike=115, net_credit=1.5)),
+    ("BULL_PUT_SPREAD", dict(S0=100, days=30, iv=0.25, sell_strike=95, buy_strike=90, net_credit=1.1)),
+    ("BEAR_CALL_SPREAD", dict(S0=100, days=30, iv=0.25, sell_strike=105, buy_strike=110, net_credit=1.0)),
+]
+
+
+@pytest.mark.parametrize("strategy,params", ANALYTIC_CASES)
+def test_analytic_matches_simulation(strategy, params):
+    exact = mc_pnl_analytic(strategy, params, mu=0.05, rf=0.03)
+    sim = mc_pnl(strategy, params, n_paths=200_000, mu=0.05, seed=2, rf=0.03, sampler="stratified")
+    scale = sim["pnl_std"]
+    for key in ("pnl_expected", "pnl_std", "pnl_p5", "pnl_p50", "pnl_p95"):
+        assert abs(exact[key] - sim[key]) <= 0.01 * scale + 1e-6, key
+    assert exact["pnl_min"] <= sim["pnl_min"] + 1e-9 and exact["pnl_max"] >= sim["pnl_max"] - 1e-9
+    assert exact["roi_ann_expected"] == pytest.approx(sim["roi_ann_expected"], abs=0.02)
+    assert exact["collateral"] == pytest.approx(sim["collateral"])
+    assert exact["prob_profit"] == pytest.approx(float(np.mean(sim["pnl_paths"] > 0)), abs=0.005)
+    assert exact["method"] == "analytic" and "pnl_paths" not in exact
+
+
+def test_analytic_rejects_path_dependent_strategies():
+    with pytest.raises(ValueError):
+        mc_pnl_analytic("PMCC", dict(S0=100, days=30, iv=0.25, long_call_strike=80, long_call_cost=23,
+                                     long_days_total=300, short_call_strike=105, short_call_premium=1.1))
+
+
+def _make_exp(days):
+    return (datetime.now(timezone.utc).date() + timedelta(days=days)).strftime("%Y-%m-%d")
+
+
+def _chain(S):
+    rows = []
+    for K in np.arange(round(S * 0.6), S * 1.4, 2.5):
+        for typ in ("call", "put"):
+            itm = (S - K) if typ == "call" else (K - S)
+            mid = max(itm, 0.0) + 0.02 * S * np.exp(-abs(K - S) / (0.1 * S)) + 0.05
+            rows.append({"type": typ, "strike": float(K), "bid": round(mid * 0.97, 2), "ask": round(mid * 1.03, 2),
+                         "lastPrice": mid, "openInterest": 2000, "volume": 500, "impliedVolatility": 0.35})
+    return pd.DataFrame(rows)
+
+
+def _csp_with_cap(monkeypatch, batch):
+    monkeypatch.setattr(df, "fetch_price", lambda t: 100.0)
+    monkeypatch.setattr(df, "fetch_expirations", lambda t: [_make_exp(30)])
+    monkeypatch.setattr(df, "fetch_chain", lambda t, e: _chain(100.0))
+    monkeypatch.setattr(df, "estimate_next_ex_div", lambda stock: (None, 0.0))
+    monkeypatch.setattr(sa, "trailing_dividend_info", lambda stock, S: (0.0, 0.0))
+    monkeypatch.setattr(sa, "get_earnings_date_cached", lambda t: None)
+    monkeypatch.setenv("SCAN_MC_PATHS", "100")
+    monkeypatch.setenv("SCAN_MAX_MC_PER_EXP", "1")
+    monkeypatch.setenv("SCAN_PRE_MC_SCORE_MIN", "-1e9")
+    monkeypatch.setenv("SCAN_BATCH_MC", "1" if batch else "0")
+    monkeypatch.setenv("SCAN_ANALYTIC_STRATEGIES", "none")
+    out, _ = sa.analyze_csp("AAA", min_days=1, days_limit=60, min_otm=0.0, min_oi=0, max_spread=100.0,
+                            min_roi=0.0, min_cushion=0.0, min_poew=0.0, earn_window=0, risk_free=0.02)
+    return out
+
+
+def test_batched_scan_runs_mc_for_every_candidate(monkeypatch):
+    batched = _csp_with_cap(monkeypatch, batch=True)
+    assert len(batched) > 1
+    assert batched["MC_ExpectedPnL"].notna().all()
+
+    capped = _csp_with_cap(monkeypatch, batch=False)
+    assert len(capped) == len(batched)
+    assert capped["MC_ExpectedPnL"].notna().sum() == 1
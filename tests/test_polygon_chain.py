@@ -0,0 +1,74 @@
+import threading
+
+from providers.polygon import PolygonClient
+
+EXPS = ["2030-01-18", "2030-02-15", "2030-03-15"]
+
+
+class _Resp:
+    status_code = 200
+    text = ""
+
+    def __init__(self, data):
+        self._data = data
+
+    def json(self):
+        return self._data
+
+
+def _contract(exp, strike, typ):
+    return {"details": {"expiration_date": exp, "contract_type": typ, "strike_price": strike},
+            "last_quote": {"bid": 1.0, "ask": 1.2}, "open_interest": 10, "implied_volatility": 0.3,
+            "day": {"volume": 5}}
+
+
+class _FakeSession:
+    """Serves 2 snapshot pages per expiration; the 2nd page is reached via next_url."""
+
+    def __init__(self):
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def get(self, url, params=None, timeout=None):
+        with self.lock:
+            self.calls.append((url, dict(params or {})))
+        if "/v3/reference/options/contracts" in url:
+            return _Resp({"results": [{"expiration_date": e} for e in EXPS]})
+        if "cursor=" in url:
+            exp = url.split("cursor=")[1]
+            return _Resp({"results": [_contract(exp, 110.0, "put")]})
+        exp = params["expiration_date"]
+        assert "strike_price.gte" not in params or params["strike_price.gte"] == 95
+        return _Resp({"results": [_contract(exp, 100.0, "call"), _contract(exp, 100.0, "put")],
+                      "next_url": f"https://api.polygon.io/v3/snapshot/options/XYZ?cursor={exp}"})
+
+
+def _client():
+    c = PolygonClient(api_key="test", max_concurrency=2)
+    c.sess = _FakeSession()
+    return c
+
+
+def test_snapshot_filters_server_side_and_reports_truncation():
+    c = _client()
+    df = c.chain_snapshot_df("XYZ", "2030-02-15", strike_gte=95)
+    snap_calls = [p for u, p in c.sess.calls if "snapshot" in u and "cursor" not in u]
+    assert snap_calls == [{"expiration_date": "2030-02-15", "limit": 250, "strike_price.gte": 95}]
+    assert len(df) == 3 and set(df["expiration"]) == {"2030-02-15"} and df.attrs["truncated"] is False
+
+    df = c.chain_snapshot_df("XYZ", "2030-01-18", max_pages=1)
+    assert len(df) == 2 and df.attrs["truncated"] is True
+    assert ("XYZ", "2030-01-18") in c.truncated
+
+
+def test_range_fans_out_per_expiration_and_caches_for_the_scan():
+    c = _client()
+    df = c.chain_range_df("XYZ", "2030-01-01", "2030-02-28")
+    assert sorted(df["expiration"].unique()) == EXPS[:2] and len(df) == 6
+    assert df.attrs["truncated"] == []
+    n = len(c.sess.calls)
+    # Per-expiration calls inside the cached range are served locally
+    part = c.chain_snapshot_df("XYZ", "2030-02-15")
+    assert len(part) == 3 and len(c.sess.calls) == n
+    c.chain_snapshot_df("XYZ", "2030-03-15")
+    assert len(c.sess.calls) == n + 2
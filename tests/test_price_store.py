@@ -0,0 +1,114 @@
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from price_store import PriceStore, adjustment_factors
+
+
+def _market(seed=0, end=date(2026, 3, 31), periods=400):
+    rng = np.random.default_rng(seed)
+    idx = pd.bdate_range(end=end, periods=periods, tz="America/New_York")
+    close = 50.0 * np.exp(np.cumsum(rng.normal(0, 0.01, periods)))
+    div = np.zeros(periods)
+    div[[100, 300]] = [0.5, 0.6]
+    return pd.DataFrame({"Open": close * 0.99, "High": close * 1.01, "Low": close * 0.98, "Close": close,
+                         "Volume": rng.integers(1e5, 1e6, periods).astype(float), "Dividends": div,
+                         "Stock Splits": 0.0}, index=idx)
+
+
+class _Fetcher:
+    def __init__(self, frames):
+        self.frames = frames
+        self.calls = []
+
+    def __call__(self, symbol, start, end):
+        self.calls.append((symbol, start, end))
+        df = self.frames.get(symbol)
+        if df is None:
+            return pd.DataFrame()
+        days = df.index.tz_localize(None).normalize()
+        return df[(days >= pd.Timestamp(start)) & (days < pd.Timestamp(end))]
+
+
+def test_incremental_updates_fetch_only_the_tail(tmp_path):
+    full = _market()
+    fetch = _Fetcher({"AAA": full})
+    store = PriceStore(str(tmp_path), fetcher=fetch, backfill_days=365, mode="on")
+
+    day1 = date(2026, 3, 20)
+    store.update("AAA", today=day1)
+    assert fetch.calls == [("AAA", day1 - timedelta(days=365), day1)]
+    bars = store.bars("AAA", update=False)
+    assert bars.index[-1] == pd.Timestamp("2026-03-19")  # today's bar is never stored
+    assert store.update("AAA", today=day1) == 0 and len(fetch.calls) == 1  # checked today
+
+    day2 = date(2026, 3, 26)
+    assert store.update("AAA", today=day2) == 4  # 20, 23, 24, 25 March
+    assert fetch.calls[-1] == ("AAA", date(2026, 3, 19), day2)  # one overlapping day
+
+    # Appended store equals a one-shot fetch of the same window
+    ref = full[(full.index.tz_localize(None) >= pd.Timestamp(day1 - timedelta(days=365)))
+               & (full.index.tz_localize(None) < pd.Timestamp(day2))]
+    np.testing.assert_allclose(store.bars("AAA", update=False)["Close"].to_numpy(), ref["Close"].to_numpy())
+
+    # Unknown symbols create nothing
+    assert store.update("ZZZ", today=day2) == 0
+    assert not (tmp_path / "ZZZ").exists()
+
+
+def test_adjusted_history_and_aligned_closes(tmp_path):
+    frames = {"AAA": _market(1), "BBB": _market(2).iloc[:-3]}
+    store = PriceStore(str(tmp_path), fetcher=_Fetcher(frames), backfill_days=800, mode="on")
+    today = date(2026, 4, 1)
+    store.update_many(["AAA", "bbb"], today=today)
+
+    close = frames["AAA"]["Close"].to_numpy()
+    div = frames["AAA"]["Dividends"].to_numpy()
+    factor = adjustment_factors(close, div)
+    assert factor[-1] == 1.0 and factor[300] == 1.0
+    assert np.isclose(factor[299], 1.0 - 0.6 / close[299])
+    assert np.isclose(factor[0], (1.0 - 0.5 / close[99]) * (1.0 - 0.6 / close[299]))
+
+    start = date(2025, 6, 1)
+    hist = store.history("AAA", start=start, update=False)
+    raw = store.history("AAA", start=start, adjusted=False, update=False)
+    assert list(hist.columns) == ["Open", "High", "Low", "Close", "Volume"]
+    assert hist.index[0] >= pd.Timestamp(start)
+    np.testing.assert_allclose(hist["Close"], raw["Close"] * factor[-len(hist):])
+
+    mat = store.closes(["AAA", "BBB", "CCC"], start=start, update=False)
+    assert list(mat.columns) == ["AAA", "BBB"]
+    assert mat.index.is_monotonic_increasing and mat["BBB"].iloc[-3:].isna().all()
+    np.testing.assert_allclose(mat["AAA"], hist["Close"])
+
+
+def test_split_rebuilds_and_interrupted_append_is_ignored(tmp_path):
+    full = _market(3)
+    fetch = _Fetcher({"AAA": full})
+    store = PriceStore(str(tmp_path), fetcher=fetch, backfill_days=365, mode="on")
+    store.update("AAA", today=date(2026, 3, 20))
+    rows = len(store.bars("AAA", update=False))
+
+    # Bytes from a crashed append are beyond the committed row count
+    with open(tmp_path / "AAA" / "close.f8", "ab") as fh:
+        fh.write(np.ones(3).tobytes())
+    assert len(store.bars("AAA", update=False)) == rows
+
+    # A 2:1 split rescales every earlier close: the overlap check triggers a full refetch
+    split = full.copy()
+    split[["Open", "High", "Low", "Close"]] /= 2.0
+    fetch.frames["AAA"] = split
+    store.update("AAA", today=date(2026, 3, 24))
+    bars = store.bars("AAA", update=False)
+    assert len(bars) == rows + 2
+    ref = split["Close"].set_axis(split.index.tz_localize(None)).reindex(bars.index)
+    np.testing.assert_allclose(bars["Close"].to_numpy(), ref.to_numpy())
+
+
+def test_off_mode_fetches_directly_without_disk(tmp_path):
+    fetch = _Fetcher({"AAA": _market(4, end=date.today() - timedelta(days=1))})
+    store = PriceStore(str(tmp_path / "store"), fetcher=fetch, mode="off")
+    hist = store.history("AAA", start=date.today() - timedelta(days=92))
+    assert len(hist) > 50 and len(fetch.calls) == 1
+    assert not (tmp_path / "store").exists()
@@ -0,0 +1,153 @@
+import json
+import os
+import subprocess
+import sys
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+
+import strategy_analysis as sa
+import data_fetching as df
+import scan_engine
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _make_exp(days):
+    return (datetime.now(timezone.utc).date() + timedelta(days=days)).strftime("%Y-%m-%d")
+
+
+def _chain(S):
+    rows = []
+    for K in np.arange(round(S * 0.6), S * 1.4, 2.5):
+        for typ in ("call", "put"):
+            itm = (S - K) if typ == "call" else (K - S)
+            mid = max(itm, 0.0) + 0.02 * S * np.exp(-abs(K - S) / (0.1 * S)) + 0.05
+            rows.append({"type": typ, "strike": float(K), "bid": round(mid * 0.97, 2), "ask": round(mid * 1.03, 2),
+                         "lastPrice": mid, "openInterest": 2000, "volume": 500, "impliedVolatility": 0.35})
+    return pd.DataFrame(rows)
+
+
+def test_engine_import_does_not_load_streamlit():
+    code = ("import sys, scan_engine, data_fetching; "
+            "print(sorted(m for m in ('streamlit', 'altair', 'strategy_lab') if m in sys.modules))")
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "[]"
+
+
+def test_ttl_cache_fallback_caches_copies_and_clears():
+    n = {"calls": 0}
+
+    @df._ttl_cache_data(ttl=60)
+    def _load(t):
+        n["calls"] += 1
+        return pd.DataFrame({"x": [1.0, 2.0]})
+
+    a = _load("A")
+    a.loc[0, "x"] = 99.0  # callers get copies; the cached frame is untouched
+    assert _load("A")["x"].tolist() == [1.0, 2.0] and n["calls"] == 1
+    _load("B")
+    _load.clear()
+    _load("A")
+    assert n["calls"] == 3
+
+
+def test_cli_writes_one_file_per_strategy(monkeypatch, tmp_path, capsys):
+    exps = [_make_exp(d) for d in (14, 35)]
+    monkeypatch.setattr(df, "fetch_price", lambda t: 100.0)
+    monkeypatch.setattr(df, "fetch_expirations", lambda t: exps)
+    monkeypatch.setattr(df, "fetch_chain", lambda t, e: _chain(100.0))
+    monkeypatch.setattr(df, "estimate_next_ex_div", lambda stock: (None, 0.0))
+    monkeypatch.setattr(sa, "trailing_dividend_info", lambda stock, S: (0.0, 0.0))
+    monkeypatch.setattr(sa, "get_earnings_date_cached", lambda t: None)
+    monkeypatch.setenv("SCAN_MC_PATHS", "50")
+
+    params_file = tmp_path / "params.json"
+    params_file.write_text(json.dumps({"min_oi": 0, "max_spread": 100.0, "min_poew": 0.0, "min_cushion": 0.0}))
+    rc = scan_engine.main(["aaa,bbb", "--out", str(tmp_path / "out"), "--format", "csv", "--prefix", "t",
+                           "--params", str(params_file), "--param", "min_roi_csp=0.0", "--param", "min_otm_csp=0",
+                           "--param", "require_nonneg_mc=false", "--executor", "thread"])
+    assert rc == 0
+    assert "Scanned 2 tickers" in capsys.readouterr().out
+
+    files = sorted(os.listdir(tmp_path / "out"))
+    assert "t_counters.json" in files and "t_csp.csv" in files
+    csp = pd.read_csv(tmp_path / "out" / "t_csp.csv")
+    assert set(csp["Ticker"]) == {"AAA", "BBB"}
+    counters = json.loads((tmp_path / "out" / "t_counters.json").read_text())
+    assert counters["CSP"]
+
+
+def test_stream_yields_tickers_as_they_finish(monkeypatch):
+    import time
+
+    exps = [_make_exp(d) for d in (14, 35)]
+
+    def _price(t):
+        if t == "SLOW":
+            time.sleep(0.5)
+        return 100.0
+
+    monkeypatch.setattr(df, "fetch_price", _price)
+    monkeypatch.setattr(df, "fetch_expirations", lambda t: exps)
+    monkeypatch.setattr(df, "fetch_chain", lambda t, e: _chain(100.0))
+    monkeypatch.setattr(df, "estimate_next_ex_div", lambda stock: (None, 0.0))
+    monkeypatch.setattr(sa, "trailing_dividend_info", lambda stock, S: (0.0, 0.0))
+    monkeypatch.setattr(sa, "get_earnings_date_cached", lambda t: None)
+    monkeypatch.setenv("SCAN_MC_PATHS", "50")
+    monkeypatch.setenv("SCAN_MC_SEED", "7")
+    params = dict(scan_engine.DEFAULT_SCAN_PARAMS, min_oi=0, max_spread=100.0, min_poew=0.0, min_cushion=0.0,
+                  min_roi_csp=0.0, min_otm_csp=0.0, scan_executor="thread")
+    tickers = ["SLOW", "AAA", "BBB"]
+
+    updates = list(scan_engine.stream_scans(tickers, params))
+    # The slow ticker is listed first but does not hold back the others
+    assert updates[-2].ticker == "SLOW" and updates[-1].ticker is None
+    assert [u.done for u in updates] == [1, 2, 3, 3]
+    assert updates[0].eta is not None and updates[-1].progress == 1.0
+    assert "csp" in updates[0].frames
+
+    full = scan_engine.run_scans(tickers, params)
+    for a, b in zip(updates[-1].result[:8], full[:8]):
+        pd.testing.assert_frame_equal(a, b)
+    assert updates[-1].result[-1] == full[-1]
+    assert list(full[0]["Ticker"].unique()) == tickers  # merged in input order
+
+    board = scan_engine.leaderboard([(k, d) for u in updates[:-1] for k, d in u.frames.items()], n=10)
+    assert len(board) == 10 and board["UnifiedScore"].is_monotonic_decreasing
+
+
+def test_scan_profile_times_stages_per_ticker_and_strategy(monkeypatch):
+    from scan_profile import TickerProfile, profile_frame, profiling, timer
+
+    exps = [_make_exp(d) for d in (14, 35)]
+    monkeypatch.setattr(df, "fetch_price", lambda t: 100.0)
+    monkeypatch.setattr(df, "fetch_expirations", lambda t: exps)
+    monkeypatch.setattr(df, "fetch_chain", lambda t, e: _chain(100.0))
+    monkeypatch.setattr(df, "estimate_next_ex_div", lambda stock: (None, 0.0))
+    monkeypatch.setattr(sa, "trailing_dividend_info", lambda stock, S: (0.0, 0.0))
+    monkeypatch.setattr(sa, "get_earnings_date_cached", lambda t: None)
+    monkeypatch.setenv("SCAN_MC_PATHS", "50")
+    params = dict(scan_engine.DEFAULT_SCAN_PARAMS, min_oi=0, max_spread=100.0, min_poew=0.0, min_cushion=0.0,
+                  min_roi_csp=0.0, min_otm_csp=0.0, scan_executor="thread")
+
+    assert "profile" not in scan_engine.run_scans(["AAA"], params)[-1]
+    assert timer("fetch_price") is timer("mc")  # shared no-op when profiling is off
+
+    prof = scan_engine.run_scans(["AAA", "BBB"], dict(params, scan_profile=True))[-1]["profile"]
+    assert {"fetch_price", "fetch_expirations", "fetch_chain", "analyze", "mc", "score"} <= set(prof["stages"])
+    assert set(prof["tickers"]) == {"AAA", "BBB"}
+    assert prof["tickers"]["AAA"]["fetch_chain"]["count"] == len(exps)
+    csp = prof["strategies"]["csp"]
+    assert csp["analyze"]["count"] == 2 and csp["mc"]["count"] > 0
+    assert 0 <= csp["filter"]["seconds"] <= csp["analyze"]["seconds"]
+    assert prof["wall_seconds"] > 0
+    assert set(profile_frame(prof, "strategies")["strategy"]) == set(scan_engine.STRATEGIES)
+    json.dumps(prof)
+
+    # Provider round trips are labelled with the provider
+    ticker_prof = TickerProfile()
+    with profiling(ticker_prof):
+        assert df._provider_call("polygon", lambda: 1) == 1
+    assert ticker_prof.stats[("request", None, "polygon")][0] == 1
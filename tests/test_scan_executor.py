@@ -0,0 +1,208 @@
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+
+import strategy_analysis as sa
+import data_fetching as df
+import scan_executor as se
+
+
+def _make_exp(days):
+    return (datetime.now(timezone.utc).date() + timedelta(days=days)).strftime("%Y-%m-%d")
+
+
+def _chain(S):
+    rows = []
+    for K in np.arange(round(S * 0.6), S * 1.4, 2.5):
+        for typ in ("call", "put"):
+            itm = (S - K) if typ == "call" else (K - S)
+            mid = max(itm, 0.0) + 0.02 * S * np.exp(-abs(K - S) / (0.1 * S)) + 0.05
+            rows.append({"type": typ, "strike": float(K), "bid": round(mid * 0.97, 2), "ask": round(mid * 1.03, 2),
+                         "lastPrice": mid, "openInterest": 2000, "volume": 500, "impliedVolatility": 0.35})
+    return pd.DataFrame(rows)
+
+
+PARAMS = dict(
+    min_days=1, days_limit=60, min_otm_csp=0.0, min_roi_csp=0.0, min_cushion=0.0, min_poew=0.0,
+    min_otm_cc=0.0, min_roi_cc=0.0, include_div_cc=True, call_delta_tgt=0.25, put_delta_tgt=0.25,
+    include_div_col=True, min_net_credit=None, ic_target_delta=0.20, ic_spread_width_put=5.0,
+    ic_spread_width_call=5.0, ic_min_roi=0.0, ic_min_cushion=0.0, cs_spread_width=5.0,
+    cs_target_delta=0.20, cs_min_roi=0.0, min_oi=0, max_spread=100.0, earn_window=0,
+    risk_free=0.02, per_contract_cap=None, bill_yield=0.0,
+)
+
+_KEYS = ["Ticker", "Exp", "Strike", "Premium"]
+
+
+def _patch_market(monkeypatch, fetched):
+    spots = {"AAA": 100.0, "BBB": 50.0}
+    exps = [_make_exp(d) for d in (14, 35, 250)]
+
+    def _price(t):
+        if t not in spots:
+            raise ValueError(f"No price data for {t}")
+        return spots[t]
+
+    def _fetch_chain(t, e):
+        fetched.append((t, e))
+        return _chain(spots[t])
+
+    monkeypatch.setattr(df, "fetch_price", _price)
+    monkeypatch.setattr(df, "fetch_expirations", lambda t: exps)
+    monkeypatch.setattr(df, "fetch_chain", _fetch_chain)
+    monkeypatch.setattr(df, "estimate_next_ex_div", lambda stock: (None, 0.0))
+    monkeypatch.setattr(sa, "trailing_dividend_info", lambda stock, S: (0.0, 0.0))
+    monkeypatch.setattr(sa, "get_earnings_date_cached", lambda t: None)
+    monkeypatch.setenv("SCAN_MC_PATHS", "50")
+
+
+def test_thread_and_process_executors_agree(monkeypatch):
+    fetched = []
+    _patch_market(monkeypatch, fetched)
+    monkeypatch.setenv("SCAN_MP_START", "fork")
+    # MC is unseeded and can filter rows; switching it off (propagated to workers) makes both runs deterministic
+    monkeypatch.setenv("SCAN_PRE_MC_SCORE_MIN", "1e9")
+    tickers = ["BBB", "ZZZ", "AAA"]
+
+    by_thread = se.execute_scan(tickers, PARAMS, mode="thread", max_workers=3)
+    by_process = se.execute_scan(tickers, PARAMS, mode="process", max_workers=2)
+
+    # Input order is preserved and failures are reported per ticker
+    assert [t for t, _, _ in by_thread] == tickers == [t for t, _, _ in by_process]
+    assert by_thread[1][1] is None and "No price data" in by_thread[1][2]
+    assert by_process[1][1] is None and "No price data" in by_process[1][2]
+
+    n_rows = 0
+    for (_, r_thr, _), (_, r_proc, _) in zip(by_thread, by_process):
+        if r_thr is None:
+            continue
+        assert r_thr[1] == r_proc[1]  # CSP counters
+        for a, b in zip(r_thr[:1] + r_thr[2:], r_proc[:1] + r_proc[2:]):
+            assert list(a.columns) == list(b.columns)
+            if a.empty:
+                continue
+            cols = [c for c in _KEYS if c in a.columns]
+            pd.testing.assert_frame_equal(a[cols].reset_index(drop=True), b[cols].reset_index(drop=True))
+            n_rows += len(a)
+    assert n_rows > 0
+
+
+def test_process_payload_only_ships_scanned_expirations(monkeypatch):
+    fetched = []
+    _patch_market(monkeypatch, fetched)
+    snap = sa.fetch_market_snapshot("AAA")
+    exps = se.scan_expirations(snap, dict(PARAMS, pmcc_long_days_min=300, syn_long_days_min=300))
+    assert len(exps) == 2  # the 250-day expiration is outside every window
+    payload = snap.to_payload(exps)
+    assert all(isinstance(v, np.ndarray) for v in payload["chains"][exps[0]]["cols"].values())
+
+
+def test_credit_spread_failure_does_not_fail_ticker(monkeypatch):
+    fetched = []
+    _patch_market(monkeypatch, fetched)
+    # An unusable spread width makes both credit-spread analyzers raise; the other strategies stand
+    out = se.execute_scan(["AAA"], dict(PARAMS, cs_spread_width="wide"), mode="thread")
+    (_, res, err), = out
+    assert err is None
+    csp, cc, bull_put, bear_call = res[0], res[2], res[5], res[6]
+    assert not csp.empty and not cc.empty
+    assert bull_put.empty and bear_call.empty
+
+
+def test_deadlines_report_slow_and_hung_tickers(monkeypatch):
+    import time
+
+    from scan_control import ScanReport
+
+    def _price(t):
+        if t == "HUNG":
+            time.sleep(4.0)  # never reaches a checkpoint
+            raise ValueError("gave up")
+        return 100.0
+
+    def _fetch_chain(t, e):
+        if t == "SLOW":
+            time.sleep(2.0)
+        return _chain(100.0)
+
+    _patch_market(monkeypatch, [])
+    monkeypatch.setattr(df, "fetch_price", _price)
+    monkeypatch.setattr(df, "fetch_chain", _fetch_chain)
+    monkeypatch.setenv("SCAN_TIMEOUT_GRACE", "1.0")
+    se.scan_ticker("AAA", PARAMS)  # first scan in a process pays one-off import costs
+    report = ScanReport()
+
+    start = time.monotonic()
+    out = se.execute_scan(["HUNG", "SLOW", "AAA"], dict(PARAMS, scan_ticker_timeout=1.5), mode="thread",
+                          report=report)
+    assert time.monotonic() - start < 3.5
+    res = {t: (r, e) for t, r, e in out}
+    assert res["AAA"][0] is not None and res["AAA"][1] is None, res["AAA"][1]
+    assert sorted(report.timed_out) == ["HUNG", "SLOW"] and not report.failed
+    assert "ScanTimeout" in res["SLOW"][1] and "Traceback" in res["SLOW"][1]  # stopped at a checkpoint
+    assert res["HUNG"][1].startswith("ScanTimeout")  # abandoned by the executor
+
+
+def test_provider_fallback_is_reported_as_degraded(monkeypatch):
+    import inspect
+    import sys
+    import types
+
+    from providers.rate_limit import reset_circuit_breakers
+    from scan_control import ScanReport
+
+    calls = []
+
+    class _BadPolygon:
+        def last_price(self, t):
+            calls.append(t)
+            raise ValueError("401 Unauthorized")
+
+    raw_fetch_price = inspect.unwrap(df.fetch_price)  # no caches
+    _patch_market(monkeypatch, [])
+    monkeypatch.setattr(df, "fetch_price", raw_fetch_price)
+    monkeypatch.setattr(df, "fetch_chain", lambda t, e: _chain(100.0))
+    monkeypatch.setitem(sys.modules, "strategy_lab", types.SimpleNamespace(POLY=_BadPolygon(), USE_POLYGON=True))
+    monkeypatch.setattr(df.yf, "Ticker", lambda t: types.SimpleNamespace(
+        history=lambda period: pd.DataFrame({"Close": [100.0]})))
+    monkeypatch.setenv("POLYGON_CIRCUIT_BREAKER", "2/60/600")
+    reset_circuit_breakers()
+    try:
+        report = ScanReport()
+        out = se.execute_scan(["AAA", "BBB", "CCC"], dict(PARAMS, scan_workers=1), mode="thread", report=report)
+    finally:
+        reset_circuit_breakers()
+    assert all(err is None for _, _, err in out)
+    assert calls == ["AAA", "BBB"]  # breaker open after two failures: CCC goes straight to yfinance
+    assert report.degraded["AAA"] == [("polygon", "401 Unauthorized")]
+    assert report.degraded["CCC"] == [("polygon", "circuit open")]
+
+
+def test_two_phase_and_incremental_scans_honor_deadlines(monkeypatch):
+    import time
+
+    import scan_engine
+    from incremental_scan import IncrementalScanner
+
+    def _price(t):
+        if t == "HUNG":
+            time.sleep(4.0)  # never reaches a checkpoint
+            raise ValueError("gave up")
+        return 100.0
+
+    _patch_market(monkeypatch, [])
+    monkeypatch.setattr(df, "fetch_price", _price)
+    monkeypatch.setenv("SCAN_TIMEOUT_GRACE", "1.0")
+    params = dict(scan_engine.DEFAULT_SCAN_PARAMS, **PARAMS, scan_executor="thread", scan_ticker_timeout=1.5,
+                  require_nonneg_mc=False)
+    scan_engine.run_scans(["AAA"], dict(params, mc_top_k=3))  # first scan in a process pays one-off import costs
+
+    for kw in ({"scanner": IncrementalScanner()}, {}):
+        run_params = params if kw else dict(params, mc_top_k=3)
+        start = time.monotonic()
+        out = scan_engine.run_scans(["HUNG", "AAA"], run_params, on_error=lambda t, e: None, **kw)
+        assert time.monotonic() - start < 3.5, kw
+        report = out[-1]["report"]
+        assert report["timed_out"] == ["HUNG"] and not report["failed"], kw
+        assert not out[0].empty and set(out[0]["Ticker"]) == {"AAA"}, kw
@@ -0,0 +1,58 @@
+from providers.schwab import SchwabClient
+
+
+class _Resp:
+    def __init__(self, data):
+        self._data = data
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self._data
+
+
+def _contract(strike, iv=30.0):
+    return {"strikePrice": strike, "bid": 1.0, "ask": 1.2, "last": 1.1, "openInterest": 10,
+            "volatility": iv, "totalVolume": 5, "expirationDate": ""}
+
+
+def _exp_map(exps):
+    return {f"{e}:10": {"100.0": [_contract(100.0)], "105.0": [_contract(105.0)]} for e in exps}
+
+
+class _FakeApi:
+    def __init__(self):
+        self.chain_calls = []
+
+    def get_option_expiration_chain(self, symbol):
+        return _Resp({"expirationList": [{"expirationDate": "2030-02-15"}, {"expirationDate": "2030-01-18"}]})
+
+    def get_option_chain(self, symbol, contract_type=None, from_date=None, to_date=None):
+        self.chain_calls.append((from_date, to_date))
+        exps = ["2030-01-18", "2030-02-15", "2030-03-15"]
+        return _Resp({"callExpDateMap": _exp_map(exps), "putExpDateMap": _exp_map(exps)})
+
+
+def _client():
+    c = SchwabClient.__new__(SchwabClient)  # skip OAuth
+    c.client = _FakeApi()
+    return c
+
+
+def test_chain_range_is_one_request_split_by_expiration():
+    c = _client()
+    df = c.chain_range_df("xyz", "2030-01-01", "2030-02-28")
+    assert len(c.client.chain_calls) == 1
+    assert sorted(df["expiration"].unique()) == ["2030-01-18", "2030-02-15"]
+    assert set(df["type"]) == {"call", "put"} and len(df) == 8
+    assert abs(df["impliedVolatility"].iloc[0] - 0.30) < 1e-12
+
+    single = c.chain_snapshot_df("xyz", "2030-02-15")
+    assert set(single["expiration"]) == {"2030-02-15"} and len(single) == 4
+
+
+def test_expirations_use_expiration_chain_endpoint():
+    c = _client()
+    assert c.expirations("xyz") == ["2030-01-18", "2030-02-15"]
+    assert c.client.chain_calls == []
@@ -0,0 +1,92 @@
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+
+import strategy_analysis as sa
+import data_fetching as df
+import scan_engine
+from options_math import mc_pnl_analytic
+
+_KEY = ["Ticker", "Exp", "Strike", "SellStrike", "BuyStrike", "CallStrike", "PutStrike"]
+
+
+def _make_exp(days):
+    return (datetime.now(timezone.utc).date() + timedelta(days=days)).strftime("%Y-%m-%d")
+
+
+def _chain(S):
+    rows = []
+    for K in np.arange(round(S * 0.6), S * 1.4, 2.5):
+        for typ in ("call", "put"):
+            itm = (S - K) if typ == "call" else (K - S)
+            mid = max(itm, 0.0) + 0.02 * S * np.exp(-abs(K - S) / (0.1 * S)) + 0.05
+            rows.append({"type": typ, "strike": float(K), "bid": round(mid * 0.97, 2), "ask": round(mid * 1.03, 2),
+                         "lastPrice": mid, "openInterest": 2000, "volume": 500, "impliedVolatility": 0.35})
+    return pd.DataFrame(rows)
+
+
+def _setup(monkeypatch, calls):
+    spots = {"AAA": 100.0, "BBB": 50.0}
+    exps = [_make_exp(d) for d in (14, 35)]
+    monkeypatch.setattr(df, "fetch_price", lambda t: spots[t])
+    monkeypatch.setattr(df, "fetch_expirations", lambda t: exps)
+    monkeypatch.setattr(df, "fetch_chain", lambda t, e: _chain(spots[t]))
+    monkeypatch.setattr(df, "estimate_next_ex_div", lambda stock: (None, 0.0))
+    monkeypatch.setattr(sa, "trailing_dividend_info", lambda stock, S: (0.0, 0.0))
+    monkeypatch.setattr(sa, "get_earnings_date_cached", lambda t: None)
+    monkeypatch.setenv("SCAN_MC_PATHS", "100")
+    monkeypatch.setenv("SCAN_PRE_MC_SCORE_MIN", "-1e9")
+
+    def _counting(strategy, params, **kw):
+        calls.append(strategy)
+        return mc_pnl_analytic(strategy, params, **kw)
+
+    monkeypatch.setattr(sa, "mc_pnl_analytic", _counting)
+
+
+def _params(**kw):
+    params = dict(scan_engine.DEFAULT_SCAN_PARAMS, min_oi=0, max_spread=100.0, min_poew=0.0, min_cushion=0.0,
+                  min_roi_csp=0.0, min_otm_csp=0.0, min_roi_cc=0.0, min_otm_cc=0.0, cs_min_roi=0.0,
+                  ic_min_roi=0.0, ic_min_cushion=0.0, require_nonneg_mc=False, scan_executor="thread")
+    params.update(kw)
+    return params
+
+
+def _rows(frame):
+    key = [c for c in _KEY if c in frame.columns]
+    return frame.sort_values(key).reset_index(drop=True)
+
+
+def test_two_phase_enriches_only_global_top_k(monkeypatch):
+    calls = []
+    _setup(monkeypatch, calls)
+    full = scan_engine.run_scans(["AAA", "BBB"], _params())
+    full_calls = len(calls)
+
+    calls.clear()
+    top = scan_engine.run_scans(["AAA", "BBB"], _params(mc_top_k=3))
+    assert 0 < len(calls) <= 3 * 6  # analytic strategies only, at most K each
+    assert len(calls) < full_calls
+
+    for name, a, b in zip(scan_engine.STRATEGIES[:6], top[:6], full[:6]):
+        assert len(a) <= 3, name
+        if a.empty:
+            continue
+        assert a["MC_ExpectedPnL"].notna().all()
+        # Survivors come out exactly as in the single-pass scan
+        key = [c for c in _KEY if c in a.columns]
+        same = b.merge(a[key], on=key)
+        pd.testing.assert_frame_equal(_rows(a)[same.columns], _rows(same))
+    assert top[-1] == full[-1]
+
+
+def test_top_k_is_global_across_tickers(monkeypatch):
+    _setup(monkeypatch, [])
+    full = scan_engine.run_scans(["AAA", "BBB"], _params())
+    top = scan_engine.run_scans(["AAA", "BBB"], _params(mc_top_k=2))
+    csp = top[0]
+    assert len(csp) == 2
+    # Phase-1 score is the heuristic Score; the two best across both tickers survive
+    best = full[0].sort_values("Score", ascending=False).head(2)
+    assert sorted(csp["Score"]) == sorted(best["Score"])
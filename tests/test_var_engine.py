@@ -0,0 +1,150 @@
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from options_math import implied_vol_vec
+from risk_metrics import var_calculator as vc
+
+
+def _book():
+    exp = (date.today() + timedelta(days=40)).isoformat()
+    positions = [
+        {"symbol": "AAA", "quantity": 100, "underlying_price": 50.0, "position_type": "STOCK", "market_value": 5000.0},
+        {"symbol": "AAA", "quantity": -2, "underlying_price": 50.0, "position_type": "PUT", "option_price": 1.1,
+         "strike": 46.0, "expiration": exp, "market_value": -220.0},
+        {"symbol": "BBB", "quantity": 1, "underlying_price": 120.0, "position_type": "CALL", "option_price": 4.0,
+         "strike": 125.0, "expiration": exp, "market_value": 400.0},
+        {"symbol": "CCC", "quantity": 10, "underlying_price": 10.0, "position_type": "STOCK"},  # no history
+    ]
+    rng = np.random.default_rng(5)
+    idx = pd.bdate_range(end=date.today(), periods=260)
+    prices = pd.DataFrame({"AAA": 50.0 * np.exp(np.cumsum(rng.normal(0, 0.02, 260))),
+                           "BBB": 120.0 * np.exp(np.cumsum(rng.normal(0, 0.015, 260)))}, index=idx)
+    prices.iloc[3, 1] = np.nan
+    return positions, prices
+
+
+def test_scenario_matrix_matches_scalar_repricing():
+    positions, prices = _book()
+    returns, symbols = vc.historical_scenarios(positions, prices)
+    pnl, included = vc.scenario_pnl_matrix(positions, returns, symbols)
+    assert pnl.shape == (len(returns), 4)
+    assert included.tolist() == [True, True, True, False]
+    assert not pnl[:, 3].any()
+
+    now = pd.Timestamp.now().to_pydatetime()
+    for j, pos in enumerate(positions[:3]):
+        r = returns[:, symbols.index(pos["symbol"])]
+        if pos["position_type"] == "STOCK":
+            expected = pos["quantity"] * pos["underlying_price"] * r
+        else:
+            T0 = vc._years_to_expiry(pos["expiration"], now)
+            is_call = pos["position_type"] == "CALL"
+            price = vc._bs_call_price if is_call else vc._bs_put_price
+            sigma, converged = implied_vol_vec(pos["option_price"], pos["underlying_price"], pos["strike"], T0,
+                                               vc.RISK_FREE_RATE, 0.0, is_call)
+            assert converged
+            assert abs(price(pos["underlying_price"], pos["strike"], T0, vc.RISK_FREE_RATE, float(sigma))
+                       - pos["option_price"]) < 1e-6
+            sigma = float(sigma)
+            T1 = T0 - 1.0 / vc.TRADING_DAYS_PER_YEAR
+            expected = np.array([pos["quantity"] * 100.0 * (
+                price(pos["underlying_price"] * (1 + x), pos["strike"], T1, vc.RISK_FREE_RATE, sigma)
+                - pos["option_price"]) for x in r])
+        np.testing.assert_allclose(pnl[:, j], expected, rtol=1e-9, atol=1e-9)
+
+
+def test_window_sums_and_cvar_contributions():
+    x = np.random.default_rng(1).normal(size=(50, 3))
+    loop = np.array([x[i:i + 5].sum(axis=0) for i in range(len(x) - 4)])
+    np.testing.assert_allclose(vc.window_sums(x, 5), loop)
+    np.testing.assert_allclose(vc.window_sums(x[:, 0], 5), loop[:, 0])
+    assert vc.window_sums(x, 1) is not None and len(vc.window_sums(x, 60)) == 0
+
+    positions, prices = _book()
+    for horizon in (1, 10):
+        res = vc.calculate_portfolio_var(positions, prices, confidence_level=0.95, time_horizon_days=horizon)
+        assert res.data_points == len(prices) - 2
+        assert set(res.cvar_contributions) == {"AAA", "BBB"}
+        assert abs(sum(res.cvar_contributions.values()) - res.cvar_amount) < 1e-6
+        assert res.var_amount <= res.cvar_amount
+
+
+def test_monte_carlo_var_matches_lognormal_and_is_chunk_invariant():
+    rng = np.random.default_rng(2)
+    idx = pd.bdate_range(end=date.today(), periods=501)
+    prices = pd.DataFrame({"A": 100.0 * np.exp(np.cumsum(rng.normal(0, 0.02, 501)))}, index=idx)
+    stock = [{"symbol": "A", "quantity": 100, "underlying_price": 100.0, "position_type": "STOCK",
+              "market_value": 10000.0}]
+    res = vc.calculate_portfolio_var(stock, prices, confidence_level=0.99, time_horizon_days=10,
+                                     method="monte_carlo", n_paths=100000, seed=1)
+    sd = np.std(np.diff(np.log(prices["A"].to_numpy())))
+    expected = 10000.0 * (1.0 - np.exp(-2.3263 * sd * np.sqrt(10)))
+    assert res.method == "monte_carlo" and res.data_points == 100000
+    assert abs(res.var_amount - expected) / expected < 0.03
+
+    positions, prices = _book()
+    a = vc.calculate_monte_carlo_var(positions, prices, 0.99, 10, n_paths=3000, seed=4, chunk_size=257)
+    b = vc.calculate_monte_carlo_var(positions, prices, 0.99, 10, n_paths=3000, seed=4, chunk_size=3000)
+    assert a.var_amount == b.var_amount and a.cvar_amount == b.cvar_amount
+    assert a.cvar_contributions == b.cvar_contributions
+    assert abs(sum(a.cvar_contributions.values()) - a.cvar_amount) < 1e-6
+
+    # IV shocks widen the tail of a short-premium book
+    short_put = [p for p in positions if p["position_type"] == "PUT"]
+    fixed_iv = vc.calculate_monte_carlo_var(short_put, prices, 0.99, 10, n_paths=5000, seed=4, vol_of_vol=0.0)
+    shocked = vc.calculate_monte_carlo_var(short_put, prices, 0.99, 10, n_paths=5000, seed=4, vol_of_vol=1.5)
+    assert shocked.var_amount > fixed_iv.var_amount
+
+
+def test_shrunk_covariance_is_positive_definite_with_few_days():
+    x = np.random.default_rng(0).normal(size=(20, 40))  # more underlyings than days
+    cov, intensity = vc.shrunk_covariance(x)
+    assert 0.0 < intensity <= 1.0
+    assert np.linalg.eigvalsh(cov).min() > 0
+    fixed, used = vc.shrunk_covariance(x, shrinkage=0.0)
+    np.testing.assert_allclose(fixed, np.cov(x, rowvar=False, bias=True), atol=1e-12)
+    assert used == 0.0
+
+
+def test_parametric_method_uses_portfolio_pnl_distribution():
+    positions, prices = _book()
+    hist = vc.calculate_portfolio_var(positions, prices, 0.95, 5, method="historical")
+    res = vc.calculate_portfolio_var(positions, prices, 0.95, 5, method="parametric")
+    assert res.method == "parametric" and res.data_points == hist.data_points
+    expected = -(hist.mean_return * 5 - 1.6449 * hist.volatility * np.sqrt(5))
+    assert abs(res.var_percent / 100.0 - expected) < 1e-4
+
+
+def test_risk_attribution_sums_to_var_and_matches_leg_removal():
+    positions, prices = _book()
+    positions = positions + [dict(positions[1])]  # same put twice: legs must not overwrite each other
+    for method in ("historical", "parametric", "monte_carlo"):
+        res = vc.calculate_portfolio_var(positions, prices, 0.95, 5, method=method, n_paths=4000, seed=3)
+        attr = res.attribution
+        legs = attr.by_position
+        assert len(legs) == 4 and legs.index.is_unique  # CCC has no history
+        assert legs["symbol"].tolist() == ["AAA", "AAA", "BBB", "AAA"]
+        assert legs["strategy"].tolist() == ["STOCK", "SHORT_PUT", "LONG_CALL", "SHORT_PUT"]
+        assert abs(legs["component_var"].sum() - res.var_amount) < 1e-6
+        assert abs(legs["component_cvar"].sum() - res.cvar_amount) < 1e-6
+        assert res.var_amount < res.cvar_amount
+        np.testing.assert_allclose(legs["marginal_var"] * legs["quantity"], legs["component_var"])
+        for groups in (attr.by_underlying, attr.by_strategy):
+            assert abs(groups["component_var"].sum() - res.var_amount) < 1e-6
+            assert groups["positions"].sum() == 4
+        assert attr.by_strategy.loc["SHORT_PUT", "positions"] == 2
+        assert res.position_contributions == attr.by_underlying["component_var"].to_dict()
+
+    # Incremental VaR = VaR minus the VaR of the book without the leg, on the same scenarios
+    hist = vc.calculate_portfolio_var(positions, prices, 0.95, 5)
+    without = vc.calculate_portfolio_var(positions[:4], prices, 0.95, 5)
+    assert abs(hist.attribution.by_position["incremental_var"].iloc[3] - (hist.var_amount - without.var_amount)) < 1e-6
+
+    # Monte Carlo attribution is streamed per chunk but does not depend on the chunk size
+    a = vc.calculate_monte_carlo_var(positions, prices, 0.99, 10, n_paths=3000, seed=4, chunk_size=257)
+    b = vc.calculate_monte_carlo_var(positions, prices, 0.99, 10, n_paths=3000, seed=4, chunk_size=3000)
+    pd.testing.assert_frame_equal(a.attribution.by_position, b.attribution.by_position, rtol=1e-9)
+    without = vc.calculate_monte_carlo_var(positions[:4], prices, 0.99, 10, n_paths=3000, seed=4)
+    assert abs(a.attribution.by_position["incremental_var"].iloc[3] - (a.var_amount - without.var_amount)) < 1e-6
@@ -239,3 +239,117 @@ def effective_debit(bid, ask, last=None, alpha=None, *, oi: int | None = None,
     if l == l and l > 0:
         return 1.05 * l
     return float("nan")
+
+
+# ----------------------------- Vectorized fill pricing -----------------------------
+
+def _as_float_array(x, default=float("nan")):
+    """Coerce scalar/array-like to a float ndarray, replacing non-numeric with default."""
+    if x is None:
+        return np.asarray(default, dtype=float)
+    try:
+        arr = np.asarray(x, dtype=float)
+    except Exception:
+        arr = pd.to_numeric(pd.Series(np.ravel(x)), errors="coerce").to_numpy(dtype=float)
+    return arr
+
+
+def _int_like_array(x):
+    """Vector equivalent of _safe_int(x, 0): truncate toward zero, NaN/inf -> 0."""
+    arr = _as_float_array(x, 0.0)
+    arr = np.where(np.isfinite(arr), np.trunc(arr), 0.0)
+    return arr
+
+
+def dynamic_alpha_array(bid, ask, oi=None, volume=None, dte=None,
+                        aggressiveness: str | None = None,
+                        base_default: float = 0.25) -> np.ndarray:
+    """
+    Array version of _dynamic_alpha. Produces the same alpha as the scalar
+    helper element-by-element (spread base + OI/volume/DTE overlays + preset).
+    """
+    b = _as_float_array(bid)
+    a = _as_float_array(ask)
+    b, a = np.broadcast_arrays(b, a)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        valid = (b > 0) & (a > 0) & (a >= b)
+        mid = (a + b) / 2.0
+        spread_pct = ((a - b) / mid) * 100.0
+        alpha = np.where(valid, np.clip(0.5 - 0.04 * spread_pct, 0.05, 0.5), base_default)
+
+    oi_v = _int_like_array(oi) if oi is not None else 0.0
+    vol_v = _int_like_array(volume) if volume is not None else 0.0
+    deep = (oi_v >= 2000) | (vol_v >= 1000)
+    mild = (oi_v >= 500) | (vol_v >= 250)
+    alpha = alpha + np.where(deep, 0.05, np.where(mild, 0.02, 0.0))
+
+    try:
+        if dte is not None:
+            alpha = alpha + np.where(_as_float_array(dte) <= 7, 0.03, 0.0)
+    except Exception:
+        pass
+
+    adj = 0.0
+    if isinstance(aggressiveness, str):
+        preset = aggressiveness.strip().lower()
+        if preset.startswith("conserv"):
+            adj = -0.05
+        elif preset.startswith("assert") or preset.startswith("aggres"):
+            adj = 0.10
+    return np.clip(alpha + adj, 0.05, 0.55)
+
+
+def _fill_prices(bid, ask, last, alpha):
+    """(credit, debit) fills for a shared alpha: quoted legs clamp to [bid, ask], else 0.95/1.05*last, else NaN."""
+    with np.errstate(invalid="ignore"):
+        quoted = (bid > 0) & (ask > 0) & (ask >= bid)
+        credit = np.minimum(np.maximum(bid + alpha * (ask - bid), bid), ask)
+        debit = np.minimum(np.maximum(ask - alpha * (ask - bid), bid), ask)
+        pos_last = last > 0
+        credit = np.where(quoted, credit, np.where(pos_last, 0.95 * last, np.nan))
+        debit = np.where(quoted, debit, np.where(pos_last, 1.05 * last, np.nan))
+    return credit, debit
+
+
+def effective_credit_array(bid, ask, last=None, *, oi=None, volume=None, dte=None,
+                           aggressiveness: str | None = None) -> np.ndarray:
+    """
+    Vectorized effective_credit with dynamic alpha. Identical per-element results
+    to the scalar function: bid + alpha*(ask-bid) clamped to [bid, ask], else
+    0.95*last, else NaN.
+    """
+    b, a, l = np.broadcast_arrays(_as_float_array(bid), _as_float_array(ask), _as_float_array(last))
+    alpha = dynamic_alpha_array(b, a, oi=oi, volume=volume, dte=dte, aggressiveness=aggressiveness)
+    return _fill_prices(b, a, l, alpha)[0]
+
+
+def effective_debit_array(bid, ask, last=None, *, oi=None, volume=None, dte=None,
+                          aggressiveness: str | None = None) -> np.ndarray:
+    """
+    Vectorized effective_debit with dynamic alpha. Identical per-element results
+    to the scalar function: ask - alpha*(ask-bid) clamped to [bid, ask], else
+    1.05*last, else NaN.
+    """
+    b, a, l = np.broadcast_arrays(_as_float_array(bid), _as_float_array(ask), _as_float_array(last))
+    alpha = dynamic_alpha_array(b, a, oi=oi, volume=volume, dte=dte, aggressiveness=aggressiveness)
+    return _fill_prices(b, a, l, alpha)[1]
+
+
+def fill_price_table(bid, ask, last=None, *, oi=None, volume=None, dte=None,
+                     aggressiveness: str | None = None) -> pd.DataFrame:
+    """
+    Per-contract fill prices for both sides of one chain in a single pass.
+
+    The dynamic alpha is computed once and shared by the sell-side and buy-side
+    fills, so a contract evaluated as a short leg and again as a long wing costs
+    one alpha evaluation. Row order follows the inputs.
+
+    Returns:
+        DataFrame with columns alpha, credit_fill (== effective_credit_array) and
+        debit_fill (== effective_debit_array).
+    """
+    b, a, l = np.broadcast_arrays(_as_float_array(bid), _as_float_array(ask), _as_float_array(last))
+    alpha = dynamic_alpha_array(b, a, oi=oi, volume=volume, dte=dte, aggressiveness=aggressiveness)
+    credit, debit = _fill_prices(b, a, l, alpha)
+    return pd.DataFrame({"alpha": np.atleast_1d(alpha), "credit_fill": np.atleast_1d(credit),
+                         "debit_fill": np.atleast_1d(debit)})